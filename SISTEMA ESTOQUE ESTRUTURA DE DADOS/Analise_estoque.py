@@ -0,0 +1,177 @@
+# Análise vetorizada do estoque com NumPy.
+# Os relatórios do menu consultam os índices do Estoque produto a produto, o que é ótimo
+# para o estoque vivo. Para analisar um estoque muito grande de uma vez (por exemplo, o
+# snapshot binário, com milhões de engradados), esta análise exporta os engradados para
+# vetores NumPy e calcula todos os relatórios com operações vetorizadas (bincount,
+# máscaras e ordenação), sem um laço Python por engradado.
+#
+# Os vetores vêm da MatrizColunar: sobre os seus vetores de inteiros (ou as memoryviews
+# de um snapshot mapeado em memória) o NumPy cria visões sem copiar os dados.
+#
+# O NumPy é opcional: sem ele o restante do sistema funciona normalmente, e criar uma
+# AnaliseEstoque gera um ImportError com a explicação.
+from datetime import datetime, timedelta
+from Matriz_colunar import MatrizColunar
+
+try:
+    import numpy as np
+except ImportError: # O NumPy não é uma dependência obrigatória.
+    np = None
+
+# Ordinal usado como validade dos produtos fora do catálogo: nunca entram no relatório de vencimento.
+SEM_VALIDADE = datetime.max.toordinal()
+
+
+class AnaliseEstoque:
+    """
+    Vetores NumPy com os engradados do estoque e os relatórios calculados sobre eles.
+    """
+    def __init__(self, matriz, produtos_cadastrados):
+        """
+        Exporta os engradados da matriz colunar para vetores NumPy.
+
+        Args:
+            matriz (MatrizColunar): O estoque em formato colunar.
+            produtos_cadastrados (CatalogoProdutos): O catálogo, de onde vêm nomes, preços e validades.
+
+        Raises:
+            ImportError: Se o NumPy não estiver instalado.
+        """
+        if np is None:
+            raise ImportError("A análise vetorizada do estoque precisa do NumPy (pip install numpy).")
+        self.produtos_cadastrados = produtos_cadastrados
+        self.codigos = list(matriz.codigos)
+
+        # Visões sem cópia sobre os vetores da matriz; os níveis vazios têm produto -1.
+        produtos = np.frombuffer(matriz.produtos, dtype=np.intc)
+        quantidades = np.frombuffer(matriz.quantidades, dtype=np.intc)
+        ocupados = np.flatnonzero(produtos >= 0)
+        # Um elemento por engradado: produto (identificador interno), quantidade e posição
+        # (na lista plana, linha * colunas + coluna), na ordem linha a linha da matriz.
+        self.produto = produtos[ocupados]
+        self.quantidade = quantidades[ocupados].astype(np.int64)
+        self.posicao = ocupados // matriz.altura_maxima
+        self.colunas = matriz.colunas
+
+        # Tabelas por produto, alinhadas aos identificadores internos.
+        catalogo = [produtos_cadastrados.obter(codigo) for codigo in self.codigos]
+        self.preco_compra = np.array([float(p.preco_compra) if p is not None else 0.0 for p in catalogo])
+        self.preco_venda = np.array([float(p.preco_venda) if p is not None else 0.0 for p in catalogo])
+        self.validade_produto = np.array(
+            [p.data_validade.toordinal() if p is not None else SEM_VALIDADE for p in catalogo], dtype=np.int64)
+        # Validade (ordinal da data) de cada engradado.
+        self.validade = self.validade_produto[self.produto]
+
+        # Uma única passada agrupa unidades e engradados por produto.
+        self.total_por_produto = np.bincount(self.produto, weights=self.quantidade,
+                                             minlength=len(self.codigos)).astype(np.int64)
+        self.engradados_por_produto = np.bincount(self.produto, minlength=len(self.codigos))
+
+    @classmethod
+    def de_estoque(cls, estoque, produtos_cadastrados):
+        """
+        Cria a análise a partir de um Estoque (passando pela MatrizColunar).
+        """
+        return cls(MatrizColunar.de_estoque(estoque), produtos_cadastrados)
+
+    def _totais_do_catalogo(self):
+        """
+        Retorna os produtos do catálogo e, alinhado a eles, o total em estoque de cada um.
+        """
+        ids = {codigo: i for i, codigo in enumerate(self.codigos)}
+        produtos = list(self.produtos_cadastrados)
+        indices = np.array([ids.get(p.codigo, -1) for p in produtos], dtype=np.int64)
+        totais = np.where(indices >= 0, self.total_por_produto[np.maximum(indices, 0)], 0)
+        return produtos, totais
+
+    def relatorio_estoque_geral(self):
+        """
+        Total em estoque de cada produto cadastrado.
+
+        Returns:
+            list: Dicionários com 'codigo', 'nome' e 'total_em_estoque', na ordem do catálogo.
+        """
+        produtos, totais = self._totais_do_catalogo()
+        return [{'codigo': p.codigo, 'nome': p.nome, 'total_em_estoque': int(total)}
+                for p, total in zip(produtos, totais.tolist())]
+
+    def itens_em_falta(self, limite_baixo=10):
+        """
+        Produtos cadastrados com estoque abaixo do limite (como Estoque.obter_itens_em_falta).
+
+        Returns:
+            list: Dicionários com 'codigo', 'nome', 'total_em_estoque', 'limite_baixo' e 'faltando'.
+        """
+        produtos, totais = self._totais_do_catalogo()
+        return [
+            {'codigo': produtos[k].codigo, 'nome': produtos[k].nome, 'total_em_estoque': int(totais[k]),
+             'limite_baixo': limite_baixo, 'faltando': limite_baixo - int(totais[k])}
+            for k in np.flatnonzero(totais < limite_baixo).tolist()
+        ]
+
+    def proximos_vencimento(self, dias=30, hoje=None):
+        """
+        Engradados que vencem até 'dias' dias a partir de hoje
+        (como Estoque.obter_produtos_proximos_vencimento).
+
+        Args:
+            dias (int, opcional): O número de dias considerado "próximo ao vencimento".
+            hoje (datetime, opcional): A data de referência (agora, se omitida).
+
+        Returns:
+            list: Dicionários com 'codigo', 'nome', 'lote', 'quantidade_engradado',
+                  'data_validade', 'linha' e 'coluna', em ordem de validade.
+        """
+        limite = ((hoje or datetime.now()) + timedelta(days=dias)).toordinal()
+        selecionados = np.flatnonzero(self.validade <= limite)
+        # Ordena por validade; na mesma validade, mantém a ordem da matriz (ordenação estável).
+        selecionados = selecionados[np.argsort(self.validade[selecionados], kind='stable')]
+        produtos = self.produto[selecionados]
+        # Nome, lote e data formatada são montados uma vez por produto, não por engradado.
+        info = {}
+        for produto in np.unique(produtos).tolist():
+            p = self.produtos_cadastrados.obter(self.codigos[produto])
+            info[produto] = (p.codigo, p.nome, p.lote, p.data_validade.strftime("%Y-%m-%d"))
+        linhas, colunas = np.divmod(self.posicao[selecionados], self.colunas)
+        return [
+            {'codigo': codigo, 'nome': nome, 'lote': lote, 'quantidade_engradado': quantidade,
+             'data_validade': data_validade, 'linha': linha, 'coluna': coluna}
+            for (codigo, nome, lote, data_validade), quantidade, linha, coluna in zip(
+                map(info.__getitem__, produtos.tolist()), self.quantidade[selecionados].tolist(),
+                linhas.tolist(), colunas.tolist())
+        ]
+
+    def valor_estoque(self):
+        """
+        Valor do estoque a preço de custo (preco_compra) e a preço de venda (preco_venda).
+
+        Returns:
+            dict: 'valor_custo', 'valor_venda' e 'margem' (totais) e 'por_produto' (lista de
+                  dicionários com 'codigo', 'total_em_estoque', 'valor_custo' e 'valor_venda',
+                  apenas dos produtos com estoque).
+        """
+        custo = self.total_por_produto * self.preco_compra
+        venda = self.total_por_produto * self.preco_venda
+        por_produto = [
+            {'codigo': self.codigos[k], 'total_em_estoque': int(self.total_por_produto[k]),
+             'valor_custo': float(custo[k]), 'valor_venda': float(venda[k])}
+            for k in np.flatnonzero(self.total_por_produto).tolist()
+        ]
+        valor_custo = float(custo.sum())
+        valor_venda = float(venda.sum())
+        return {'valor_custo': valor_custo, 'valor_venda': valor_venda,
+                'margem': valor_venda - valor_custo, 'por_produto': por_produto}
+
+    def relatorios(self, limite_baixo=10, dias=30, hoje=None):
+        """
+        Calcula todos os relatórios de uma vez.
+
+        Returns:
+            dict: 'estoque_geral', 'itens_em_falta', 'proximos_vencimento' e 'valor_estoque'.
+        """
+        return {
+            'estoque_geral': self.relatorio_estoque_geral(),
+            'itens_em_falta': self.itens_em_falta(limite_baixo),
+            'proximos_vencimento': self.proximos_vencimento(dias, hoje),
+            'valor_estoque': self.valor_estoque(),
+        }
@@ -0,0 +1,148 @@
+# Escolha do armazenamento onde o estado do sistema (catálogo, estoque e fila) é gravado.
+# Um armazenamento fornece:
+# - carregar(estoque, fila_pedidos, arquivos_json): reconstrói o estado no estoque e na
+#   fila, passa a gravar as alterações seguintes (como ouvinte do estoque e da fila) e
+#   retorna o catálogo de produtos (um objeto com a interface de CatalogoProdutos);
+# - sincronizar(): garante que as alterações feitas até agora estão gravadas em disco;
+# - compactar(esperar=False): reorganiza os arquivos para a próxima inicialização;
+# - fechar(): sincroniza e libera os arquivos.
+#
+# Só um processo por vez pode gravar em um diretório: carregar obtém a TravaDiretorio
+# (abaixo) e falha logo se o Menu, o servidor ou a importação já estiver usando a pasta.
+# Esses três pontos de entrada iniciam o sistema pela mesma função, iniciar_sistema.
+#
+# Implementações:
+# - 'log' (Persistencia.py): log de alterações com snapshots JSON; tudo fica em memória.
+# - 'sqlite' (Armazenamento_sqlite.py): banco SQLite com tabelas indexadas; o catálogo e o
+#   histórico de atendidos são consultados no banco e não ficam inteiros em memória.
+import os
+
+TIPOS_ARMAZENAMENTO = ('log', 'sqlite')
+# Variável de ambiente lida pelo Menu para escolher o armazenamento.
+VARIAVEL_AMBIENTE = 'ESTOQUE_ARMAZENAMENTO'
+NOME_TRAVA = 'armazenamento.trava'
+
+
+class TravaDiretorio:
+    """
+    Trava exclusiva de um diretório de armazenamento entre processos.
+
+    Usa a trava do sistema operacional sobre um arquivo (flock, ou msvcrt no Windows),
+    que é liberada sozinha se o processo terminar sem chamar liberar.
+    """
+    def __init__(self, diretorio, nome=NOME_TRAVA):
+        self.diretorio = diretorio
+        self.caminho = os.path.join(diretorio, nome)
+        self._arquivo = None
+
+    def obter(self):
+        """
+        Obtém a trava sem esperar.
+
+        Raises:
+            RuntimeError: Se outro processo já estiver com a trava.
+        """
+        arquivo = open(self.caminho, 'a')
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                arquivo.seek(0)
+                msvcrt.locking(arquivo.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            arquivo.close()
+            raise RuntimeError(f"O armazenamento em '{self.diretorio}' já está aberto por outro processo "
+                               "(Menu, servidor ou importação).") from None
+        self._arquivo = arquivo
+
+    def liberar(self):
+        """
+        Libera a trava (fechar o arquivo desfaz a trava do sistema operacional).
+        """
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+
+def abrir_armazenamento(diretorio, tipo=None):
+    """
+    Cria o armazenamento do tipo escolhido em um diretório.
+
+    Args:
+        diretorio (str): Pasta onde ficam os arquivos do armazenamento.
+        tipo (str, opcional): 'log' ou 'sqlite'. Se omitido, vem da variável de ambiente
+                              ESTOQUE_ARMAZENAMENTO (e, sem ela, 'log').
+
+    Returns:
+        O armazenamento (Persistencia ou ArmazenamentoSQLite), ainda não carregado.
+
+    Raises:
+        ValueError: Se o tipo não for conhecido.
+    """
+    if tipo is None:
+        tipo = os.environ.get(VARIAVEL_AMBIENTE) or 'log'
+    # Os imports ficam aqui para que só o armazenamento escolhido seja carregado.
+    if tipo == 'log':
+        from Persistencia import Persistencia
+        return Persistencia(diretorio)
+    if tipo == 'sqlite':
+        from Armazenamento_sqlite import ArmazenamentoSQLite
+        return ArmazenamentoSQLite(diretorio)
+    raise ValueError(f"Armazenamento desconhecido: '{tipo}' (use {' ou '.join(TIPOS_ARMAZENAMENTO)}).")
+
+
+def caminhos_arquivos_json(diretorio):
+    """
+    Retorna os caminhos dos arquivos JSON completos ('produtos', 'estoque' e 'pedidos') de um diretório.
+    """
+    return {
+        "produtos": os.path.join(diretorio, 'produtos.json'),
+        "estoque": os.path.join(diretorio, 'estoque.json'),
+        "pedidos": os.path.join(diretorio, 'pedidos.json')
+    }
+
+
+def iniciar_sistema(diretorio, tipo=None, saida=None, metricas=None):
+    """
+    Abre o armazenamento de um diretório e carrega nele um Estoque e uma FilaPedidos novos,
+    como o Menu, o servidor de pedidos e a importação em lote fazem ao iniciar. O catálogo
+    carregado é vinculado ao estoque (veja Estoque.vincular_catalogo).
+
+    Args:
+        diretorio (str): Pasta do armazenamento e dos arquivos JSON completos.
+        tipo (str, opcional): O tipo do armazenamento (veja abrir_armazenamento).
+        saida (opcional): Para onde vão as mensagens do estoque, da fila e do armazenamento
+                          (veja Log_estruturado.py). Se omitida, elas são descartadas.
+        metricas (RegistroMetricas, opcional): Se informado, o estoque, a fila e o
+                                               armazenamento são instrumentados antes da
+                                               carga, que é medida em 'armazenamento.carregar'.
+
+    Returns:
+        tuple: (armazenamento, catálogo de produtos, estoque, fila de pedidos).
+
+    Raises:
+        ValueError: Se o tipo não for conhecido ou se o log de alterações estiver corrompido.
+        RuntimeError: Se outro processo já estiver usando o armazenamento do diretório.
+    """
+    from Estoque import Estoque
+    from Fila_de_Pedidos import FilaPedidos
+    armazenamento = abrir_armazenamento(diretorio, tipo)
+    estoque = Estoque()
+    fila_pedidos = FilaPedidos()
+    if saida is not None:
+        estoque.saida = fila_pedidos.saida = armazenamento.saida = saida
+    if metricas is None:
+        produtos = armazenamento.carregar(estoque, fila_pedidos, caminhos_arquivos_json(diretorio))
+        # As validades do índice do estoque (relatório de vencimentos) vêm deste catálogo.
+        estoque.vincular_catalogo(produtos)
+        return armazenamento, produtos, estoque, fila_pedidos
+    from Metricas import instrumentar_estoque, instrumentar_fila, instrumentar_armazenamento
+    instrumentar_estoque(estoque, metricas)
+    instrumentar_fila(fila_pedidos, metricas)
+    instrumentar_armazenamento(armazenamento, metricas)
+    with metricas.medir('armazenamento.carregar'):
+        produtos = armazenamento.carregar(estoque, fila_pedidos, caminhos_arquivos_json(diretorio))
+    estoque.vincular_catalogo(produtos)
+    return armazenamento, produtos, estoque, fila_pedidos
@@ -0,0 +1,541 @@
+# Armazenamento do estado do sistema em um banco SQLite (um arquivo local, em modo WAL).
+# Interface em Armazenamento.py; é a alternativa à Persistencia (log + snapshots JSON).
+#
+# Tabelas:
+# - produtos: o catálogo, indexado por código, categoria, fornecedor e fabricante;
+# - engradados: um registro por engradado, com chave (linha, coluna, nivel) e índice por produto;
+# - pedidos_pendentes: a fila, por número do pedido;
+# - historico: os pedidos atendidos, indexados por solicitante e por produto.
+#
+# O estoque e a fila continuam inteiros em memória (os índices de alocação e os heaps de
+# escalonamento precisam deles) e o banco acompanha cada alteração como ouvinte. Já o
+# catálogo (CatalogoSQLite) e o histórico de atendidos (HistoricoSQLite) ficam no banco:
+# em memória há só um cache limitado de produtos, e consultas como "total do produto X"
+# ou "histórico do cliente Y" são feitas em SQL sobre os índices.
+#
+# As alterações entram em uma transação aberta e são confirmadas (commit) em sincronizar.
+# Na primeira execução o banco é preenchido com o estado atual do log (ou dos arquivos JSON).
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from itertools import groupby
+from Produto import Produto, salvar_produtos
+from Pedido import Pedido
+from Engradado import Engradado
+from Armazenamento import TravaDiretorio
+
+NOME_BANCO = 'estoque.sqlite3'
+VERSAO_ESQUEMA = 1
+
+# Colunas na ordem dos parâmetros de Produto(...) e de Pedido(...).
+COLUNAS_PRODUTO = ('codigo', 'lote', 'nome', 'peso', 'data_validade', 'data_fabricacao', 'preco_compra',
+                   'preco_venda', 'fornecedor', 'fabricante', 'categoria', 'capacidade_engradado')
+COLUNAS_PEDIDO = ('codigo_produto', 'quantidade', 'data_solicitacao', 'solicitante', 'numero')
+
+# Peso e preços ficam sem tipo declarado para que o SQLite guarde inteiros e reais como vieram.
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS metadados (chave TEXT PRIMARY KEY, valor TEXT);
+CREATE TABLE IF NOT EXISTS produtos (
+    id INTEGER PRIMARY KEY, codigo TEXT NOT NULL UNIQUE, lote TEXT, nome TEXT, peso,
+    data_validade TEXT, data_fabricacao TEXT, preco_compra, preco_venda,
+    fornecedor TEXT, fabricante TEXT, categoria TEXT, capacidade_engradado INTEGER);
+CREATE INDEX IF NOT EXISTS produtos_categoria ON produtos (categoria);
+CREATE INDEX IF NOT EXISTS produtos_fornecedor ON produtos (fornecedor);
+CREATE INDEX IF NOT EXISTS produtos_fabricante ON produtos (fabricante);
+CREATE TABLE IF NOT EXISTS engradados (
+    linha INTEGER NOT NULL, coluna INTEGER NOT NULL, nivel INTEGER NOT NULL,
+    produto_codigo TEXT NOT NULL, quantidade INTEGER NOT NULL,
+    PRIMARY KEY (linha, coluna, nivel)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS engradados_produto ON engradados (produto_codigo, quantidade);
+CREATE TABLE IF NOT EXISTS pedidos_pendentes (
+    numero INTEGER PRIMARY KEY, codigo_produto TEXT NOT NULL, quantidade INTEGER NOT NULL,
+    data_solicitacao TEXT NOT NULL, solicitante TEXT NOT NULL, reservado INTEGER NOT NULL DEFAULT 0);
+CREATE TABLE IF NOT EXISTS historico (
+    id INTEGER PRIMARY KEY, codigo_produto TEXT NOT NULL, quantidade INTEGER NOT NULL,
+    data_solicitacao TEXT NOT NULL, solicitante TEXT NOT NULL, numero INTEGER);
+CREATE INDEX IF NOT EXISTS historico_solicitante ON historico (solicitante);
+CREATE INDEX IF NOT EXISTS historico_produto ON historico (codigo_produto);
+"""
+
+# Engradado do topo de uma pilha: o de maior nível na posição.
+TOPO = "linha = ? AND coluna = ? AND nivel = (SELECT MAX(nivel) FROM engradados WHERE linha = ? AND coluna = ?)"
+
+# Quantos registros cada consulta de uma iteração traz por vez.
+TAMANHO_PAGINA = 1000
+
+
+def _linha_pedido(pedido):
+    """
+    Converte um Pedido em uma tupla na ordem de COLUNAS_PEDIDO.
+    """
+    return (pedido.codigo_produto, pedido.quantidade, pedido.data_solicitacao.strftime("%Y-%m-%d"),
+            pedido.solicitante, pedido.numero)
+
+
+def _linhas_estoque_serializavel(matriz_serializavel):
+    """
+    Gera as linhas da tabela de engradados a partir de um estoque no formato de para_serializavel.
+    """
+    for i, linha_serializavel in enumerate(matriz_serializavel):
+        for j, pilha_serializavel in enumerate(linha_serializavel):
+            for nivel, d in enumerate(pilha_serializavel):
+                yield i, j, nivel, d['produto_codigo'], d['quantidade']
+
+
+class ArmazenamentoSQLite:
+    """
+    Persiste o catálogo, o estoque e a fila de pedidos em um banco SQLite.
+    """
+    def __init__(self, diretorio, nome_banco=NOME_BANCO, tamanho_cache=1024):
+        """
+        Abre (ou cria) o banco em um diretório.
+
+        Args:
+            diretorio (str): Pasta onde fica o arquivo do banco (e o log a ser migrado).
+            nome_banco (str, opcional): Nome do arquivo do banco.
+            tamanho_cache (int, opcional): Quantos produtos o catálogo mantém em memória.
+        """
+        self.diretorio = diretorio
+        self.caminho = os.path.join(diretorio, nome_banco)
+        self.tamanho_cache = tamanho_cache
+        # Uma única conexão, usada por todas as threads sob a trava.
+        self._trava = threading.Lock()
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.executescript(ESQUEMA)
+        # Só este objeto grava no diretório enquanto estiver carregado (veja carregar).
+        self._trava_diretorio = TravaDiretorio(diretorio)
+
+    # --- Acesso ao banco ---
+
+    def executar(self, sql, parametros=()):
+        """
+        Executa um comando sob a trava da conexão.
+
+        Returns:
+            list: As linhas do resultado.
+        """
+        with self._trava:
+            return self._conexao.execute(sql, parametros).fetchall()
+
+    def alterar(self, sql, parametros=()):
+        """
+        Executa um comando de alteração sob a trava da conexão.
+
+        Returns:
+            int: O número de registros alterados.
+        """
+        with self._trava:
+            return self._conexao.execute(sql, parametros).rowcount
+
+    def executar_varios(self, sql, sequencia):
+        """
+        Executa um comando para cada conjunto de parâmetros, sob a trava da conexão.
+        """
+        with self._trava:
+            self._conexao.executemany(sql, sequencia)
+
+    def paginas(self, sql, parametros=()):
+        """
+        Percorre o resultado de uma consulta em páginas, sem segurar a trava entre elas.
+        A consulta deve selecionar a coluna 'id' primeiro e ter uma condição "id > ?" como
+        último parâmetro, seguida de "ORDER BY id LIMIT ?".
+
+        Yields:
+            tuple: Cada linha do resultado, sem a coluna 'id'.
+        """
+        ultimo = -1
+        while True:
+            linhas = self.executar(sql, tuple(parametros) + (ultimo, TAMANHO_PAGINA))
+            for linha in linhas:
+                yield linha[1:]
+            if len(linhas) < TAMANHO_PAGINA:
+                return
+            ultimo = linhas[-1][0]
+
+    def _metadado(self, chave):
+        linha = self._conexao.execute("SELECT valor FROM metadados WHERE chave = ?", (chave,)).fetchone()
+        return linha[0] if linha is not None else None
+
+    def _gravar_metadado(self, chave, valor):
+        self._conexao.execute("INSERT OR REPLACE INTO metadados (chave, valor) VALUES (?, ?)", (chave, str(valor)))
+
+    # --- Carregamento ---
+
+    def _migrar(self, estoque, fila_pedidos, arquivos_json):
+        """
+        Preenche um banco novo com o estado atual do log de alterações (ou dos arquivos JSON).
+        """
+        from Persistencia import Persistencia
+        produtos = Persistencia(self.diretorio).ler(estoque, fila_pedidos, arquivos_json)
+        conexao = self._conexao
+        conexao.executemany(
+            f"INSERT OR IGNORE INTO produtos ({', '.join(COLUNAS_PRODUTO)}) VALUES ({', '.join('?' * len(COLUNAS_PRODUTO))})",
+            (tuple(p.para_dicionario()[coluna] for coluna in COLUNAS_PRODUTO) for p in produtos))
+        conexao.executemany(
+            "INSERT INTO engradados (linha, coluna, nivel, produto_codigo, quantidade) VALUES (?, ?, ?, ?, ?)",
+            ((i, j, nivel, e.produto_codigo, e.quantidade) for i, j, nivel, e in estoque.iter_engradados()))
+        conexao.executemany(
+            f"INSERT OR REPLACE INTO pedidos_pendentes ({', '.join(COLUNAS_PEDIDO)}, reservado) VALUES (?, ?, ?, ?, ?, ?)",
+            (_linha_pedido(p) + (int(p.reservado),) for p in fila_pedidos.fila))
+        conexao.executemany(
+            f"INSERT INTO historico ({', '.join(COLUNAS_PEDIDO)}) VALUES (?, ?, ?, ?, ?)",
+            map(_linha_pedido, fila_pedidos.historico_atendidos))
+        self._gravar_metadado('versao', VERSAO_ESQUEMA)
+        self._gravar_metadado('proximo_numero', fila_pedidos.proximo_numero)
+        conexao.commit()
+
+    def _ler_estoque(self, estoque):
+        """
+        Carrega no estoque os engradados gravados no banco.
+        """
+        linhas = self._conexao.execute(
+            "SELECT linha, coluna, produto_codigo, quantidade FROM engradados ORDER BY linha, coluna, nivel").fetchall()
+        pilhas = (
+            (i, j, [Engradado(codigo, quantidade) for _, _, codigo, quantidade in engradados])
+            for (i, j), engradados in groupby(linhas, key=lambda linha: (linha[0], linha[1]))
+        )
+        estoque.carregar_pilhas(int(self._metadado('linhas') or 0), int(self._metadado('colunas') or 0), pilhas)
+
+    def carregar(self, estoque, fila_pedidos, arquivos_json):
+        """
+        Reconstrói o estado do sistema a partir do banco e passa a gravar as alterações
+        seguintes. Se o banco ainda não foi preenchido, migra para ele o estado atual do
+        log de alterações (ou dos arquivos JSON).
+
+        Args:
+            estoque (Estoque): O estoque a ser carregado.
+            fila_pedidos (FilaPedidos): A fila a ser carregada; o seu histórico de
+                                        atendidos passa a ser a tabela do banco.
+            arquivos_json (dict): Caminhos dos arquivos 'produtos', 'estoque' e 'pedidos',
+                                  usados na migração.
+
+        Returns:
+            CatalogoSQLite: O catálogo de produtos cadastrados.
+
+        Raises:
+            RuntimeError: Se outro processo já estiver gravando no diretório.
+        """
+        self._trava_diretorio.obter()
+        if self._metadado('versao') is None:
+            self._migrar(estoque, fila_pedidos, arquivos_json)
+            fila_pedidos.usar_historico(HistoricoSQLite(self))
+        else:
+            self._ler_estoque(estoque)
+            fila_pedidos.usar_historico(HistoricoSQLite(self))
+            pendentes = self._conexao.execute(
+                f"SELECT {', '.join(COLUNAS_PEDIDO)}, reservado FROM pedidos_pendentes ORDER BY numero").fetchall()
+            fila_pedidos.carregar_objetos((Pedido(*linha, converter_datas=False) for linha in pendentes), ())
+            # A numeração continua de onde parou, mesmo com a fila vazia (bancos antigos não
+            # têm o metadado: aí ela segue o histórico).
+            proximo_numero = self._metadado('proximo_numero')
+            if proximo_numero is not None:
+                fila_pedidos.avancar_numeracao(int(proximo_numero) - 1)
+            fila_pedidos.avancar_numeracao(self._conexao.execute("SELECT MAX(numero) FROM historico").fetchone()[0])
+        # As reservas são refeitas a partir dos pedidos reservados da fila.
+        fila_pedidos.reaplicar_reservas(estoque)
+        self._gravar_dimensoes(estoque)
+        self._conexao.commit()
+        estoque.adicionar_ouvinte(self._registrar)
+        fila_pedidos.adicionar_ouvinte(self._registrar)
+        return CatalogoSQLite(self, self.tamanho_cache)
+
+    # --- Registro das alterações ---
+
+    def _gravar_dimensoes(self, estoque):
+        self._gravar_metadado('linhas', estoque.linhas)
+        self._gravar_metadado('colunas', estoque.colunas)
+
+    def _registrar(self, evento):
+        """
+        Ouvinte do estoque e da fila: aplica cada alteração às tabelas.
+        """
+        tipo = evento['tipo']
+        with self._trava:
+            executar = self._conexao.execute
+            if tipo == 'engradado_adicionado':
+                # O novo engradado fica um nível acima do topo da pilha (nível 0 numa pilha vazia).
+                executar("INSERT INTO engradados (linha, coluna, nivel, produto_codigo, quantidade) "
+                         "SELECT ?, ?, COALESCE(MAX(nivel) + 1, 0), ?, ? FROM engradados WHERE linha = ? AND coluna = ?",
+                         (evento['linha'], evento['coluna'], evento['produto_codigo'], evento['quantidade'],
+                          evento['linha'], evento['coluna']))
+            elif tipo in ('unidades_removidas', 'unidades_adicionadas'):
+                posicao = (evento['linha'], evento['coluna'])
+                sinal = -1 if tipo == 'unidades_removidas' else 1
+                executar(f"UPDATE engradados SET quantidade = quantidade + ? WHERE {TOPO}",
+                         (sinal * evento['quantidade'],) + posicao + posicao)
+                # O engradado que zerou saiu da pilha.
+                executar("DELETE FROM engradados WHERE linha = ? AND coluna = ? AND quantidade <= 0", posicao)
+            elif tipo == 'estoque_recarregado':
+                executar("DELETE FROM engradados")
+                self._conexao.executemany(
+                    "INSERT INTO engradados (linha, coluna, nivel, produto_codigo, quantidade) VALUES (?, ?, ?, ?, ?)",
+                    _linhas_estoque_serializavel(evento['dados']))
+                self._gravar_metadado('linhas', len(evento['dados']))
+                self._gravar_metadado('colunas', max((len(linha) for linha in evento['dados']), default=0))
+            elif tipo == 'pedido_adicionado':
+                pedido = evento['pedido']
+                executar(f"INSERT OR REPLACE INTO pedidos_pendentes ({', '.join(COLUNAS_PEDIDO)}, reservado) "
+                         "VALUES (?, ?, ?, ?, ?, ?)",
+                         tuple(pedido.get(coluna) for coluna in COLUNAS_PEDIDO) + (int(pedido.get('reservado', False)),))
+                self._gravar_metadado('proximo_numero', pedido['numero'] + 1)
+            elif tipo == 'pedido_atendido':
+                # O histórico é gravado pelo próprio HistoricoSQLite; aqui sai da fila a parte atendida.
+                executar("UPDATE pedidos_pendentes SET quantidade = quantidade - ? WHERE numero = ?",
+                         (evento['quantidade'], evento['numero']))
+                executar("DELETE FROM pedidos_pendentes WHERE numero = ? AND quantidade <= 0", (evento['numero'],))
+            elif tipo == 'pedido_cancelado':
+                executar("DELETE FROM pedidos_pendentes WHERE numero = ?", (evento['numero'],))
+            elif tipo == 'fila_recarregada':
+                executar("DELETE FROM pedidos_pendentes")
+                self._conexao.executemany(
+                    f"INSERT OR REPLACE INTO pedidos_pendentes ({', '.join(COLUNAS_PEDIDO)}, reservado) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (tuple(d.get(coluna) for coluna in COLUNAS_PEDIDO) + (int(d.get('reservado', False)),)
+                     for d in evento['dados']['fila']))
+                self._gravar_metadado('proximo_numero', evento['dados']['proximo_numero'])
+
+    def sincronizar(self):
+        """
+        Confirma no banco (commit) todas as alterações registradas até agora.
+        """
+        with self._trava:
+            self._conexao.commit()
+
+    def compactar(self, esperar=False):
+        """
+        Confirma as alterações e transfere o conteúdo do arquivo WAL para o banco (checkpoint).
+
+        Args:
+            esperar (bool, opcional): Aceito pela compatibilidade com Persistencia.compactar;
+                                      o checkpoint é sempre feito na hora.
+        """
+        with self._trava:
+            self._conexao.commit()
+            self._conexao.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def fechar(self):
+        """
+        Confirma as alterações pendentes e fecha o banco.
+        """
+        with self._trava:
+            self._conexao.commit()
+            self._conexao.close()
+        self._trava_diretorio.liberar()
+
+    # --- Consultas ---
+
+    def total_produto(self, codigo):
+        """
+        Total de unidades de um produto nos engradados do estoque (pelo índice por produto).
+        """
+        return self.executar("SELECT COALESCE(SUM(quantidade), 0) FROM engradados WHERE produto_codigo = ?",
+                             (codigo,))[0][0]
+
+    def posicoes_produto(self, codigo):
+        """
+        Posições (linha, coluna) das pilhas com engradados de um produto, em ordem.
+        """
+        return self.executar("SELECT DISTINCT linha, coluna FROM engradados WHERE produto_codigo = ? "
+                             "ORDER BY linha, coluna", (codigo,))
+
+    def historico_do_cliente(self, solicitante):
+        """
+        Pedidos atendidos de um solicitante, na ordem do histórico (veja HistoricoSQLite.do_solicitante).
+        """
+        return HistoricoSQLite(self).do_solicitante(solicitante)
+
+
+class HistoricoSQLite:
+    """
+    Histórico de pedidos atendidos gravado na tabela 'historico', com a interface usada pela
+    FilaPedidos (append, extend, clear, len, iteração e historico[i]).
+    """
+    def __init__(self, armazenamento):
+        """
+        Args:
+            armazenamento (ArmazenamentoSQLite): O banco onde o histórico fica.
+        """
+        self._armazenamento = armazenamento
+
+    def append(self, pedido):
+        self._armazenamento.executar(
+            f"INSERT INTO historico ({', '.join(COLUNAS_PEDIDO)}) VALUES (?, ?, ?, ?, ?)", _linha_pedido(pedido))
+
+    def extend(self, pedidos):
+        self._armazenamento.executar_varios(
+            f"INSERT INTO historico ({', '.join(COLUNAS_PEDIDO)}) VALUES (?, ?, ?, ?, ?)", map(_linha_pedido, pedidos))
+
+    def clear(self):
+        self._armazenamento.executar("DELETE FROM historico")
+
+    def __len__(self):
+        return self._armazenamento.executar("SELECT COUNT(*) FROM historico")[0][0]
+
+    def __iter__(self):
+        """
+        Percorre o histórico em ordem, uma página por vez.
+        """
+        consulta = f"SELECT id, {', '.join(COLUNAS_PEDIDO)} FROM historico WHERE id > ? ORDER BY id LIMIT ?"
+        return (Pedido(*linha, converter_datas=False) for linha in self._armazenamento.paginas(consulta))
+
+    def __getitem__(self, indice):
+        """
+        Retorna o pedido na posição 'indice' do histórico (negativo conta do fim, como numa lista).
+
+        Raises:
+            IndexError: Se a posição não existir.
+        """
+        ordem = 'ASC' if indice >= 0 else 'DESC'
+        deslocamento = indice if indice >= 0 else -indice - 1
+        linhas = self._armazenamento.executar(
+            f"SELECT {', '.join(COLUNAS_PEDIDO)} FROM historico ORDER BY id {ordem} LIMIT 1 OFFSET ?", (deslocamento,))
+        if not linhas:
+            raise IndexError("Posição fora do histórico de atendidos.")
+        return Pedido(*linhas[0], converter_datas=False)
+
+    def do_solicitante(self, solicitante):
+        """
+        Pedidos atendidos de um solicitante, pelo índice da tabela.
+
+        Returns:
+            list: Objetos Pedido, na ordem do histórico.
+        """
+        return [Pedido(*linha, converter_datas=False) for linha in self._armazenamento.executar(
+            f"SELECT {', '.join(COLUNAS_PEDIDO)} FROM historico WHERE solicitante = ? ORDER BY id", (solicitante,))]
+
+    def volume_por_solicitante(self):
+        """
+        Total de unidades atendidas por solicitante, agrupado no banco.
+
+        Returns:
+            dict: Solicitante -> unidades.
+        """
+        return dict(self._armazenamento.executar(
+            "SELECT solicitante, SUM(quantidade) FROM historico GROUP BY solicitante"))
+
+
+class CatalogoSQLite:
+    """
+    Catálogo de produtos gravado na tabela 'produtos', com a mesma interface de CatalogoProdutos.
+    Só os produtos consultados mais recentemente ficam em memória.
+    """
+    def __init__(self, armazenamento, tamanho_cache=1024):
+        """
+        Args:
+            armazenamento (ArmazenamentoSQLite): O banco onde o catálogo fica.
+            tamanho_cache (int, opcional): Quantos produtos manter em memória.
+        """
+        self._armazenamento = armazenamento
+        self.tamanho_cache = tamanho_cache
+        # Código -> Produto, do menos para o mais recentemente usado.
+        self._cache = OrderedDict()
+        self._ouvintes = []
+
+    def adicionar_ouvinte(self, ouvinte):
+        """
+        Registra uma função chamada a cada produto cadastrado (veja CatalogoProdutos.adicionar_ouvinte).
+        """
+        self._ouvintes.append(ouvinte)
+
+    def remover_ouvinte(self, ouvinte):
+        """
+        Cancela o registro de uma função feito com adicionar_ouvinte.
+        """
+        self._ouvintes.remove(ouvinte)
+
+    def _guardar(self, produto):
+        self._cache[produto.codigo] = produto
+        self._cache.move_to_end(produto.codigo)
+        if len(self._cache) > self.tamanho_cache:
+            self._cache.popitem(last=False)
+
+    def _consultar(self, condicao, parametros):
+        """
+        Produtos que atendem a uma condição sobre a tabela, na ordem de cadastro.
+        """
+        return [Produto(*linha, converter_datas=False) for linha in self._armazenamento.executar(
+            f"SELECT {', '.join(COLUNAS_PRODUTO)} FROM produtos WHERE {condicao} ORDER BY id", parametros)]
+
+    def adicionar(self, produto):
+        """
+        Cadastra um produto no catálogo.
+
+        Args:
+            produto (Produto): O produto a ser cadastrado.
+
+        Returns:
+            bool: True se o produto foi cadastrado, False se já existia um produto com o mesmo código.
+        """
+        dados = produto.para_dicionario()
+        inseridos = self._armazenamento.alterar(
+            f"INSERT OR IGNORE INTO produtos ({', '.join(COLUNAS_PRODUTO)}) "
+            f"VALUES ({', '.join('?' * len(COLUNAS_PRODUTO))})",
+            tuple(dados[coluna] for coluna in COLUNAS_PRODUTO))
+        if inseridos == 0:
+            return False
+        self._guardar(produto)
+        for ouvinte in self._ouvintes:
+            ouvinte({'tipo': 'produto_cadastrado', 'produto': dados})
+        return True
+
+    def obter(self, codigo, padrao=None):
+        """
+        Busca um produto pelo código (no cache ou pelo índice da tabela).
+
+        Returns:
+            Produto: O produto encontrado, ou 'padrao'.
+        """
+        produto = self._cache.get(codigo)
+        if produto is not None:
+            self._cache.move_to_end(codigo)
+            return produto
+        encontrados = self._consultar("codigo = ?", (codigo,))
+        if not encontrados:
+            return padrao
+        self._guardar(encontrados[0])
+        return encontrados[0]
+
+    def por_categoria(self, categoria):
+        """
+        Retorna os produtos de uma categoria, na ordem de cadastro.
+        """
+        return self._consultar("categoria = ?", (categoria,))
+
+    def por_fornecedor(self, fornecedor):
+        """
+        Retorna os produtos de um fornecedor, na ordem de cadastro.
+        """
+        return self._consultar("fornecedor = ?", (fornecedor,))
+
+    def por_fabricante(self, fabricante):
+        """
+        Retorna os produtos de um fabricante, na ordem de cadastro.
+        """
+        return self._consultar("fabricante = ?", (fabricante,))
+
+    def __contains__(self, codigo):
+        return self.obter(codigo) is not None
+
+    def __iter__(self):
+        """
+        Percorre os produtos na ordem de cadastro, uma página por vez.
+        """
+        consulta = f"SELECT id, {', '.join(COLUNAS_PRODUTO)} FROM produtos WHERE id > ? ORDER BY id LIMIT ?"
+        return (Produto(*linha, converter_datas=False) for linha in self._armazenamento.paginas(consulta))
+
+    def __len__(self):
+        return self._armazenamento.executar("SELECT COUNT(*) FROM produtos")[0][0]
+
+    def para_serializavel(self):
+        """
+        Converte o catálogo em uma lista de dicionários, no formato do arquivo JSON.
+        """
+        return [produto.para_dicionario() for produto in self]
+
+    def salvar(self, nome_arquivo):
+        """
+        Exporta o catálogo para um arquivo JSON (mesmo formato de salvar_produtos).
+        """
+        salvar_produtos(self, nome_arquivo)
@@ -0,0 +1,89 @@
+# Benchmark da análise vetorizada (Analise_estoque.py): mede o tempo para exportar uma
+# matriz colunar com milhões de engradados para vetores NumPy e calcular todos os relatórios.
+# A matriz sintética é gerada diretamente em vetores (sem criar objetos Engradado), como
+# se tivesse sido aberta de um snapshot binário.
+#
+# Uso (a partir da pasta do projeto; precisa do NumPy):
+#     python -m Benchmarks.Benchmark_analise --engradados 10000000 --produtos 5000
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Permite executar o arquivo diretamente, além de "python -m Benchmarks.Benchmark_analise".
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Analise_estoque import AnaliseEstoque, np
+from Matriz_colunar import MatrizColunar
+from Produto import Produto, CatalogoProdutos
+
+
+def gerar_matriz(total_engradados, total_produtos, altura, semente=1):
+    """
+    Gera uma MatrizColunar com pilhas cheias de um único produto cada, quantidades aleatórias
+    e algumas posições vazias (o último nível de uma em cada sete pilhas fica livre).
+    """
+    aleatorio = np.random.default_rng(semente)
+    posicoes = -(-total_engradados // altura) + total_engradados // (7 * altura) + 1
+    colunas = 1000
+    linhas = -(-posicoes // colunas)
+    posicoes = linhas * colunas
+    produtos = np.full(posicoes * altura, -1, dtype=np.intc)
+    quantidades = np.zeros(posicoes * altura, dtype=np.intc)
+    niveis = np.tile(np.arange(altura), posicoes)
+    ocupados = np.flatnonzero(~((np.repeat(np.arange(posicoes), altura) % 7 == 0) & (niveis == altura - 1)))
+    ocupados = ocupados[:total_engradados]
+    produto_da_pilha = aleatorio.integers(0, total_produtos, posicoes, dtype=np.intc)
+    produtos[ocupados] = produto_da_pilha[ocupados // altura]
+    quantidades[ocupados] = aleatorio.integers(1, 51, len(ocupados), dtype=np.intc)
+    alturas = np.bincount(ocupados // altura, minlength=posicoes).astype(np.uint8)
+    codigos = [f"P{k:06d}" for k in range(total_produtos)]
+    return MatrizColunar.de_vetores(linhas, colunas, altura, alturas, produtos, quantidades, codigos)
+
+
+def gerar_catalogo(total_produtos, semente=1):
+    aleatorio = np.random.default_rng(semente)
+    hoje = datetime.now()
+    dias = aleatorio.integers(-10, 720, total_produtos).tolist()
+    return CatalogoProdutos(
+        Produto(f"P{k:06d}", "L1", f"Produto {k}", 1.0, (hoje + timedelta(days=dias[k])).strftime("%Y-%m-%d"),
+                "2024-01-01", 10.0 + k % 7, 15.0 + k % 11, "Fornecedor", "Fabricante", "Geral")
+        for k in range(total_produtos)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a análise vetorizada do estoque com NumPy.")
+    parser.add_argument('--engradados', type=int, default=10_000_000, help="Número de engradados na matriz.")
+    parser.add_argument('--produtos', type=int, default=5000, help="Número de produtos cadastrados.")
+    parser.add_argument('--altura', type=int, default=5, help="Altura máxima das pilhas.")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Repetições (vale o melhor tempo).")
+    args = parser.parse_args()
+    if np is None:
+        sys.exit("Este benchmark precisa do NumPy (pip install numpy).")
+
+    matriz = gerar_matriz(args.engradados, args.produtos, args.altura)
+    catalogo = gerar_catalogo(args.produtos)
+
+    melhor_exportacao = melhor_relatorios = float('inf')
+    for _ in range(args.repeticoes):
+        inicio = time.perf_counter()
+        analise = AnaliseEstoque(matriz, catalogo)
+        meio = time.perf_counter()
+        relatorios = analise.relatorios()
+        fim = time.perf_counter()
+        melhor_exportacao = min(melhor_exportacao, meio - inicio)
+        melhor_relatorios = min(melhor_relatorios, fim - meio)
+
+    valor = relatorios['valor_estoque']
+    print(f"--- Análise vetorizada: {len(analise.produto)} engradados, {args.produtos} produtos ---")
+    print(f"  exportação para NumPy: {melhor_exportacao:.3f} s")
+    print(f"  todos os relatórios:   {melhor_relatorios:.3f} s")
+    print(f"  itens em falta: {len(relatorios['itens_em_falta'])}, "
+          f"engradados a vencer em 30 dias: {len(relatorios['proximos_vencimento'])}")
+    print(f"  valor a custo: R$ {valor['valor_custo']:.2f}, a venda: R$ {valor['valor_venda']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
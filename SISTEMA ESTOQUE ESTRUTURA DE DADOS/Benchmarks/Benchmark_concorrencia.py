@@ -0,0 +1,151 @@
+# Benchmark de concorrência: várias estações de separação (threads) usando o mesmo estoque.
+# - "trava global": o Estoque comum, com uma única trava em volta de cada operação;
+# - "concorrente": o EstoqueConcorrente, com travas por produto e por posição.
+# Cada thread trabalha com os seus próprios produtos, adicionando engradados e retirando
+# unidades. No fim, um teste de disputa faz todas as threads retirarem o mesmo produto e
+# confere que nada foi retirado além do saldo.
+#
+# No CPython com GIL as threads não executam código Python em paralelo, então o ganho da
+# versão concorrente aparece principalmente em builds sem GIL (free-threaded).
+#
+# Uso (a partir da pasta do projeto):
+#     python -m Benchmarks.Benchmark_concorrencia --threads 1 2 4 8 --operacoes 20000
+import argparse
+import contextlib
+import os
+import random
+import sys
+import threading
+import time
+
+# Permite executar o arquivo diretamente, além de "python -m Benchmarks.Benchmark_concorrencia".
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Engradado import Engradado
+from Estoque import Estoque
+from Estoque_concorrente import EstoqueConcorrente
+
+
+class EstoqueTravaGlobal:
+    """
+    Referência: o Estoque comum com uma única trava em volta de cada operação.
+    """
+    def __init__(self, *args):
+        self._estoque = Estoque(*args)
+        self._trava = threading.Lock()
+
+    def adicionar_engradado(self, engradado):
+        with self._trava:
+            return self._estoque.adicionar_engradado(engradado)
+
+    def remover_engradado(self, produto_codigo, quantidade):
+        with self._trava:
+            return self._estoque.remover_engradado(produto_codigo, quantidade)
+
+    def contar_por_produto(self, produto_codigo):
+        with self._trava:
+            return self._estoque.contar_por_produto(produto_codigo)
+
+
+def _estacao(estoque, produtos, operacoes, semente, barreira):
+    """
+    Trabalho de uma estação: alterna entre guardar um engradado e retirar unidades.
+    """
+    aleatorio = random.Random(semente)
+    barreira.wait()
+    for _ in range(operacoes):
+        codigo = aleatorio.choice(produtos)
+        if aleatorio.random() < 0.55:
+            estoque.adicionar_engradado(Engradado(codigo, aleatorio.randint(5, 20)))
+        else:
+            estoque.remover_engradado(codigo, aleatorio.randint(1, 15))
+
+
+def _executar_threads(alvo, argumentos):
+    """
+    Inicia uma thread por tupla de argumentos e retorna o tempo (em segundos) até todas terminarem.
+    """
+    barreira = threading.Barrier(len(argumentos) + 1)
+    threads = [threading.Thread(target=alvo, args=args + (barreira,)) for args in argumentos]
+    for thread in threads:
+        thread.start()
+    barreira.wait()
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - inicio
+
+
+def medir_vazao(criar_estoque, total_threads, operacoes, produtos_por_thread=20):
+    """
+    Mede as operações por segundo com 'total_threads' estações, cada uma com produtos próprios.
+    """
+    estoque = criar_estoque()
+    argumentos = [
+        (estoque, [f"T{t}-P{k}" for k in range(produtos_por_thread)], operacoes, t)
+        for t in range(total_threads)
+    ]
+    duracao = _executar_threads(_estacao, argumentos)
+    return total_threads * operacoes / duracao
+
+
+def _disputa(estoque, codigo, retiradas, semente, barreira):
+    aleatorio = random.Random(semente)
+    barreira.wait()
+    while True:
+        quantidade = aleatorio.randint(1, 7)
+        if estoque.remover_engradado(codigo, quantidade):
+            retiradas.append(quantidade)
+        elif estoque.contar_por_produto(codigo) == 0:
+            return
+
+
+def conferir_disputa(criar_estoque, total_threads, engradados=2000):
+    """
+    Todas as threads retiram o mesmo produto até o saldo acabar.
+
+    Returns:
+        tuple: (unidades guardadas, unidades retiradas, saldo final).
+    """
+    estoque = criar_estoque()
+    guardadas = 0
+    for k in range(engradados):
+        quantidade = 1 + k % 10
+        if estoque.adicionar_engradado(Engradado('DISPUTADO', quantidade)):
+            guardadas += quantidade
+    retiradas = []
+    _executar_threads(_disputa, [(estoque, 'DISPUTADO', retiradas, t) for t in range(total_threads)])
+    return guardadas, sum(retiradas), estoque.contar_por_produto('DISPUTADO')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a vazão do estoque com várias threads de separação.")
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8], help="Números de threads a testar.")
+    parser.add_argument('--operacoes', type=int, default=20000, help="Operações por thread.")
+    parser.add_argument('--linhas', type=int, default=200, help="Linhas da matriz.")
+    parser.add_argument('--colunas', type=int, default=100, help="Colunas da matriz.")
+    args = parser.parse_args()
+
+    versoes = {
+        'trava global': lambda: EstoqueTravaGlobal(args.linhas, args.colunas),
+        'concorrente': lambda: EstoqueConcorrente(args.linhas, args.colunas),
+    }
+    # As operações imprimem mensagens para o menu; aqui elas são descartadas.
+    with open(os.devnull, 'w') as nulo:
+        with contextlib.redirect_stdout(nulo):
+            resultados = {nome: [medir_vazao(criar, t, args.operacoes) for t in args.threads]
+                          for nome, criar in versoes.items()}
+            disputas = {t: conferir_disputa(versoes['concorrente'], t) for t in args.threads}
+
+    print(f"--- Vazão (operações/s, {args.operacoes} operações por thread) ---")
+    print(f"  {'threads':<14}" + "".join(f"{t:>12}" for t in args.threads))
+    for nome, vazoes in resultados.items():
+        print(f"  {nome:<14}" + "".join(f"{v:12.0f}" for v in vazoes))
+    print("--- Disputa pelo mesmo produto (estoque concorrente) ---")
+    for t, (guardadas, retiradas, saldo) in disputas.items():
+        situacao = "ok" if retiradas + saldo == guardadas and saldo >= 0 else "ERRO: venda além do saldo"
+        print(f"  {t} threads: guardadas {guardadas}, retiradas {retiradas}, saldo {saldo} ({situacao})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# Benchmark de escalonamento: mede o tempo de espera dos pedidos na fila com cada política
+# (veja Politicas_fila.py), usando o mesmo fluxo sintético de pedidos e reposições.
+#
+# A simulação avança em rodadas. Em cada rodada chegam pedidos novos (alguns com data de
+# solicitação retroativa e alguns de clientes prioritários), chegam engradados de reposição
+# e a separação processa um número fixo de pedidos com processar_pedido. A espera de um
+# pedido é o número de rodadas entre a chegada e o atendimento.
+#
+# Uso (a partir da pasta do projeto):
+#     python -m Benchmarks.Benchmark_escalonamento --rodadas 2000 --pedidos-por-rodada 8
+import argparse
+import contextlib
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+# Permite executar o arquivo diretamente, além de "python -m Benchmarks.Benchmark_escalonamento".
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Engradado import Engradado
+from Estoque import Estoque
+from Fila_de_Pedidos import FilaPedidos
+from Pedido import Pedido
+from Politicas_fila import (PoliticaFIFO, PoliticaDataSolicitacao, PoliticaPrioridadeCliente,
+                            PoliticaAtendivelPrimeiro)
+
+CLIENTES = ['Cliente %d' % k for k in range(20)]
+PRIORIDADES = {'Cliente 0': 2, 'Cliente 1': 2, 'Cliente 2': 1}
+
+
+def _percentil(valores, p):
+    if not valores:
+        return float('nan')
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def simular(politica, rodadas, pedidos_por_rodada, capacidade, produtos=20, semente=7):
+    """
+    Executa a simulação com uma política.
+
+    Returns:
+        dict: 'atendidos', 'pendentes', 'espera_p50', 'espera_p90', 'espera_p99',
+              'espera_max' (em rodadas) e 'espera_p90_prioritarios'.
+    """
+    aleatorio = random.Random(semente)
+    estoque = Estoque(60, 50)
+    fila = FilaPedidos(politica)
+    codigos = [f"P{k}" for k in range(produtos)]
+    inicio = datetime(2025, 1, 1)
+    chegada = {}
+    esperas = []
+    esperas_prioritarios = []
+
+    for rodada in range(rodadas):
+        # Pedidos novos: alguns chegam com a solicitação feita dias antes.
+        for _ in range(aleatorio.randint(0, 2 * pedidos_por_rodada)):
+            data = inicio + timedelta(days=rodada // 10 - aleatorio.choice((0, 0, 0, 1, 3)))
+            pedido = Pedido(aleatorio.choice(codigos), aleatorio.choice((2, 5, 10, 40)),
+                            data, aleatorio.choice(CLIENTES))
+            fila.adicionar_pedido(pedido)
+            chegada[pedido.numero] = rodada
+        # Reposição: alguns engradados por rodada, de produtos aleatórios.
+        for _ in range(aleatorio.randint(0, 6)):
+            estoque.adicionar_engradado(Engradado(aleatorio.choice(codigos), 20))
+        # Separação: um número fixo de tentativas por rodada.
+        for _ in range(capacidade):
+            if fila.processar_pedido(estoque) is None:
+                break
+            if fila.historico_atendidos and fila.historico_atendidos[-1].numero in chegada:
+                pedido = fila.historico_atendidos[-1]
+                espera = rodada - chegada.pop(pedido.numero)
+                esperas.append(espera)
+                if pedido.solicitante in PRIORIDADES:
+                    esperas_prioritarios.append(espera)
+
+    return {
+        'atendidos': len(esperas),
+        'pendentes': len(fila.fila),
+        'espera_p50': _percentil(esperas, 50),
+        'espera_p90': _percentil(esperas, 90),
+        'espera_p99': _percentil(esperas, 99),
+        'espera_max': max(esperas, default=float('nan')),
+        'espera_p90_prioritarios': _percentil(esperas_prioritarios, 90),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara o tempo de espera na fila com cada política de escalonamento.")
+    parser.add_argument('--rodadas', type=int, default=2000, help="Número de rodadas simuladas.")
+    parser.add_argument('--pedidos-por-rodada', type=int, default=4, help="Média de pedidos novos por rodada.")
+    parser.add_argument('--capacidade', type=int, default=6, help="Tentativas de atendimento por rodada.")
+    parser.add_argument('--semente', type=int, default=7, help="Semente do fluxo sintético.")
+    args = parser.parse_args()
+
+    politicas = {
+        'FIFO': PoliticaFIFO(),
+        'data de solicitação': PoliticaDataSolicitacao(),
+        'prioridade do cliente': PoliticaPrioridadeCliente(PRIORIDADES),
+        'atendível primeiro': PoliticaAtendivelPrimeiro(),
+    }
+    # As operações imprimem mensagens para o menu; aqui elas são descartadas.
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        resultados = {nome: simular(politica, args.rodadas, args.pedidos_por_rodada, args.capacidade,
+                                    semente=args.semente)
+                      for nome, politica in politicas.items()}
+
+    print(f"--- Espera na fila, em rodadas ({args.rodadas} rodadas) ---")
+    print(f"  {'política':<24}{'atendidos':>10}{'pendentes':>10}{'p50':>7}{'p90':>7}{'p99':>7}{'máx':>7}{'p90 prior.':>12}")
+    for nome, r in resultados.items():
+        print(f"  {nome:<24}{r['atendidos']:>10}{r['pendentes']:>10}{r['espera_p50']:>7}{r['espera_p90']:>7}"
+              f"{r['espera_p99']:>7}{r['espera_max']:>7}{r['espera_p90_prioritarios']:>12}")
+
+
+if __name__ == "__main__":
+    main()
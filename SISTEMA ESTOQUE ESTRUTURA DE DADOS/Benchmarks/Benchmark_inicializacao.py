@@ -0,0 +1,124 @@
+# Benchmark da inicialização: quanto tempo leva para carregar os arquivos JSON de um armazém
+# grande e deixar o menu pronto (catálogo, estoque, fila de pendentes e relatórios vinculados).
+# - "completa": lê os arquivos um depois do outro e já cria tudo na carga (todos os pedidos
+#   do histórico, todas as datas convertidas e o volume por cliente calculado), como a
+#   inicialização fazia antes;
+# - "adiada (serial)": o caminho usado pelo Menu, que adia o histórico e as datas e lê os
+#   arquivos um depois do outro;
+# - "adiada (paralela)": como a anterior, com os três arquivos lidos em uma pool de threads
+#   (veja Carga_paralela.py).
+# Para os modos adiados também é medida a primeira consulta ao histórico (o relatório de
+# volume por cliente), que paga a criação dos pedidos adiada.
+#
+# Os arquivos ficam no cache do sistema operacional depois da geração, então o tempo medido
+# é o de decodificar e montar os objetos, não o de leitura do disco.
+#
+# Uso (a partir da pasta do projeto):
+#     python -m Benchmarks.Benchmark_inicializacao --produtos 20000 --historico 300000
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Permite executar o arquivo diretamente, além de "python -m Benchmarks.Benchmark_inicializacao".
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Benchmarks.Geradores import codigos_produtos, gerar_catalogo, gerar_armazem, gerar_fluxo_pedidos
+from Carga_paralela import carregar_arquivos_json
+from Estoque import Estoque
+from Fila_de_Pedidos import FilaPedidos
+from Produto import data_de_texto
+from Visoes_relatorios import RelatoriosMaterializados
+
+
+def gerar_arquivos(diretorio, total_produtos, linhas, colunas, altura, pendentes, historico, semente=1):
+    """
+    Grava produtos.json, estoque.json e pedidos.json com dados sintéticos.
+
+    Returns:
+        dict: Os caminhos dos arquivos 'produtos', 'estoque' e 'pedidos'.
+    """
+    arquivos = {nome: os.path.join(diretorio, f"{nome}.json") for nome in ('produtos', 'estoque', 'pedidos')}
+    codigos = codigos_produtos(total_produtos)
+    gerar_catalogo(total_produtos, semente=semente).salvar(arquivos['produtos'])
+    gerar_armazem(linhas, colunas, altura, codigos, semente=semente).salvar_estoque(arquivos['estoque'])
+    pedidos = list(gerar_fluxo_pedidos(codigos, pendentes + historico, semente=semente))
+    fila_pedidos = FilaPedidos()
+    fila_pedidos.carregar_objetos(pedidos[historico:], pedidos[:historico])
+    fila_pedidos.salvar_pedidos(arquivos['pedidos'])
+    return arquivos
+
+
+def iniciar(arquivos, modo):
+    """
+    Carrega os arquivos e vincula os relatórios, como o Menu faz ao iniciar.
+
+    Returns:
+        tuple: (segundos até o menu ficar pronto, os relatórios criados).
+    """
+    # Sem as conversões de datas guardadas por uma repetição anterior.
+    data_de_texto.cache_clear()
+    inicio = time.perf_counter()
+    estoque = Estoque()
+    fila_pedidos = FilaPedidos()
+    completa = modo == 'completa'
+    produtos = carregar_arquivos_json(estoque, fila_pedidos, arquivos, paralela=modo == 'adiada (paralela)',
+                                      adiar_historico=not completa)
+    relatorios = RelatoriosMaterializados(estoque, fila_pedidos, produtos)
+    if completa:
+        for produto in produtos:
+            produto.data_validade, produto.data_fabricacao
+        for pedido in fila_pedidos.historico_atendidos:
+            pedido.data_solicitacao
+        relatorios.volume_por_cliente.unidades
+    return time.perf_counter() - inicio, relatorios
+
+
+def executar(arquivos, repeticoes):
+    """
+    Mede cada modo de inicialização e retorna o melhor tempo entre as repetições.
+
+    Returns:
+        dict: Nome do modo -> {'inicializacao': segundos, 'primeira_consulta': segundos}.
+    """
+    resultados = {}
+    for modo in ('completa', 'adiada (serial)', 'adiada (paralela)'):
+        melhor_inicio = melhor_consulta = float('inf')
+        for _ in range(repeticoes):
+            segundos, relatorios = iniciar(arquivos, modo)
+            inicio = time.perf_counter()
+            relatorios.volume_por_cliente.ranking(10)
+            melhor_consulta = min(melhor_consulta, time.perf_counter() - inicio)
+            melhor_inicio = min(melhor_inicio, segundos)
+        resultados[modo] = {'inicializacao': melhor_inicio, 'primeira_consulta': melhor_consulta}
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o tempo de inicialização com arquivos JSON grandes.")
+    parser.add_argument('--produtos', type=int, default=20000, help="Produtos no catálogo.")
+    parser.add_argument('--linhas', type=int, default=100, help="Linhas da matriz do estoque.")
+    parser.add_argument('--colunas', type=int, default=100, help="Colunas da matriz do estoque.")
+    parser.add_argument('--altura', type=int, default=10, help="Altura máxima de cada pilha.")
+    parser.add_argument('--pendentes', type=int, default=5000, help="Pedidos na fila de pendentes.")
+    parser.add_argument('--historico', type=int, default=300000, help="Pedidos no histórico de atendidos.")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Repetições de cada modo (vale a melhor).")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivos = gerar_arquivos(diretorio, args.produtos, args.linhas, args.colunas, args.altura,
+                                  args.pendentes, args.historico)
+        tamanho = sum(os.path.getsize(caminho) for caminho in arquivos.values())
+        resultados = executar(arquivos, args.repeticoes)
+
+    print(f"--- Inicialização ({args.produtos} produtos, {args.historico} pedidos no histórico, "
+          f"{tamanho / 1e6:.1f} MB de JSON) ---")
+    base = resultados['completa']['inicializacao']
+    for modo, tempos in resultados.items():
+        print(f"  {modo:<20} até o menu: {tempos['inicializacao']:7.3f} s ({base / tempos['inicializacao']:4.1f}x)"
+              f"   primeira consulta ao histórico: {tempos['primeira_consulta']:7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# Benchmark de memória: compara quantos bytes cada engradado custa em cada representação.
+# - "objetos com __dict__": o layout antigo, um objeto Engradado com __dict__ por engradado;
+# - "objetos com __slots__": a mesma matriz de listas, com o Engradado atual (com __slots__);
+# - "colunar": a MatrizColunar, com vetores de inteiros e códigos internados.
+# As duas primeiras usam exatamente o mesmo contêiner, então a diferença entre elas é só a
+# do objeto Engradado. O Estoque completo (Pilhas e índices por produto) é medido à parte:
+# "índices do Estoque" é o que ele custa a mais que a matriz de listas com __slots__.
+#
+# Uso (a partir da pasta do projeto):
+#     python -m Benchmarks.Benchmark_memoria --engradados 1000000 --produtos 1000
+import argparse
+import os
+import sys
+import tracemalloc
+
+# Permite executar o arquivo diretamente, além de "python -m Benchmarks.Benchmark_memoria".
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Engradado import Engradado
+from Estoque import Estoque
+from Matriz_colunar import MatrizColunar
+
+
+class EngradadoComDict:
+    """
+    Réplica do Engradado original (sem __slots__), usada apenas como referência.
+    """
+    def __init__(self, produto_codigo, quantidade):
+        self.produto_codigo = produto_codigo
+        self.quantidade = quantidade
+
+
+def _gerar_pilhas(total_engradados, total_produtos, colunas, altura):
+    """
+    Gera as pilhas do teste: cada pilha é cheia com engradados de um único produto.
+
+    Yields:
+        tuple: (linha, coluna, lista de (produto_codigo, quantidade)).
+    """
+    # Os códigos são criados uma vez só, como acontece com um catálogo real.
+    codigos = [f"P{k:06d}" for k in range(total_produtos)]
+    posicao = 0
+    restantes = total_engradados
+    while restantes > 0:
+        tamanho = min(altura, restantes)
+        linha, coluna = divmod(posicao, colunas)
+        codigo = codigos[posicao % total_produtos]
+        yield linha, coluna, [(codigo, 10 + nivel) for nivel in range(tamanho)]
+        restantes -= tamanho
+        posicao += 1
+
+
+def _medir(construir):
+    """
+    Mede a memória alocada (em bytes) pelo objeto retornado por 'construir'.
+    O objeto é mantido vivo até o fim da medição.
+    """
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    objeto = construir()
+    depois = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objeto
+    return depois - antes
+
+
+def executar(total_engradados, total_produtos, colunas=1000, altura=5):
+    """
+    Executa o benchmark e retorna os bytes por engradado de cada representação.
+
+    Returns:
+        dict: Nome da representação -> bytes por engradado.
+    """
+    linhas = -(-total_engradados // (colunas * altura))
+    pilhas = list(_gerar_pilhas(total_engradados, total_produtos, colunas, altura))
+
+    def matriz_de_listas(classe):
+        # Layout antigo: matriz de listas, uma lista por pilha, um objeto por engradado.
+        matriz = [[[] for _ in range(colunas)] for _ in range(linhas)]
+        for i, j, engradados in pilhas:
+            matriz[i][j].extend(classe(c, q) for c, q in engradados)
+        return matriz
+
+    def estoque_completo():
+        estoque = Estoque(linhas, colunas, altura)
+        estoque.carregar_pilhas(linhas, colunas, (
+            (i, j, [Engradado(c, q) for c, q in engradados]) for i, j, engradados in pilhas
+        ))
+        return estoque
+
+    def colunar():
+        matriz = MatrizColunar(linhas, colunas, altura)
+        for i, j, engradados in pilhas:
+            for c, q in engradados:
+                matriz.empilhar(i, j, c, q)
+        return matriz
+
+    com_slots = _medir(lambda: matriz_de_listas(Engradado)) / total_engradados
+    return {
+        'objetos com __dict__': _medir(lambda: matriz_de_listas(EngradadoComDict)) / total_engradados,
+        'objetos com __slots__': com_slots,
+        'colunar': _medir(colunar) / total_engradados,
+        'índices do Estoque': _medir(estoque_completo) / total_engradados - com_slots,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara os bytes por engradado de cada representação do estoque.")
+    parser.add_argument('--engradados', type=int, default=200000, help="Número de engradados a armazenar.")
+    parser.add_argument('--produtos', type=int, default=1000, help="Número de produtos distintos.")
+    parser.add_argument('--colunas', type=int, default=1000, help="Colunas da matriz (as linhas são calculadas).")
+    parser.add_argument('--altura', type=int, default=5, help="Altura máxima de cada pilha.")
+    args = parser.parse_args()
+
+    resultados = executar(args.engradados, args.produtos, args.colunas, args.altura)
+    print(f"--- Memória por engradado ({args.engradados} engradados, {args.produtos} produtos) ---")
+    for nome, bytes_por_engradado in resultados.items():
+        print(f"  {nome:<24} {bytes_por_engradado:8.1f} bytes/engradado")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Benchmark da rede de estoques (veja Rede_estoques.py): vazão de entrada de engradados,
+# contagens e retiradas com 1, 2, 4... armazéns, cada um em um processo próprio.
+#
+# O armazém total tem sempre o mesmo tamanho: com N armazéns, cada um tem 1/N das linhas.
+# Os engradados chegam em lotes (a rede entrega a parte de cada armazém de uma vez) e as
+# retiradas são divididas pela política escolhida. Como os armazéns trabalham ao mesmo
+# tempo, a vazão só cresce com o número de armazéns se houver CPUs livres para eles.
+# As contagens são medidas uma a uma (uma ida e volta por armazém a cada produto) e em lotes
+# de produtos (contar_produtos: uma ida e volta por armazém a cada lote).
+#
+# Uso (a partir da pasta do projeto):
+#     python -m Benchmarks.Benchmark_rede --armazens 1 2 4 --engradados 200000
+import argparse
+import os
+import sys
+import time
+
+# Permite executar o arquivo diretamente, além de "python -m Benchmarks.Benchmark_rede".
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Benchmarks.Geradores import codigos_produtos, gerar_engradados
+from Rede_estoques import RedeEstoques, EstoqueEmProcesso, POLITICAS_DIVISAO, DIVISAO_MAIOR_SALDO
+
+
+def executar(total_armazens, engradados, codigos, linhas, colunas, altura, tamanho_lote, retiradas, politica,
+             lote_consultas):
+    """
+    Mede as operações da rede com 'total_armazens' armazéns.
+
+    Returns:
+        dict: Operações por segundo de 'entrada', 'contagem', 'contagem_lote' e 'retirada'.
+    """
+    linhas_por_armazem = -(-linhas // total_armazens)
+    rede = RedeEstoques([EstoqueEmProcesso(linhas_por_armazem, colunas, altura) for _ in range(total_armazens)],
+                        localizacoes=[(k, 0) for k in range(total_armazens)], politica_divisao=politica)
+    try:
+        inicio = time.perf_counter()
+        for k in range(0, len(engradados), tamanho_lote):
+            rede.adicionar_engradados(engradados[k:k + tamanho_lote])
+        entrada = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for codigo in codigos:
+            rede.contar_por_produto(codigo)
+        contagem = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for k in range(0, len(codigos), lote_consultas):
+            rede.contar_produtos(codigos[k:k + lote_consultas])
+        contagem_lote = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for k in range(retiradas):
+            rede.remover_engradado(codigos[k % len(codigos)], 5, destino=(0, 0))
+        retirada = time.perf_counter() - inicio
+    finally:
+        rede.fechar()
+    return {
+        'entrada': len(engradados) / entrada,
+        'contagem': len(codigos) / contagem,
+        'contagem_lote': len(codigos) / contagem_lote,
+        'retirada': retiradas / retirada,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a vazão da rede de estoques com vários armazéns.")
+    parser.add_argument('--armazens', type=int, nargs='+', default=[1, 2, 4], help="Números de armazéns a medir.")
+    parser.add_argument('--engradados', type=int, default=200000, help="Engradados que entram na rede.")
+    parser.add_argument('--produtos', type=int, default=2000, help="Número de produtos distintos.")
+    parser.add_argument('--linhas', type=int, default=400, help="Linhas do armazém total.")
+    parser.add_argument('--colunas', type=int, default=100, help="Colunas de cada armazém.")
+    parser.add_argument('--altura', type=int, default=10, help="Altura máxima de cada pilha.")
+    parser.add_argument('--lote', type=int, default=5000, help="Engradados por chamada de adicionar_engradados.")
+    parser.add_argument('--lote-consultas', type=int, default=100, help="Produtos por chamada de contar_produtos.")
+    parser.add_argument('--retiradas', type=int, default=2000, help="Retiradas de 5 unidades.")
+    parser.add_argument('--politica', choices=POLITICAS_DIVISAO, default=DIVISAO_MAIOR_SALDO,
+                        help="Política de divisão das retiradas.")
+    args = parser.parse_args()
+
+    codigos = codigos_produtos(args.produtos)
+    engradados = list(gerar_engradados(codigos, args.engradados, 'zipf'))
+    print(f"--- Rede de estoques ({args.engradados} engradados, {args.produtos} produtos, "
+          f"{os.cpu_count()} CPUs) ---")
+    base = None
+    for total in args.armazens:
+        vazao = executar(total, engradados, codigos, args.linhas, args.colunas, args.altura,
+                         args.lote, args.retiradas, args.politica, args.lote_consultas)
+        base = base or vazao
+        print(f"  {total:>3} armazéns: entrada {vazao['entrada']:10.0f} engradados/s "
+              f"({vazao['entrada'] / base['entrada']:4.1f}x)   contagem {vazao['contagem']:8.0f}/s   "
+              f"contagem em lote {vazao['contagem_lote']:9.0f}/s   retirada {vazao['retirada']:8.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
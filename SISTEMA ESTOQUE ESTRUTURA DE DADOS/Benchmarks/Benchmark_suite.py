@@ -0,0 +1,255 @@
+# Suíte de benchmarks das operações mais usadas do sistema, sobre dados sintéticos
+# (veja Geradores.py): inclusão e remoção de engradados, contagem por produto,
+# processamento de pedidos, gravação e leitura dos arquivos JSON e cada relatório do menu.
+#
+# O resultado é um JSON com os parâmetros da execução e, para cada operação, o número de
+# operações, o melhor tempo entre as repetições e a vazão. Com --comparar, os tempos são
+# comparados com os de uma execução anterior e o programa termina com código 1 se alguma
+# operação ficou mais lenta que a tolerância.
+#
+# Uso (a partir da pasta do projeto):
+#     python -m Benchmarks.Benchmark_suite --saida base.json
+#     python -m Benchmarks.Benchmark_suite --saida nova.json --comparar base.json
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Permite executar o arquivo diretamente, além de "python -m Benchmarks.Benchmark_suite".
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Benchmarks.Geradores import (DISTRIBUICOES, codigos_produtos, gerar_catalogo, gerar_engradados,
+                                  gerar_armazem, gerar_fluxo_pedidos)
+from Estoque import Estoque
+from Fila_de_Pedidos import FilaPedidos
+from Produto import CatalogoProdutos
+from Visoes_relatorios import RelatoriosMaterializados
+import Operacoes_menu as op
+
+VERSAO_FORMATO = 1
+
+
+def medir(preparar, executar, repeticoes):
+    """
+    Mede uma operação: 'preparar' monta o estado (fora do tempo medido) e 'executar'
+    recebe esse estado e retorna quantas operações fez.
+
+    Returns:
+        dict: 'operacoes', 'segundos' (o melhor tempo), 'operacoes_por_segundo' e
+              'microssegundos_por_operacao'.
+    """
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        estado = preparar()
+        inicio = time.perf_counter()
+        operacoes = executar(estado)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return {
+        'operacoes': operacoes,
+        'segundos': melhor,
+        'operacoes_por_segundo': operacoes / melhor if melhor > 0 else float('inf'),
+        'microssegundos_por_operacao': melhor / operacoes * 1e6 if operacoes else 0.0,
+    }
+
+
+def executar_suite(args):
+    """
+    Gera os dados sintéticos e mede todas as operações.
+
+    Returns:
+        dict: Nome da operação -> medição (veja medir).
+    """
+    codigos = codigos_produtos(args.produtos)
+    catalogo = gerar_catalogo(args.produtos, semente=args.semente)
+    total_engradados = int(args.linhas * args.colunas * args.altura * args.ocupacao)
+
+    def armazem():
+        return gerar_armazem(args.linhas, args.colunas, args.altura, codigos, args.ocupacao,
+                             args.distribuicao, args.inclinacao_engradados, semente=args.semente)
+
+    def pedidos():
+        return list(gerar_fluxo_pedidos(codigos, args.pedidos, args.inclinacao_pedidos, semente=args.semente + 1))
+
+    def engradados():
+        return list(gerar_engradados(codigos, total_engradados, args.distribuicao, args.inclinacao_engradados,
+                                     semente=args.semente))
+
+    resultados = {}
+
+    def caso(nome, preparar, executar):
+        resultados[nome] = medir(preparar, executar, args.repeticoes)
+        print(f"  {nome:<40}{resultados[nome]['segundos']:>10.4f} s", file=sys.stderr)
+
+    # --- Estoque e Pilha ---
+    def adicionar(estado):
+        estoque, lista = estado
+        for engradado in lista:
+            estoque.adicionar_engradado(engradado)
+        return len(lista)
+    caso('estoque.adicionar_engradado',
+         lambda: (Estoque(args.linhas, args.colunas, args.altura), engradados()), adicionar)
+    caso('estoque.adicionar_engradados',
+         lambda: (Estoque(args.linhas, args.colunas, args.altura), engradados()),
+         lambda estado: len(estado[1]) - len(estado[0].adicionar_engradados(estado[1])))
+
+    def remover(estado):
+        estoque, lista = estado
+        for pedido in lista:
+            estoque.remover_engradado(pedido.codigo_produto, pedido.quantidade)
+        return len(lista)
+    caso('estoque.remover_engradado', lambda: (armazem(), pedidos()), remover)
+
+    def contar(estado):
+        estoque, lista = estado
+        contar_por_produto = estoque.contar_por_produto
+        for pedido in lista:
+            contar_por_produto(pedido.codigo_produto)
+        return len(lista)
+    caso('estoque.contar_por_produto', lambda: (armazem(), pedidos()), contar)
+
+    # --- FilaPedidos ---
+    def fila_carregada():
+        fila = FilaPedidos()
+        fila.adicionar_pedidos(pedidos())
+        return armazem(), fila
+
+    def processar(estado):
+        estoque, fila = estado
+        for _ in range(args.pedidos):
+            fila.processar_pedido(estoque)
+        return args.pedidos
+    caso('fila.processar_pedido', fila_carregada, processar)
+    caso('fila.processar_lote', fila_carregada,
+         lambda estado: estado[1].processar_lote(estado[0], permitir_parcial=True)['processados'])
+
+    # --- Arquivos JSON ---
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivos = {nome: os.path.join(pasta, nome + '.json') for nome in ('produtos', 'estoque', 'pedidos')}
+        estoque, fila = fila_carregada()
+        processar((estoque, fila))
+        total_gravado = sum(1 for _ in estoque.iter_engradados())
+        registros_fila = len(fila.fila) + len(fila.historico_atendidos)
+
+        caso('json.salvar_produtos', lambda: catalogo,
+             lambda c: (c.salvar(arquivos['produtos']), len(c))[1])
+        caso('json.salvar_estoque', lambda: estoque,
+             lambda e: (e.salvar_estoque(arquivos['estoque']), total_gravado)[1])
+        caso('json.salvar_pedidos', lambda: fila,
+             lambda f: (f.salvar_pedidos(arquivos['pedidos']), registros_fila)[1])
+        caso('json.carregar_produtos', lambda: None,
+             lambda _: len(CatalogoProdutos.carregar(arquivos['produtos'])))
+        caso('json.carregar_estoque', lambda: Estoque(args.linhas, args.colunas, args.altura),
+             lambda e: (e.carregar_estoque(arquivos['estoque']), total_gravado)[1])
+        caso('json.carregar_pedidos', FilaPedidos,
+             lambda f: (f.carregar_pedidos(arquivos['pedidos']), registros_fila)[1])
+
+    # --- Relatórios do menu (sobre o estado depois do processamento da fila) ---
+    estoque.vincular_catalogo(catalogo)
+    relatorios_menu = {
+        'relatorio.estoque_geral': lambda r: op.gerar_relatorio_estoque_geral(estoque, catalogo, r),
+        'relatorio.vencimento': lambda r: op.gerar_relatorio_vencimento(estoque, catalogo, r),
+        'relatorio.itens_em_falta': lambda r: op.gerar_relatorio_itens_em_falta(estoque, catalogo, r),
+        'relatorio.valor_estoque': lambda r: op.gerar_relatorio_valor_estoque(estoque, catalogo),
+        'relatorio.historico_atendidos': lambda r: op.gerar_historico_pedidos_atendidos(fila, catalogo),
+        'relatorio.volume_por_cliente': lambda r: op.gerar_relatorio_volume_por_cliente(fila, r),
+    }
+    for nome, gerar in relatorios_menu.items():
+        caso(nome, lambda: None, lambda _, gerar=gerar: (gerar(None), 1)[1])
+    # Os mesmos relatórios lidos das visões materializadas (veja Visoes_relatorios.py).
+    visoes = RelatoriosMaterializados(estoque, fila, catalogo)
+    for nome in ('relatorio.estoque_geral', 'relatorio.vencimento', 'relatorio.itens_em_falta',
+                 'relatorio.volume_por_cliente'):
+        caso(nome + '.visoes', lambda: visoes, lambda r, gerar=relatorios_menu[nome]: (gerar(r), 1)[1])
+    visoes.desvincular()
+    return resultados
+
+
+def comparar(resultados, anteriores, tolerancia):
+    """
+    Compara os tempos com os de uma execução anterior e mostra a variação de cada operação.
+
+    Returns:
+        list: Nomes das operações que ficaram mais lentas que a tolerância.
+    """
+    regressoes = []
+    print(f"\n  {'operação':<40}{'anterior':>12}{'atual':>12}{'variação':>10}", file=sys.stderr)
+    for nome, atual in resultados.items():
+        anterior = anteriores.get(nome)
+        if anterior is None:
+            print(f"  {nome:<40}{'-':>12}{atual['microssegundos_por_operacao']:>10.2f}µs", file=sys.stderr)
+            continue
+        # Compara o tempo por operação, que não depende do número de operações de cada execução.
+        antes, agora = anterior['microssegundos_por_operacao'], atual['microssegundos_por_operacao']
+        variacao = agora / antes - 1 if antes > 0 else 0.0
+        marca = ''
+        if variacao > tolerancia:
+            regressoes.append(nome)
+            marca = '  REGRESSÃO'
+        print(f"  {nome:<40}{antes:>10.2f}µs{agora:>10.2f}µs{variacao:>+10.1%}{marca}", file=sys.stderr)
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede as operações mais usadas sobre dados sintéticos e grava JSON.")
+    parser.add_argument('--linhas', type=int, default=100, help="Linhas do armazém.")
+    parser.add_argument('--colunas', type=int, default=50, help="Colunas do armazém.")
+    parser.add_argument('--altura', type=int, default=5, help="Altura máxima das pilhas.")
+    parser.add_argument('--produtos', type=int, default=500, help="Número de produtos do catálogo.")
+    parser.add_argument('--ocupacao', type=float, default=0.6, help="Fração dos níveis ocupada por engradados.")
+    parser.add_argument('--distribuicao', choices=DISTRIBUICOES, default='zipf',
+                        help="Distribuição dos produtos entre os engradados.")
+    parser.add_argument('--inclinacao-engradados', type=float, default=0.8, help="Inclinação de Zipf dos engradados.")
+    parser.add_argument('--pedidos', type=int, default=20000, help="Tamanho do fluxo de pedidos.")
+    parser.add_argument('--inclinacao-pedidos', type=float, default=1.1,
+                        help="Inclinação de Zipf dos pedidos (0 para uniforme).")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Repetições (vale o melhor tempo).")
+    parser.add_argument('--semente', type=int, default=1, help="Semente dos dados sintéticos.")
+    parser.add_argument('--saida', help="Arquivo JSON do resultado (se omitido, o JSON vai para a saída padrão).")
+    parser.add_argument('--comparar', help="JSON de uma execução anterior para comparar os tempos.")
+    parser.add_argument('--tolerancia', type=float, default=0.10,
+                        help="Aumento relativo do tempo por operação considerado regressão (0.10 = 10%%).")
+    args = parser.parse_args()
+
+    print(f"--- Suíte de benchmarks ({args.linhas}x{args.colunas}x{args.altura}, {args.produtos} produtos, "
+          f"{args.pedidos} pedidos) ---", file=sys.stderr)
+    inicio = datetime.now()
+    # As operações imprimem mensagens para o menu; aqui elas são descartadas.
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        resultados = executar_suite(args)
+
+    documento = {
+        'versao_formato': VERSAO_FORMATO,
+        'inicio': inicio.isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'implementacao': platform.python_implementation(),
+        'plataforma': platform.platform(),
+        'parametros': {k: v for k, v in vars(args).items() if k not in ('saida', 'comparar', 'tolerancia')},
+        'resultados': resultados,
+    }
+    texto = json.dumps(documento, ensure_ascii=False, indent=2)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            f.write(texto + '\n')
+    else:
+        print(texto)
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            anterior = json.load(f)
+        if anterior.get('parametros') != documento['parametros']:
+            print("\nAviso: a execução anterior usou outros parâmetros; os tempos podem não ser comparáveis.",
+                  file=sys.stderr)
+        regressoes = comparar(resultados, anterior['resultados'], args.tolerancia)
+        if regressoes:
+            print(f"\n{len(regressoes)} operação(ões) mais lenta(s) que a tolerância de {args.tolerancia:.0%}.",
+                  file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# Gerador de carga para o Servidor_pedidos: abre várias conexões ao mesmo tempo, cada uma
+# enviando pedidos em pipeline (até --janela pedidos sem resposta), e mede pedidos por segundo
+# e a latência de cada pedido até a resposta.
+#
+# Uso (a partir da pasta do projeto):
+#     python -m Benchmarks.Carga_pedidos --embutido --clientes 50 --pedidos 400
+#         (sobe um servidor no próprio processo, com catálogo e estoque sintéticos)
+#     python -m Benchmarks.Carga_pedidos --porta 8765 --codigos 1 2 3
+#         (usa um Servidor_pedidos já em execução)
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import time
+
+# Permite executar o arquivo diretamente, além de "python -m Benchmarks.Carga_pedidos".
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Engradado import Engradado
+from Estoque import Estoque
+from Fila_de_Pedidos import FilaPedidos
+from Produto import Produto, CatalogoProdutos
+from Servidor_pedidos import ServidorPedidos
+
+
+async def _cliente(host, porta, codigos, pedidos, janela, semente, latencias, respostas):
+    """
+    Uma conexão: envia 'pedidos' pedidos com no máximo 'janela' sem resposta.
+    """
+    aleatorio = random.Random(semente)
+    leitor, escritor = await asyncio.open_connection(host, porta)
+    vagas = asyncio.Semaphore(janela)
+    # Os instantes de envio chegam à leitura na mesma ordem das respostas.
+    enviados_em = asyncio.Queue()
+
+    async def ler():
+        for _ in range(pedidos):
+            enviado_em = await enviados_em.get()
+            status = json.loads(await leitor.readline())['status']
+            latencias.append(time.perf_counter() - enviado_em)
+            respostas[status] = respostas.get(status, 0) + 1
+            vagas.release()
+
+    leitura = asyncio.create_task(ler())
+    for _ in range(pedidos):
+        await vagas.acquire()
+        pedido = {'codigo_produto': aleatorio.choice(codigos), 'quantidade': aleatorio.randint(1, 5),
+                  'solicitante': f"Cliente {semente}"}
+        escritor.write(json.dumps(pedido).encode('utf-8') + b'\n')
+        enviados_em.put_nowait(time.perf_counter())
+        await escritor.drain()
+    await leitura
+    escritor.close()
+    await escritor.wait_closed()
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+async def executar(host, porta, codigos, clientes, pedidos, janela):
+    """
+    Executa a carga e retorna as métricas.
+
+    Returns:
+        dict: 'pedidos', 'duracao_segundos', 'pedidos_por_segundo', 'latencia_p50_ms',
+              'latencia_p99_ms' e 'respostas' (contagem por status).
+    """
+    latencias = []
+    respostas = {}
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        _cliente(host, porta, codigos, pedidos, janela, c, latencias, respostas) for c in range(clientes)
+    ))
+    duracao = time.perf_counter() - inicio
+    total = clientes * pedidos
+    return {
+        'pedidos': total,
+        'duracao_segundos': duracao,
+        'pedidos_por_segundo': total / duracao,
+        'latencia_p50_ms': _percentil(latencias, 50) * 1000,
+        'latencia_p99_ms': _percentil(latencias, 99) * 1000,
+        'respostas': respostas,
+    }
+
+
+def _sistema_sintetico(total_produtos=100):
+    """
+    Catálogo e estoque sintéticos para o servidor embutido.
+    """
+    catalogo = CatalogoProdutos(
+        Produto(str(k), str(k), f"Produto {k}", 1.0, "2030-01-01", "2024-01-01", 1.0, 2.0,
+                "Fornecedor", "Fabricante", "Categoria")
+        for k in range(total_produtos)
+    )
+    estoque = Estoque(100, 50)
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        for k in range(total_produtos * 40):
+            estoque.adicionar_engradado(Engradado(str(k % total_produtos), 50))
+    return catalogo, estoque
+
+
+async def _executar_embutido(args):
+    catalogo, estoque = _sistema_sintetico()
+    servidor = ServidorPedidos(FilaPedidos(), estoque, catalogo, tamanho_fila=args.tamanho_fila)
+    soquete = await servidor.iniciar_tcp('127.0.0.1', 0)
+    porta = soquete.sockets[0].getsockname()[1]
+    codigos = [produto.codigo for produto in catalogo]
+    try:
+        return await executar('127.0.0.1', porta, codigos, args.clientes, args.pedidos, args.janela)
+    finally:
+        await servidor.parar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera carga de pedidos para o Servidor_pedidos.")
+    parser.add_argument('--host', default='127.0.0.1', help="Endereço do servidor.")
+    parser.add_argument('--porta', type=int, default=8765, help="Porta do servidor.")
+    parser.add_argument('--codigos', nargs='+', default=['1'], help="Códigos de produto usados nos pedidos.")
+    parser.add_argument('--clientes', type=int, default=50, help="Conexões simultâneas.")
+    parser.add_argument('--pedidos', type=int, default=200, help="Pedidos por conexão.")
+    parser.add_argument('--janela', type=int, default=32, help="Pedidos sem resposta por conexão.")
+    parser.add_argument('--embutido', action='store_true', help="Sobe um servidor sintético no próprio processo.")
+    parser.add_argument('--tamanho-fila', type=int, default=10000, help="Fila de entrada do servidor embutido.")
+    args = parser.parse_args()
+
+    if args.embutido:
+        # As mensagens do processamento da fila são descartadas para não distorcer a medida.
+        with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+            resultado = asyncio.run(_executar_embutido(args))
+    else:
+        resultado = asyncio.run(executar(args.host, args.porta, args.codigos, args.clientes,
+                                         args.pedidos, args.janela))
+
+    print(f"--- Carga de pedidos ({args.clientes} clientes x {args.pedidos} pedidos) ---")
+    print(f"  Duração:      {resultado['duracao_segundos']:.2f} s")
+    print(f"  Vazão:        {resultado['pedidos_por_segundo']:.0f} pedidos/s")
+    print(f"  Latência p50: {resultado['latencia_p50_ms']:.2f} ms")
+    print(f"  Latência p99: {resultado['latencia_p99_ms']:.2f} ms")
+    print(f"  Respostas:    {resultado['respostas']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# Geradores de dados sintéticos para os benchmarks: catálogos, armazéns e fluxos de pedidos.
+# Todos recebem uma semente, então a mesma chamada gera sempre os mesmos dados.
+#
+# A popularidade dos produtos pode ser uniforme ou seguir uma distribuição de Zipf: o
+# produto de posição k é escolhido com peso 1 / (k + 1) ** inclinacao. Com inclinação 0 a
+# escolha é uniforme; com inclinação 1 ou mais, poucos produtos concentram a maior parte
+# dos engradados ou dos pedidos, como acontece em armazéns reais.
+import random
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from Engradado import Engradado
+from Estoque import Estoque
+from Pedido import Pedido
+from Produto import Produto, CatalogoProdutos
+
+DISTRIBUICOES = ('uniforme', 'zipf')
+
+
+def codigos_produtos(total_produtos):
+    """
+    Retorna os códigos dos produtos sintéticos, na ordem de popularidade.
+    """
+    return [f"P{k:06d}" for k in range(total_produtos)]
+
+
+def pesos_acumulados(total, distribuicao='zipf', inclinacao=1.0):
+    """
+    Pesos acumulados (para random.choices) de 'total' itens segundo a distribuição.
+
+    Args:
+        total (int): Número de itens.
+        distribuicao (str, opcional): 'uniforme' ou 'zipf'.
+        inclinacao (float, opcional): Expoente da distribuição de Zipf.
+
+    Returns:
+        list: Os pesos acumulados, ou None para a escolha uniforme.
+
+    Raises:
+        ValueError: Se a distribuição não for conhecida.
+    """
+    if distribuicao not in DISTRIBUICOES:
+        raise ValueError(f"Distribuição desconhecida: '{distribuicao}' (use {' ou '.join(DISTRIBUICOES)}).")
+    if distribuicao == 'uniforme' or inclinacao == 0:
+        return None
+    return list(accumulate(1 / (k + 1) ** inclinacao for k in range(total)))
+
+
+def gerar_catalogo(total_produtos, capacidade_engradado=None, semente=1):
+    """
+    Gera um catálogo com validades espalhadas entre 10 dias atrás e 2 anos à frente.
+
+    Args:
+        total_produtos (int): Número de produtos.
+        capacidade_engradado (int, opcional): Capacidade de engradado de todos os produtos.
+        semente (int, opcional): Semente dos números aleatórios.
+
+    Returns:
+        CatalogoProdutos: O catálogo.
+    """
+    aleatorio = random.Random(semente)
+    hoje = datetime.now()
+    return CatalogoProdutos(
+        Produto(codigo, f"L{k % 97}", f"Produto {k}", round(aleatorio.uniform(0.1, 20), 2),
+                (hoje + timedelta(days=aleatorio.randint(-10, 720))).strftime("%Y-%m-%d"),
+                "2024-01-01", 10.0 + k % 7, 15.0 + k % 11, f"Fornecedor {k % 25}",
+                f"Fabricante {k % 40}", f"Categoria {k % 10}", capacidade_engradado)
+        for k, codigo in enumerate(codigos_produtos(total_produtos))
+    )
+
+
+def gerar_engradados(codigos, total, distribuicao='uniforme', inclinacao=1.0, quantidade_maxima=50, semente=1):
+    """
+    Gera engradados de produtos escolhidos segundo a distribuição, com 1 a
+    'quantidade_maxima' unidades cada.
+
+    Yields:
+        Engradado: Cada engradado gerado.
+    """
+    aleatorio = random.Random(semente)
+    acumulados = pesos_acumulados(len(codigos), distribuicao, inclinacao)
+    escolhidos = aleatorio.choices(codigos, cum_weights=acumulados, k=total)
+    for codigo in escolhidos:
+        yield Engradado(codigo, aleatorio.randint(1, quantidade_maxima))
+
+
+def gerar_armazem(linhas, colunas, altura, codigos, ocupacao=0.6, distribuicao='uniforme', inclinacao=1.0,
+                  quantidade_maxima=50, semente=1):
+    """
+    Gera um Estoque com engradados suficientes para ocupar a fração 'ocupacao' dos níveis.
+    Como cada pilha guarda um único produto, a ocupação real pode ficar um pouco abaixo.
+
+    Returns:
+        Estoque: O estoque preenchido (sem ouvintes nem catálogo vinculado).
+    """
+    estoque = Estoque(linhas, colunas, altura)
+    total = int(linhas * colunas * altura * ocupacao)
+    estoque.adicionar_engradados(gerar_engradados(codigos, total, distribuicao, inclinacao,
+                                                  quantidade_maxima, semente))
+    return estoque
+
+
+def gerar_fluxo_pedidos(codigos, total, inclinacao=1.0, clientes=50, quantidade_maxima=20,
+                        data_inicial=datetime(2025, 1, 1), semente=1):
+    """
+    Gera um fluxo de pedidos com produtos escolhidos pela distribuição de Zipf (inclinação 0
+    para a escolha uniforme), clientes uniformes e datas de solicitação crescentes.
+
+    Yields:
+        Pedido: Cada pedido, ainda sem número.
+    """
+    aleatorio = random.Random(semente)
+    acumulados = pesos_acumulados(len(codigos), 'zipf', inclinacao)
+    escolhidos = aleatorio.choices(codigos, cum_weights=acumulados, k=total)
+    for k, codigo in enumerate(escolhidos):
+        yield Pedido(codigo, aleatorio.randint(1, quantidade_maxima), data_inicial + timedelta(days=k // 500),
+                     f"Cliente {aleatorio.randrange(clientes)}")
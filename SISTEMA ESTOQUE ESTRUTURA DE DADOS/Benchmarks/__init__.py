@@ -0,0 +1,3 @@
+# Pacote de benchmarks do sistema de estoque.
+# Cada módulo pode ser executado a partir da pasta do projeto, por exemplo:
+#     python -m Benchmarks.Benchmark_memoria
@@ -0,0 +1,50 @@
+# Carga dos três arquivos JSON do sistema (produtos, estoque e pedidos) na inicialização.
+# Os arquivos não dependem uns dos outros, então também podem ser lidos ao mesmo tempo em
+# uma pool de threads (paralela=True): cada thread preenche um objeto diferente (o
+# catálogo, o estoque ou a fila).
+#
+# A maior parte do tempo de carga estava em criar objetos que quase nunca são usados logo
+# após a inicialização: por isso as datas de produtos e pedidos só são convertidas no
+# primeiro acesso (o parâmetro converter_datas de Produto e Pedido) e o histórico de
+# atendidos só vira uma lista de pedidos quando alguém o lê (veja HistoricoAdiado, em
+# Fila_de_Pedidos.py). O catálogo, o estoque e a fila de pendentes ficam prontos ao fim da carga.
+#
+# Observação: a leitura e a decodificação do JSON seguram o GIL, então as threads só ganham
+# na espera por um disco lento. Com os arquivos no cache do sistema, a pool foi mais lenta
+# que a leitura em sequência (veja Benchmarks/Benchmark_inicializacao.py), por isso ela não
+# é o padrão; o ganho vem do trabalho adiado.
+from concurrent.futures import ThreadPoolExecutor
+
+from Produto import CatalogoProdutos
+
+
+def carregar_arquivos_json(estoque, fila_pedidos, arquivos_json, paralela=False, adiar_historico=True):
+    """
+    Carrega o catálogo, o estoque e a fila a partir dos arquivos JSON completos.
+
+    Args:
+        estoque (Estoque): O estoque a ser carregado.
+        fila_pedidos (FilaPedidos): A fila a ser carregada.
+        arquivos_json (dict): Caminhos dos arquivos 'produtos', 'estoque' e 'pedidos'.
+        paralela (bool, opcional): Se True, lê os três arquivos ao mesmo tempo em uma
+                                   pool de threads; senão, um depois do outro.
+        adiar_historico (bool, opcional): Se True, os pedidos do histórico de atendidos
+                                          só são criados no primeiro acesso.
+
+    Returns:
+        CatalogoProdutos: O catálogo de produtos cadastrados. O aviso de arquivo de produtos
+                          ausente vai para a saída do estoque (veja Log_estruturado.py).
+    """
+    if not paralela:
+        produtos = CatalogoProdutos.carregar(arquivos_json['produtos'], estoque.saida)
+        estoque.carregar_estoque(arquivos_json['estoque'])
+        fila_pedidos.carregar_pedidos(arquivos_json['pedidos'], adiar_historico)
+        return produtos
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix='carga') as pool:
+        produtos = pool.submit(CatalogoProdutos.carregar, arquivos_json['produtos'], estoque.saida)
+        carga_estoque = pool.submit(estoque.carregar_estoque, arquivos_json['estoque'])
+        carga_pedidos = pool.submit(fila_pedidos.carregar_pedidos, arquivos_json['pedidos'], adiar_historico)
+        # result() repassa a exceção de uma carga que falhou.
+        carga_estoque.result()
+        carga_pedidos.result()
+        return produtos.result()
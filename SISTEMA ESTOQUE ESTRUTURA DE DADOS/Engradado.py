@@ -4,6 +4,10 @@ class Engradado:
     """
     Representa um engradado contendo uma quantidade específica de um produto.
     """
+    # __slots__ elimina o __dict__ de cada instância: com milhões de engradados,
+    # o custo de memória do objeto cai para pouco mais que as duas referências.
+    __slots__ = ('produto_codigo', 'quantidade')
+
     def __init__(self, produto_codigo, quantidade):
         """
         Inicializa um novo Engradado.
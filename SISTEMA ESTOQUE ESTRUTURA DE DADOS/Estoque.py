@@ -1,30 +1,535 @@
 import json
+import time
+import heapq # Filas de prioridade para escolher a próxima posição livre em O(log n).
+import bisect # Busca binária no índice de validades.
 from Pilha import Pilha # O estoque é composto por Pilhas de engradados.
 from Pedido import Pedido
 from Engradado import Engradado
+from Log_estruturado import SAIDA_NULA, INFO, AVISO, ERRO, registro # Mensagens estruturadas.
 from datetime import datetime, timedelta # Para o relatório de validade.
 
+# Políticas de alocação aceitas por Estoque.adicionar_engradado:
+# - PRIMEIRA_POSICAO: a primeira pilha compatível na ordem linha a linha (comportamento original);
+# - COMPLETAR_PILHAS: prefere completar uma pilha do mesmo produto antes de ocupar uma vazia;
+# - PILHA_VAZIA: prefere ocupar uma pilha vazia antes de empilhar sobre o mesmo produto.
+POLITICA_PRIMEIRA_POSICAO = 'primeira_posicao'
+POLITICA_COMPLETAR_PILHAS = 'completar_pilhas'
+POLITICA_PILHA_VAZIA = 'pilha_vazia'
+POLITICAS_ALOCACAO = (POLITICA_PRIMEIRA_POSICAO, POLITICA_COMPLETAR_PILHAS, POLITICA_PILHA_VAZIA)
+
+# Maior caractere Unicode: (data, CODIGO_MAXIMO) fica depois de todas as chaves
+# (data, produto_codigo) dessa data nos índices de validade, para a busca binária por data.
+CODIGO_MAXIMO = chr(0x10FFFF)
+
 # A classe Estoque é o coração do sistema. Ela gerencia a estrutura de armazenamento.
-# A estrutura escolhida foi uma Matriz (lista de listas) 8x5, simulando um armazém com
-# 8 corredores e 5 prateleiras (ou posições) em cada um.
-# Cada posição da matriz contém uma Pilha de engradados.
+# A estrutura é uma Matriz de dimensões configuráveis (por padrão 8x5, simulando um armazém
+# com 8 corredores e 5 prateleiras, ou posições, em cada um).
+# Cada posição da matriz contém uma Pilha de engradados. A matriz é guardada em uma única
+# lista plana (posição = linha * colunas + coluna) e as Pilhas só são criadas quando a
+# posição recebe o primeiro engradado, então um armazém enorme e vazio custa apenas a lista.
 class Estoque:
     """
     Gerencia o estoque físico, representado por uma matriz de pilhas de engradados.
     """
-    def __init__(self):
+    # Para onde vão as mensagens das operações (veja Log_estruturado.py). Por padrão são
+    # descartadas; o Menu troca por uma SaidaConsole.
+    saida = SAIDA_NULA
+
+    def __init__(self, linhas=8, colunas=5, altura_maxima=5, politica_alocacao=POLITICA_PRIMEIRA_POSICAO):
+        """
+        Inicializa o estoque como uma matriz linhas x colunas de pilhas vazias.
+
+        Args:
+            linhas (int, opcional): Número de linhas (corredores) da matriz.
+            colunas (int, opcional): Número de colunas (posições) em cada linha.
+            altura_maxima (int, opcional): Número máximo de engradados em cada pilha.
+            politica_alocacao (str, opcional): Uma das políticas em POLITICAS_ALOCACAO,
+                                               usada para escolher onde cada engradado é colocado.
+        """
+        if linhas <= 0 or colunas <= 0 or altura_maxima <= 0:
+            raise ValueError("As dimensões do estoque e a altura das pilhas devem ser positivas.")
+        if politica_alocacao not in POLITICAS_ALOCACAO:
+            raise ValueError(f"Política de alocação desconhecida: {politica_alocacao}")
+        self.linhas = linhas
+        self.colunas = colunas
+        self.altura_maxima = altura_maxima
+        self.politica_alocacao = politica_alocacao
+        # Cria a matriz plana. None representa uma posição vazia (sem Pilha alocada).
+        self._pilhas = [None] * (linhas * colunas)
+        # Índices mantidos incrementalmente para evitar varrer a matriz inteira:
+        # - posições das pilhas que contêm cada produto;
+        # - total de unidades em estoque de cada produto.
+        self._posicoes_por_produto = {}
+        self._total_por_produto = {}
+        # - número de engradados de cada produto.
+        self._engradados_por_produto = {}
+        # Índice de validade: tuplas (data_validade, produto_codigo) em ordem crescente, apenas
+        # dos produtos com engradados no estoque. As datas vêm do catálogo vinculado
+        # (veja vincular_catalogo).
+        self._catalogo = None
+        self._indice_validade = []
+        # Unidades reservadas de cada produto para pedidos ainda na fila (veja reservar).
+        # Reservas não tiram engradados das pilhas; só diminuem o saldo disponível.
+        self._reservado_por_produto = {}
+        # Funções notificadas a cada alteração (veja adicionar_ouvinte).
+        self._ouvintes = []
+        # Produtos que ainda faltam na rodada de consolidação em andamento (veja consolidar).
+        self._consolidacao_pendente = None
+        # Índices de alocação (heaps de posições, com remoção preguiçosa):
+        # - pilhas não cheias cujo topo é de cada produto;
+        # - pilhas vazias.
+        self._reconstruir_indices_alocacao()
+
+    def _posicao(self, linha, coluna):
+        """
+        Converte coordenadas (linha, coluna) para a posição na lista plana.
+        """
+        return linha * self.colunas + coluna
+
+    def _coordenadas(self, posicao):
+        """
+        Converte uma posição da lista plana para as coordenadas (linha, coluna).
+        """
+        return divmod(posicao, self.colunas)
+
+    def obter_pilha(self, linha, coluna):
+        """
+        Retorna a pilha da posição [linha][coluna].
+
+        Args:
+            linha (int): Linha da posição.
+            coluna (int): Coluna da posição.
+
+        Returns:
+            Pilha: A pilha da posição, ou None se a posição estiver vazia.
+        """
+        if not (0 <= linha < self.linhas and 0 <= coluna < self.colunas):
+            raise IndexError(f"Posição [{linha}][{coluna}] fora do estoque.")
+        return self._pilhas[self._posicao(linha, coluna)]
+
+    def _reconstruir_indices_alocacao(self):
+        """
+        Recria, com uma única varredura das posições ocupadas, os heaps de pilhas
+        compatíveis e de pilhas vazias usados por adicionar_engradado.
+
+        As posições a partir de '_inicio_intocado' estão todas vazias e não entram no
+        heap de vazias; assim um armazém grande não precisa de um heap com milhões de entradas.
+        """
+        self._pilhas_compativeis = {}
+        self._pilhas_vazias = []
+        ultima_ocupada = -1
+        for posicao, pilha in enumerate(self._pilhas):
+            if pilha is None:
+                continue
+            # As posições vazias entre a última ocupada e esta vão para o heap de vazias.
+            self._pilhas_vazias.extend(range(ultima_ocupada + 1, posicao))
+            ultima_ocupada = posicao
+            if not pilha.esta_cheia():
+                self._pilhas_compativeis.setdefault(pilha.topo().produto_codigo, []).append(posicao)
+        self._inicio_intocado = ultima_ocupada + 1
+        # Listas geradas em ordem crescente já satisfazem a propriedade de heap.
+
+    def _proxima_compativel(self, produto_codigo):
+        """
+        Retorna a primeira posição (linha a linha) de uma pilha não cheia do produto.
+        Entradas que deixaram de ser válidas são descartadas ao chegar ao topo do heap.
+
+        Args:
+            produto_codigo (str): O código do produto a ser empilhado.
+
+        Returns:
+            int: A posição na lista plana, ou None se não houver pilha compatível.
+        """
+        heap = self._pilhas_compativeis.get(produto_codigo)
+        while heap:
+            pilha = self._pilhas[heap[0]]
+            if pilha is not None and pilha.topo().produto_codigo == produto_codigo and not pilha.esta_cheia():
+                return heap[0]
+            heapq.heappop(heap)
+        if heap is not None:
+            del self._pilhas_compativeis[produto_codigo]
+        return None
+
+    def _proxima_vazia(self):
+        """
+        Retorna a primeira posição (linha a linha) de uma pilha vazia.
+
+        Returns:
+            int: A posição na lista plana, ou None se não houver pilha vazia.
+        """
+        heap = self._pilhas_vazias
+        while heap:
+            if self._pilhas[heap[0]] is None:
+                return heap[0]
+            heapq.heappop(heap)
+        # Nenhuma vazia já usada: a próxima posição nunca ocupada, se existir.
+        if self._inicio_intocado < len(self._pilhas):
+            return self._inicio_intocado
+        return None
+
+    def _escolher_posicao(self, produto_codigo):
+        """
+        Escolhe, conforme a política de alocação, a posição que receberá um engradado.
+
+        Args:
+            produto_codigo (str): O código do produto a ser armazenado.
+
+        Returns:
+            int: A posição na lista plana, ou None se o estoque estiver cheio.
+        """
+        compativel = self._proxima_compativel(produto_codigo)
+        vazia = self._proxima_vazia()
+        if compativel is None:
+            return vazia
+        if vazia is None:
+            return compativel
+        if self.politica_alocacao == POLITICA_COMPLETAR_PILHAS:
+            return compativel
+        if self.politica_alocacao == POLITICA_PILHA_VAZIA:
+            return vazia
+        # Primeira posição: a menor das duas na ordem linha a linha.
+        return min(compativel, vazia)
+
+    def _indexar_engradado(self, posicao, engradado):
+        """
+        Atualiza os índices após um engradado ser colocado na posição informada.
+
+        Args:
+            posicao (int): Posição (na lista plana) da pilha que recebeu o engradado.
+            engradado (Engradado): O engradado adicionado.
+        """
+        codigo = engradado.produto_codigo
+        self._posicoes_por_produto.setdefault(codigo, set()).add(posicao)
+        self._total_por_produto[codigo] = self._total_por_produto.get(codigo, 0) + engradado.quantidade
+        engradados = self._engradados_por_produto.get(codigo, 0)
+        self._engradados_por_produto[codigo] = engradados + 1
+        if not engradados:
+            # Primeiro engradado do produto: ele passa a constar no índice de validade.
+            self._indexar_validade(codigo)
+
+    def _desindexar_unidades(self, posicao, produto_codigo, quantidade, engradado_removido=False):
+        """
+        Atualiza os índices após 'quantidade' unidades saírem da posição informada.
+        Se a pilha ficou vazia, a posição é liberada e deixa de ser associada ao produto.
+
+        Args:
+            posicao (int): Posição (na lista plana) de onde as unidades saíram.
+            produto_codigo (str): O código do produto removido.
+            quantidade (int): O número de unidades removidas.
+            engradado_removido (bool, opcional): True se o engradado inteiro saiu da pilha.
+        """
+        restante = self._total_por_produto.get(produto_codigo, 0) - quantidade
+        if restante > 0:
+            self._total_por_produto[produto_codigo] = restante
+        else:
+            self._total_por_produto.pop(produto_codigo, None)
+
+        if engradado_removido:
+            engradados = self._engradados_por_produto.get(produto_codigo, 0) - 1
+            if engradados > 0:
+                self._engradados_por_produto[produto_codigo] = engradados
+            else:
+                # Último engradado do produto: ele sai do índice de validade.
+                self._engradados_por_produto.pop(produto_codigo, None)
+                self._desindexar_validade(produto_codigo)
+
+        if self._pilhas[posicao].esta_vazia():
+            # Libera a Pilha: posições vazias são representadas por None.
+            self._pilhas[posicao] = None
+            posicoes = self._posicoes_por_produto.get(produto_codigo)
+            if posicoes is not None:
+                posicoes.discard(posicao)
+                if not posicoes:
+                    del self._posicoes_por_produto[produto_codigo]
+
+    # --- Índice de validade ---
+
+    def _chave_validade(self, produto_codigo):
+        """
+        Retorna a chave (data_validade, produto_codigo) do produto no índice de validade,
+        ou None se não houver catálogo vinculado ou o produto não estiver cadastrado.
+        """
+        if self._catalogo is None:
+            return None
+        produto = self._catalogo.obter(produto_codigo)
+        if produto is None:
+            return None
+        return (produto.data_validade, produto_codigo)
+
+    def _indexar_validade(self, produto_codigo):
+        """
+        Insere o produto no índice de validade, mantendo a ordem por data (O(log n) para achar a posição).
+        """
+        chave = self._chave_validade(produto_codigo)
+        if chave is None:
+            return
+        indice = bisect.bisect_left(self._indice_validade, chave)
+        if indice == len(self._indice_validade) or self._indice_validade[indice] != chave:
+            self._indice_validade.insert(indice, chave)
+
+    def _desindexar_validade(self, produto_codigo):
         """
-        Inicializa o estoque como uma matriz 8x5. Cada célula da matriz contém uma Pilha.
+        Retira o produto do índice de validade, se ele estiver lá.
         """
-        # Cria uma matriz 8x5 onde cada elemento é uma nova instância da classe Pilha.
-        self.matriz = [[Pilha() for _ in range(5)] for _ in range(8)]
+        chave = self._chave_validade(produto_codigo)
+        if chave is None:
+            return
+        indice = bisect.bisect_left(self._indice_validade, chave)
+        if indice < len(self._indice_validade) and self._indice_validade[indice] == chave:
+            del self._indice_validade[indice]
+
+    def _reconstruir_indice_validade(self):
+        """
+        Recria o índice de validade a partir dos produtos com engradados no estoque.
+        """
+        chaves = (self._chave_validade(codigo) for codigo in self._engradados_por_produto)
+        self._indice_validade = sorted(chave for chave in chaves if chave is not None)
+
+    def _ao_cadastrar_produto(self, evento):
+        """
+        Ouvinte do catálogo vinculado: um produto cadastrado depois de já ter engradados
+        no estoque entra no índice de validade.
+        """
+        if evento['tipo'] == 'produto_cadastrado':
+            codigo = evento['produto']['codigo']
+            if codigo in self._engradados_por_produto:
+                self._indexar_validade(codigo)
+
+    def vincular_catalogo(self, catalogo):
+        """
+        Vincula o catálogo de produtos de onde vêm as datas de validade do índice de validade.
+        O índice é reconstruído uma vez e, a partir daí, mantido a cada engradado que entra
+        ou sai do estoque e a cada produto cadastrado no catálogo.
+
+        Args:
+            catalogo (CatalogoProdutos): O catálogo de produtos cadastrados.
+        """
+        if self._catalogo is catalogo:
+            return
+        if self._catalogo is not None:
+            self._catalogo.remover_ouvinte(self._ao_cadastrar_produto)
+        self._catalogo = catalogo
+        catalogo.adicionar_ouvinte(self._ao_cadastrar_produto)
+        self._reconstruir_indice_validade()
+
+    def validade(self, produto_codigo):
+        """
+        Retorna a data de validade do produto segundo o catálogo vinculado, ou None se não
+        houver catálogo ou o produto não estiver cadastrado.
+        """
+        chave = self._chave_validade(produto_codigo)
+        return chave[0] if chave is not None else None
+
+    def obter_vencimentos(self, data_limite):
+        """
+        Consulta o índice de validade: produtos em estoque que vencem até a data limite,
+        em ordem de validade. Custa O(log n + k), sem percorrer a matriz.
+
+        Args:
+            data_limite (datetime): A data limite (inclusive).
+
+        Returns:
+            list: Tuplas (data_validade, produto_codigo, total de unidades, número de engradados).
+        """
+        fim = bisect.bisect_right(self._indice_validade, (data_limite, CODIGO_MAXIMO))
+        return [
+            (data_validade, codigo, self._total_por_produto.get(codigo, 0), self._engradados_por_produto[codigo])
+            for data_validade, codigo in self._indice_validade[:fim]
+        ]
         
+    def adicionar_ouvinte(self, ouvinte):
+        """
+        Registra uma função que será chamada a cada alteração do estoque.
+
+        A função recebe um dicionário com a chave 'tipo' e os dados da alteração:
+        - 'engradado_adicionado': linha, coluna, produto_codigo, quantidade;
+        - 'unidades_removidas': linha, coluna, produto_codigo, quantidade
+          (retiradas do engradado do topo; o engradado sai da pilha quando zera);
+        - 'unidades_adicionadas': linha, coluna, produto_codigo, quantidade
+          (acrescentadas ao engradado do topo, veja completar_topo);
+        - 'estoque_recarregado': dados (o estoque inteiro no formato de para_serializavel).
+
+        Args:
+            ouvinte (callable): A função a ser chamada com cada evento.
+        """
+        self._ouvintes.append(ouvinte)
+
+    def remover_ouvinte(self, ouvinte):
+        """
+        Cancela o registro de uma função feito com adicionar_ouvinte.
+        """
+        self._ouvintes.remove(ouvinte)
+
+    def _publicar(self, evento):
+        """
+        Entrega um evento de alteração a todos os ouvintes registrados.
+        """
+        for ouvinte in self._ouvintes:
+            ouvinte(evento)
+
+    def _colocar(self, posicao, engradado):
+        """
+        Coloca um engradado na pilha da posição informada e atualiza todos os índices.
+
+        Args:
+            posicao (int): Posição (na lista plana) da pilha de destino.
+            engradado (Engradado): O engradado a ser colocado.
+
+        Returns:
+            bool: True se a pilha aceitou o engradado, False caso contrário.
+        """
+        pilha = self._pilhas[posicao]
+        estava_vazia = pilha is None
+        if estava_vazia:
+            # A Pilha só é criada quando a posição recebe o primeiro engradado.
+            pilha = Pilha(self.altura_maxima)
+        # O método pilha.adicionar() continua validando as regras da pilha.
+        if not pilha.adicionar(engradado):
+            return False
+        if estava_vazia:
+            self._pilhas[posicao] = pilha
+            if posicao >= self._inicio_intocado:
+                # As posições puladas entre o início intocado e esta continuam vazias.
+                for pulada in range(self._inicio_intocado, posicao):
+                    heapq.heappush(self._pilhas_vazias, pulada)
+                self._inicio_intocado = posicao + 1
+            # Uma pilha que acabou de sair do estado "vazia" passa a aceitar o mesmo produto.
+            if not pilha.esta_cheia():
+                heapq.heappush(self._pilhas_compativeis.setdefault(engradado.produto_codigo, []), posicao)
+        self._indexar_engradado(posicao, engradado)
+        if self._ouvintes:
+            i, j = self._coordenadas(posicao)
+            self._publicar({'tipo': 'engradado_adicionado', 'linha': i, 'coluna': j,
+                            'produto_codigo': engradado.produto_codigo, 'quantidade': engradado.quantidade})
+        return True
+
+    def _retirar_do_topo(self, posicao, quantidade):
+        """
+        Retira unidades do engradado do topo da pilha da posição informada.
+        Se o engradado ficar vazio, ele é removido da pilha.
+
+        Args:
+            posicao (int): Posição (na lista plana) da pilha.
+            quantidade (int): Número máximo de unidades a retirar.
+
+        Returns:
+            tuple: (unidades retiradas, True se o engradado inteiro saiu da pilha).
+        """
+        pilha = self._pilhas[posicao]
+        engradado_topo = pilha.topo()
+        produto_codigo = engradado_topo.produto_codigo
+        if engradado_topo.quantidade <= quantidade:
+            # Remove o engradado inteiro.
+            estava_cheia = pilha.esta_cheia()
+            retiradas = pilha.remover().quantidade
+            engradado_completo = True
+            self._desindexar_unidades(posicao, produto_codigo, retiradas, engradado_removido=True)
+            # A pilha volta aos índices de alocação: vazia, ou com espaço para o mesmo produto.
+            if pilha.esta_vazia():
+                heapq.heappush(self._pilhas_vazias, posicao)
+            elif estava_cheia:
+                heapq.heappush(self._pilhas_compativeis.setdefault(produto_codigo, []), posicao)
+        else:
+            # Remove apenas a quantidade necessária do engradado.
+            engradado_topo.quantidade -= quantidade
+            retiradas = quantidade
+            engradado_completo = False
+            self._desindexar_unidades(posicao, produto_codigo, retiradas)
+        if self._ouvintes:
+            i, j = self._coordenadas(posicao)
+            self._publicar({'tipo': 'unidades_removidas', 'linha': i, 'coluna': j,
+                            'produto_codigo': produto_codigo, 'quantidade': retiradas})
+        return retiradas, engradado_completo
+
+    def _completar_topo(self, posicao, quantidade):
+        """
+        Acrescenta unidades ao engradado do topo da pilha da posição informada.
+
+        Args:
+            posicao (int): Posição (na lista plana) da pilha.
+            quantidade (int): Número de unidades acrescentadas.
+        """
+        engradado_topo = self._pilhas[posicao].topo()
+        engradado_topo.quantidade += quantidade
+        produto_codigo = engradado_topo.produto_codigo
+        self._total_por_produto[produto_codigo] = self._total_por_produto.get(produto_codigo, 0) + quantidade
+        if self._ouvintes:
+            i, j = self._coordenadas(posicao)
+            self._publicar({'tipo': 'unidades_adicionadas', 'linha': i, 'coluna': j,
+                            'produto_codigo': produto_codigo, 'quantidade': quantidade})
+
+    def colocar_engradado(self, linha, coluna, engradado):
+        """
+        Coloca um engradado diretamente na pilha da posição [linha][coluna],
+        sem passar pela política de alocação.
+
+        Args:
+            linha (int): Linha da pilha de destino.
+            coluna (int): Coluna da pilha de destino.
+            engradado (Engradado): O engradado a ser colocado.
+
+        Returns:
+            bool: True se a pilha aceitou o engradado, False caso contrário.
+        """
+        self.obter_pilha(linha, coluna) # Valida a posição.
+        return self._colocar(self._posicao(linha, coluna), engradado)
+
+    def retirar_do_topo(self, linha, coluna, quantidade):
+        """
+        Retira até 'quantidade' unidades do engradado do topo da pilha [linha][coluna].
+
+        Args:
+            linha (int): Linha da pilha.
+            coluna (int): Coluna da pilha.
+            quantidade (int): Número máximo de unidades a retirar.
+
+        Returns:
+            int: O número de unidades efetivamente retiradas (0 se a pilha estiver vazia).
+        """
+        if self.obter_pilha(linha, coluna) is None:
+            return 0
+        return self._retirar_do_topo(self._posicao(linha, coluna), quantidade)[0]
+
+    def completar_topo(self, linha, coluna, quantidade):
+        """
+        Acrescenta unidades ao engradado do topo da pilha [linha][coluna].
+        Não confere a capacidade do produto: quem chama decide quanto cabe.
+
+        Args:
+            linha (int): Linha da pilha.
+            coluna (int): Coluna da pilha.
+            quantidade (int): Número de unidades acrescentadas.
+
+        Returns:
+            bool: True se as unidades foram acrescentadas, False se a pilha estiver vazia.
+        """
+        if self.obter_pilha(linha, coluna) is None:
+            return False
+        self._completar_topo(self._posicao(linha, coluna), quantidade)
+        return True
+
+    def _alocar(self, engradado):
+        """
+        Escolhe a posição do engradado pela política de alocação e o coloca lá.
+
+        Args:
+            engradado (Engradado): O engradado a ser adicionado.
+
+        Returns:
+            int: A posição (na lista plana) que recebeu o engradado, ou None se o estoque estiver cheio.
+        """
+        posicao = self._escolher_posicao(engradado.produto_codigo)
+        # Sem pilha compatível nem pilha vazia, o estoque está cheio.
+        if posicao is None or not self._colocar(posicao, engradado):
+            return None
+        return posicao
+
     def adicionar_engradado(self, engradado):
         """
         Adiciona um engradado ao estoque.
 
-        Percorre a matriz procurando uma pilha que possa aceitar o engradado
-        (de acordo com as regras da classe Pilha).
+        Consulta os índices de alocação para ir direto a uma pilha que possa aceitar
+        o engradado (de acordo com as regras da classe Pilha), sem tentar célula por célula.
 
         Args:
             engradado (Engradado): O engradado a ser adicionado.
@@ -32,61 +537,86 @@ class Estoque:
         Returns:
             bool: True se adicionado com sucesso, False se o estoque estiver cheio.
         """
-        # Itera pelas linhas (i) e colunas (j) da matriz.
-        for i, linha in enumerate(self.matriz):
-            for j, pilha in enumerate(linha):
-                # Tenta adicionar o engradado na pilha atual.
-                # O método pilha.adicionar() já contém a lógica de validação.
-                if pilha.adicionar(engradado):
-                    print(f"Engradado adicionado na posição [{i}][{j}]")
-                    return True
-        # Se percorreu toda a matriz e não conseguiu adicionar, o estoque está cheio.
-        return False
+        posicao = self._alocar(engradado)
+        if posicao is None:
+            return False
+        saida = self.saida
+        if saida.nivel <= INFO:
+            i, j = self._coordenadas(posicao)
+            saida.emitir(registro(INFO, 'engradado_adicionado', linha=i, coluna=j,
+                                  produto_codigo=engradado.produto_codigo, quantidade=engradado.quantidade))
+        return True
+
+    def adicionar_engradados(self, engradados):
+        """
+        Adiciona vários engradados de uma vez (por exemplo, a carga de um caminhão), com a
+        mesma política de adicionar_engradado, mas sem uma mensagem por engradado.
+
+        Args:
+            engradados (iterable): Os engradados a serem adicionados.
+
+        Returns:
+            list: Os engradados que não couberam no estoque (vazia se todos foram adicionados).
+        """
+        alocar = self._alocar
+        return [engradado for engradado in engradados if alocar(engradado) is None]
         
-    def remover_engradado(self, produto_codigo, quantidade):
+    def remover_engradado(self, produto_codigo, quantidade, quantidade_reservada=0):
         """
         Remove uma quantidade específica de um produto do estoque.
 
-        Percorre toda a matriz procurando pelo produto. Como os engradados estão
+        Consulta o índice de posições para visitar apenas as pilhas que contêm o
+        produto, na mesma ordem (linha a linha) da matriz. Como os engradados estão
         em pilhas, a remoção segue a regra LIFO (começa pelo topo).
+        Unidades reservadas para pedidos não podem ser removidas, a não ser que a
+        remoção consuma a própria reserva (quantidade_reservada).
 
         Args:
             produto_codigo (str): O código do produto a ser removido.
             quantidade (int): A quantidade de unidades a ser removida.
+            quantidade_reservada (int, opcional): Quantas das unidades removidas vêm de
+                                                  reservas do produto, que são baixadas junto.
 
         Returns:
             bool: True se a remoção foi bem-sucedida, False caso contrário.
         """
+        # O saldo mantido nos índices permite recusar a remoção antes de mexer nas pilhas.
+        quantidade_reservada = min(quantidade_reservada, self.reservado(produto_codigo))
+        saida = self.saida
+        if self.disponivel(produto_codigo) + quantidade_reservada < quantidade:
+            if saida.nivel <= AVISO:
+                saida.emitir(registro(AVISO, 'estoque_insuficiente', produto_codigo=produto_codigo,
+                                      quantidade=quantidade))
+            return False
+        if quantidade_reservada:
+            self.liberar_reserva(produto_codigo, quantidade_reservada)
+
         quantidade_a_remover = quantidade
         
-        # Percorre a matriz para encontrar os engradados do produto.
-        for linha_idx, linha in enumerate(self.matriz):
-            for pilha_idx, pilha in enumerate(linha):
-                # Enquanto a pilha tiver engradados do produto desejado e ainda faltar remover itens...
-                while pilha.topo() and pilha.topo().produto_codigo == produto_codigo and quantidade_a_remover > 0:
-                    engradado_topo = pilha.topo()
-                    
-                    # Se a quantidade no engradado do topo for menor ou igual à que precisamos...
-                    if engradado_topo.quantidade <= quantidade_a_remover:
-                        # Remove o engradado inteiro.
-                        removido = pilha.remover()
-                        quantidade_a_remover -= removido.quantidade
-                        print(f"  Removido engradado completo de {removido.quantidade} unidades do produto {produto_codigo} da posição [{linha_idx}][{pilha_idx}].")
-                    else:
-                        # Se o engradado do topo tem mais itens do que precisamos...
-                        # Remove apenas a quantidade necessária do engradado.
-                        engradado_topo.quantidade -= quantidade_a_remover
-                        print(f"  Removidas {quantidade_a_remover} unidades do produto {produto_codigo} do engradado na posição [{linha_idx}][{pilha_idx}].")
-                        quantidade_a_remover = 0 # Zera a quantidade, pois já removemos tudo.
-                        
-                    # Se já removemos a quantidade total, podemos sair da função.
-                    if quantidade_a_remover == 0:
-                        return True
+        # Percorre somente as pilhas do produto, ordenadas como na varredura da matriz.
+        # A cópia ordenada é necessária porque o índice muda quando uma pilha esvazia.
+        for posicao in sorted(self._posicoes_por_produto.get(produto_codigo, ())):
+            pilha = self._pilhas[posicao]
+            # Enquanto a pilha tiver engradados do produto desejado e ainda faltar remover itens...
+            while pilha.topo() and pilha.topo().produto_codigo == produto_codigo and quantidade_a_remover > 0:
+                retiradas, engradado_completo = self._retirar_do_topo(posicao, quantidade_a_remover)
+                quantidade_a_remover -= retiradas
+                if saida.nivel <= INFO:
+                    linha_idx, pilha_idx = self._coordenadas(posicao)
+                    saida.emitir(registro(INFO, 'engradado_retirado' if engradado_completo else 'unidades_retiradas',
+                                          linha=linha_idx, coluna=pilha_idx, produto_codigo=produto_codigo,
+                                          quantidade=retiradas))
+
+                # Se já removemos a quantidade total, podemos sair da função.
+                if quantidade_a_remover == 0:
+                    return True
         
         # Se o loop terminar e ainda faltar remover itens, o estoque era insuficiente.
         if quantidade_a_remover > 0:
-            print(f"Estoque insuficiente. Não foi possível remover a quantidade total solicitada.")
-            # Este retorno é um fallback, a verificação prévia no menu deve evitar isso.
+            if saida.nivel <= AVISO:
+                saida.emitir(registro(AVISO, 'estoque_insuficiente', produto_codigo=produto_codigo,
+                                      quantidade=quantidade))
+            # Este retorno é um fallback, a verificação pelo índice deve evitar isso.
             return False
         
         return True
@@ -96,11 +626,12 @@ class Estoque:
         Imprime uma representação textual do estado atual do estoque.
         Mostra o que há no topo de cada pilha.
         """
-        for i, linha in enumerate(self.matriz):
+        for i in range(self.linhas):
             print(f"Linha {i}:")
-            for j, pilha in enumerate(linha):
-                topo = pilha.topo()
-                if topo:
+            for j in range(self.colunas):
+                pilha = self._pilhas[self._posicao(i, j)]
+                if pilha is not None:
+                    topo = pilha.topo()
                     # Mostra o código do produto, quantos engradados há na pilha, e a quantidade no engradado do topo.
                     print(f"  Coluna {j}: {topo.produto_codigo} x {len(pilha.engradados)} engradados (Topo: {topo.quantidade} unidades)")
                 else:
@@ -116,34 +647,274 @@ class Estoque:
         Returns:
             int: O total de unidades do produto em estoque.
         """
-        total = 0
-        # Percorre cada pilha e cada engradado, somando as quantidades.
-        for linha in self.matriz:
-            for pilha in linha:
-                for eng in pilha.engradados:
-                    if eng.produto_codigo == produto_codigo:
-                        total += eng.quantidade
-        return total
-    
-    def salvar_estoque(self, nome_arquivo):
+        # O total é mantido incrementalmente, então a consulta é O(1).
+        return self._total_por_produto.get(produto_codigo, 0)
+
+    # --- Reservas ---
+
+    def reservado(self, produto_codigo):
         """
-        Salva o estado atual do estoque em um arquivo JSON.
+        Retorna quantas unidades do produto estão reservadas para pedidos.
+        """
+        return self._reservado_por_produto.get(produto_codigo, 0)
+
+    def disponivel(self, produto_codigo):
+        """
+        Retorna o saldo disponível do produto: unidades em estoque menos as reservadas.
+        Como os dois contadores são mantidos por produto, a consulta é O(1).
+        """
+        return max(0, self.contar_por_produto(produto_codigo) - self.reservado(produto_codigo))
+
+    def reservar(self, produto_codigo, quantidade):
+        """
+        Reserva unidades de um produto, sem tirá-las das pilhas.
+
+        Args:
+            produto_codigo (str): O código do produto.
+            quantidade (int): O número de unidades a reservar.
+
+        Returns:
+            bool: True se havia saldo disponível e a reserva foi feita, False caso contrário.
+        """
+        if self.disponivel(produto_codigo) < quantidade:
+            return False
+        self._reservado_por_produto[produto_codigo] = self.reservado(produto_codigo) + quantidade
+        return True
+
+    def liberar_reserva(self, produto_codigo, quantidade):
+        """
+        Devolve ao saldo disponível unidades reservadas de um produto.
+
+        Args:
+            produto_codigo (str): O código do produto.
+            quantidade (int): O número de unidades a liberar.
+        """
+        restante = self.reservado(produto_codigo) - quantidade
+        if restante > 0:
+            self._reservado_por_produto[produto_codigo] = restante
+        else:
+            self._reservado_por_produto.pop(produto_codigo, None)
+
+    def limpar_reservas(self):
+        """
+        Remove todas as reservas (usado antes de recalculá-las a partir da fila de pedidos).
+        """
+        self._reservado_por_produto = {}
+
+    # --- Consolidação ---
+
+    def _capacidade_engradado(self, produto_codigo, produtos_cadastrados):
+        """
+        Retorna a capacidade de engradado do produto, ou None se não for conhecida (ilimitada).
+        """
+        catalogo = produtos_cadastrados if produtos_cadastrados is not None else self._catalogo
+        if catalogo is None:
+            return None
+        produto = catalogo.obter(produto_codigo)
+        return produto.capacidade_engradado if produto is not None else None
+
+    def _passo_consolidacao(self, produto_codigo, capacidade):
+        """
+        Faz um movimento de consolidação das pilhas de um produto, na ordem:
+        1. completar engradados parciais: entre dois topos abaixo da capacidade, as unidades
+           do menor vão para o maior; numa pilha cujo topo e o engradado de baixo são
+           parciais, o de baixo é completado com as unidades do topo;
+        2. liberar posições: se as outras pilhas do produto têm espaço para todos os
+           engradados da pilha mais baixa, o topo dela vai para a pilha mais alta não cheia
+           (completando o topo de lá, se for parcial).
+        Só os topos são movidos (regra LIFO). Sem capacidade conhecida, não há passo 1.
+
+        Args:
+            produto_codigo (str): O código do produto.
+            capacidade (int): A capacidade de engradado do produto, ou None.
+
+        Returns:
+            tuple: (True se houve movimento, True se uma posição foi liberada).
+        """
+        pilhas = self._pilhas
+        posicoes = sorted(self._posicoes_por_produto.get(produto_codigo, ()))
+
+        if capacidade is not None:
+            parciais = [p for p in posicoes if pilhas[p].topo().quantidade < capacidade]
+            if len(parciais) >= 2:
+                chave = lambda p: (pilhas[p].topo().quantidade, -p)
+                origem, destino = min(parciais, key=chave), max(parciais, key=chave)
+                quantidade = min(capacidade - pilhas[destino].topo().quantidade, pilhas[origem].topo().quantidade)
+                self._completar_topo(destino, quantidade)
+                self._retirar_do_topo(origem, quantidade)
+                return True, pilhas[origem] is None
+            for posicao in parciais:
+                engradados = pilhas[posicao].engradados
+                if len(engradados) >= 2 and engradados[-2].quantidade < capacidade:
+                    topo = engradados[-1].quantidade
+                    quantidade = min(capacidade - engradados[-2].quantidade, topo)
+                    self._retirar_do_topo(posicao, topo)
+                    self._completar_topo(posicao, quantidade)
+                    if topo > quantidade:
+                        self._colocar(posicao, Engradado(produto_codigo, topo - quantidade))
+                    return True, False
+
+        if len(posicoes) >= 2:
+            origem = min(posicoes, key=lambda p: (len(pilhas[p].engradados), -p))
+            espaco = sum(self.altura_maxima - len(pilhas[p].engradados) for p in posicoes if p != origem)
+            if espaco >= len(pilhas[origem].engradados):
+                destino = max((p for p in posicoes if p != origem and not pilhas[p].esta_cheia()),
+                              key=lambda p: (len(pilhas[p].engradados), -p))
+                quantidade = pilhas[origem].topo().quantidade
+                self._retirar_do_topo(origem, quantidade)
+                completar = 0
+                topo_destino = pilhas[destino].topo().quantidade
+                if capacidade is not None and topo_destino < capacidade:
+                    completar = min(capacidade - topo_destino, quantidade)
+                    self._completar_topo(destino, completar)
+                if quantidade > completar:
+                    self._colocar(destino, Engradado(produto_codigo, quantidade - completar))
+                return True, pilhas[origem] is None
+        return False, False
+
+    def consolidar(self, produtos_cadastrados=None, max_movimentos=None, tempo_limite=None):
+        """
+        Consolida as pilhas de cada produto: completa engradados parciais até a capacidade
+        do produto e junta pilhas do mesmo produto, liberando posições para novos engradados.
+
+        A consolidação é incremental: cada chamada trabalha até esgotar o número de
+        movimentos ou o tempo informado e para; a próxima chamada continua do produto em
+        que a anterior parou. Assim ela pode rodar em segundo plano, entre pedidos.
+        Os movimentos passam pelas mesmas operações (e eventos) das pilhas, então a
+        persistência os registra normalmente.
+
+        Args:
+            produtos_cadastrados (CatalogoProdutos, opcional): De onde vem a capacidade de
+                                                               engradado de cada produto (o
+                                                               catálogo vinculado, se omitido).
+                                                               Sem capacidade, os engradados só
+                                                               são movidos inteiros.
+            max_movimentos (int, opcional): Máximo de movimentos nesta chamada.
+            tempo_limite (float, opcional): Máximo de segundos nesta chamada.
+
+        Returns:
+            dict: 'movimentos' (int), 'posicoes_liberadas' (int), 'concluido' (bool, True se
+                  a rodada de consolidação terminou) e 'duracao_segundos' (float).
+        """
+        inicio = time.perf_counter()
+        if self._consolidacao_pendente is None:
+            # Nova rodada: a lista é consumida do fim, então fica em ordem decrescente.
+            self._consolidacao_pendente = sorted(self._posicoes_por_produto, reverse=True)
+        pendentes = self._consolidacao_pendente
+        movimentos = 0
+        posicoes_liberadas = 0
+        capacidades = {}
+        while pendentes:
+            if max_movimentos is not None and movimentos >= max_movimentos:
+                break
+            if tempo_limite is not None and time.perf_counter() - inicio >= tempo_limite:
+                break
+            codigo = pendentes[-1]
+            if codigo not in capacidades:
+                capacidades[codigo] = self._capacidade_engradado(codigo, produtos_cadastrados)
+            movimentou, liberou = self._passo_consolidacao(codigo, capacidades[codigo])
+            if not movimentou:
+                # Produto consolidado: passa para o próximo.
+                pendentes.pop()
+                continue
+            movimentos += 1
+            posicoes_liberadas += liberou
+        concluido = not pendentes
+        if concluido:
+            self._consolidacao_pendente = None
+        return {
+            'movimentos': movimentos,
+            'posicoes_liberadas': posicoes_liberadas,
+            'concluido': concluido,
+            'duracao_segundos': time.perf_counter() - inicio,
+        }
+
+    def para_serializavel(self):
+        """
+        Converte o estoque em listas e dicionários (matriz de pilhas de engradados),
+        no mesmo formato gravado no arquivo JSON.
+
+        Returns:
+            list: Uma lista de linhas; cada linha é uma lista de pilhas e cada pilha é
+                  uma lista de dicionários com 'produto_codigo' e 'quantidade'.
         """
         matriz_serializavel = []
-        for linha in self.matriz:
+        for i in range(self.linhas):
             linha_serializavel = []
-            for pilha in linha:
-                # Converte cada engradado em um dicionário.
+            for j in range(self.colunas):
+                pilha = self._pilhas[self._posicao(i, j)]
+                # Converte cada engradado em um dicionário (posições vazias viram listas vazias).
                 pilha_serializavel = [
                     {'produto_codigo': eng.produto_codigo, 'quantidade': eng.quantidade} 
                     for eng in pilha.engradados
-                ]
+                ] if pilha is not None else []
                 linha_serializavel.append(pilha_serializavel)
             matriz_serializavel.append(linha_serializavel)
-        
+        return matriz_serializavel
+
+    def salvar_estoque(self, nome_arquivo):
+        """
+        Salva o estado atual do estoque em um arquivo JSON.
+        """
+        matriz_serializavel = self.para_serializavel()
         with open(nome_arquivo, 'w', encoding='utf-8') as f:
             json.dump(matriz_serializavel, f, ensure_ascii=False, indent=4)
 
+    def carregar_pilhas(self, linhas, colunas, pilhas):
+        """
+        Substitui todo o conteúdo do estoque pelas pilhas informadas, reconstruindo os índices.
+        Se as dimensões informadas forem maiores que as do estoque, a matriz cresce para
+        não perder engradados.
+
+        Args:
+            linhas (int): Número de linhas dos dados de origem.
+            colunas (int): Número de colunas dos dados de origem.
+            pilhas (iterable): Tuplas (linha, coluna, engradados), com os engradados de
+                               cada pilha da base para o topo.
+        """
+        self.linhas = max(self.linhas, linhas)
+        self.colunas = max(self.colunas, colunas)
+        self._pilhas = [None] * (self.linhas * self.colunas)
+        self._posicoes_por_produto = {}
+        self._total_por_produto = {}
+        self._engradados_por_produto = {}
+        self._consolidacao_pendente = None
+        for i, j, engradados in pilhas:
+            posicao = self._posicao(i, j)
+            pilha = self._pilhas[posicao] = Pilha(self.altura_maxima)
+            for engradado in engradados:
+                # Adiciona cada engradado à pilha correta, respeitando as regras da Pilha.
+                if pilha.adicionar(engradado):
+                    self._indexar_engradado(posicao, engradado)
+            if pilha.esta_vazia():
+                self._pilhas[posicao] = None
+        self._reconstruir_indices_alocacao()
+        self._reconstruir_indice_validade()
+        if self._ouvintes:
+            self._publicar({'tipo': 'estoque_recarregado', 'dados': self.para_serializavel()})
+
+    def carregar_serializavel(self, matriz_serializavel):
+        """
+        Substitui o conteúdo do estoque pelos dados no formato de para_serializavel.
+
+        Args:
+            matriz_serializavel (list): A matriz de pilhas de dicionários de engradados.
+        """
+        if not matriz_serializavel: return
+
+        # Recria cada objeto Engradado a partir dos dicionários, pilha por pilha.
+        pilhas = (
+            (i, j, (Engradado(d['produto_codigo'], d['quantidade']) for d in pilha_serializavel))
+            for i, linha_serializavel in enumerate(matriz_serializavel)
+            for j, pilha_serializavel in enumerate(linha_serializavel)
+            if pilha_serializavel
+        )
+        self.carregar_pilhas(
+            len(matriz_serializavel),
+            max(len(linha) for linha in matriz_serializavel),
+            pilhas
+        )
+
     def carregar_estoque(self, nome_arquivo):
         """
         Carrega o estado do estoque de um arquivo JSON.
@@ -151,87 +922,88 @@ class Estoque:
         try:
             with open(nome_arquivo, 'r', encoding='utf-8') as f:
                 matriz_serializavel = json.load(f)
-                if not matriz_serializavel: return
-
-                # Recria a estrutura da matriz e das pilhas.
-                self.matriz = [[Pilha() for _ in range(5)] for _ in range(8)]
-                for i, linha_serializavel in enumerate(matriz_serializavel):
-                    for j, pilha_serializavel in enumerate(linha_serializavel):
-                        for dados_engradado in pilha_serializavel:
-                            # Recria cada objeto Engradado e o adiciona à pilha correta.
-                            engradado = Engradado(dados_engradado['produto_codigo'], dados_engradado['quantidade'])
-                            self.matriz[i][j].adicionar(engradado)
+            self.carregar_serializavel(matriz_serializavel)
         except FileNotFoundError:
             pass # Se o arquivo não existe, simplesmente começa com o estoque vazio.
         except (json.JSONDecodeError, KeyError):
-            print(f"Erro ao ler o arquivo de estoque '{nome_arquivo}'. Iniciando com estoque vazio.")
+            if self.saida.nivel <= ERRO:
+                self.saida.emitir(registro(ERRO, 'erro_leitura_estoque', arquivo=nome_arquivo))
 
     # --- Métodos para Relatórios ---
 
-    def _obter_engradados_recursivo(self, i, j, engradados_encontrados):
+    def iter_engradados(self, produto_codigo=None):
         """
-        Função auxiliar RECURSIVA para percorrer a matriz e coletar todos os engradados.
+        Percorre os engradados do estoque sob demanda (gerador), linha a linha e da base
+        para o topo de cada pilha, sem recursão e sem montar uma lista intermediária.
+        O estoque não deve ser alterado enquanto o gerador estiver em uso.
 
         Args:
-            i (int): Índice da linha atual.
-            j (int): Índice da coluna atual.
-            engradados_encontrados (list): Lista para acumular os engradados.
-        """
-        # Caso base da recursão: quando o índice 'i' ultrapassa o número de linhas.
-        if i >= len(self.matriz):
-            return
-
-        # Se o índice 'j' ultrapassa o número de colunas, passa para a próxima linha.
-        if j >= len(self.matriz[i]):
-            self._obter_engradados_recursivo(i + 1, 0, engradados_encontrados)
-            return
+            produto_codigo (str, opcional): Se informado, visita apenas as pilhas desse
+                                            produto (pelo índice de posições).
 
-        # Adiciona os engradados da pilha atual à lista.
-        engradados_encontrados.extend(self.matriz[i][j].engradados)
-        
-        # Chamada recursiva para a próxima coluna na mesma linha.
-        self._obter_engradados_recursivo(i, j + 1, engradados_encontrados)
+        Yields:
+            tuple: (linha, coluna, nivel, engradado), com nivel 0 na base da pilha.
+        """
+        pilhas = self._pilhas
+        if produto_codigo is None:
+            posicoes = range(len(pilhas))
+        else:
+            posicoes = sorted(self._posicoes_por_produto.get(produto_codigo, ()))
+        for posicao in posicoes:
+            pilha = pilhas[posicao]
+            if pilha is None:
+                continue
+            linha, coluna = divmod(posicao, self.colunas)
+            for nivel, engradado in enumerate(pilha.engradados):
+                yield linha, coluna, nivel, engradado
 
     def obter_todos_engradados(self):
         """
-        Retorna uma lista plana com todos os engradados no estoque, usando recursividade.
+        Retorna uma lista plana com todos os engradados no estoque.
+        Para percorrer o estoque sem montar a lista, use iter_engradados().
 
         Returns:
             list: Uma lista de todos os objetos Engradado no estoque.
         """
-        todos_engradados = []
-        # Inicia o processo recursivo a partir da posição [0][0].
-        self._obter_engradados_recursivo(0, 0, todos_engradados)
-        return todos_engradados
+        return [engradado for _, _, _, engradado in self.iter_engradados()]
 
     def obter_produtos_proximos_vencimento(self, produtos_cadastrados, dias=30):
         """
         Identifica produtos no estoque que estão próximos da data de vencimento.
 
         Args:
-            produtos_cadastrados (list): A lista de todos os produtos cadastrados.
+            produtos_cadastrados (CatalogoProdutos): O catálogo de produtos cadastrados.
             dias (int): O número de dias para considerar como "próximo ao vencimento".
 
         Returns:
-            list: Uma lista de dicionários, cada um representando um item próximo a vencer.
+            list: Uma lista de dicionários, cada um representando um item próximo a vencer,
+                  em ordem de validade.
         """
         produtos_vencendo = []
         data_limite = datetime.now() + timedelta(days=dias)
-        
-        # Usa a função recursiva para obter todos os engradados de uma só vez.
-        engradados_no_estoque = self.obter_todos_engradados()
-
-        # Compara a data de validade de cada produto no estoque com a data limite.
-        for engradado in engradados_no_estoque:
-            for produto_info in produtos_cadastrados:
-                if produto_info.codigo == engradado.produto_codigo:
-                    if produto_info.data_validade <= data_limite:
-                        produtos_vencendo.append({
-                            'codigo': produto_info.codigo, 'nome': produto_info.nome,
-                            'lote': produto_info.lote, 'quantidade_engradado': engradado.quantidade,
-                            'data_validade': produto_info.data_validade.strftime("%Y-%m-%d")
-                        })
-                    break 
+
+        if self._catalogo is produtos_cadastrados:
+            # O índice de validade já entrega, em ordem de validade, só os produtos que vencem
+            # até a data limite; depois basta visitar as pilhas desses produtos.
+            codigos = [codigo for _, codigo, _, _ in self.obter_vencimentos(data_limite)]
+        else:
+            # Sem esse catálogo vinculado (veja vincular_catalogo), confere cada produto em estoque.
+            chaves = []
+            for codigo in self._engradados_por_produto:
+                produto_info = produtos_cadastrados.obter(codigo)
+                if produto_info is not None and produto_info.data_validade <= data_limite:
+                    chaves.append((produto_info.data_validade, codigo))
+            codigos = [codigo for _, codigo in sorted(chaves)]
+
+        for codigo in codigos:
+            produto_info = produtos_cadastrados.obter(codigo)
+            data_validade = produto_info.data_validade.strftime("%Y-%m-%d")
+            for _, _, _, engradado in self.iter_engradados(codigo):
+                produtos_vencendo.append({
+                    'codigo': produto_info.codigo, 'nome': produto_info.nome,
+                    'lote': produto_info.lote, 'quantidade_engradado': engradado.quantidade,
+                    'data_validade': data_validade
+                })
         return produtos_vencendo
 
     def obter_itens_em_falta(self, produtos_cadastrados, limite_baixo=10):
@@ -239,7 +1011,7 @@ class Estoque:
         Identifica produtos cujo nível de estoque está abaixo de um limite mínimo.
 
         Args:
-            produtos_cadastrados (list): A lista de todos os produtos cadastrados.
+            produtos_cadastrados (CatalogoProdutos): O catálogo de produtos cadastrados.
             limite_baixo (int): O nível de estoque considerado crítico.
 
         Returns:
@@ -255,4 +1027,30 @@ class Estoque:
                     'total_em_estoque': total_em_estoque, 'limite_baixo': limite_baixo,
                     'faltando': limite_baixo - total_em_estoque
                 })
-        return itens_em_falta
\ No newline at end of file
+        return itens_em_falta
+
+    def obter_valor_estoque(self, produtos_cadastrados):
+        """
+        Calcula o valor do estoque a preço de custo e a preço de venda, usando os totais
+        mantidos por produto (sem percorrer as pilhas).
+
+        Args:
+            produtos_cadastrados (CatalogoProdutos): O catálogo de produtos cadastrados.
+
+        Returns:
+            dict: 'valor_custo', 'valor_venda' e 'margem' (totais) e 'por_produto' (lista de
+                  dicionários com 'codigo', 'nome', 'total_em_estoque', 'valor_custo' e 'valor_venda').
+        """
+        por_produto = []
+        for produto in produtos_cadastrados:
+            total_em_estoque = self.contar_por_produto(produto.codigo)
+            if total_em_estoque:
+                por_produto.append({
+                    'codigo': produto.codigo, 'nome': produto.nome, 'total_em_estoque': total_em_estoque,
+                    'valor_custo': total_em_estoque * produto.preco_compra,
+                    'valor_venda': total_em_estoque * produto.preco_venda
+                })
+        valor_custo = sum(item['valor_custo'] for item in por_produto)
+        valor_venda = sum(item['valor_venda'] for item in por_produto)
+        return {'valor_custo': valor_custo, 'valor_venda': valor_venda,
+                'margem': valor_venda - valor_custo, 'por_produto': por_produto}
\ No newline at end of file
@@ -0,0 +1,231 @@
+# Importa threading para as travas (locks) que protegem o estoque compartilhado.
+import threading
+import heapq
+from Estoque import Estoque, POLITICA_PRIMEIRA_POSICAO
+
+# A classe EstoqueConcorrente é o Estoque usado por várias estações de separação ao mesmo
+# tempo (uma thread por estação). Em vez de uma trava global, usa três níveis de travas:
+# - uma trava por produto: quem a detém é o único que altera as pilhas desse produto, os
+#   seus índices e as suas reservas, então "conferir o saldo e remover" (ou reservar) é
+#   atômico e o estoque nunca é vendido além do que existe;
+# - travas por posição (distribuídas em faixas, posição % número de faixas): protegem o
+#   conteúdo de cada Pilha contra leituras de outras threads no meio de uma alteração;
+# - uma trava de alocação, curta, para o que é compartilhado entre produtos: o heap de
+#   posições vazias, a ocupação/liberação de uma posição e o índice de validade.
+# As travas são sempre obtidas nessa ordem (produto -> alocação -> posição), o que evita deadlocks.
+# Threads que trabalham com produtos diferentes só disputam a trava de alocação ao ocupar ou
+# liberar uma posição.
+# Recarregar o estoque (carregar_pilhas e afins) e percorrê-lo inteiro (iter_engradados sem
+# produto) não são protegidos: devem ser feitos sem outras threads alterando o estoque.
+class EstoqueConcorrente(Estoque):
+    """
+    Estoque seguro para uso simultâneo por várias threads, com travas por produto e por posição.
+    """
+    def __init__(self, linhas=8, colunas=5, altura_maxima=5, politica_alocacao=POLITICA_PRIMEIRA_POSICAO,
+                 faixas_travas=1024):
+        """
+        Inicializa o estoque concorrente.
+
+        Args:
+            linhas, colunas, altura_maxima, politica_alocacao: Como em Estoque.
+            faixas_travas (int, opcional): Número de travas de posição; cada posição usa a
+                                           trava de índice posicao % faixas_travas.
+        """
+        super().__init__(linhas, colunas, altura_maxima, politica_alocacao)
+        self._trava_alocacao = threading.Lock()
+        self._travas_produto = {}
+        self._travas_posicao = [threading.Lock() for _ in range(max(1, faixas_travas))]
+
+    # --- Travas ---
+
+    def _trava_produto(self, produto_codigo):
+        """
+        Retorna a trava do produto, criando-a na primeira vez.
+        """
+        trava = self._travas_produto.get(produto_codigo)
+        if trava is None:
+            # setdefault é atômico: se duas threads criarem ao mesmo tempo, ambas usam a mesma.
+            trava = self._travas_produto.setdefault(produto_codigo, threading.RLock())
+        return trava
+
+    def _trava_posicao(self, posicao):
+        """
+        Retorna a trava (da faixa) que protege a pilha da posição informada.
+        """
+        return self._travas_posicao[posicao % len(self._travas_posicao)]
+
+    # --- Primitivas (chamadas com a trava do produto já obtida) ---
+
+    def _proxima_compativel(self, produto_codigo):
+        """
+        Como em Estoque, mas lê cada pilha com a trava da sua posição: uma entrada antiga
+        do heap pode apontar para uma pilha que outro produto está alterando.
+        """
+        heap = self._pilhas_compativeis.get(produto_codigo)
+        while heap:
+            posicao = heap[0]
+            with self._trava_posicao(posicao):
+                pilha = self._pilhas[posicao]
+                valida = (pilha is not None and pilha.topo().produto_codigo == produto_codigo
+                          and not pilha.esta_cheia())
+            if valida:
+                return posicao
+            heapq.heappop(heap)
+        if heap is not None:
+            del self._pilhas_compativeis[produto_codigo]
+        return None
+
+    def _colocar(self, posicao, engradado):
+        """
+        Como em Estoque._colocar. Ocupar uma posição vazia ou colocar o primeiro engradado
+        de um produto (que entra no índice de validade) também exige a trava de alocação.
+        """
+        with self._trava_posicao(posicao):
+            estrutural = (self._pilhas[posicao] is None
+                          or engradado.produto_codigo not in self._engradados_por_produto)
+            if not estrutural:
+                return super()._colocar(posicao, engradado)
+        with self._trava_alocacao, self._trava_posicao(posicao):
+            return super()._colocar(posicao, engradado)
+
+    def _retirar_do_topo(self, posicao, quantidade):
+        """
+        Como em Estoque._retirar_do_topo. Liberar a posição ou retirar o último engradado
+        de um produto (que sai do índice de validade) também exige a trava de alocação.
+        """
+        # Com a trava do produto, ninguém mais altera esta pilha: a leitura é estável.
+        pilha = self._pilhas[posicao]
+        engradado_topo = pilha.topo()
+        estrutural = engradado_topo.quantidade <= quantidade and (
+            len(pilha.engradados) == 1
+            or self._engradados_por_produto.get(engradado_topo.produto_codigo, 0) <= 1
+        )
+        if estrutural:
+            with self._trava_alocacao, self._trava_posicao(posicao):
+                return super()._retirar_do_topo(posicao, quantidade)
+        with self._trava_posicao(posicao):
+            return super()._retirar_do_topo(posicao, quantidade)
+
+    def _completar_topo(self, posicao, quantidade):
+        with self._trava_posicao(posicao):
+            super()._completar_topo(posicao, quantidade)
+
+    def _passo_consolidacao(self, produto_codigo, capacidade):
+        """
+        Como em Estoque._passo_consolidacao, sob a trava do produto: cada movimento é
+        atômico para as outras threads. consolidar deve ser chamado por uma thread só.
+        """
+        with self._trava_produto(produto_codigo):
+            return super()._passo_consolidacao(produto_codigo, capacidade)
+
+    # --- Operações públicas ---
+    # adicionar_engradado e adicionar_engradados passam por _alocar, acima.
+
+    def _alocar(self, engradado):
+        """
+        Como em Estoque._alocar (usado por adicionar_engradado e adicionar_engradados),
+        sob a trava do produto.
+
+        Returns:
+            int: A posição que recebeu o engradado, ou None se o estoque estiver cheio.
+        """
+        with self._trava_produto(engradado.produto_codigo):
+            while True:
+                with self._trava_alocacao:
+                    posicao = self._escolher_posicao(engradado.produto_codigo)
+                if posicao is None:
+                    return None
+                # Uma posição vazia escolhida pode ter sido ocupada por outro produto
+                # antes de _colocar; nesse caso, escolhe de novo.
+                if self._colocar(posicao, engradado):
+                    return posicao
+
+    def remover_engradado(self, produto_codigo, quantidade, quantidade_reservada=0):
+        """
+        Remove uma quantidade de um produto do estoque (veja Estoque.remover_engradado).
+        A conferência do saldo e a remoção acontecem sob a trava do produto, então duas
+        threads nunca retiram juntas mais do que existe.
+
+        Returns:
+            bool: True se a remoção foi bem-sucedida, False caso contrário.
+        """
+        with self._trava_produto(produto_codigo):
+            return super().remover_engradado(produto_codigo, quantidade, quantidade_reservada)
+
+    def reservar(self, produto_codigo, quantidade):
+        """
+        Reserva unidades de um produto (veja Estoque.reservar), sob a trava do produto.
+        """
+        with self._trava_produto(produto_codigo):
+            return super().reservar(produto_codigo, quantidade)
+
+    def liberar_reserva(self, produto_codigo, quantidade):
+        """
+        Libera unidades reservadas de um produto (veja Estoque.liberar_reserva), sob a trava do produto.
+        """
+        with self._trava_produto(produto_codigo):
+            super().liberar_reserva(produto_codigo, quantidade)
+
+    def colocar_engradado(self, linha, coluna, engradado):
+        """
+        Coloca um engradado diretamente na pilha [linha][coluna] (veja Estoque.colocar_engradado).
+        """
+        with self._trava_produto(engradado.produto_codigo):
+            return super().colocar_engradado(linha, coluna, engradado)
+
+    def completar_topo(self, linha, coluna, quantidade):
+        """
+        Acrescenta unidades ao topo da pilha [linha][coluna] (veja Estoque.completar_topo).
+        """
+        pilha = self.obter_pilha(linha, coluna)
+        if pilha is None:
+            return False
+        with self._trava_produto(pilha.topo().produto_codigo):
+            return super().completar_topo(linha, coluna, quantidade)
+
+    def retirar_do_topo(self, linha, coluna, quantidade):
+        """
+        Retira até 'quantidade' unidades do topo da pilha [linha][coluna]
+        (veja Estoque.retirar_do_topo).
+        """
+        self.obter_pilha(linha, coluna) # Valida a posição.
+        posicao = self._posicao(linha, coluna)
+        while True:
+            with self._trava_posicao(posicao):
+                pilha = self._pilhas[posicao]
+                if pilha is None:
+                    return 0
+                produto_codigo = pilha.topo().produto_codigo
+            with self._trava_produto(produto_codigo):
+                # Uma Pilha nunca troca de produto: se ainda é o mesmo objeto, o topo ainda
+                # é do produto travado. Senão, a posição foi liberada e reocupada; tenta de novo.
+                with self._trava_posicao(posicao):
+                    mesma_pilha = self._pilhas[posicao] is pilha
+                if mesma_pilha:
+                    return self._retirar_do_topo(posicao, quantidade)[0]
+
+    def iter_engradados(self, produto_codigo=None):
+        """
+        Como em Estoque.iter_engradados. Com produto_codigo, os engradados do produto são
+        copiados sob a trava dele, então o gerador pode ser usado durante a separação.
+        """
+        if produto_codigo is None:
+            yield from super().iter_engradados()
+            return
+        with self._trava_produto(produto_codigo):
+            engradados = list(super().iter_engradados(produto_codigo))
+        yield from engradados
+
+    # --- Índice de validade (compartilhado entre produtos) ---
+
+    def _ao_cadastrar_produto(self, evento):
+        with self._trava_alocacao:
+            super()._ao_cadastrar_produto(evento)
+
+    def vincular_catalogo(self, catalogo):
+        with self._trava_alocacao:
+            super().vincular_catalogo(catalogo)
+
+    def obter_vencimentos(self, data_limite):
+        with self._trava_alocacao:
+            return super().obter_vencimentos(data_limite)
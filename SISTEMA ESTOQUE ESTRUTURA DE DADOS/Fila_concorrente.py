@@ -0,0 +1,96 @@
+# Importa threading para a trava que protege a fila compartilhada.
+import threading
+from Fila_de_Pedidos import FilaPedidos
+
+# A classe FilaPedidosConcorrente é a FilaPedidos usada por várias estações de separação ao
+# mesmo tempo, junto com um EstoqueConcorrente (veja Estoque_concorrente.py).
+# processar_pedido já reivindica o pedido antes de mexer no estoque: o pedido escolhido sai
+# do escalonamento (ninguém mais o escolhe nem o cancela), a remoção é feita e, se ela
+# falhar, o pedido é devolvido na mesma posição.
+# Aqui, escolher e reivindicar (e devolver, e gravar no histórico) acontecem sob uma trava
+# da fila, então duas threads nunca atendem o mesmo pedido. A remoção do estoque fica fora
+# dessa trava: as estações só se esperam na trava do produto, dentro do estoque.
+# A trava da fila é sempre obtida antes das travas do estoque (fila -> produto), o que evita
+# deadlocks. processar_lote segura a trava da fila durante o lote inteiro.
+class FilaPedidosConcorrente(FilaPedidos):
+    """
+    Fila de pedidos segura para uso simultâneo por várias threads.
+    """
+    def __init__(self, politica=None):
+        """
+        Inicializa a fila concorrente (veja FilaPedidos).
+        """
+        super().__init__(politica)
+        # RLock: os métodos travados chamam uns aos outros (processar_lote -> proximo_pedido).
+        self._trava = threading.RLock()
+
+    # --- Reivindicação usada por processar_pedido ---
+
+    def _reivindicar(self, estoque):
+        with self._trava:
+            return super()._reivindicar(estoque)
+
+    def _devolver(self, pedido):
+        with self._trava:
+            super()._devolver(pedido)
+
+    def _concluir(self, pedido):
+        with self._trava:
+            super()._concluir(pedido)
+
+    # --- Operações públicas ---
+    # processar_pedido passa pelos três métodos acima.
+
+    def proximo_pedido(self, estoque=None):
+        with self._trava:
+            return super().proximo_pedido(estoque)
+
+    def definir_politica(self, politica):
+        with self._trava:
+            super().definir_politica(politica)
+
+    def adicionar_pedido(self, pedido, estoque=None):
+        """
+        Adiciona um pedido ao final da fila (veja FilaPedidos.adicionar_pedido), sob a trava da fila.
+        """
+        with self._trava:
+            return super().adicionar_pedido(pedido, estoque)
+
+    def cancelar_pedido(self, numero, estoque=None):
+        """
+        Cancela um pedido da fila (veja FilaPedidos.cancelar_pedido). Um pedido que outra
+        thread está processando não está mais entre os pendentes e não é cancelado.
+        """
+        with self._trava:
+            return super().cancelar_pedido(numero, estoque)
+
+    def avancar_numeracao(self, ultimo_numero):
+        with self._trava:
+            super().avancar_numeracao(ultimo_numero)
+
+    def reaplicar_reservas(self, estoque):
+        with self._trava:
+            super().reaplicar_reservas(estoque)
+
+    def registrar_atendimento(self, numero, quantidade=None):
+        with self._trava:
+            return super().registrar_atendimento(numero, quantidade)
+
+    def processar_lote(self, estoque, max_pedidos=None, permitir_parcial=False, planejador=None):
+        """
+        Processa um lote de pedidos (veja FilaPedidos.processar_lote), sob a trava da fila.
+        """
+        with self._trava:
+            return super().processar_lote(estoque, max_pedidos, permitir_parcial, planejador)
+
+    def para_serializavel(self):
+        with self._trava:
+            return super().para_serializavel()
+
+    def carregar_objetos(self, fila, historico_atendidos):
+        with self._trava:
+            super().carregar_objetos(fila, historico_atendidos)
+
+    def limpar(self):
+        with self._trava:
+            super().limpar()
@@ -1,40 +1,367 @@
 # Importa json para salvar e carregar a fila de/para arquivos.
 # Importa deque (Double-Ended Queue) da biblioteca collections, que é uma estrutura de dados
 # otimizada para adicionar e remover elementos de suas extremidades (ideal para filas e pilhas).
+# Importa heapq para as filas de prioridade usadas pelas políticas de escalonamento.
 # Importa a classe Pedido.
 import json
+import time
+import heapq
 from collections import deque
+from contextlib import nullcontext
 from Pedido import Pedido
+from Politicas_fila import PoliticaFIFO
+from Log_estruturado import SAIDA_NULA, INFO, AVISO, ERRO, registro
 
 # A classe FilaPedidos gerencia os pedidos que aguardam processamento.
-# Utiliza a estrutura de dados "Fila" (Queue), que segue a lógica FIFO (First-In, First-Out).
-# O primeiro pedido que chega é o primeiro a ser processado.
+# Por padrão segue a lógica FIFO (First-In, First-Out): o primeiro pedido que chega é o
+# primeiro a ser processado. Outras ordens podem ser escolhidas com uma política de
+# escalonamento (veja Politicas_fila.py).
+#
+# Os pedidos pendentes ficam em um dicionário por número (na ordem de chegada) e em filas
+# de prioridade (heaps):
+# - um heap por produto, com as chaves (da política) dos pedidos daquele produto;
+# - um heap das "cabeças": o primeiro pedido de cada produto.
+# Escolher o próximo pedido é O(log n). Entradas de pedidos que já saíram da fila são
+# descartadas quando chegam ao topo de um heap (remoção preguiçosa).
 class FilaPedidos:
     """
     Gerencia uma fila de pedidos pendentes e um histórico de pedidos atendidos.
     """
-    def __init__(self):
+    # Para onde vão as mensagens do processamento (veja Log_estruturado.py).
+    saida = SAIDA_NULA
+
+    def __init__(self, politica=None):
         """
-        Inicializa a fila de pedidos e o histórico de atendidos usando 'deque'.
+        Inicializa a fila de pedidos e o histórico de atendidos (um 'deque').
+
+        Args:
+            politica (opcional): A política de escalonamento (PoliticaFIFO, se não for informada).
         """
-        self.fila = deque()
+        self.politica = politica if politica is not None else PoliticaFIFO()
+        # Pedidos pendentes por número, na ordem de chegada.
+        self._pendentes = {}
+        self._heaps_por_produto = {}
+        self._cabecas = []
+        # Números dos pedidos que processar_pedido tirou do escalonamento enquanto os atende.
+        self._reivindicados = set()
         self.historico_atendidos = deque()
+        # Próximo número a ser atribuído a um pedido que entra na fila sem número.
+        self._proximo_numero = 1
+        # Funções notificadas a cada alteração (veja adicionar_ouvinte).
+        self._ouvintes = []
+
+    @property
+    def fila(self):
+        """
+        Os pedidos pendentes, na ordem de chegada (uma visão somente leitura).
+        """
+        return self._pendentes.values()
+
+    @property
+    def proximo_numero(self):
+        """
+        O número que o próximo pedido sem número vai receber.
+        """
+        return self._proximo_numero
+
+    def obter_pedido(self, numero):
+        """
+        Retorna o pedido pendente com o número informado, ou None se ele não estiver na fila.
+        """
+        return self._pendentes.get(numero)
+
+    # --- Estrutura de escalonamento ---
+
+    def _enfileirar(self, pedido):
+        """
+        Coloca um pedido (já numerado) entre os pendentes e nos heaps da política.
+        """
+        self._pendentes[pedido.numero] = pedido
+        self._escalonar(pedido)
+
+    def _escalonar(self, pedido):
+        """
+        Coloca um pedido pendente nos heaps da política.
+        """
+        entrada = (self.politica.chave(pedido), pedido.numero)
+        heap = self._heaps_por_produto.setdefault(pedido.codigo_produto, [])
+        heapq.heappush(heap, entrada)
+        if heap[0] is entrada:
+            # O pedido passou a ser o primeiro do seu produto.
+            heapq.heappush(self._cabecas, entrada + (pedido.codigo_produto,))
+
+    def _desenfileirar(self, pedido):
+        """
+        Tira um pedido dos pendentes. As entradas nos heaps são descartadas depois.
+        """
+        del self._pendentes[pedido.numero]
+        self._reivindicados.discard(pedido.numero)
+        self._avancar_produto(pedido.codigo_produto)
+
+    def _avancar_produto(self, codigo):
+        """
+        Coloca no heap das cabeças o novo primeiro pedido do produto, se houver.
+        """
+        primeira = self._primeira_do_produto(codigo)
+        if primeira is not None:
+            heapq.heappush(self._cabecas, primeira + (codigo,))
+
+    def _primeira_do_produto(self, codigo):
+        """
+        Retorna a entrada (chave, numero) do primeiro pedido pendente do produto, ou None.
+        Pedidos reivindicados por processar_pedido não contam.
+        """
+        heap = self._heaps_por_produto.get(codigo)
+        while heap and (heap[0][1] not in self._pendentes or heap[0][1] in self._reivindicados):
+            heapq.heappop(heap)
+        if not heap:
+            self._heaps_por_produto.pop(codigo, None)
+            return None
+        return heap[0]
+
+    def _cabeca_valida(self, cabeca):
+        """
+        Indica se uma entrada do heap das cabeças ainda é o primeiro pedido do seu produto.
+        """
+        chave, numero, codigo = cabeca
+        return self._primeira_do_produto(codigo) == (chave, numero)
+
+    def _reconstruir_escalonamento(self):
+        """
+        Recria os heaps da política a partir dos pedidos pendentes.
+        """
+        pendentes = list(self._pendentes.values())
+        self._pendentes = {}
+        self._heaps_por_produto = {}
+        self._cabecas = []
+        for pedido in pendentes:
+            self._enfileirar(pedido)
+
+    def definir_politica(self, politica):
+        """
+        Troca a política de escalonamento; os pedidos pendentes são reordenados.
+
+        Args:
+            politica: A nova política (veja Politicas_fila.py).
+        """
+        self.politica = politica
+        self._reconstruir_escalonamento()
+
+    def _pode_atender(self, pedido, estoque):
+        """
+        Indica se o pedido pode ser atendido agora com o saldo do estoque.
+        """
+        return pedido.reservado or pedido.quantidade <= estoque.disponivel(pedido.codigo_produto)
+
+    def proximo_pedido(self, estoque=None):
+        """
+        Retorna, sem retirá-lo da fila, o próximo pedido segundo a política.
+
+        Com uma política que pula bloqueados e o estoque informado, os produtos cujo
+        primeiro pedido não cabe no saldo são pulados (custo O(log n) por produto pulado).
+
+        Args:
+            estoque (Estoque, opcional): O estoque usado para saber o que pode ser atendido.
+
+        Returns:
+            Pedido: O próximo pedido, ou None se não houver (ou se nenhum puder ser atendido).
+        """
+        cabecas = self._cabecas
+        pular = self.politica.pular_bloqueados and estoque is not None
+        pulados = []
+        escolhido = None
+        while cabecas:
+            cabeca = cabecas[0]
+            if not self._cabeca_valida(cabeca):
+                heapq.heappop(cabecas)
+                continue
+            pedido = self._pendentes[cabeca[1]]
+            if pular and not self._pode_atender(pedido, estoque):
+                pulados.append(heapq.heappop(cabecas))
+                continue
+            escolhido = pedido
+            break
+        # Os produtos pulados continuam na fila com a mesma posição.
+        for cabeca in pulados:
+            heapq.heappush(cabecas, cabeca)
+        return escolhido
+
+    def adicionar_ouvinte(self, ouvinte):
+        """
+        Registra uma função que será chamada a cada alteração da fila ou do histórico.
+
+        A função recebe um dicionário com a chave 'tipo' e os dados da alteração:
+        - 'pedido_adicionado': pedido (dicionário no formato de Pedido.para_dicionario);
+        - 'pedido_atendido': numero, quantidade (unidades atendidas; se for menor que a do
+          pedido, o atendimento foi parcial e o restante continua na fila), solicitante,
+          codigo_produto;
+        - 'pedido_cancelado': numero (o pedido saiu da fila sem ser atendido);
+        - 'fila_recarregada': dados (fila e histórico no formato de para_serializavel).
+
+        Args:
+            ouvinte (callable): A função a ser chamada com cada evento.
+        """
+        self._ouvintes.append(ouvinte)
+
+    def remover_ouvinte(self, ouvinte):
+        """
+        Cancela o registro de uma função feito com adicionar_ouvinte.
+        """
+        self._ouvintes.remove(ouvinte)
+
+    def _publicar(self, evento):
+        """
+        Entrega um evento de alteração a todos os ouvintes registrados.
+        """
+        for ouvinte in self._ouvintes:
+            ouvinte(evento)
+
+    def _numerar(self, pedido):
+        """
+        Atribui um número ao pedido, se ele ainda não tiver um, e mantém o contador à frente
+        de todos os números já vistos.
+        """
+        if pedido.numero is None:
+            pedido.numero = self._proximo_numero
+        self._proximo_numero = max(self._proximo_numero, pedido.numero + 1)
+
+    def avancar_numeracao(self, ultimo_numero):
+        """
+        Garante que os próximos pedidos recebam números maiores que 'ultimo_numero'.
+        Usado na carga, para que a numeração continue depois dos pedidos do histórico
+        mesmo quando a fila está vazia.
+
+        Args:
+            ultimo_numero (int | None): O maior número já usado (None é ignorado).
+        """
+        if ultimo_numero is not None:
+            self._proximo_numero = max(self._proximo_numero, ultimo_numero + 1)
+
+    def _numerados(self, pedidos):
+        """
+        Percorre os pedidos do histórico avançando a numeração além de cada um.
+        """
+        for pedido in pedidos:
+            self.avancar_numeracao(pedido.numero)
+            yield pedido
         
-    def adicionar_pedido(self, pedido):
+    def adicionar_pedido(self, pedido, estoque=None):
         """
         Adiciona um novo pedido ao final da fila.
 
         Args:
             pedido (Pedido): O objeto Pedido a ser adicionado.
+            estoque (Estoque, opcional): Se informado, tenta reservar no estoque a quantidade
+                                         do pedido. Sem saldo disponível, o pedido entra na
+                                         fila sem reserva.
+
+        Returns:
+            bool: True se o pedido está com a quantidade reservada, False caso contrário.
+        """
+        if estoque is not None and not pedido.reservado:
+            pedido.reservado = estoque.reservar(pedido.codigo_produto, pedido.quantidade)
+        self._numerar(pedido)
+        self._enfileirar(pedido)
+        if self._ouvintes:
+            self._publicar({'tipo': 'pedido_adicionado', 'pedido': pedido.para_dicionario()})
+        return pedido.reservado
+
+    def adicionar_pedidos(self, pedidos, estoque=None):
+        """
+        Adiciona vários pedidos ao final da fila, na ordem recebida (veja adicionar_pedido).
+
+        Args:
+            pedidos (iterable): Os pedidos a serem adicionados.
+            estoque (Estoque, opcional): Se informado, cada pedido tenta reservar a sua quantidade.
+
+        Returns:
+            int: Quantos pedidos ficaram com a quantidade reservada.
+        """
+        reservados = 0
+        for pedido in pedidos:
+            reservados += self.adicionar_pedido(pedido, estoque)
+        return reservados
+
+    def cancelar_pedido(self, numero, estoque=None):
+        """
+        Retira da fila um pedido que não será atendido, liberando a sua reserva.
+
+        Args:
+            numero (int): O número do pedido.
+            estoque (Estoque, opcional): O estoque onde a reserva do pedido foi feita.
+
+        Returns:
+            Pedido: O pedido cancelado, ou None se não estava na fila.
+        """
+        pedido = self._pendentes.get(numero)
+        if pedido is None or numero in self._reivindicados:
+            return None
+        self._desenfileirar(pedido)
+        if pedido.reservado:
+            if estoque is not None:
+                estoque.liberar_reserva(pedido.codigo_produto, pedido.quantidade)
+            pedido.reservado = False
+        if self._ouvintes:
+            self._publicar({'tipo': 'pedido_cancelado', 'numero': numero})
+        return pedido
+
+    def reaplicar_reservas(self, estoque):
+        """
+        Refaz no estoque as reservas dos pedidos da fila marcados como reservados
+        (por exemplo, depois de carregar a fila e o estoque de arquivos).
+        Um pedido cuja reserva não cabe mais no saldo perde a marcação.
+
+        Args:
+            estoque (Estoque): O estoque onde as reservas são feitas.
+        """
+        estoque.limpar_reservas()
+        for pedido in self._pendentes.values():
+            if pedido.reservado:
+                pedido.reservado = estoque.reservar(pedido.codigo_produto, pedido.quantidade)
+
+    def registrar_atendimento(self, numero, quantidade=None):
+        """
+        Registra o atendimento de um pedido que está na fila, sem mexer no estoque.
+        Um atendimento parcial (quantidade menor que a do pedido) grava a parte atendida
+        no histórico e deixa o restante na fila.
+
+        Args:
+            numero (int): O número do pedido.
+            quantidade (int, opcional): Unidades atendidas. None atende o pedido inteiro.
+
+        Returns:
+            bool: True se o pedido foi encontrado na fila, False caso contrário.
+        """
+        pedido = self._pendentes.get(numero)
+        if pedido is None or numero in self._reivindicados:
+            return False
+        if quantidade is None or quantidade >= pedido.quantidade:
+            quantidade = pedido.quantidade
+            self._desenfileirar(pedido)
+            pedido.reservado = False
+            self.historico_atendidos.append(pedido)
+        else:
+            self.historico_atendidos.append(self._parte_atendida(pedido, quantidade))
+            pedido.quantidade -= quantidade
+        if self._ouvintes:
+            self._publicar({'tipo': 'pedido_atendido', 'numero': numero, 'quantidade': quantidade,
+                            'solicitante': pedido.solicitante, 'codigo_produto': pedido.codigo_produto})
+        return True
+
+    def _parte_atendida(self, pedido, quantidade):
+        """
+        Cria o registro de histórico da parte atendida de um pedido parcial.
         """
-        self.fila.append(pedido)
+        return Pedido(pedido.codigo_produto, quantidade, pedido.data_solicitacao.strftime("%Y-%m-%d"),
+                      pedido.solicitante, numero=pedido.numero)
         
     def processar_pedido(self, estoque):
         """
-        Processa o primeiro pedido da fila.
+        Processa o próximo pedido da fila, escolhido pela política de escalonamento.
 
         Verifica se há estoque suficiente. Se houver, remove os itens do estoque
-        e move o pedido para o histórico. Se não, o pedido volta para o início da fila.
+        e move o pedido para o histórico. Se não, o pedido continua na sua posição da fila.
+        Um pedido com reserva sempre tem saldo: a remoção baixa a própria reserva.
 
         Args:
             estoque (Estoque): O objeto de estoque para verificação e remoção de itens.
@@ -43,34 +370,244 @@ class FilaPedidos:
             bool: True se o pedido foi processado com sucesso, False caso contrário.
                   Retorna None se a fila estiver vazia.
         """
-        # Verifica se há pedidos na fila.
-        if self.fila:
-            # Pega o primeiro pedido da fila (FIFO).
-            pedido = self.fila.popleft()
-            # Verifica a quantidade total do produto disponível no estoque.
-            total_disponivel = estoque.contar_por_produto(pedido.codigo_produto)
-            
-            # Se a quantidade em estoque for suficiente...
-            if total_disponivel >= pedido.quantidade:
-                # Tenta remover a quantidade solicitada do estoque.
-                remocao_sucesso = estoque.remover_engradado(pedido.codigo_produto, pedido.quantidade)
-                if remocao_sucesso:
-                    print(f"Pedido de {pedido.solicitante} atendido!")
-                    # Adiciona o pedido ao histórico de pedidos atendidos.
-                    self.historico_atendidos.append(pedido)
-                    return True
+        # Pega o próximo pedido segundo a política e o reserva para si enquanto é processado.
+        pedido = self._reivindicar(estoque)
+        if pedido is None:
+            return None
+        # Verifica a quantidade do produto disponível no estoque (mais a reserva do pedido).
+        quantidade_reservada = pedido.quantidade if pedido.reservado else 0
+        total_disponivel = estoque.disponivel(pedido.codigo_produto) + quantidade_reservada
+
+        # Se a quantidade em estoque for suficiente...
+        if total_disponivel >= pedido.quantidade:
+            # Tenta remover a quantidade solicitada do estoque.
+            remocao_sucesso = estoque.remover_engradado(pedido.codigo_produto, pedido.quantidade,
+                                                        quantidade_reservada)
+            if remocao_sucesso:
+                if self.saida.nivel <= INFO:
+                    self.saida.emitir(registro(INFO, 'pedido_atendido', numero=pedido.numero,
+                                               solicitante=pedido.solicitante,
+                                               codigo_produto=pedido.codigo_produto,
+                                               quantidade=pedido.quantidade))
+                # Adiciona o pedido ao histórico de pedidos atendidos.
+                self._concluir(pedido)
+                return True
+            # Se ocorrer um erro inesperado na remoção, o pedido é devolvido.
+            if self.saida.nivel <= ERRO:
+                self.saida.emitir(registro(ERRO, 'erro_remocao_pedido', numero=pedido.numero,
+                                           solicitante=pedido.solicitante,
+                                           codigo_produto=pedido.codigo_produto))
+        # Se não houver estoque suficiente...
+        elif self.saida.nivel <= AVISO:
+            self.saida.emitir(registro(AVISO, 'pedido_sem_estoque', numero=pedido.numero,
+                                       solicitante=pedido.solicitante,
+                                       codigo_produto=pedido.codigo_produto,
+                                       faltam=pedido.quantidade - total_disponivel))
+        # O pedido volta para a sua posição na fila, para ser tentado novamente mais tarde.
+        self._devolver(pedido)
+        return False
+
+    def _reivindicar(self, estoque):
+        """
+        Escolhe o próximo pedido para processar_pedido e o tira do escalonamento, para que
+        ninguém mais o processe (nem o cancele) ao mesmo tempo. O pedido continua entre os
+        pendentes, na sua posição, até ser concluído ou devolvido. Se a política pula os
+        bloqueados e nenhum pedido pode ser atendido, o primeiro da fila é tentado (e informado).
+
+        Returns:
+            Pedido: O pedido escolhido, ou None se não houver pedido livre na fila.
+        """
+        if len(self._pendentes) == len(self._reivindicados):
+            return None
+        pedido = self.proximo_pedido(estoque) or self.proximo_pedido()
+        if pedido is not None:
+            self._reivindicados.add(pedido.numero)
+            self._avancar_produto(pedido.codigo_produto)
+        return pedido
+
+    def _devolver(self, pedido):
+        """
+        Devolve ao escalonamento um pedido reivindicado que não foi atendido. A chave da
+        política mantém a posição que ele tinha.
+        """
+        self._reivindicados.discard(pedido.numero)
+        self._escalonar(pedido)
+
+    def _concluir(self, pedido):
+        """
+        Registra no histórico um pedido reivindicado que foi atendido por inteiro.
+        """
+        self._desenfileirar(pedido)
+        pedido.reservado = False
+        self.historico_atendidos.append(pedido)
+        if self._ouvintes:
+            self._publicar({'tipo': 'pedido_atendido', 'numero': pedido.numero,
+                            'quantidade': pedido.quantidade, 'solicitante': pedido.solicitante,
+                            'codigo_produto': pedido.codigo_produto})
+
+    def _remover_do_estoque(self, estoque, codigo, quantidade, quantidade_reservada, planejador):
+        """
+        Remove a demanda de um produto do estoque, pelo planejador de retirada se houver um.
+        Com um EstoqueConcorrente, o plano é montado e executado sob a trava do produto,
+        para que outra thread não mexa nas pilhas entre uma coisa e outra.
+
+        Returns:
+            bool: True se a remoção foi bem-sucedida, False caso contrário (inclusive se o
+                  estoque mudou entre o planejamento e a execução).
+        """
+        if planejador is None:
+            return estoque.remover_engradado(codigo, quantidade, quantidade_reservada)
+        trava_produto = getattr(estoque, '_trava_produto', None)
+        with trava_produto(codigo) if trava_produto is not None else nullcontext():
+            plano = planejador.planejar(codigo, quantidade)
+            try:
+                return plano is not None and planejador.executar(plano, quantidade_reservada)
+            except ValueError:
+                return False
+
+    def processar_lote(self, estoque, max_pedidos=None, permitir_parcial=False, planejador=None):
+        """
+        Processa vários pedidos da fila de uma só vez.
+
+        A demanda é agrupada por produto: a disponibilidade de cada produto é consultada
+        uma única vez e a remoção do estoque é feita uma única vez por produto.
+        Os pedidos do lote são retirados na ordem da política de escalonamento.
+        Um pedido que não pode ser atendido não trava os demais: ele é adiado e, ao final
+        do lote, volta para a mesma posição da fila.
+        Pedidos com reserva são sempre atendidos, e as suas reservas são baixadas na
+        mesma remoção do produto.
+
+        Args:
+            estoque (Estoque): O objeto de estoque para verificação e remoção de itens.
+            max_pedidos (int, opcional): Número máximo de pedidos retirados da fila.
+                                         None processa a fila inteira.
+            permitir_parcial (bool, opcional): Se True, um pedido maior que o saldo disponível
+                                               recebe o que houver e o restante continua na fila.
+            planejador (PlanejadorRetirada, opcional): Se informado, a remoção de cada produto
+                                                       segue o plano de retirada que toca menos
+                                                       engradados, em vez da ordem da matriz.
+
+        Returns:
+            dict: Resultado do lote com as chaves:
+                  'atendidos' (list de Pedido), 'parciais' (list de dicts com 'pedido',
+                  'quantidade_atendida' e 'quantidade_pendente'), 'adiados' (list de Pedido),
+                  'processados' (int), 'duracao_segundos' (float) e 'pedidos_por_segundo' (float).
+                  As três listas são disjuntas: um pedido parcial volta à fila com o restante,
+                  mas aparece só em 'parciais'; 'adiados' tem os pedidos que não receberam nada.
+        """
+        inicio = time.perf_counter()
+        quantidade_lote = len(self._pendentes) if max_pedidos is None else min(max_pedidos, len(self._pendentes))
+        lote = []
+        while len(lote) < quantidade_lote:
+            pedido = self.proximo_pedido(estoque)
+            if pedido is None:
+                # Só restam pedidos que a política deixa para depois.
+                break
+            self._desenfileirar(pedido)
+            lote.append(pedido)
+
+        # Agrupa os pedidos por produto, preservando a ordem do lote dentro de cada grupo.
+        pedidos_por_produto = {}
+        for pedido in lote:
+            pedidos_por_produto.setdefault(pedido.codigo_produto, []).append(pedido)
+
+        atendidos = set()
+        parciais = []
+        adiados = []
+        for codigo, pedidos in pedidos_por_produto.items():
+            # Uma única consulta de disponibilidade por produto.
+            saldo = estoque.disponivel(codigo)
+            total_a_remover = 0
+            reservado_a_baixar = 0
+            for pedido in pedidos:
+                if pedido.reservado:
+                    # A quantidade já está separada para este pedido e não entra no saldo.
+                    total_a_remover += pedido.quantidade
+                    reservado_a_baixar += pedido.quantidade
+                    atendidos.add(id(pedido))
+                elif pedido.quantidade <= saldo:
+                    saldo -= pedido.quantidade
+                    total_a_remover += pedido.quantidade
+                    atendidos.add(id(pedido))
+                elif permitir_parcial and saldo > 0:
+                    # Atende o que houver; o pedido continua na fila com o restante.
+                    parciais.append({'pedido': pedido, 'quantidade_atendida': saldo,
+                                     'quantidade_pendente': pedido.quantidade - saldo})
+                    total_a_remover += saldo
+                    saldo = 0
                 else:
-                    # Se ocorrer um erro inesperado na remoção, devolve o pedido à fila.
-                    print(f"Erro inesperado ao remover do estoque para o pedido de {pedido.solicitante}.")
-                    self.fila.appendleft(pedido)
-                    return False
-            # Se não houver estoque suficiente...
+                    adiados.append(pedido)
+            # Uma única remoção por produto para toda a demanda atendida.
+            if total_a_remover and not self._remover_do_estoque(estoque, codigo, total_a_remover,
+                                                                reservado_a_baixar, planejador):
+                # Erro inesperado na remoção: nenhum pedido deste produto é considerado atendido.
+                if self.saida.nivel <= ERRO:
+                    self.saida.emitir(registro(ERRO, 'erro_remocao_lote', codigo_produto=codigo,
+                                               quantidade=total_a_remover))
+                for pedido in pedidos:
+                    if id(pedido) in atendidos:
+                        atendidos.discard(id(pedido))
+                        adiados.append(pedido)
+                adiados.extend(p['pedido'] for p in parciais if p['pedido'].codigo_produto == codigo)
+                parciais = [p for p in parciais if p['pedido'].codigo_produto != codigo]
+
+        # Atendidos (e as partes atendidas dos parciais) vão para o histórico na ordem do lote.
+        parciais_por_pedido = {id(parcial['pedido']): parcial for parcial in parciais}
+        lista_atendidos = []
+        for pedido in lote:
+            if id(pedido) in atendidos:
+                pedido.reservado = False
+                lista_atendidos.append(pedido)
+                self.historico_atendidos.append(pedido)
+                quantidade_atendida = pedido.quantidade
+            elif id(pedido) in parciais_por_pedido:
+                quantidade_atendida = parciais_por_pedido[id(pedido)]['quantidade_atendida']
+                self.historico_atendidos.append(self._parte_atendida(pedido, quantidade_atendida))
+                # O pedido continua na fila apenas com a quantidade pendente.
+                pedido.quantidade -= quantidade_atendida
             else:
-                print(f"Estoque insuficiente para atender pedido de {pedido.solicitante} (faltam {pedido.quantidade - total_disponivel} unidades do produto {pedido.codigo_produto}).")
-                # Devolve o pedido ao início da fila para ser tentado novamente mais tarde.
-                self.fila.appendleft(pedido)
-                return False
-        return None
+                continue
+            if self._ouvintes:
+                self._publicar({'tipo': 'pedido_atendido', 'numero': pedido.numero,
+                                'quantidade': quantidade_atendida, 'solicitante': pedido.solicitante,
+                                'codigo_produto': pedido.codigo_produto})
+
+        # Adiados e parciais voltam à fila; a chave da política mantém a posição que tinham.
+        ids_adiados = {id(pedido) for pedido in adiados}
+        adiados = []
+        for pedido in lote:
+            if id(pedido) in ids_adiados:
+                adiados.append(pedido)
+                self._enfileirar(pedido)
+            elif id(pedido) in parciais_por_pedido:
+                self._enfileirar(pedido)
+
+        duracao = time.perf_counter() - inicio
+        return {
+            'atendidos': lista_atendidos,
+            'parciais': parciais,
+            'adiados': adiados,
+            'processados': len(lote),
+            'duracao_segundos': duracao,
+            'pedidos_por_segundo': len(lote) / duracao if duracao > 0 else float('inf')
+        }
+
+    def para_serializavel(self):
+        """
+        Converte a fila de pedidos pendentes e o histórico de atendidos em dicionários,
+        no mesmo formato gravado no arquivo JSON.
+
+        Returns:
+            dict: Um dicionário com as listas 'fila' e 'historico_atendidos' e o
+                  'proximo_numero' a ser atribuído.
+        """
+        historico = self.historico_atendidos
+        return {
+            'fila': [p.para_dicionario() for p in self._pendentes.values()],
+            'historico_atendidos': (historico.para_serializavel() if isinstance(historico, HistoricoAdiado)
+                                    else [p.para_dicionario() for p in historico]),
+            'proximo_numero': self._proximo_numero
+        }
 
     def salvar_pedidos(self, nome_arquivo):
         """
@@ -80,46 +617,103 @@ class FilaPedidos:
             nome_arquivo (str): O caminho do arquivo para salvar os dados.
         """
         # Cria um dicionário contendo a fila e o histórico.
-        dados_a_salvar = {
-            'fila': [p.para_dicionario() for p in self.fila],
-            'historico_atendidos': [p.para_dicionario() for p in self.historico_atendidos]
-        }
+        dados_a_salvar = self.para_serializavel()
         with open(nome_arquivo, 'w', encoding='utf-8') as f:
             json.dump(dados_a_salvar, f, ensure_ascii=False, indent=4)
 
-    def carregar_pedidos(self, nome_arquivo):
+    def carregar_serializavel(self, dados_carregados, adiar_historico=False):
+        """
+        Acrescenta à fila e ao histórico os pedidos no formato de para_serializavel.
+
+        Args:
+            dados_carregados (dict | list): Os dados da fila e do histórico. Uma lista é
+                                            aceita como o formato antigo (apenas a fila).
+            adiar_historico (bool, opcional): Se True e o histórico atual estiver vazio, os
+                                              pedidos do histórico só são criados no primeiro
+                                              acesso a ele (veja HistoricoAdiado).
+        """
+        # Para compatibilidade com versões antigas do arquivo JSON.
+        if isinstance(dados_carregados, list):
+            # Formato antigo era apenas uma lista de pedidos.
+            fila_para_carregar = dados_carregados
+            historico_para_carregar = []
+        else:
+            # Formato novo é um dicionário com 'fila' e 'historico_atendidos'.
+            fila_para_carregar = dados_carregados.get('fila', [])
+            historico_para_carregar = dados_carregados.get('historico_atendidos', [])
+            proximo_numero = dados_carregados.get('proximo_numero')
+            if proximo_numero is not None:
+                self.avancar_numeracao(proximo_numero - 1)
+
+        if (adiar_historico and historico_para_carregar and isinstance(self.historico_atendidos, deque)
+                and not self.historico_atendidos):
+            self.historico_atendidos = HistoricoAdiado(historico_para_carregar)
+            # Arquivos antigos não têm 'proximo_numero': a numeração segue o histórico.
+            self.avancar_numeracao(max((d.get('numero') or 0 for d in historico_para_carregar), default=0))
+            historico_para_carregar = ()
+        self.carregar_objetos(
+            (Pedido.de_dicionario(d) for d in fila_para_carregar),
+            (Pedido.de_dicionario(d) for d in historico_para_carregar)
+        )
+
+    def limpar(self):
+        """
+        Esvazia a fila de pendentes e o histórico de atendidos.
+        """
+        self._pendentes = {}
+        self._heaps_por_produto = {}
+        self._cabecas = []
+        self._reivindicados = set()
+        self.historico_atendidos.clear()
+
+    def usar_historico(self, historico):
+        """
+        Troca o armazenamento do histórico de atendidos. O histórico atual é descartado.
+
+        Args:
+            historico: Um objeto com a interface usada pela fila (append, extend, clear,
+                       len, iteração e historico[-1]), como um deque ou uma tabela
+                       (veja Armazenamento_sqlite.HistoricoSQLite).
+        """
+        self.historico_atendidos = historico
+
+    def carregar_objetos(self, fila, historico_atendidos):
+        """
+        Acrescenta à fila e ao histórico pedidos já criados.
+
+        Args:
+            fila (iterable): Os pedidos pendentes, na ordem da fila.
+            historico_atendidos (iterable): Os pedidos atendidos, na ordem do histórico.
+        """
+        # Carrega os pedidos pendentes.
+        for pedido in fila:
+            self._numerar(pedido)
+            self._enfileirar(pedido)
+        
+        # Carrega o histórico de pedidos atendidos; a numeração continua depois deles.
+        self.historico_atendidos.extend(self._numerados(historico_atendidos))
+
+        if self._ouvintes:
+            self._publicar({'tipo': 'fila_recarregada', 'dados': self.para_serializavel()})
+
+    def carregar_pedidos(self, nome_arquivo, adiar_historico=False):
         """
         Carrega a fila de pedidos e o histórico de um arquivo JSON.
 
         Args:
             nome_arquivo (str): O caminho do arquivo para carregar os dados.
+            adiar_historico (bool, opcional): Veja carregar_serializavel.
         """
         try:
             with open(nome_arquivo, 'r', encoding='utf-8') as f:
                 dados_carregados = json.load(f)
-                
-                # Para compatibilidade com versões antigas do arquivo JSON.
-                if isinstance(dados_carregados, list):
-                    # Formato antigo era apenas uma lista de pedidos.
-                    fila_para_carregar = dados_carregados
-                    historico_para_carregar = []
-                else:
-                    # Formato novo é um dicionário com 'fila' e 'historico_atendidos'.
-                    fila_para_carregar = dados_carregados.get('fila', [])
-                    historico_para_carregar = dados_carregados.get('historico_atendidos', [])
-                
-                # Carrega os pedidos pendentes.
-                for d in fila_para_carregar:
-                    self.adicionar_pedido(Pedido(d['codigo_produto'], d['quantidade'], d['data_solicitacao'], d['solicitante']))
-                
-                # Carrega o histórico de pedidos atendidos.
-                for d in historico_para_carregar:
-                    self.historico_atendidos.append(Pedido(d['codigo_produto'], d['quantidade'], d['data_solicitacao'], d['solicitante']))
-                
+            self.carregar_serializavel(dados_carregados, adiar_historico)
         except FileNotFoundError:
-            print(f"Arquivo de pedidos '{nome_arquivo}' não encontrado. Iniciando com fila e histórico vazios.")
+            if self.saida.nivel <= AVISO:
+                self.saida.emitir(registro(AVISO, 'arquivo_pedidos_ausente', arquivo=nome_arquivo))
         except (json.JSONDecodeError, KeyError) as e:
-            print(f"Erro ao ler o arquivo de pedidos '{nome_arquivo}' ({e}). Iniciando com fila e histórico vazios.")
+            if self.saida.nivel <= ERRO:
+                self.saida.emitir(registro(ERRO, 'erro_leitura_pedidos', arquivo=nome_arquivo, erro=str(e)))
 
     def obter_historico_pedidos_atendidos(self):
         """
@@ -128,4 +722,69 @@ class FilaPedidos:
         Returns:
             list: Uma lista de objetos Pedido.
         """
-        return list(self.historico_atendidos)
\ No newline at end of file
+        return list(self.historico_atendidos)
+
+# Histórico de atendidos lido de um arquivo, mas cujos objetos Pedido só são criados no
+# primeiro acesso. Com um histórico longo, criar centenas de milhares de pedidos é a maior
+# parte do tempo de carga, e a maioria das operações do menu não lê o histórico.
+#
+# Antes do primeiro acesso, o histórico guarda os dicionários lidos do arquivo; os pedidos
+# acrescentados nesse meio tempo (append/extend não precisam ler o histórico) ficam numa
+# lista à parte e entram depois dos lidos.
+class HistoricoAdiado:
+    """
+    Histórico de atendidos com a criação dos pedidos adiada até o primeiro acesso.
+    """
+    def __init__(self, dicionarios):
+        """
+        Args:
+            dicionarios (list): Os pedidos atendidos no formato de Pedido.para_dicionario,
+                                na ordem do histórico.
+        """
+        self._dicionarios = dicionarios
+        self._acrescimos = deque()
+        self._pedidos = None
+
+    @property
+    def carregado(self):
+        """
+        True se os pedidos já foram criados.
+        """
+        return self._pedidos is not None
+
+    def _carregar(self):
+        if self._pedidos is None:
+            pedidos = deque(map(Pedido.de_dicionario, self._dicionarios))
+            pedidos.extend(self._acrescimos)
+            self._pedidos = pedidos
+            self._dicionarios = self._acrescimos = None
+        return self._pedidos
+
+    def append(self, pedido):
+        (self._acrescimos if self._pedidos is None else self._pedidos).append(pedido)
+
+    def extend(self, pedidos):
+        (self._acrescimos if self._pedidos is None else self._pedidos).extend(pedidos)
+
+    def clear(self):
+        self._pedidos = deque()
+        self._dicionarios = self._acrescimos = None
+
+    def para_serializavel(self):
+        """
+        Os pedidos no formato de Pedido.para_dicionario, sem criar os que ainda não foram lidos.
+        """
+        if self._pedidos is not None:
+            return [p.para_dicionario() for p in self._pedidos]
+        return [dict(d) for d in self._dicionarios] + [p.para_dicionario() for p in self._acrescimos]
+
+    def __len__(self):
+        if self._pedidos is None:
+            return len(self._dicionarios) + len(self._acrescimos)
+        return len(self._pedidos)
+
+    def __iter__(self):
+        return iter(self._carregar())
+
+    def __getitem__(self, indice):
+        return self._carregar()[indice]
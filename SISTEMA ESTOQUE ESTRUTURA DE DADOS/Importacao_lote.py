@@ -0,0 +1,290 @@
+# Importação em lote de engradados e pedidos a partir de arquivos CSV ou JSONL.
+# Quando chega um caminhão, dezenas de milhares de engradados entram de uma vez; pelo menu
+# cada um exigiria uma digitação. Aqui o arquivo passa por uma sequência de geradores:
+#     ler_registros -> engradados_validos / pedidos_validos -> em_lotes -> Estoque / FilaPedidos
+# Cada etapa consome a anterior sob demanda, então só um lote fica em memória por vez,
+# qualquer que seja o tamanho do arquivo.
+#
+# Formatos (a primeira linha do CSV é o cabeçalho; no JSONL, um objeto por linha):
+#     engradados: produto_codigo, quantidade
+#     pedidos:    codigo_produto, quantidade, solicitante, data_solicitacao (opcional, AAAA-MM-DD)
+#
+# Uso (a partir da pasta do projeto; usa os mesmos arquivos do Menu, e só um dos dois pode
+# estar aberto por vez, veja Armazenamento.TravaDiretorio):
+#     python Importacao_lote.py engradados caminhao.csv
+#     python Importacao_lote.py pedidos pedidos.jsonl --reservar
+import argparse
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from itertools import islice
+from Engradado import Engradado
+from Pedido import Pedido
+
+# Quantas mensagens de erro são guardadas no resultado (as demais só são contadas).
+MAXIMO_ERROS_GUARDADOS = 20
+
+
+def ler_registros(caminho, formato=None):
+    """
+    Lê um arquivo CSV ou JSONL, um registro por vez.
+
+    Args:
+        caminho (str): O caminho do arquivo.
+        formato (str, opcional): 'csv' ou 'jsonl'. Se omitido, vem da extensão do arquivo.
+
+    Yields:
+        tuple: (número da linha no arquivo, dicionário do registro ou ValueError se a linha for ilegível).
+    """
+    formato = formato or ('jsonl' if caminho.lower().endswith(('.jsonl', '.ndjson')) else 'csv')
+    with open(caminho, 'r', encoding='utf-8', newline='') as f:
+        if formato == 'csv':
+            leitor = csv.DictReader(f)
+            for registro in leitor:
+                yield leitor.line_num, registro
+        else:
+            for numero_linha, linha in enumerate(f, 1):
+                if not linha.strip():
+                    continue
+                try:
+                    yield numero_linha, json.loads(linha)
+                except json.JSONDecodeError as e:
+                    yield numero_linha, ValueError(f"JSON inválido: {e.msg}")
+
+
+def _inteiro_positivo(valor, campo):
+    """
+    Converte o valor de um campo (texto no CSV, número no JSONL) para um inteiro positivo.
+
+    Raises:
+        ValueError: Se o valor não for um inteiro positivo.
+    """
+    try:
+        if isinstance(valor, bool) or (isinstance(valor, float) and not valor.is_integer()):
+            raise ValueError
+        numero = int(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{campo}' deve ser um número inteiro positivo")
+    if numero <= 0:
+        raise ValueError(f"'{campo}' deve ser um número inteiro positivo")
+    return numero
+
+
+def _campo(registro, campo):
+    """
+    Retorna um campo obrigatório do registro como texto.
+
+    Raises:
+        ValueError: Se o campo estiver ausente ou vazio.
+    """
+    if not isinstance(registro, dict):
+        raise ValueError("o registro deve ser um objeto")
+    valor = registro.get(campo)
+    if valor is None or str(valor).strip() == '':
+        raise ValueError(f"campo obrigatório ausente: {campo}")
+    return str(valor).strip()
+
+
+def engradados_validos(registros, produtos_cadastrados, resultado):
+    """
+    Valida os registros de engradados contra o catálogo: o produto deve estar cadastrado e
+    a quantidade não pode passar da capacidade_engradado do produto.
+
+    Args:
+        registros (iterable): Os pares (número da linha, registro) de ler_registros.
+        produtos_cadastrados (CatalogoProdutos): O catálogo de produtos.
+        resultado (dict): O resultado da importação, onde os erros são contados.
+
+    Yields:
+        Engradado: Os engradados válidos.
+    """
+    for numero_linha, registro in registros:
+        resultado['linhas_lidas'] += 1
+        try:
+            if isinstance(registro, ValueError):
+                raise registro
+            codigo = _campo(registro, 'produto_codigo')
+            quantidade = _inteiro_positivo(registro.get('quantidade'), 'quantidade')
+            produto = produtos_cadastrados.obter(codigo)
+            if produto is None:
+                raise ValueError(f"nenhum produto encontrado com o código {codigo}")
+            if produto.capacidade_engradado is not None and quantidade > produto.capacidade_engradado:
+                raise ValueError(f"a quantidade ({quantidade}) excede a capacidade máxima de engradado "
+                                 f"do produto {codigo} ({produto.capacidade_engradado})")
+        except ValueError as e:
+            _registrar_erro(resultado, numero_linha, e)
+            continue
+        yield Engradado(codigo, quantidade)
+
+
+def pedidos_validos(registros, produtos_cadastrados, resultado):
+    """
+    Valida os registros de pedidos contra o catálogo.
+
+    Args:
+        registros (iterable): Os pares (número da linha, registro) de ler_registros.
+        produtos_cadastrados (CatalogoProdutos): O catálogo de produtos.
+        resultado (dict): O resultado da importação, onde os erros são contados.
+
+    Yields:
+        Pedido: Os pedidos válidos.
+    """
+    hoje = datetime.now().strftime("%Y-%m-%d")
+    for numero_linha, registro in registros:
+        resultado['linhas_lidas'] += 1
+        try:
+            if isinstance(registro, ValueError):
+                raise registro
+            codigo = _campo(registro, 'codigo_produto')
+            quantidade = _inteiro_positivo(registro.get('quantidade'), 'quantidade')
+            solicitante = _campo(registro, 'solicitante')
+            if codigo not in produtos_cadastrados:
+                raise ValueError(f"nenhum produto encontrado com o código {codigo}")
+            # Sem data, vale a data da importação.
+            data_solicitacao = str(registro.get('data_solicitacao') or hoje).strip()
+            pedido = Pedido(codigo, quantidade, data_solicitacao, solicitante)
+        except ValueError as e:
+            # Uma data fora do formato AAAA-MM-DD também chega aqui (datetime.strptime).
+            _registrar_erro(resultado, numero_linha, e)
+            continue
+        yield pedido
+
+
+def _registrar_erro(resultado, numero_linha, erro):
+    resultado['linhas_rejeitadas'] += 1
+    if len(resultado['erros']) < MAXIMO_ERROS_GUARDADOS:
+        resultado['erros'].append(f"linha {numero_linha}: {erro}")
+
+
+def em_lotes(itens, tamanho_lote):
+    """
+    Agrupa os itens de um iterável em listas de até 'tamanho_lote' itens.
+
+    Yields:
+        list: Cada lote.
+    """
+    itens = iter(itens)
+    while True:
+        lote = list(islice(itens, tamanho_lote))
+        if not lote:
+            return
+        yield lote
+
+
+def _novo_resultado():
+    return {'linhas_lidas': 0, 'linhas_importadas': 0, 'linhas_rejeitadas': 0, 'erros': []}
+
+
+def _concluir(resultado, inicio):
+    resultado['duracao_segundos'] = time.perf_counter() - inicio
+    resultado['linhas_por_segundo'] = (resultado['linhas_lidas'] / resultado['duracao_segundos']
+                                       if resultado['duracao_segundos'] > 0 else 0.0)
+    return resultado
+
+
+def importar_engradados(caminho, estoque, produtos_cadastrados, tamanho_lote=1000, formato=None):
+    """
+    Importa os engradados de um arquivo para o estoque, em lotes (Estoque.adicionar_engradados).
+
+    Args:
+        caminho (str): O arquivo CSV ou JSONL.
+        estoque (Estoque): O estoque de destino.
+        produtos_cadastrados (CatalogoProdutos): O catálogo usado na validação.
+        tamanho_lote (int, opcional): Quantos engradados são colocados de cada vez.
+        formato (str, opcional): 'csv' ou 'jsonl' (pela extensão, se omitido).
+
+    Returns:
+        dict: 'linhas_lidas', 'linhas_importadas', 'linhas_rejeitadas' (inválidas),
+              'sem_espaco' (válidas que não couberam no estoque), 'erros' (as primeiras
+              mensagens), 'duracao_segundos' e 'linhas_por_segundo'.
+    """
+    inicio = time.perf_counter()
+    resultado = _novo_resultado()
+    resultado['sem_espaco'] = 0
+    engradados = engradados_validos(ler_registros(caminho, formato), produtos_cadastrados, resultado)
+    for lote in em_lotes(engradados, tamanho_lote):
+        recusados = estoque.adicionar_engradados(lote)
+        resultado['linhas_importadas'] += len(lote) - len(recusados)
+        resultado['sem_espaco'] += len(recusados)
+    return _concluir(resultado, inicio)
+
+
+def importar_pedidos(caminho, fila_pedidos, produtos_cadastrados, estoque=None, tamanho_lote=1000, formato=None):
+    """
+    Importa os pedidos de um arquivo para a fila, em lotes (FilaPedidos.adicionar_pedidos).
+
+    Args:
+        caminho (str): O arquivo CSV ou JSONL.
+        fila_pedidos (FilaPedidos): A fila de destino.
+        produtos_cadastrados (CatalogoProdutos): O catálogo usado na validação.
+        estoque (Estoque, opcional): Se informado, cada pedido tenta reservar a sua quantidade.
+        tamanho_lote (int, opcional): Quantos pedidos são enfileirados de cada vez.
+        formato (str, opcional): 'csv' ou 'jsonl' (pela extensão, se omitido).
+
+    Returns:
+        dict: 'linhas_lidas', 'linhas_importadas', 'linhas_rejeitadas', 'reservados',
+              'erros' (as primeiras mensagens), 'duracao_segundos' e 'linhas_por_segundo'.
+    """
+    inicio = time.perf_counter()
+    resultado = _novo_resultado()
+    resultado['reservados'] = 0
+    pedidos = pedidos_validos(ler_registros(caminho, formato), produtos_cadastrados, resultado)
+    for lote in em_lotes(pedidos, tamanho_lote):
+        resultado['reservados'] += fila_pedidos.adicionar_pedidos(lote, estoque)
+        resultado['linhas_importadas'] += len(lote)
+    return _concluir(resultado, inicio)
+
+
+def exibir_resultado(resultado):
+    """
+    Imprime o resumo de uma importação.
+    """
+    print(f"{resultado['linhas_lidas']} linhas lidas, {resultado['linhas_importadas']} importadas, "
+          f"{resultado['linhas_rejeitadas']} rejeitadas em {resultado['duracao_segundos']:.3f} s "
+          f"({resultado['linhas_por_segundo']:.0f} linhas/s).")
+    if resultado.get('sem_espaco'):
+        print(f"{resultado['sem_espaco']} engradados não couberam no estoque.")
+    if 'reservados' in resultado:
+        print(f"{resultado['reservados']} pedidos com a quantidade reservada.")
+    for erro in resultado['erros']:
+        print(f"  {erro}")
+    if resultado['linhas_rejeitadas'] > len(resultado['erros']):
+        print(f"  ... e mais {resultado['linhas_rejeitadas'] - len(resultado['erros'])} linhas rejeitadas.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa engradados ou pedidos de um arquivo CSV ou JSONL.")
+    parser.add_argument('tipo', choices=('engradados', 'pedidos'), help="O que o arquivo contém.")
+    parser.add_argument('arquivo', help="O arquivo CSV ou JSONL.")
+    parser.add_argument('--formato', choices=('csv', 'jsonl'), help="Formato do arquivo (pela extensão, se omitido).")
+    parser.add_argument('--tamanho-lote', type=int, default=1000, help="Registros por lote.")
+    parser.add_argument('--reservar', action='store_true', help="Reserva no estoque a quantidade dos pedidos importados.")
+    parser.add_argument('--armazenamento', choices=('log', 'sqlite'), default=None,
+                        help="Onde gravar o estado (padrão: variável ESTOQUE_ARMAZENAMENTO ou 'log').")
+    args = parser.parse_args()
+
+    # Os imports ficam aqui para que o módulo possa ser usado sem carregar a persistência.
+    from Armazenamento import iniciar_sistema
+
+    try:
+        persistencia, produtos_cadastrados, estoque, fila_pedidos = iniciar_sistema(
+            os.path.dirname(os.path.abspath(__file__)), args.armazenamento)
+    except (RuntimeError, ValueError) as e:
+        raise SystemExit(f"Erro: {e}")
+    try:
+        if args.tipo == 'engradados':
+            resultado = importar_engradados(args.arquivo, estoque, produtos_cadastrados,
+                                            args.tamanho_lote, args.formato)
+        else:
+            resultado = importar_pedidos(args.arquivo, fila_pedidos, produtos_cadastrados,
+                                         estoque if args.reservar else None, args.tamanho_lote, args.formato)
+        exibir_resultado(resultado)
+    finally:
+        persistencia.sincronizar()
+        persistencia.fechar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# Mensagens estruturadas das classes principais (Estoque, FilaPedidos, PlanejadorRetirada).
+# Em vez de chamar print() a cada engradado ou pedido, essas classes entregam registros a uma
+# "saída" (o atributo 'saida' do objeto). Um registro é um dicionário com 'momento', 'nivel',
+# 'tipo' e os dados do acontecimento (por exemplo linha, coluna e quantidade).
+#
+# Toda saída tem um nível mínimo ('nivel'); quem emite confere o nível antes de montar o
+# registro, então com a SaidaNula (o padrão, para uso como biblioteca) uma mensagem custa
+# só uma comparação. Saídas disponíveis:
+# - SaidaNula: descarta tudo;
+# - SaidaConsole: o texto legível de antes, para o Menu;
+# - SaidaJSONL: uma linha JSON por registro, gravadas em lotes;
+# - SaidaMemoria: guarda os últimos registros em memória;
+# - SaidaAssincrona: repassa os registros a outra saída numa thread própria, para que a
+#   escrita em disco não atrase quem emite.
+import json
+import queue
+import sys
+import threading
+import time
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+AVISO = 30
+ERRO = 40
+NOMES_NIVEIS = {DEBUG: 'DEBUG', INFO: 'INFO', AVISO: 'AVISO', ERRO: 'ERRO'}
+
+# Texto de cada tipo de registro na SaidaConsole.
+MENSAGENS = {
+    'engradado_adicionado': "Engradado adicionado na posição [{linha}][{coluna}]",
+    'engradado_retirado': "  Removido engradado completo de {quantidade} unidades do produto {produto_codigo} da posição [{linha}][{coluna}].",
+    'unidades_retiradas': "  Removidas {quantidade} unidades do produto {produto_codigo} do engradado na posição [{linha}][{coluna}].",
+    'estoque_insuficiente': "Estoque insuficiente. Não foi possível remover a quantidade total solicitada.",
+    'erro_leitura_estoque': "Erro ao ler o arquivo de estoque '{arquivo}'. Iniciando com estoque vazio.",
+    'pedido_atendido': "Pedido de {solicitante} atendido!",
+    'pedido_sem_estoque': "Estoque insuficiente para atender pedido de {solicitante} (faltam {faltam} unidades do produto {codigo_produto}).",
+    'erro_remocao_pedido': "Erro inesperado ao remover do estoque para o pedido de {solicitante}.",
+    'erro_remocao_lote': "Erro inesperado ao remover do estoque os pedidos do produto {codigo_produto}.",
+    'arquivo_produtos_ausente': "Arquivo de produtos '{arquivo}' não encontrado. Iniciando com catálogo vazio.",
+    'arquivo_pedidos_ausente': "Arquivo de pedidos '{arquivo}' não encontrado. Iniciando com fila e histórico vazios.",
+    'erro_leitura_pedidos': "Erro ao ler o arquivo de pedidos '{arquivo}' ({erro}). Iniciando com fila e histórico vazios.",
+    'erro_compactacao': "Erro ao compactar o log de alterações ({erro}).",
+}
+
+
+def registro(nivel, tipo, **dados):
+    """
+    Monta um registro com o momento atual (segundos desde a época), o nível e o tipo.
+    """
+    dados.update(momento=time.time(), nivel=nivel, tipo=tipo)
+    return dados
+
+
+def formatar(registro):
+    """
+    Retorna o texto legível de um registro (o tipo e os dados, se o tipo não tiver mensagem).
+    """
+    modelo = MENSAGENS.get(registro['tipo'])
+    if modelo is None:
+        dados = {k: v for k, v in registro.items() if k not in ('momento', 'nivel', 'tipo')}
+        return f"{registro['tipo']} {dados}"
+    return modelo.format(**registro)
+
+
+class SaidaNula:
+    """
+    Descarta todos os registros (a saída padrão das classes).
+    """
+    nivel = float('inf')
+
+    def emitir(self, registro):
+        pass
+
+    def descarregar(self):
+        pass
+
+    def fechar(self):
+        pass
+
+
+SAIDA_NULA = SaidaNula()
+
+
+class SaidaConsole(SaidaNula):
+    """
+    Escreve o texto legível de cada registro, como as mensagens do menu.
+    """
+    def __init__(self, nivel=INFO, arquivo=None):
+        """
+        Args:
+            nivel (int, opcional): Nível mínimo dos registros exibidos.
+            arquivo (opcional): Onde escrever; se omitido, a saída padrão do momento da escrita.
+        """
+        self.nivel = nivel
+        self.arquivo = arquivo
+
+    def emitir(self, registro):
+        print(formatar(registro), file=self.arquivo or sys.stdout)
+
+
+class SaidaJSONL(SaidaNula):
+    """
+    Grava uma linha JSON por registro, acumulando 'tamanho_lote' linhas antes de cada escrita.
+    """
+    def __init__(self, caminho, nivel=DEBUG, tamanho_lote=500):
+        """
+        Args:
+            caminho (str): O arquivo (aberto para acrescentar).
+            nivel (int, opcional): Nível mínimo dos registros gravados.
+            tamanho_lote (int, opcional): Quantas linhas juntar antes de escrever no arquivo.
+        """
+        self.nivel = nivel
+        self.tamanho_lote = tamanho_lote
+        self._arquivo = open(caminho, 'a', encoding='utf-8')
+        self._lote = []
+
+    def emitir(self, registro):
+        registro = dict(registro, nivel=NOMES_NIVEIS.get(registro['nivel'], registro['nivel']))
+        self._lote.append(json.dumps(registro, ensure_ascii=False, separators=(',', ':')))
+        if len(self._lote) >= self.tamanho_lote:
+            self.descarregar()
+
+    def descarregar(self):
+        """
+        Escreve no arquivo as linhas acumuladas.
+        """
+        if self._lote:
+            self._arquivo.write('\n'.join(self._lote) + '\n')
+            self._lote = []
+        self._arquivo.flush()
+
+    def fechar(self):
+        self.descarregar()
+        self._arquivo.close()
+
+
+class SaidaMemoria(SaidaNula):
+    """
+    Guarda os últimos registros em memória (por exemplo, para conferir um processamento em lote).
+    """
+    def __init__(self, nivel=DEBUG, limite=10000):
+        self.nivel = nivel
+        self.registros = deque(maxlen=limite)
+
+    def emitir(self, registro):
+        self.registros.append(registro)
+
+
+class SaidaAssincrona(SaidaNula):
+    """
+    Repassa os registros a outra saída numa thread de escrita. Quem emite só coloca o
+    registro numa fila; se a fila estiver cheia, espera a escrita abrir espaço.
+    Uma falha do destino (disco cheio, por exemplo) não encerra a thread de escrita: o
+    registro é perdido, a falha é contada em 'erros' e guardada em 'ultimo_erro'.
+    """
+    def __init__(self, destino, capacidade=10000):
+        """
+        Args:
+            destino: A saída que recebe os registros (por exemplo, uma SaidaJSONL).
+            capacidade (int, opcional): Quantos registros podem aguardar a escrita.
+        """
+        self.destino = destino
+        self.nivel = destino.nivel
+        self.erros = 0
+        self.ultimo_erro = None
+        self._fila = queue.Queue(capacidade)
+        self._escritor = threading.Thread(target=self._escrever, name='escrita-log', daemon=True)
+        self._escritor.start()
+
+    def _escrever(self):
+        while True:
+            registro = self._fila.get()
+            if registro is None:
+                break
+            self._repassar(self.destino.emitir, registro)
+            if self._fila.empty():
+                # Sem mais nada esperando: é um bom momento para gravar o lote.
+                self._repassar(self.destino.descarregar)
+        self._repassar(self.destino.descarregar)
+
+    def _repassar(self, metodo, *args):
+        """
+        Chama um método do destino; se ele falhar, conta o erro e segue escrevendo.
+        """
+        try:
+            metodo(*args)
+        except Exception as erro:
+            self.erros += 1
+            self.ultimo_erro = erro
+
+    def emitir(self, registro):
+        self._fila.put(registro)
+
+    def fechar(self):
+        """
+        Escreve os registros pendentes, encerra a thread de escrita e fecha o destino.
+        """
+        self._fila.put(None)
+        self._escritor.join()
+        self.destino.fechar()
@@ -0,0 +1,222 @@
+# Importa array para guardar os engradados em vetores contíguos de inteiros,
+# sem um objeto Python por engradado.
+from array import array
+from Engradado import Engradado
+
+# Marca usada no vetor de produtos para um nível de pilha sem engradado.
+SEM_PRODUTO = -1
+
+# A classe MatrizColunar é uma representação compacta (colunar) do estoque.
+# Em vez de uma Pilha com uma lista de objetos Engradado em cada posição, guarda vetores
+# paralelos de tamanho fixo:
+# - 'alturas': quantos engradados há em cada posição;
+# - 'produtos': o identificador inteiro do produto de cada nível de cada posição;
+# - 'quantidades': as unidades de cada nível de cada posição.
+# Os códigos de produto (strings) são "internados": cada código distinto ganha um inteiro,
+# e os vetores guardam apenas esse inteiro.
+# O nível n da posição p fica no índice p * altura_maxima + n dos vetores.
+class MatrizColunar:
+    """
+    Armazena as pilhas de engradados de um estoque em vetores paralelos de inteiros.
+    """
+    def __init__(self, linhas=8, colunas=5, altura_maxima=5):
+        """
+        Inicializa uma matriz colunar vazia.
+
+        Args:
+            linhas (int, opcional): Número de linhas da matriz.
+            colunas (int, opcional): Número de colunas da matriz.
+            altura_maxima (int, opcional): Número máximo de engradados em cada pilha.
+        """
+        self.linhas = linhas
+        self.colunas = colunas
+        self.altura_maxima = altura_maxima
+        total_posicoes = linhas * colunas
+        # 'B' usa 1 byte por posição; pilhas mais altas que 255 precisam de 'H'.
+        self.alturas = array('B' if altura_maxima <= 255 else 'H', [0]) * total_posicoes
+        self.produtos = array('i', [SEM_PRODUTO]) * (total_posicoes * altura_maxima)
+        self.quantidades = array('i', [0]) * (total_posicoes * altura_maxima)
+        # Tabela de internação: código -> identificador e identificador -> código.
+        self.codigos = []
+        self._ids = {}
+
+    @classmethod
+    def de_vetores(cls, linhas, colunas, altura_maxima, alturas, produtos, quantidades, codigos):
+        """
+        Cria uma MatrizColunar sobre vetores já existentes, sem copiá-los.
+        Os vetores podem ser, por exemplo, memoryviews de um arquivo mapeado em memória
+        (nesse caso a matriz é somente leitura).
+
+        Args:
+            linhas (int): Número de linhas da matriz.
+            colunas (int): Número de colunas da matriz.
+            altura_maxima (int): Número máximo de engradados em cada pilha.
+            alturas: Vetor com a altura de cada posição.
+            produtos: Vetor com o identificador do produto de cada nível.
+            quantidades: Vetor com as unidades de cada nível.
+            codigos (list): Os códigos de produto, na ordem dos identificadores.
+
+        Returns:
+            MatrizColunar: A matriz que usa os vetores informados.
+        """
+        matriz = cls.__new__(cls)
+        matriz.linhas = linhas
+        matriz.colunas = colunas
+        matriz.altura_maxima = altura_maxima
+        matriz.alturas = alturas
+        matriz.produtos = produtos
+        matriz.quantidades = quantidades
+        matriz.codigos = list(codigos)
+        matriz._ids = {codigo: i for i, codigo in enumerate(matriz.codigos)}
+        return matriz
+
+    def internar(self, produto_codigo):
+        """
+        Retorna o identificador inteiro de um código de produto, criando-o se necessário.
+
+        Args:
+            produto_codigo (str): O código do produto.
+
+        Returns:
+            int: O identificador do produto na tabela de internação.
+        """
+        identificador = self._ids.get(produto_codigo)
+        if identificador is None:
+            identificador = len(self.codigos)
+            self._ids[produto_codigo] = identificador
+            self.codigos.append(produto_codigo)
+        return identificador
+
+    def altura(self, linha, coluna):
+        """
+        Retorna quantos engradados há na posição [linha][coluna].
+        """
+        return self.alturas[linha * self.colunas + coluna]
+
+    def empilhar(self, linha, coluna, produto_codigo, quantidade):
+        """
+        Coloca um engradado no topo da pilha da posição [linha][coluna].
+        Segue as mesmas regras da classe Pilha: capacidade máxima e um único produto por pilha.
+
+        Args:
+            linha (int): Linha da posição.
+            coluna (int): Coluna da posição.
+            produto_codigo (str): O código do produto do engradado.
+            quantidade (int): O número de unidades no engradado.
+
+        Returns:
+            bool: True se o engradado foi empilhado, False caso contrário.
+        """
+        posicao = linha * self.colunas + coluna
+        altura = self.alturas[posicao]
+        if altura >= self.altura_maxima:
+            return False
+        identificador = self.internar(produto_codigo)
+        base = posicao * self.altura_maxima
+        if altura and self.produtos[base + altura - 1] != identificador:
+            return False
+        self.produtos[base + altura] = identificador
+        self.quantidades[base + altura] = quantidade
+        self.alturas[posicao] = altura + 1
+        return True
+
+    def desempilhar(self, linha, coluna):
+        """
+        Remove o engradado do topo da pilha da posição [linha][coluna] (LIFO).
+
+        Returns:
+            tuple: (produto_codigo, quantidade) do engradado removido, ou None se a pilha estiver vazia.
+        """
+        posicao = linha * self.colunas + coluna
+        altura = self.alturas[posicao]
+        if not altura:
+            return None
+        indice = posicao * self.altura_maxima + altura - 1
+        removido = (self.codigos[self.produtos[indice]], self.quantidades[indice])
+        self.produtos[indice] = SEM_PRODUTO
+        self.quantidades[indice] = 0
+        self.alturas[posicao] = altura - 1
+        return removido
+
+    def topo(self, linha, coluna):
+        """
+        Retorna (produto_codigo, quantidade) do topo da pilha, ou None se ela estiver vazia.
+        """
+        posicao = linha * self.colunas + coluna
+        altura = self.alturas[posicao]
+        if not altura:
+            return None
+        indice = posicao * self.altura_maxima + altura - 1
+        return self.codigos[self.produtos[indice]], self.quantidades[indice]
+
+    def iter_engradados(self):
+        """
+        Percorre todos os engradados, linha a linha e da base para o topo de cada pilha.
+
+        Yields:
+            tuple: (linha, coluna, nivel, produto_codigo, quantidade).
+        """
+        codigos = self.codigos
+        for posicao, altura in enumerate(self.alturas):
+            if not altura:
+                continue
+            linha, coluna = divmod(posicao, self.colunas)
+            base = posicao * self.altura_maxima
+            for nivel in range(altura):
+                yield linha, coluna, nivel, codigos[self.produtos[base + nivel]], self.quantidades[base + nivel]
+
+    def total_engradados(self):
+        """
+        Retorna o número total de engradados armazenados.
+        """
+        return sum(self.alturas)
+
+    def bytes_ocupados(self):
+        """
+        Retorna o número de bytes ocupados pelos vetores de dados (sem a tabela de internação).
+        """
+        return sum(v.itemsize * len(v) for v in (self.alturas, self.produtos, self.quantidades))
+
+    @classmethod
+    def de_estoque(cls, estoque):
+        """
+        Cria uma MatrizColunar com o mesmo conteúdo de um Estoque.
+
+        Args:
+            estoque (Estoque): O estoque de origem.
+
+        Returns:
+            MatrizColunar: A representação colunar do estoque.
+        """
+        matriz = cls(estoque.linhas, estoque.colunas, estoque.altura_maxima)
+        for i, j, _, engradado in estoque.iter_engradados():
+            matriz.empilhar(i, j, engradado.produto_codigo, engradado.quantidade)
+        return matriz
+
+    def para_estoque(self, estoque):
+        """
+        Substitui o conteúdo de um Estoque pelo conteúdo desta matriz,
+        recriando os objetos Engradado e os índices do estoque.
+
+        Args:
+            estoque (Estoque): O estoque de destino.
+
+        Returns:
+            Estoque: O mesmo estoque, já carregado.
+        """
+        codigos = self.codigos
+        altura_maxima = self.altura_maxima
+
+        def pilhas():
+            for posicao, altura in enumerate(self.alturas):
+                if not altura:
+                    continue
+                linha, coluna = divmod(posicao, self.colunas)
+                base = posicao * altura_maxima
+                yield linha, coluna, [
+                    Engradado(codigos[self.produtos[base + nivel]], self.quantidades[base + nivel])
+                    for nivel in range(altura)
+                ]
+
+        estoque.carregar_pilhas(self.linhas, self.colunas, pilhas())
+        return estoque
@@ -1,22 +1,31 @@
 import os
-from Produto import carregar_produtos
-from Estoque import Estoque
-from Fila_de_Pedidos import FilaPedidos
+from Armazenamento import iniciar_sistema, caminhos_arquivos_json
+from Visoes_relatorios import RelatoriosMaterializados
+from Metricas import RegistroMetricas
+from Log_estruturado import SaidaConsole
 import Operacoes_menu as op
 
 CAMINHO_BASE = os.path.dirname(os.path.abspath(__file__))
-ARQUIVOS_JSON = {
-    "produtos": os.path.join(CAMINHO_BASE, 'produtos.json'),
-    "estoque": os.path.join(CAMINHO_BASE, 'estoque.json'),
-    "pedidos": os.path.join(CAMINHO_BASE, 'pedidos.json')
-}
+ARQUIVOS_JSON = caminhos_arquivos_json(CAMINHO_BASE)
 
 print("--- Carregando Sistema de Estoque ---")
-produtos_cadastrados = carregar_produtos(ARQUIVOS_JSON['produtos'])
-estoque = Estoque()
-estoque.carregar_estoque(ARQUIVOS_JSON['estoque'])
-fila_pedidos = FilaPedidos()
-fila_pedidos.carregar_pedidos(ARQUIVOS_JSON['pedidos'])
+# As alterações são gravadas no armazenamento escolhido pela variável de ambiente
+# ESTOQUE_ARMAZENAMENTO (veja Armazenamento.py): por padrão, um log com snapshots
+# periódicos (Persistencia.py); com 'sqlite', um banco SQLite (Armazenamento_sqlite.py).
+# Os arquivos JSON completos só são lidos enquanto o armazenamento ainda está vazio (veja
+# Carga_paralela.py). O histórico de atendidos e as datas dos produtos e pedidos só são
+# montados quando usados, então o menu aparece assim que o catálogo, o estoque e a fila de
+# pendentes estão prontos.
+# Métricas de desempenho, ligadas com a variável de ambiente ESTOQUE_METRICAS=1 (veja Metricas.py).
+metricas = RegistroMetricas() if os.environ.get('ESTOQUE_METRICAS') else None
+try:
+    # As mensagens das operações (engradados retirados, pedidos atendidos...) vão para a tela.
+    persistencia, produtos_cadastrados, estoque, fila_pedidos = iniciar_sistema(
+        CAMINHO_BASE, saida=SaidaConsole(), metricas=metricas)
+except (RuntimeError, ValueError) as e:
+    raise SystemExit(f"Erro: {e}")
+# Relatórios mantidos a cada alteração do estoque, da fila e do catálogo.
+relatorios = RelatoriosMaterializados(estoque, fila_pedidos, produtos_cadastrados)
 print("--- Sistema Carregado com Sucesso ---\n")
 
 def menu():
@@ -32,6 +41,11 @@ def menu():
         print("6. Processar Próximo Pedido da Fila")
         print("7. Gerar Todos os Relatórios")
         print("8. Salvar Tudo")
+        print("9. Processar Toda a Fila (em Lote)")
+        print("10. Cancelar Pedido da Fila")
+        print("11. Consolidar Estoque")
+        print("12. Importar Arquivo (Engradados ou Pedidos)")
+        print("13. Exibir Métricas de Desempenho")
         print("0. Sair")
         print("==================================================")
         
@@ -48,17 +62,31 @@ def menu():
         elif opcao == '4':
             op.visualizar_estoque(estoque)
         elif opcao == '5':
-            op.registrar_pedido(fila_pedidos, produtos_cadastrados)
+            op.registrar_pedido(fila_pedidos, produtos_cadastrados, estoque)
         elif opcao == '6':
             op.processar_pedidos(fila_pedidos, estoque)
         elif opcao == '7':
-            op.gerar_todos_relatorios(estoque, fila_pedidos, produtos_cadastrados)
+            op.gerar_todos_relatorios(estoque, fila_pedidos, produtos_cadastrados, relatorios)
         elif opcao == '8':
-            op.salvar_tudo(produtos_cadastrados, estoque, fila_pedidos, ARQUIVOS_JSON)
+            op.salvar_tudo(produtos_cadastrados, estoque, fila_pedidos, ARQUIVOS_JSON, persistencia)
+        elif opcao == '9':
+            op.processar_fila_em_lote(fila_pedidos, estoque)
+        elif opcao == '10':
+            op.cancelar_pedido(fila_pedidos, estoque)
+        elif opcao == '11':
+            op.consolidar_estoque(estoque, produtos_cadastrados)
+        elif opcao == '12':
+            op.importar_arquivo(estoque, fila_pedidos, produtos_cadastrados)
+        elif opcao == '13':
+            op.exibir_metricas(metricas)
         elif opcao == '0':
-            # Garante que todos os dados sejam salvos antes de encerrar.
-            op.salvar_tudo(produtos_cadastrados, estoque, fila_pedidos, ARQUIVOS_JSON)
-            print("\nAlterações salvas. Saindo do sistema...")
+            # Garante que todos os dados sejam salvos antes de encerrar, deixa um snapshot
+            # atualizado para a próxima inicialização e regrava os arquivos JSON completos.
+            op.salvar_tudo(produtos_cadastrados, estoque, fila_pedidos, ARQUIVOS_JSON, persistencia)
+            persistencia.compactar(esperar=True)
+            op.salvar_arquivos_json(produtos_cadastrados, estoque, fila_pedidos, ARQUIVOS_JSON)
+            persistencia.fechar()
+            print("\nAlterações salvas e arquivos JSON atualizados. Saindo do sistema...")
             break # Encerra o loop e o programa.
         else:
             print("\nOpção inválida! Tente novamente.")
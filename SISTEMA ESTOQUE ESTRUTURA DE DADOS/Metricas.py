@@ -0,0 +1,373 @@
+# Métricas de desempenho dos caminhos mais usados do Estoque e da FilaPedidos.
+# A instrumentação é opcional: um Estoque ou uma FilaPedidos só é medido depois de
+# instrumentar_estoque / instrumentar_fila. Essas funções trocam, apenas naquele objeto,
+# os métodos medidos por versões que cronometram a chamada (um atributo da instância
+# encobre o método da classe). Sem instrumentação nada muda nas classes, então o custo
+# com as métricas desligadas é zero.
+#
+# O RegistroMetricas guarda três tipos de métricas:
+# - contadores (número de chamadas, resultados);
+# - medidores (valores instantâneos, como a profundidade da fila);
+# - histogramas (latências em segundos e comprimentos de varredura), com faixas fixas.
+# O conteúdo pode ser lido em Python (instantaneo), em JSON (exportar_json) ou em texto no
+# formato de exposição do Prometheus (exportar_texto).
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Faixas (limites superiores) dos histogramas de latência, em segundos: de 1 µs a 10 s.
+LIMITES_SEGUNDOS = tuple(base * 10 ** expoente for expoente in range(-6, 1) for base in (1, 2.5, 5)) + (10.0,)
+# Faixas dos histogramas de contagem (posições, pilhas e engradados visitados).
+LIMITES_CONTAGEM = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+class Histograma:
+    """
+    Distribuição de valores em faixas fixas, com contagem, soma, mínimo e máximo.
+    """
+    def __init__(self, limites=LIMITES_SEGUNDOS):
+        """
+        Args:
+            limites (tuple, opcional): Limites superiores das faixas, em ordem crescente.
+                                       Valores acima do último caem numa faixa extra.
+        """
+        self.limites = tuple(limites)
+        self.contagens = [0] * (len(self.limites) + 1)
+        self.contagem = 0
+        self.soma = 0
+        self.minimo = None
+        self.maximo = None
+
+    def registrar(self, valor):
+        """
+        Conta um valor na faixa correspondente.
+        """
+        self.contagens[bisect_left(self.limites, valor)] += 1
+        self.contagem += 1
+        self.soma += valor
+        if self.minimo is None or valor < self.minimo:
+            self.minimo = valor
+        if self.maximo is None or valor > self.maximo:
+            self.maximo = valor
+
+    def percentil(self, p):
+        """
+        Estimativa do percentil 'p' (0 a 100): o limite superior da faixa onde ele cai
+        (o máximo, se cair na faixa extra).
+
+        Returns:
+            O valor estimado, ou None se o histograma estiver vazio.
+        """
+        if not self.contagem:
+            return None
+        alvo = p / 100 * self.contagem
+        acumulado = 0
+        for limite, contagem in zip(self.limites, self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return min(limite, self.maximo)
+        return self.maximo
+
+    def para_dicionario(self):
+        return {
+            'contagem': self.contagem,
+            'soma': self.soma,
+            'media': self.soma / self.contagem if self.contagem else None,
+            'minimo': self.minimo,
+            'maximo': self.maximo,
+            'p50': self.percentil(50),
+            'p90': self.percentil(90),
+            'p99': self.percentil(99),
+            'limites': list(self.limites),
+            'contagens': list(self.contagens),
+        }
+
+
+class RegistroMetricas:
+    """
+    Contadores, medidores e histogramas nomeados, seguros para uso por várias threads.
+    """
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._contadores = {}
+        self._medidores = {}
+        self._histogramas = {}
+
+    def contar(self, nome, valor=1):
+        """
+        Soma 'valor' ao contador 'nome' (criado com zero no primeiro uso).
+        """
+        with self._trava:
+            self._contadores[nome] = self._contadores.get(nome, 0) + valor
+
+    def definir(self, nome, valor):
+        """
+        Define o valor atual do medidor 'nome'.
+        """
+        with self._trava:
+            self._medidores[nome] = valor
+
+    def observar(self, nome, valor, limites=LIMITES_SEGUNDOS):
+        """
+        Registra um valor no histograma 'nome' (criado com as faixas 'limites' no primeiro uso).
+        """
+        with self._trava:
+            histograma = self._histogramas.get(nome)
+            if histograma is None:
+                histograma = self._histogramas[nome] = Histograma(limites)
+            histograma.registrar(valor)
+
+    @contextmanager
+    def medir(self, nome):
+        """
+        Mede o tempo de um bloco "with": conta a chamada em 'nome.chamadas' e registra a
+        duração no histograma 'nome.segundos'.
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nome + '.segundos', time.perf_counter() - inicio)
+            self.contar(nome + '.chamadas')
+
+    def contador(self, nome):
+        return self._contadores.get(nome, 0)
+
+    def medidor(self, nome):
+        return self._medidores.get(nome)
+
+    def histograma(self, nome):
+        return self._histogramas.get(nome)
+
+    def zerar(self):
+        """
+        Descarta todas as métricas registradas até agora.
+        """
+        with self._trava:
+            self._contadores = {}
+            self._medidores = {}
+            self._histogramas = {}
+
+    def instantaneo(self):
+        """
+        Retorna uma cópia de todas as métricas.
+
+        Returns:
+            dict: 'contadores' e 'medidores' (nome -> valor) e 'histogramas'
+                  (nome -> dicionário de Histograma.para_dicionario).
+        """
+        with self._trava:
+            return {
+                'contadores': dict(self._contadores),
+                'medidores': dict(self._medidores),
+                'histogramas': {nome: h.para_dicionario() for nome, h in self._histogramas.items()},
+            }
+
+    def exportar_json(self, indent=None):
+        """
+        Retorna as métricas (veja instantaneo) como texto JSON.
+        """
+        return json.dumps(self.instantaneo(), ensure_ascii=False, indent=indent)
+
+    def exportar_texto(self, prefixo=''):
+        """
+        Retorna as métricas no formato de texto de exposição do Prometheus
+        (os pontos dos nomes viram sublinhados).
+        """
+        instantaneo = self.instantaneo()
+        linhas = []
+        for nome, valor in sorted(instantaneo['contadores'].items()):
+            nome = prefixo + nome.replace('.', '_')
+            linhas += [f"# TYPE {nome}_total counter", f"{nome}_total {valor}"]
+        for nome, valor in sorted(instantaneo['medidores'].items()):
+            nome = prefixo + nome.replace('.', '_')
+            linhas += [f"# TYPE {nome} gauge", f"{nome} {valor}"]
+        for nome, h in sorted(instantaneo['histogramas'].items()):
+            nome = prefixo + nome.replace('.', '_')
+            linhas.append(f"# TYPE {nome} histogram")
+            acumulado = 0
+            for limite, contagem in zip(h['limites'], h['contagens']):
+                acumulado += contagem
+                linhas.append(f'{nome}_bucket{{le="{limite:g}"}} {acumulado}')
+            linhas += [f'{nome}_bucket{{le="+Inf"}} {h["contagem"]}',
+                       f"{nome}_sum {h['soma']}", f"{nome}_count {h['contagem']}"]
+        return '\n'.join(linhas) + '\n'
+
+
+# --- Instrumentação ---
+
+def _cronometrar(objeto, nome_metodo, registro, nome):
+    """
+    Troca um método do objeto por uma versão que conta as chamadas e registra a latência.
+    """
+    original = getattr(objeto, nome_metodo)
+    observar, contar, relogio = registro.observar, registro.contar, time.perf_counter
+
+    def medido(*args, **kwargs):
+        inicio = relogio()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            observar(nome + '.segundos', relogio() - inicio)
+            contar(nome + '.chamadas')
+
+    setattr(objeto, nome_metodo, medido)
+    return medido
+
+
+def instrumentar_estoque(estoque, registro):
+    """
+    Passa a medir um Estoque (ou EstoqueConcorrente):
+    - adicionar_engradado, remover_engradado, contar_por_produto, salvar_estoque e
+      carregar_estoque: chamadas ('<metodo>.chamadas') e latência ('<metodo>.segundos');
+    - adicionar_engradado (e toda alocação): posições examinadas nos índices de alocação
+      até achar a pilha ('estoque.alocacao.posicoes_examinadas');
+    - remover_engradado: pilhas visitadas e engradados tocados
+      ('estoque.remover_engradado.pilhas_visitadas' e '.engradados_tocados');
+    - retirar_do_topo (os passos de um plano de retirada, veja Planejador_retirada.py):
+      engradados tocados ('estoque.retirar_do_topo.engradados_tocados', um contador, já que
+      cada chamada toca no máximo um engradado).
+
+    Args:
+        estoque (Estoque): O estoque a ser medido.
+        registro (RegistroMetricas): Onde as métricas são registradas.
+    """
+    desinstrumentar(estoque)
+    metodos = ['adicionar_engradado', 'remover_engradado', 'contar_por_produto', 'salvar_estoque',
+               'carregar_estoque', '_escolher_posicao', '_retirar_do_topo', 'retirar_do_topo']
+    for metodo in metodos[:5]:
+        _cronometrar(estoque, metodo, registro, 'estoque.' + metodo)
+
+    # Posições examinadas: a escolhida mais as entradas obsoletas descartadas dos heaps.
+    escolher = estoque._escolher_posicao
+
+    def escolher_posicao(produto_codigo):
+        antes = len(estoque._pilhas_vazias) + len(estoque._pilhas_compativeis.get(produto_codigo, ()))
+        posicao = escolher(produto_codigo)
+        depois = len(estoque._pilhas_vazias) + len(estoque._pilhas_compativeis.get(produto_codigo, ()))
+        registro.observar('estoque.alocacao.posicoes_examinadas', antes - depois + (posicao is not None),
+                          LIMITES_CONTAGEM)
+        return posicao
+    estoque._escolher_posicao = escolher_posicao
+
+    # Pilhas e engradados tocados por cada remoção (retiradas do topo durante a chamada).
+    # Com um EstoqueConcorrente, cada thread conta as suas próprias retiradas.
+    tocados = threading.local()
+    retirar = estoque._retirar_do_topo
+    remover = estoque.remover_engradado
+
+    def retirar_do_topo(posicao, quantidade):
+        posicoes = getattr(tocados, 'posicoes', None)
+        if posicoes is not None:
+            posicoes.append(posicao)
+        return retirar(posicao, quantidade)
+
+    def remover_engradado(*args, **kwargs):
+        tocados.posicoes = []
+        try:
+            return remover(*args, **kwargs)
+        finally:
+            posicoes, tocados.posicoes = tocados.posicoes, None
+            registro.observar('estoque.remover_engradado.pilhas_visitadas', len(set(posicoes)), LIMITES_CONTAGEM)
+            registro.observar('estoque.remover_engradado.engradados_tocados', len(posicoes), LIMITES_CONTAGEM)
+    estoque._retirar_do_topo = retirar_do_topo
+    estoque.remover_engradado = remover_engradado
+
+    # As retiradas do planejador não passam por remover_engradado.
+    retirar_publico = estoque.retirar_do_topo
+
+    def retirar_do_topo_publico(linha, coluna, quantidade):
+        retiradas = retirar_publico(linha, coluna, quantidade)
+        if retiradas:
+            registro.contar('estoque.retirar_do_topo.engradados_tocados')
+        return retiradas
+    estoque.retirar_do_topo = retirar_do_topo_publico
+    estoque._instrumentacao = (metodos, None)
+
+
+def instrumentar_fila(fila_pedidos, registro):
+    """
+    Passa a medir uma FilaPedidos:
+    - processar_pedido, salvar_pedidos e carregar_pedidos: chamadas e latência, e o
+      resultado de processar_pedido ('fila.processar_pedido.atendidos', '.recusados', '.fila_vazia');
+    - a profundidade da fila ('fila.profundidade', um medidor);
+    - a espera de cada pedido, da entrada na fila até o atendimento completo
+      ('fila.espera.segundos'). Os pedidos que já estavam na fila contam a partir de agora.
+
+    Args:
+        fila_pedidos (FilaPedidos): A fila a ser medida.
+        registro (RegistroMetricas): Onde as métricas são registradas.
+    """
+    desinstrumentar(fila_pedidos)
+    metodos = ['processar_pedido', 'salvar_pedidos', 'carregar_pedidos']
+    for metodo in metodos[1:]:
+        _cronometrar(fila_pedidos, metodo, registro, 'fila.' + metodo)
+
+    processar = _cronometrar(fila_pedidos, 'processar_pedido', registro, 'fila.processar_pedido')
+    resultados = {True: 'fila.processar_pedido.atendidos', False: 'fila.processar_pedido.recusados',
+                  None: 'fila.processar_pedido.fila_vazia'}
+
+    def processar_pedido(estoque):
+        resultado = processar(estoque)
+        registro.contar(resultados[resultado])
+        return resultado
+    fila_pedidos.processar_pedido = processar_pedido
+
+    # Momento de entrada de cada pedido pendente, por número.
+    agora = time.monotonic()
+    chegadas = {pedido.numero: agora for pedido in fila_pedidos.fila}
+    registro.definir('fila.profundidade', len(chegadas))
+
+    def ouvinte(evento):
+        tipo = evento['tipo']
+        if tipo == 'pedido_adicionado':
+            chegadas[evento['pedido']['numero']] = time.monotonic()
+        elif tipo == 'pedido_atendido':
+            # Um atendimento parcial deixa o pedido na fila; a espera conta até o atendimento completo.
+            if fila_pedidos.obter_pedido(evento['numero']) is None:
+                chegada = chegadas.pop(evento['numero'], None)
+                if chegada is not None:
+                    registro.observar('fila.espera.segundos', time.monotonic() - chegada)
+        elif tipo == 'pedido_cancelado':
+            chegadas.pop(evento['numero'], None)
+        elif tipo == 'fila_recarregada':
+            agora = time.monotonic()
+            for pedido in fila_pedidos.fila:
+                chegadas.setdefault(pedido.numero, agora)
+        registro.definir('fila.profundidade', len(fila_pedidos.fila))
+    fila_pedidos.adicionar_ouvinte(ouvinte)
+    fila_pedidos._instrumentacao = (metodos, ouvinte)
+
+
+def instrumentar_armazenamento(armazenamento, registro):
+    """
+    Passa a medir um armazenamento (Persistencia ou ArmazenamentoSQLite, veja Armazenamento.py):
+    - sincronizar, o caminho de "Salvar Tudo": chamadas e latência ('armazenamento.salvar');
+    - compactar: chamadas e latência ('armazenamento.compactar'). Com a Persistencia, mede
+      só o fechamento do segmento; o snapshot é gravado em segundo plano.
+    A carga é medida por quem chama carregar (com registro.medir('armazenamento.carregar')).
+
+    Args:
+        armazenamento: O armazenamento a ser medido.
+        registro (RegistroMetricas): Onde as métricas são registradas.
+    """
+    desinstrumentar(armazenamento)
+    _cronometrar(armazenamento, 'sincronizar', registro, 'armazenamento.salvar')
+    _cronometrar(armazenamento, 'compactar', registro, 'armazenamento.compactar')
+    armazenamento._instrumentacao = (['sincronizar', 'compactar'], None)
+
+
+def desinstrumentar(objeto):
+    """
+    Devolve a um Estoque, FilaPedidos ou armazenamento instrumentado os métodos originais da classe.
+    """
+    instrumentacao = vars(objeto).pop('_instrumentacao', None)
+    if instrumentacao is None:
+        return
+    metodos, ouvinte = instrumentacao
+    for metodo in metodos:
+        vars(objeto).pop(metodo, None)
+    if ouvinte is not None:
+        objeto.remover_ouvinte(ouvinte)
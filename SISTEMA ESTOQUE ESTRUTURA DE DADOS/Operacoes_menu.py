@@ -1,13 +1,15 @@
-from Produto import Produto, salvar_produtos
+from Produto import Produto
 from Engradado import Engradado
 from Pedido import Pedido
+from Planejador_retirada import PlanejadorRetirada
+import Importacao_lote
 
 def cadastrar_novo_produto(produtos_cadastrados):
     """Lida com a lógica de coletar dados do usuário e criar um novo Produto."""
     print("\n--- Cadastro de Novo Produto ---")
     codigo = input("Código: ")
     
-    if any(p.codigo == codigo for p in produtos_cadastrados):
+    if codigo in produtos_cadastrados:
         print("Erro: Já existe um produto com este código.")
         return
 
@@ -44,7 +46,7 @@ def cadastrar_novo_produto(produtos_cadastrados):
         preco_compra, preco_venda, fornecedor, fabricante, categoria,
         capacidade_engradado=capacidade_engradado
     )
-    produtos_cadastrados.append(novo_produto)
+    produtos_cadastrados.adicionar(novo_produto)
     print(f"\nProduto '{nome}' cadastrado com sucesso!")
 
 
@@ -53,7 +55,7 @@ def adicionar_engradado_estoque(estoque, produtos_cadastrados):
     print("\n--- Adicionar Engradado ao Estoque ---")
     codigo_produto = input("Código do produto: ")
 
-    produto_encontrado = next((p for p in produtos_cadastrados if p.codigo == codigo_produto), None)
+    produto_encontrado = produtos_cadastrados.obter(codigo_produto)
 
     if not produto_encontrado:
         print("Erro: Nenhum produto encontrado com este código. Cadastre o produto primeiro.")
@@ -84,7 +86,7 @@ def remover_unidades_estoque(estoque, produtos_cadastrados):
     print("\n--- Remover Unidades do Estoque ---")
     codigo = input("Código do produto para remover: ")
     
-    if not any(p.codigo == codigo for p in produtos_cadastrados):
+    if codigo not in produtos_cadastrados:
         print("Erro: Nenhum produto encontrado com este código.")
         return
 
@@ -97,12 +99,26 @@ def remover_unidades_estoque(estoque, produtos_cadastrados):
         print("Erro: Quantidade inválida.")
         return
     
-    total_disponivel = estoque.contar_por_produto(codigo)
+    # Unidades reservadas para pedidos da fila não podem ser retiradas manualmente.
+    total_disponivel = estoque.disponivel(codigo)
     if total_disponivel < quantidade:
-        print(f"Erro: Quantidade insuficiente em estoque. Disponível: {total_disponivel} unidades.")
+        print(f"Erro: Quantidade insuficiente em estoque. Disponível: {total_disponivel} unidades "
+              f"({estoque.reservado(codigo)} reservadas para pedidos).")
         return
 
-    if estoque.remover_engradado(codigo, quantidade):
+    # Monta a lista de separação antes de mexer nas pilhas.
+    planejador = PlanejadorRetirada(estoque)
+    plano = planejador.planejar(codigo, quantidade)
+    if plano is None:
+        print("\nNão foi possível remover a quantidade desejada (estoque insuficiente ou produto não encontrado).")
+        return
+    print(f"\nLista de separação ({plano['engradados_completos']} engradados completos, "
+          f"{plano['engradados_parciais']} parcial, {plano['pilhas_tocadas']} pilhas):")
+    for passo in plano['passos']:
+        tipo = "engradado completo" if passo['engradado_completo'] else f"de um engradado de {passo['quantidade_engradado']}"
+        print(f"  [{passo['linha']}][{passo['coluna']}] nível {passo['nivel']}: {passo['quantidade']} unidades ({tipo})")
+
+    if planejador.executar(plano):
         print(f"\nRemoção de {quantidade} unidades do produto {codigo} concluída com sucesso.")
     else:
         print("\nNão foi possível remover a quantidade desejada (estoque insuficiente ou produto não encontrado).")
@@ -114,12 +130,15 @@ def visualizar_estoque(estoque):
     estoque.visualizar()
 
 
-def registrar_pedido(fila_pedidos, produtos_cadastrados):
-    """Coleta dados para criar um Pedido e adicioná-lo à Fila de Pedidos."""
+def registrar_pedido(fila_pedidos, produtos_cadastrados, estoque=None):
+    """
+    Coleta dados para criar um Pedido e adicioná-lo à Fila de Pedidos.
+    Se o estoque for informado, a quantidade do pedido é reservada na entrada.
+    """
     print("\n--- Registrar Novo Pedido ---")
     codigo_produto = input("Código do produto: ")
     
-    if not any(p.codigo == codigo_produto for p in produtos_cadastrados):
+    if codigo_produto not in produtos_cadastrados:
         print("Erro: Nenhum produto encontrado com este código.")
         return
 
@@ -137,12 +156,33 @@ def registrar_pedido(fila_pedidos, produtos_cadastrados):
 
     try:
         pedido = Pedido(codigo_produto, quantidade, data_solicitacao, solicitante)
-        fila_pedidos.adicionar_pedido(pedido)
-        print("\nPedido registrado com sucesso.")
+        reservado = fila_pedidos.adicionar_pedido(pedido, estoque)
+        print(f"\nPedido número {pedido.numero} registrado com sucesso.")
+        if estoque is not None:
+            if reservado:
+                print("A quantidade do pedido foi reservada no estoque.")
+            else:
+                print("Saldo disponível insuficiente: o pedido aguarda na fila sem reserva.")
     except ValueError as e:
         print(f"Erro ao registrar o pedido: {e}. Verifique o formato da data.")
 
 
+def cancelar_pedido(fila_pedidos, estoque):
+    """Cancela um pedido da fila pelo número, liberando a sua reserva."""
+    print("\n--- Cancelar Pedido ---")
+    try:
+        numero = int(input("Número do pedido: "))
+    except ValueError:
+        print("Erro: Número inválido.")
+        return
+
+    pedido = fila_pedidos.cancelar_pedido(numero, estoque)
+    if pedido is None:
+        print("Nenhum pedido com este número está na fila.")
+    else:
+        print(f"Pedido de {pedido.solicitante} ({pedido.quantidade} unidades do produto {pedido.codigo_produto}) cancelado.")
+
+
 def processar_pedidos(fila_pedidos, estoque):
     """Processa o próximo pedido da fila."""
     print("\n--- Processando Pedido ---")
@@ -153,32 +193,135 @@ def processar_pedidos(fila_pedidos, estoque):
     fila_pedidos.processar_pedido(estoque)
 
 
-def salvar_tudo(produtos_cadastrados, estoque, fila_pedidos, arquivos_json):
-    """Salva o estado de todos os dados do sistema nos arquivos JSON."""
-    salvar_produtos(produtos_cadastrados, arquivos_json['produtos'])
+def processar_fila_em_lote(fila_pedidos, estoque):
+    """Processa todos os pedidos da fila em um único lote e exibe o resumo."""
+    print("\n--- Processando Fila de Pedidos em Lote ---")
+    if not fila_pedidos.fila:
+        print("Não há pedidos na fila para processar.")
+        return
+
+    resultado = fila_pedidos.processar_lote(estoque, permitir_parcial=True)
+    for pedido in resultado['atendidos']:
+        print(f"  Pedido de {pedido.solicitante} atendido ({pedido.quantidade} unidades do produto {pedido.codigo_produto}).")
+    for parcial in resultado['parciais']:
+        pedido = parcial['pedido']
+        print(f"  Pedido de {pedido.solicitante} atendido parcialmente: {parcial['quantidade_atendida']} unidades entregues, {parcial['quantidade_pendente']} continuam na fila.")
+    for pedido in resultado['adiados']:
+        print(f"  Pedido de {pedido.solicitante} adiado (estoque insuficiente do produto {pedido.codigo_produto}).")
+    print(f"\n{resultado['processados']} pedidos processados em {resultado['duracao_segundos']:.4f} s "
+          f"({resultado['pedidos_por_segundo']:.0f} pedidos/s).")
+
+
+def consolidar_estoque(estoque, produtos_cadastrados):
+    """Consolida as pilhas de todos os produtos e exibe quantas posições foram liberadas."""
+    print("\n--- Consolidando Estoque ---")
+    resultado = estoque.consolidar(produtos_cadastrados)
+    if not resultado['movimentos']:
+        print("O estoque já está consolidado.")
+        return
+    print(f"{resultado['movimentos']} movimentos feitos, {resultado['posicoes_liberadas']} posições liberadas "
+          f"({resultado['duracao_segundos']:.4f} s).")
+
+
+def importar_arquivo(estoque, fila_pedidos, produtos_cadastrados):
+    """Importa engradados ou pedidos de um arquivo CSV ou JSONL e exibe o resumo."""
+    print("\n--- Importar Arquivo ---")
+    tipo = input("O arquivo contém (1) engradados ou (2) pedidos? ")
+    if tipo not in ('1', '2'):
+        print("Erro: Opção inválida.")
+        return
+    caminho = input("Caminho do arquivo (.csv ou .jsonl): ").strip()
+    try:
+        if tipo == '1':
+            resultado = Importacao_lote.importar_engradados(caminho, estoque, produtos_cadastrados)
+        else:
+            # Os pedidos importados reservam estoque, como os registrados pelo menu.
+            resultado = Importacao_lote.importar_pedidos(caminho, fila_pedidos, produtos_cadastrados, estoque)
+    except OSError as e:
+        print(f"Erro: Não foi possível ler o arquivo ({e.strerror}).")
+        return
+    Importacao_lote.exibir_resultado(resultado)
+
+
+def exibir_metricas(metricas):
+    """Exibe as métricas de desempenho registradas (veja Metricas.py), se estiverem ligadas."""
+    print("\n--- Métricas de Desempenho ---")
+    if metricas is None:
+        print("As métricas estão desligadas. Inicie o sistema com ESTOQUE_METRICAS=1 para ligá-las.")
+        return
+    instantaneo = metricas.instantaneo()
+    for nome, valor in sorted(instantaneo['contadores'].items()):
+        print(f"  {nome}: {valor}")
+    for nome, valor in sorted(instantaneo['medidores'].items()):
+        print(f"  {nome}: {valor}")
+    for nome, h in sorted(instantaneo['histogramas'].items()):
+        if nome.endswith('.segundos'):
+            print(f"  {nome}: {h['contagem']} medições, média {h['media'] * 1e6:.1f} µs, "
+                  f"p90 {h['p90'] * 1e6:.1f} µs, máx {h['maximo'] * 1e6:.1f} µs")
+        else:
+            print(f"  {nome}: {h['contagem']} medições, média {h['media']:.2f}, p90 {h['p90']}, máx {h['maximo']}")
+
+
+def salvar_tudo(produtos_cadastrados, estoque, fila_pedidos, arquivos_json, persistencia=None):
+    """
+    Salva o estado de todos os dados do sistema.
+    Com um armazenamento (log ou SQLite), grava apenas as alterações pendentes nele; os
+    arquivos JSON completos só são regravados ao sair do sistema (veja salvar_arquivos_json).
+    Sem armazenamento, regrava os arquivos JSON completos.
+    """
+    if persistencia is not None:
+        persistencia.sincronizar()
+        print("\nAlterações salvas no armazenamento! Os arquivos JSON completos são atualizados ao sair do sistema.")
+        return
+    salvar_arquivos_json(produtos_cadastrados, estoque, fila_pedidos, arquivos_json)
+    print("\nTodos os dados foram salvos com sucesso!")
+
+
+def salvar_arquivos_json(produtos_cadastrados, estoque, fila_pedidos, arquivos_json):
+    """
+    Regrava os arquivos JSON completos (produtos, estoque e pedidos) com o estado atual,
+    para que eles continuem sendo uma cópia legível e atualizada do sistema.
+    """
+    produtos_cadastrados.salvar(arquivos_json['produtos'])
     estoque.salvar_estoque(arquivos_json['estoque'])
     fila_pedidos.salvar_pedidos(arquivos_json['pedidos'])
-    print("\nTodos os dados foram salvos com sucesso!")
 
 
 # --- Funções de Relatório ---
 
-def gerar_relatorio_estoque_geral(estoque, produtos_cadastrados):
-    """Exibe a quantidade total de cada produto cadastrado em estoque."""
+def gerar_relatorio_estoque_geral(estoque, produtos_cadastrados, relatorios=None):
+    """
+    Exibe a quantidade total de cada produto cadastrado em estoque.
+    Com as visões materializadas (veja Visoes_relatorios.py), os totais vêm delas.
+    """
     print("\n--- Relatório de Estoque por Produto (Geral) ---")
     if not produtos_cadastrados:
         print("Nenhum produto cadastrado.")
         return
         
     for produto in produtos_cadastrados:
-        total_unidades = estoque.contar_por_produto(produto.codigo)
-        print(f"Produto: {produto.nome} (Cód: {produto.codigo}) - Total em Estoque: {total_unidades} unidades")
-
-
-def gerar_relatorio_vencimento(estoque, produtos_cadastrados):
-    """Exibe os produtos em estoque que vencerão nos próximos 30 dias."""
+        if relatorios is not None:
+            total_unidades = relatorios.totais.total(produto.codigo)
+        else:
+            total_unidades = estoque.contar_por_produto(produto.codigo)
+        print(f"Produto: {produto.nome} (Cód: {produto.codigo}) - Total em Estoque: {total_unidades} unidades"
+              f" (Reservadas: {estoque.reservado(produto.codigo)})")
+
+
+def gerar_relatorio_vencimento(estoque, produtos_cadastrados, relatorios=None):
+    """
+    Exibe os engradados em estoque que vencerão nos próximos 30 dias.
+    Com as visões materializadas, os produtos vencendo vêm do índice de validade da visão.
+    """
     print("\n--- Relatório de Produtos Próximos ao Vencimento (Próximos 30 dias) ---")
-    produtos_vencendo = estoque.obter_produtos_proximos_vencimento(produtos_cadastrados)
+    if relatorios is not None:
+        produtos_vencendo = [
+            dict(item, quantidade_engradado=engradado.quantidade)
+            for item in relatorios.vencimentos.vencendo(30)
+            for _, _, _, engradado in estoque.iter_engradados(item['codigo'])
+        ]
+    else:
+        produtos_vencendo = estoque.obter_produtos_proximos_vencimento(produtos_cadastrados)
     
     if not produtos_vencendo:
         print("Nenhum produto próximo ao vencimento nos próximos 30 dias.")
@@ -187,10 +330,13 @@ def gerar_relatorio_vencimento(estoque, produtos_cadastrados):
     for item in produtos_vencendo:
         print(f"  Produto: {item['nome']} (Cód: {item['codigo']}), Lote: {item['lote']}, Quantidade no engradado: {item['quantidade_engradado']}, Vencimento: {item['data_validade']}")
 
-def gerar_relatorio_itens_em_falta(estoque, produtos_cadastrados):
+def gerar_relatorio_itens_em_falta(estoque, produtos_cadastrados, relatorios=None):
     """Exibe produtos com estoque abaixo do limite mínimo (10 unidades)."""
     print("\n--- Relatório de Itens em Falta (Estoque abaixo de 10 unidades) ---")
-    itens_em_falta = estoque.obter_itens_em_falta(produtos_cadastrados)
+    if relatorios is not None:
+        itens_em_falta = relatorios.itens_em_falta.itens()
+    else:
+        itens_em_falta = estoque.obter_itens_em_falta(produtos_cadastrados)
 
     if not itens_em_falta:
         print("Nenhum item em falta (todos com estoque acima de 10 unidades).")
@@ -199,6 +345,21 @@ def gerar_relatorio_itens_em_falta(estoque, produtos_cadastrados):
     for item in itens_em_falta:
         print(f"  Produto: {item['nome']} (Cód: {item['codigo']}) - Em Estoque: {item['total_em_estoque']} unidades, Faltam para o limite ({item['limite_baixo']}): {item['faltando']} unidades.")
 
+def gerar_relatorio_valor_estoque(estoque, produtos_cadastrados):
+    """Exibe o valor do estoque a preço de custo e a preço de venda."""
+    print("\n--- Relatório de Valor do Estoque ---")
+    valor = estoque.obter_valor_estoque(produtos_cadastrados)
+
+    if not valor['por_produto']:
+        print("Nenhum produto em estoque.")
+        return
+
+    for item in valor['por_produto']:
+        print(f"  Produto: {item['nome']} (Cód: {item['codigo']}) - {item['total_em_estoque']} unidades, "
+              f"Custo: R$ {item['valor_custo']:.2f}, Venda: R$ {item['valor_venda']:.2f}")
+    print(f"Total a preço de custo: R$ {valor['valor_custo']:.2f}, a preço de venda: R$ {valor['valor_venda']:.2f} "
+          f"(margem: R$ {valor['margem']:.2f})")
+
 def gerar_historico_pedidos_atendidos(fila_pedidos, produtos_cadastrados):
     """Exibe todos os pedidos que já foram processados com sucesso."""
     print("\n--- Histórico de Pedidos Atendidos ---")
@@ -209,18 +370,48 @@ def gerar_historico_pedidos_atendidos(fila_pedidos, produtos_cadastrados):
         return
 
     for pedido in historico:
-        nome_produto = next((p.nome for p in produtos_cadastrados if p.codigo == pedido.codigo_produto), "Desconhecido")
+        produto = produtos_cadastrados.obter(pedido.codigo_produto)
+        nome_produto = produto.nome if produto is not None else "Desconhecido"
         print(f"  Pedido de: {pedido.solicitante}, Produto: {nome_produto} (Cód: {pedido.codigo_produto}), Quantidade: {pedido.quantidade}, Data: {pedido.data_solicitacao.strftime('%Y-%m-%d')}")
 
 
-def gerar_todos_relatorios(estoque, fila_pedidos, produtos_cadastrados):
-    """Função de conveniência que chama todas as funções de relatório de uma vez."""
+def gerar_relatorio_volume_por_cliente(fila_pedidos, relatorios=None):
+    """Exibe as unidades já atendidas de cada solicitante, do maior para o menor."""
+    print("\n--- Volume Atendido por Cliente ---")
+    if relatorios is not None:
+        ranking = relatorios.volume_por_cliente.ranking()
+    else:
+        unidades = {}
+        atendimentos = {}
+        for pedido in fila_pedidos.obter_historico_pedidos_atendidos():
+            unidades[pedido.solicitante] = unidades.get(pedido.solicitante, 0) + pedido.quantidade
+            atendimentos[pedido.solicitante] = atendimentos.get(pedido.solicitante, 0) + 1
+        ranking = [{'solicitante': s, 'unidades': u, 'atendimentos': atendimentos[s]}
+                   for s, u in sorted(unidades.items(), key=lambda item: item[1], reverse=True)]
+
+    if not ranking:
+        print("Nenhum pedido foi atendido ainda.")
+        return
+
+    for item in ranking:
+        print(f"  Cliente: {item['solicitante']} - {item['unidades']} unidades em {item['atendimentos']} atendimentos")
+
+
+def gerar_todos_relatorios(estoque, fila_pedidos, produtos_cadastrados, relatorios=None):
+    """
+    Função de conveniência que chama todas as funções de relatório de uma vez.
+    Com as visões materializadas (RelatoriosMaterializados), os relatórios são lidos prontos.
+    """
     print("\n=========== GERANDO TODOS OS RELATÓRIOS ===========")
-    gerar_relatorio_estoque_geral(estoque, produtos_cadastrados)
+    gerar_relatorio_estoque_geral(estoque, produtos_cadastrados, relatorios)
     print("\n---------------------------------------------------")
-    gerar_relatorio_vencimento(estoque, produtos_cadastrados)
+    gerar_relatorio_vencimento(estoque, produtos_cadastrados, relatorios)
     print("\n---------------------------------------------------")
-    gerar_relatorio_itens_em_falta(estoque, produtos_cadastrados)
+    gerar_relatorio_itens_em_falta(estoque, produtos_cadastrados, relatorios)
+    print("\n---------------------------------------------------")
+    gerar_relatorio_valor_estoque(estoque, produtos_cadastrados)
     print("\n---------------------------------------------------")
     gerar_historico_pedidos_atendidos(fila_pedidos, produtos_cadastrados)
+    print("\n---------------------------------------------------")
+    gerar_relatorio_volume_por_cliente(fila_pedidos, relatorios)
     print("\n================= FIM DOS RELATÓRIOS ================\n")
\ No newline at end of file
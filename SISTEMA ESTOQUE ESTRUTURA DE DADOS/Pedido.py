@@ -1,5 +1,6 @@
 # Importa datetime para trabalhar com a data da solicitação do pedido.
 from datetime import datetime
+from Produto import data_de_texto
 
 # A classe Pedido representa uma solicitação de um cliente.
 # Contém as informações de qual produto foi solicitado, a quantidade e por quem.
@@ -7,7 +8,12 @@ class Pedido:
     """
     Representa um pedido de um cliente.
     """
-    def __init__(self , codigo_produto , quantidade , data_solicitacao , solicitante ):
+    # Sem __dict__ por instância: o histórico de atendidos pode ficar muito longo.
+    # A data fica em _data_solicitacao (como texto até o primeiro acesso, veja converter_datas).
+    __slots__ = ('codigo_produto', 'quantidade', '_data_solicitacao', 'solicitante', 'numero', 'reservado')
+
+    def __init__(self , codigo_produto , quantidade , data_solicitacao , solicitante , numero=None, reservado=False,
+                 converter_datas=True):
         """
         Inicializa um novo objeto Pedido.
 
@@ -16,13 +22,33 @@ class Pedido:
             quantidade (int): Quantidade do produto solicitado.
             data_solicitacao (str): Data em que o pedido foi feito (formato "YYYY-MM-DD").
             solicitante (str): Nome de quem fez o pedido.
+            numero (int, opcional): Identificador do pedido, atribuído pela FilaPedidos.
+            reservado (bool, opcional): True se a quantidade do pedido está reservada no estoque.
+            converter_datas (bool, opcional): Se False, uma data em texto só é convertida (e
+                                              validada) no primeiro acesso. Usado ao ler
+                                              dados gravados pelo próprio sistema.
         """
         self.codigo_produto = codigo_produto
         self.quantidade = quantidade
-        # Converte a string da data para um objeto datetime.
-        self.data_solicitacao = datetime.strptime(data_solicitacao , "%Y-%m-%d")
+        # Converte a string da data para um objeto datetime (ou usa o datetime recebido).
+        if converter_datas and not isinstance(data_solicitacao, datetime):
+            data_solicitacao = data_de_texto(data_solicitacao)
+        self._data_solicitacao = data_solicitacao
         self.solicitante = solicitante
-    
+        self.numero = numero
+        self.reservado = reservado
+
+    @property
+    def data_solicitacao(self):
+        data = self._data_solicitacao
+        if isinstance(data, str):
+            data = self._data_solicitacao = data_de_texto(data)
+        return data
+
+    @data_solicitacao.setter
+    def data_solicitacao(self, data):
+        self._data_solicitacao = data
+
     def para_dicionario(self):
         """
         Converte o objeto Pedido para um dicionário, facilitando a gravação em JSON.
@@ -30,10 +56,33 @@ class Pedido:
         Returns:
             dict: Um dicionário representando o pedido.
         """
-        return {
+        data = self._data_solicitacao
+        dados = {
             'codigo_produto': self.codigo_produto,
             'quantidade': self.quantidade,
-            # Converte o objeto datetime de volta para uma string para salvar no JSON.
-            'data_solicitacao': self.data_solicitacao.strftime("%Y-%m-%d"),
+            # Converte o objeto datetime de volta para uma string para salvar no JSON
+            # (uma data que nunca foi lida ainda está em texto).
+            'data_solicitacao': data if isinstance(data, str) else data.strftime("%Y-%m-%d"),
             'solicitante': self.solicitante
-        }
\ No newline at end of file
+        }
+        # O número só é gravado quando existe, mantendo o formato antigo dos arquivos.
+        if self.numero is not None:
+            dados['numero'] = self.numero
+        if self.reservado:
+            dados['reservado'] = True
+        return dados
+
+    @classmethod
+    def de_dicionario(cls, d):
+        """
+        Cria um Pedido a partir de um dicionário no formato de para_dicionario. A data só
+        é convertida quando for usada.
+
+        Args:
+            d (dict): O dicionário com os dados do pedido.
+
+        Returns:
+            Pedido: O pedido recriado.
+        """
+        return cls(d['codigo_produto'], d['quantidade'], d['data_solicitacao'], d['solicitante'],
+                   numero=d.get('numero'), reservado=d.get('reservado', False), converter_datas=False)
\ No newline at end of file
@@ -0,0 +1,345 @@
+# Importa json para gravar os registros de alteração e o snapshot.
+# Importa os para renomear arquivos de forma atômica e forçar a gravação em disco (fsync).
+# Importa threading para compactar o snapshot em segundo plano.
+import json
+import os
+import threading
+from Produto import Produto, CatalogoProdutos
+from Pedido import Pedido
+from Engradado import Engradado
+from Estoque import Estoque
+from Fila_de_Pedidos import FilaPedidos
+from Carga_paralela import carregar_arquivos_json
+from Log_estruturado import SAIDA_NULA, ERRO, registro
+from Armazenamento import TravaDiretorio
+
+NOME_SNAPSHOT = 'estado.snapshot.json'
+PREFIXO_SEGMENTO = 'alteracoes.'
+SUFIXO_SEGMENTO = '.log'
+
+# A classe Persistencia implementa um "log de escrita antecipada" (write-ahead log).
+# Em vez de regravar os três arquivos JSON inteiros a cada salvamento, cada alteração do
+# Estoque, da FilaPedidos e do CatalogoProdutos vira uma linha JSON compacta, acrescentada
+# ao final de um arquivo de log (um "segmento"). Salvar passa a custar o tamanho das alterações.
+#
+# De tempos em tempos o log é compactado: o segmento atual é fechado, um novo é aberto para as
+# próximas alterações e uma thread em segundo plano aplica os segmentos fechados sobre o último
+# snapshot, grava um novo snapshot (arquivo temporário + renomeação atômica) e apaga os
+# segmentos que ele já contém. Ao iniciar, o sistema lê o snapshot e reaplica os segmentos
+# mais novos que ele.
+class Persistencia:
+    """
+    Persiste o estado do sistema com um log de alterações e snapshots periódicos.
+    """
+    # Para onde vão as falhas da compactação em segundo plano (veja Log_estruturado.py).
+    saida = SAIDA_NULA
+
+    def __init__(self, diretorio, limite_registros=5000):
+        """
+        Inicializa a persistência em um diretório.
+
+        Args:
+            diretorio (str): Pasta onde ficam o snapshot e os segmentos do log.
+            limite_registros (int, opcional): Número de registros no segmento atual que,
+                                              ao sincronizar, dispara uma compactação.
+        """
+        self.diretorio = diretorio
+        self.limite_registros = limite_registros
+        self._trava = threading.Lock()
+        self._compactacao = None
+        self._arquivo = None
+        self._segmento = 0
+        self._registros_no_segmento = 0
+        self._arquivos_json = None
+        self._dimensoes = None
+        # Só este objeto grava no diretório enquanto estiver carregado (veja carregar).
+        self._trava_diretorio = TravaDiretorio(diretorio)
+
+    # --- Arquivos ---
+
+    def _caminho(self, nome):
+        return os.path.join(self.diretorio, nome)
+
+    def _caminho_segmento(self, numero):
+        return self._caminho(f"{PREFIXO_SEGMENTO}{numero:08d}{SUFIXO_SEGMENTO}")
+
+    def _segmentos(self):
+        """
+        Lista os segmentos do log existentes no diretório, em ordem.
+
+        Returns:
+            list: Tuplas (numero, caminho) ordenadas pelo número do segmento.
+        """
+        segmentos = []
+        for nome in os.listdir(self.diretorio):
+            if nome.startswith(PREFIXO_SEGMENTO) and nome.endswith(SUFIXO_SEGMENTO):
+                numero = nome[len(PREFIXO_SEGMENTO):-len(SUFIXO_SEGMENTO)]
+                if numero.isdigit():
+                    segmentos.append((int(numero), self._caminho(nome)))
+        return sorted(segmentos)
+
+    def _ler_snapshot(self):
+        """
+        Lê o snapshot mais recente.
+
+        Returns:
+            dict: O conteúdo do snapshot, ou None se ele ainda não existir.
+        """
+        try:
+            with open(self._caminho(NOME_SNAPSHOT), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    # --- Reconstrução do estado ---
+
+    @staticmethod
+    def _aplicar(evento, produtos, estoque, fila_pedidos):
+        """
+        Reaplica um registro do log sobre o estado informado.
+        """
+        tipo = evento['tipo']
+        if tipo == 'produto_cadastrado':
+            produtos.adicionar(Produto.de_dicionario(evento['produto']))
+        elif tipo == 'engradado_adicionado':
+            estoque.colocar_engradado(evento['linha'], evento['coluna'],
+                                      Engradado(evento['produto_codigo'], evento['quantidade']))
+        elif tipo == 'unidades_removidas':
+            estoque.retirar_do_topo(evento['linha'], evento['coluna'], evento['quantidade'])
+        elif tipo == 'unidades_adicionadas':
+            estoque.completar_topo(evento['linha'], evento['coluna'], evento['quantidade'])
+        elif tipo == 'estoque_recarregado':
+            estoque.carregar_serializavel(evento['dados'])
+        elif tipo == 'pedido_adicionado':
+            fila_pedidos.adicionar_pedido(Pedido.de_dicionario(evento['pedido']))
+        elif tipo == 'pedido_atendido':
+            fila_pedidos.registrar_atendimento(evento['numero'], evento['quantidade'])
+        elif tipo == 'pedido_cancelado':
+            fila_pedidos.cancelar_pedido(evento['numero'])
+        elif tipo == 'fila_recarregada':
+            fila_pedidos.limpar()
+            fila_pedidos.carregar_serializavel(evento['dados'])
+
+    def _reproduzir(self, caminho, produtos, estoque, fila_pedidos, ultimo=False):
+        """
+        Reaplica todos os registros de um segmento do log.
+
+        Args:
+            ultimo (bool, opcional): True para o último segmento do log, o único que pode
+                                     terminar numa linha incompleta (gravação interrompida);
+                                     essa linha é ignorada.
+
+        Returns:
+            int: O tamanho, em bytes, da parte válida do segmento.
+
+        Raises:
+            ValueError: Se um registro não puder ser lido (fora a linha incompleta do fim
+                        do último segmento).
+        """
+        valido = 0
+        with open(caminho, 'rb') as f:
+            for numero_linha, linha in enumerate(f, 1):
+                try:
+                    evento = json.loads(linha)
+                except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                    # Só a gravação interrompida deixa uma linha sem o '\n' final.
+                    if ultimo and not linha.endswith(b'\n'):
+                        break
+                    raise ValueError(f"Registro inválido na linha {numero_linha} de {caminho}: {e}") from e
+                self._aplicar(evento, produtos, estoque, fila_pedidos)
+                valido += len(linha)
+        return valido
+
+    def _carregar_base(self, estoque, fila_pedidos):
+        """
+        Carrega o snapshot (ou, se ele não existir, os arquivos JSON completos)
+        no estado informado. O histórico de atendidos só é montado no primeiro acesso.
+
+        Returns:
+            tuple: (catálogo de produtos, número do último segmento contido na base).
+        """
+        snapshot = self._ler_snapshot()
+        if snapshot is None:
+            # Primeira execução com o log: parte dos arquivos JSON completos.
+            return carregar_arquivos_json(estoque, fila_pedidos, self._arquivos_json), 0
+        produtos = CatalogoProdutos(Produto.de_dicionario(d) for d in snapshot['produtos'])
+        estoque.carregar_serializavel(snapshot['estoque'])
+        fila_pedidos.carregar_serializavel(snapshot['pedidos'], adiar_historico=True)
+        return produtos, snapshot['segmento']
+
+    def _reconstruir(self, estoque, fila_pedidos, reparar=False):
+        """
+        Carrega a base e reaplica os segmentos do log mais novos que ela.
+
+        Args:
+            reparar (bool, opcional): Se True, a linha incompleta do fim do último segmento é
+                                      cortada do arquivo, para que ele possa deixar de ser o
+                                      último (os registros seguintes vão para um segmento novo).
+
+        Returns:
+            tuple: (catálogo de produtos, número do último segmento reaplicado).
+        """
+        produtos, ultimo_segmento = self._carregar_base(estoque, fila_pedidos)
+        segmentos = [(n, c) for n, c in self._segmentos() if n > ultimo_segmento]
+        for indice, (numero, caminho) in enumerate(segmentos, 1):
+            ultimo = indice == len(segmentos)
+            valido = self._reproduzir(caminho, produtos, estoque, fila_pedidos, ultimo)
+            if ultimo and reparar and valido < os.path.getsize(caminho):
+                os.truncate(caminho, valido)
+            ultimo_segmento = numero
+        return produtos, ultimo_segmento
+
+    def ler(self, estoque, fila_pedidos, arquivos_json):
+        """
+        Reconstrói o estado como em carregar, mas sem passar a registrar as alterações
+        (por exemplo, para migrar o estado para outro armazenamento).
+
+        Returns:
+            CatalogoProdutos: O catálogo de produtos cadastrados.
+        """
+        self._arquivos_json = arquivos_json
+        return self._reconstruir(estoque, fila_pedidos)[0]
+
+    def carregar(self, estoque, fila_pedidos, arquivos_json):
+        """
+        Reconstrói o estado do sistema: lê o snapshot mais recente (ou os arquivos JSON,
+        se ainda não houver snapshot), reaplica os segmentos do log mais novos e passa a
+        registrar as alterações seguintes.
+
+        Args:
+            estoque (Estoque): O estoque a ser carregado.
+            fila_pedidos (FilaPedidos): A fila a ser carregada.
+            arquivos_json (dict): Caminhos dos arquivos 'produtos', 'estoque' e 'pedidos',
+                                  usados quando ainda não existe snapshot.
+
+        Returns:
+            CatalogoProdutos: O catálogo de produtos cadastrados.
+
+        Raises:
+            RuntimeError: Se outro processo já estiver gravando no diretório.
+            ValueError: Se um registro do log estiver corrompido (veja _reproduzir).
+        """
+        self._trava_diretorio.obter()
+        self._arquivos_json = arquivos_json
+        try:
+            produtos, ultimo_segmento = self._reconstruir(estoque, fila_pedidos, reparar=True)
+        except ValueError:
+            self._trava_diretorio.liberar()
+            raise
+        # As reservas não são gravadas no log: são refeitas a partir dos pedidos reservados da fila.
+        fila_pedidos.reaplicar_reservas(estoque)
+        self._anexar(produtos, estoque, fila_pedidos, ultimo_segmento + 1)
+        return produtos
+
+    # --- Registro das alterações ---
+
+    def _anexar(self, produtos, estoque, fila_pedidos, segmento):
+        """
+        Passa a registrar no log as alterações do estoque, da fila e do cadastro de produtos.
+        """
+        self._dimensoes = (estoque.linhas, estoque.colunas, estoque.altura_maxima)
+        self._segmento = segmento
+        self._arquivo = open(self._caminho_segmento(segmento), 'a', encoding='utf-8')
+        self._registros_no_segmento = 0
+        produtos.adicionar_ouvinte(self._registrar)
+        estoque.adicionar_ouvinte(self._registrar)
+        fila_pedidos.adicionar_ouvinte(self._registrar)
+
+    def _registrar(self, evento):
+        """
+        Acrescenta um registro compacto ao segmento atual do log.
+        """
+        linha = json.dumps(evento, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self._trava:
+            self._arquivo.write(linha)
+            self._registros_no_segmento += 1
+
+    def sincronizar(self):
+        """
+        Garante que todas as alterações registradas até agora estão gravadas em disco.
+        O custo é proporcional às alterações desde a última sincronização, não ao tamanho
+        do estoque. Se o segmento atual ficou grande, dispara uma compactação em segundo plano.
+        """
+        with self._trava:
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+            compactar = self._registros_no_segmento >= self.limite_registros
+        if compactar:
+            self.compactar()
+
+    # --- Compactação ---
+
+    def compactar(self, esperar=False):
+        """
+        Fecha o segmento atual e gera, em segundo plano, um novo snapshot que o contém.
+
+        Args:
+            esperar (bool, opcional): Se True, só retorna quando o snapshot estiver gravado.
+        """
+        if self._compactacao is not None and self._compactacao.is_alive():
+            # Já existe uma compactação em andamento; a próxima pega os segmentos novos.
+            if esperar:
+                self._compactacao.join()
+            return
+        with self._trava:
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+            self._arquivo.close()
+            ultimo_segmento = self._segmento
+            # As próximas alterações vão para um segmento novo.
+            self._segmento += 1
+            self._arquivo = open(self._caminho_segmento(self._segmento), 'a', encoding='utf-8')
+            self._registros_no_segmento = 0
+        self._compactacao = threading.Thread(target=self._compactar_ate, args=(ultimo_segmento,),
+                                             name='compactacao-snapshot')
+        self._compactacao.start()
+        if esperar:
+            self._compactacao.join()
+
+    def _compactar_ate(self, ultimo_segmento):
+        """
+        Aplica os segmentos até 'ultimo_segmento' sobre o snapshot anterior (em objetos
+        próprios, sem tocar no estado em uso), grava o novo snapshot e apaga os segmentos antigos.
+        """
+        try:
+            linhas, colunas, altura_maxima = self._dimensoes
+            estoque = Estoque(linhas, colunas, altura_maxima)
+            fila_pedidos = FilaPedidos()
+            produtos, base = self._carregar_base(estoque, fila_pedidos)
+            segmentos = [(n, c) for n, c in self._segmentos() if n <= ultimo_segmento]
+            for numero, caminho in segmentos:
+                if numero > base:
+                    self._reproduzir(caminho, produtos, estoque, fila_pedidos)
+
+            snapshot = {
+                'segmento': ultimo_segmento,
+                'produtos': produtos.para_serializavel(),
+                'estoque': estoque.para_serializavel(),
+                'pedidos': fila_pedidos.para_serializavel()
+            }
+            # Grava em um arquivo temporário e troca de uma vez: um snapshot nunca fica pela metade.
+            temporario = self._caminho(NOME_SNAPSHOT + '.tmp')
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporario, self._caminho(NOME_SNAPSHOT))
+
+            # Os segmentos já contidos no snapshot não são mais necessários.
+            for _, caminho in segmentos:
+                os.remove(caminho)
+        except (OSError, ValueError, KeyError) as e:
+            # Os segmentos são mantidos: a próxima compactação tenta de novo.
+            if self.saida.nivel <= ERRO:
+                self.saida.emitir(registro(ERRO, 'erro_compactacao', segmento=ultimo_segmento, erro=str(e)))
+
+    def fechar(self):
+        """
+        Sincroniza as alterações pendentes, aguarda a compactação em andamento e fecha o log.
+        """
+        self.sincronizar()
+        if self._compactacao is not None:
+            self._compactacao.join()
+        with self._trava:
+            self._arquivo.close()
+        self._trava_diretorio.liberar()
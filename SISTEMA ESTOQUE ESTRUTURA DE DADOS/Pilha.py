@@ -9,19 +9,25 @@ class Pilha:
     Implementa uma Pilha para armazenar engradados.
     A pilha tem uma capacidade máxima e só pode conter engradados do mesmo produto.
     """
-    def __init__(self):
+    __slots__ = ('engradados', 'capacidade')
+
+    def __init__(self, capacidade=5):
         """
         Inicializa uma nova Pilha vazia.
         'engradados' é uma lista que armazenará os objetos Engradado.
+
+        Args:
+            capacidade (int, opcional): O número máximo de engradados na pilha.
         """
         self.engradados = []
+        self.capacidade = capacidade
 
     def adicionar(self, engradado):
         """
         Adiciona um engradado ao topo da pilha.
 
         Regras:
-        1. A pilha não pode ter mais de 5 engradados.
+        1. A pilha não pode ter mais engradados do que a sua capacidade.
         2. Um engradado só pode ser adicionado se a pilha estiver vazia ou se o engradado
            do topo for do mesmo produto.
 
@@ -31,8 +37,8 @@ class Pilha:
         Returns:
             bool: True se o engradado foi adicionado com sucesso, False caso contrário.
         """
-        # Verifica se a capacidade máxima da pilha (5 engradados) foi atingida.
-        if len(self.engradados) < 5:
+        # Verifica se a capacidade máxima da pilha foi atingida.
+        if len(self.engradados) < self.capacidade:
             # Se a pilha está vazia ou o produto do engradado é o mesmo do topo da pilha,
             # o novo engradado é adicionado.
             if not self.engradados or self.engradados[-1].produto_codigo == engradado.produto_codigo:
@@ -69,4 +75,13 @@ class Pilha:
         Returns:
             bool: True se a pilha estiver vazia, False caso contrário.
         """
-        return len(self.engradados) == 0
\ No newline at end of file
+        return len(self.engradados) == 0
+
+    def esta_cheia(self):
+        """
+        Verifica se a pilha atingiu a capacidade máxima de engradados.
+
+        Returns:
+            bool: True se a pilha estiver cheia, False caso contrário.
+        """
+        return len(self.engradados) >= self.capacidade
\ No newline at end of file
@@ -0,0 +1,266 @@
+# Planejamento da retirada de unidades do estoque.
+# Estoque.remover_engradado retira das pilhas do produto na ordem linha a linha, o que pode
+# abrir vários engradados pela metade espalhados pelo armazém. O planejador escolhe antes,
+# sem alterar nada, de quais pilhas e engradados tirar as unidades, deixando no máximo um
+# engradado parcial. O resultado é uma lista de separação (pick list) que pode ser
+# conferida e depois executada.
+#
+# Como as pilhas seguem a regra LIFO, só o engradado do topo de cada pilha está acessível;
+# ao retirá-lo por inteiro, o de baixo passa a ser o topo. De cada pilha, então, sai um
+# "prefixo" a partir do topo: k engradados inteiros e, talvez, parte do seguinte.
+# O plano é escolhido por programação dinâmica sobre esses prefixos (uma mochila com um
+# grupo de opções por pilha), minimizando primeiro o número de engradados parciais (zero,
+# se a quantidade puder ser formada só com engradados inteiros) e depois o número de
+# engradados tocados.
+#
+# O custo é proporcional a pilhas x altura x quantidade. Acima de LIMITE_PLANO_EXATO a
+# escolha passa a ser gulosa, sem garantia de mínimo: a cada passo, retira o topo com
+# exatamente a quantidade que falta; senão, o maior topo que cabe; senão, abre o menor topo.
+from collections import deque
+
+from Log_estruturado import INFO, registro
+
+# Acima deste número de operações (pilhas x altura x quantidade), o plano é guloso.
+LIMITE_PLANO_EXATO = 1000000
+
+INFINITO = float('inf')
+
+
+class PlanejadorRetirada:
+    """
+    Monta e executa planos de retirada (listas de separação) sobre um Estoque.
+    """
+    def __init__(self, estoque):
+        """
+        Inicializa o planejador.
+
+        Args:
+            estoque (Estoque): O estoque de onde as unidades saem.
+        """
+        self.estoque = estoque
+
+    def planejar(self, produto_codigo, quantidade):
+        """
+        Planeja a retirada de 'quantidade' unidades de um produto, sem alterar o estoque.
+
+        Args:
+            produto_codigo (str): O código do produto.
+            quantidade (int): O número de unidades a retirar.
+
+        Returns:
+            dict: O plano, com 'produto_codigo', 'quantidade', 'passos' (na ordem de execução;
+                  cada passo tem 'linha', 'coluna', 'nivel', 'quantidade',
+                  'quantidade_engradado' e 'engradado_completo'), 'engradados_completos',
+                  'engradados_parciais' e 'pilhas_tocadas'. None se o estoque do produto
+                  não for suficiente.
+        """
+        # Pilhas do produto: (linha, coluna) -> engradados da base para o topo.
+        pilhas = {}
+        for linha, coluna, _, engradado in self.estoque.iter_engradados(produto_codigo):
+            pilhas.setdefault((linha, coluna), []).append(engradado)
+        if sum(e.quantidade for engradados in pilhas.values() for e in engradados) < quantidade:
+            return None
+
+        altura = max((len(engradados) for engradados in pilhas.values()), default=0)
+        if len(pilhas) * (altura + 1) * (quantidade + 1) <= LIMITE_PLANO_EXATO:
+            retiradas = self._escolher_exato(pilhas, quantidade)
+        else:
+            retiradas = self._escolher_guloso(pilhas, quantidade)
+
+        passos = []
+        for posicao, (completos, parcial) in retiradas.items():
+            engradados = pilhas[posicao]
+            for k in range(completos + (parcial > 0)):
+                nivel = len(engradados) - 1 - k
+                completo = k < completos
+                passos.append({
+                    'linha': posicao[0], 'coluna': posicao[1], 'nivel': nivel,
+                    'quantidade': engradados[nivel].quantidade if completo else parcial,
+                    'quantidade_engradado': engradados[nivel].quantidade,
+                    'engradado_completo': completo
+                })
+        return {
+            'produto_codigo': produto_codigo,
+            'quantidade': quantidade,
+            'passos': passos,
+            'engradados_completos': sum(1 for p in passos if p['engradado_completo']),
+            'engradados_parciais': sum(1 for p in passos if not p['engradado_completo']),
+            'pilhas_tocadas': len({(p['linha'], p['coluna']) for p in passos}),
+        }
+
+    @staticmethod
+    def _escolher_exato(pilhas, quantidade):
+        """
+        Escolhe o prefixo de cada pilha por programação dinâmica.
+
+        Para cada total q de unidades: inteiros[q] é o menor número de engradados inteiros
+        que somam exatamente q; com_parcial[q] é o menor número de engradados tocados para
+        retirar q unidades abrindo exatamente um engradado. Uma pilha contribui com os k
+        engradados do topo (soma prefixo[k]) e, em com_parcial, também com k inteiros mais
+        1 a z-1 unidades do engradado seguinte (de z unidades); o mínimo sobre essa faixa
+        de totais vem de uma janela deslizante.
+
+        Returns:
+            dict: (linha, coluna) -> (engradados inteiros, unidades do parcial ou 0),
+                  só das pilhas tocadas.
+        """
+        inteiros = [0] + [INFINITO] * quantidade
+        com_parcial = [INFINITO] * (quantidade + 1)
+        escolhas = []
+        for posicao, engradados in pilhas.items():
+            # Somas a partir do topo: prefixo[k] = unidades dos k engradados de cima.
+            tamanhos = [e.quantidade for e in reversed(engradados)]
+            prefixo = [0]
+            for tamanho in tamanhos:
+                prefixo.append(prefixo[-1] + tamanho)
+            novo_inteiros = inteiros[:]
+            novo_parcial = com_parcial[:]
+            # Sem escolha registrada, a pilha não é tocada (k = 0).
+            escolha_inteiros = {}
+            escolha_parcial = {}
+            for k in range(len(tamanhos) + 1):
+                base = prefixo[k]
+                if k and base <= quantidade:
+                    for q in range(base, quantidade + 1):
+                        custo = inteiros[q - base] + k
+                        if custo < novo_inteiros[q]:
+                            novo_inteiros[q] = custo
+                            escolha_inteiros[q] = k
+                        custo = com_parcial[q - base] + k
+                        if custo < novo_parcial[q]:
+                            novo_parcial[q] = custo
+                            escolha_parcial[q] = (k, None)
+                if k == len(tamanhos) or tamanhos[k] < 2 or base + 1 > quantidade:
+                    continue
+                # k inteiros e r = 1..z-1 unidades do próximo: vem de inteiros[q - base - r].
+                z = tamanhos[k]
+                janela = deque()
+                for q in range(base + 1, quantidade + 1):
+                    entra = q - base - 1
+                    while janela and inteiros[janela[-1]] >= inteiros[entra]:
+                        janela.pop()
+                    janela.append(entra)
+                    if janela[0] < q - base - (z - 1):
+                        janela.popleft()
+                    origem = janela[0]
+                    custo = inteiros[origem] + k + 1
+                    if custo < novo_parcial[q]:
+                        novo_parcial[q] = custo
+                        escolha_parcial[q] = (k, origem)
+            inteiros, com_parcial = novo_inteiros, novo_parcial
+            escolhas.append((posicao, prefixo, escolha_inteiros, escolha_parcial))
+
+        # Refaz as escolhas da última pilha para a primeira.
+        q, parcial_aberto = quantidade, inteiros[quantidade] == INFINITO
+        retiradas = {}
+        for posicao, prefixo, escolha_inteiros, escolha_parcial in reversed(escolhas):
+            if parcial_aberto:
+                k, origem = escolha_parcial.get(q, (0, None))
+                if origem is None:
+                    if k:
+                        retiradas[posicao] = (k, 0)
+                    q -= prefixo[k]
+                else:
+                    retiradas[posicao] = (k, q - prefixo[k] - origem)
+                    q, parcial_aberto = origem, False
+            else:
+                k = escolha_inteiros.get(q, 0)
+                if k:
+                    retiradas[posicao] = (k, 0)
+                q -= prefixo[k]
+        return {posicao: retiradas[posicao] for posicao in pilhas if posicao in retiradas}
+
+    @staticmethod
+    def _escolher_guloso(pilhas, quantidade):
+        """
+        Escolhe os engradados topo a topo (veja o comentário do módulo), sem garantia de mínimo.
+
+        Returns:
+            dict: (linha, coluna) -> (engradados inteiros, unidades do parcial ou 0).
+        """
+        alturas = {posicao: len(engradados) for posicao, engradados in pilhas.items()}
+        retiradas = {}
+        restante = quantidade
+        while restante > 0:
+            topos = [(posicao, pilhas[posicao][altura - 1].quantidade)
+                     for posicao, altura in alturas.items() if altura]
+            exato = next((topo for topo in topos if topo[1] == restante), None)
+            cabem = [topo for topo in topos if topo[1] < restante]
+            if exato is not None:
+                posicao, retirar = exato
+            elif cabem:
+                posicao, retirar = max(cabem, key=lambda topo: topo[1])
+            else:
+                posicao, _ = min(topos, key=lambda topo: topo[1])
+                completos, _ = retiradas.get(posicao, (0, 0))
+                retiradas[posicao] = (completos, restante)
+                break
+            completos, _ = retiradas.get(posicao, (0, 0))
+            retiradas[posicao] = (completos + 1, 0)
+            alturas[posicao] -= 1
+            restante -= retirar
+        return retiradas
+
+    def planejar_lote(self, pedidos):
+        """
+        Planeja a retirada de vários pedidos: a demanda é somada por produto e cada
+        produto recebe um único plano.
+
+        Args:
+            pedidos (iterable): Os pedidos (objetos Pedido).
+
+        Returns:
+            dict: Produto -> plano (como em planejar; None se o estoque não for suficiente).
+        """
+        demanda = {}
+        for pedido in pedidos:
+            demanda[pedido.codigo_produto] = demanda.get(pedido.codigo_produto, 0) + pedido.quantidade
+        return {codigo: self.planejar(codigo, quantidade) for codigo, quantidade in demanda.items()}
+
+    def executar(self, plano, quantidade_reservada=0):
+        """
+        Executa um plano de retirada no estoque, passo a passo.
+
+        Args:
+            plano (dict): Um plano retornado por planejar.
+            quantidade_reservada (int, opcional): Unidades do plano que vêm de reservas do
+                                                  produto (veja Estoque.remover_engradado).
+
+        Returns:
+            bool: True se o plano foi executado, False se o saldo disponível não permite a retirada.
+
+        Raises:
+            ValueError: Se o estoque mudou desde o planejamento (um passo não bate com a
+                        pilha ou retirou menos unidades do que o planejado).
+        """
+        codigo = plano['produto_codigo']
+        quantidade_reservada = min(quantidade_reservada, self.estoque.reservado(codigo))
+        if self.estoque.disponivel(codigo) + quantidade_reservada < plano['quantidade']:
+            return False
+        # Confere o plano inteiro antes de mexer em qualquer pilha: simulando as retiradas,
+        # cada passo tem que encontrar no topo o mesmo engradado do planejamento.
+        alturas = {}
+        for passo in plano['passos']:
+            posicao = (passo['linha'], passo['coluna'])
+            pilha = self.estoque.obter_pilha(*posicao)
+            if posicao not in alturas:
+                alturas[posicao] = len(pilha.engradados) if pilha is not None else 0
+            nivel = passo['nivel']
+            if (alturas[posicao] != nivel + 1
+                    or pilha.engradados[nivel].produto_codigo != codigo
+                    or pilha.engradados[nivel].quantidade != passo['quantidade_engradado']):
+                raise ValueError(f"O estoque mudou desde o planejamento (posição [{passo['linha']}][{passo['coluna']}]).")
+            if passo['engradado_completo']:
+                alturas[posicao] -= 1
+        if quantidade_reservada:
+            self.estoque.liberar_reserva(codigo, quantidade_reservada)
+        saida = self.estoque.saida
+        for passo in plano['passos']:
+            linha, coluna = passo['linha'], passo['coluna']
+            retiradas = self.estoque.retirar_do_topo(linha, coluna, passo['quantidade'])
+            if retiradas != passo['quantidade']:
+                raise ValueError(f"O estoque mudou durante a retirada (posição [{linha}][{coluna}]).")
+            if saida.nivel <= INFO:
+                saida.emitir(registro(INFO, 'engradado_retirado' if passo['engradado_completo'] else 'unidades_retiradas',
+                                      linha=linha, coluna=coluna, produto_codigo=codigo, quantidade=retiradas))
+        return True
@@ -0,0 +1,67 @@
+# Políticas de escalonamento da FilaPedidos.
+# Uma política decide a ordem em que os pedidos pendentes são atendidos. Ela fornece:
+# - chave(pedido): a chave de ordenação do pedido (a menor é atendida primeiro; empates
+#   são desfeitos pelo número do pedido, isto é, pela ordem de chegada);
+# - pular_bloqueados: se True, a fila passa adiante dos produtos cujo próximo pedido não
+#   pode ser atendido agora, em vez de ficar parada neles.
+# A chave de um pedido não pode mudar enquanto ele estiver na fila.
+
+
+class PoliticaFIFO:
+    """
+    Ordem de chegada: o primeiro pedido registrado é o primeiro atendido.
+    """
+    pular_bloqueados = False
+
+    def chave(self, pedido):
+        return pedido.numero
+
+
+class PoliticaDataSolicitacao:
+    """
+    Data de solicitação mais antiga primeiro; na mesma data, ordem de chegada.
+    """
+    pular_bloqueados = False
+
+    def chave(self, pedido):
+        return pedido.data_solicitacao
+
+
+class PoliticaPrioridadeCliente:
+    """
+    Prioridade por cliente (solicitante): maior prioridade primeiro; na mesma prioridade,
+    ordem de chegada.
+    """
+    pular_bloqueados = False
+
+    def __init__(self, prioridades, prioridade_padrao=0):
+        """
+        Args:
+            prioridades (dict): Prioridade (int) de cada solicitante.
+            prioridade_padrao (int, opcional): Prioridade dos solicitantes fora do dicionário.
+        """
+        self.prioridades = dict(prioridades)
+        self.prioridade_padrao = prioridade_padrao
+
+    def chave(self, pedido):
+        return -self.prioridades.get(pedido.solicitante, self.prioridade_padrao)
+
+
+class PoliticaAtendivelPrimeiro:
+    """
+    Atende primeiro o que pode ser atendido agora: segue a ordem de outra política, mas
+    passa adiante de um produto cujo próximo pedido não cabe no saldo disponível.
+    Dentro de um mesmo produto a ordem é mantida, para que um pedido grande não seja
+    ultrapassado para sempre pelos pequenos.
+    """
+    pular_bloqueados = True
+
+    def __init__(self, base=None):
+        """
+        Args:
+            base (opcional): A política que define a ordem (FIFO, se não for informada).
+        """
+        self.base = base if base is not None else PoliticaFIFO()
+
+    def chave(self, pedido):
+        return self.base.chave(pedido)
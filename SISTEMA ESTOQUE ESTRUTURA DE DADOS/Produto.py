@@ -1,7 +1,24 @@
 # Importa datetime para manipular datas de validade e fabricação.
 # Importa json para serializar e desserializar os dados dos produtos para/de arquivos.
 from datetime import datetime
+from functools import lru_cache
 import json
+from Log_estruturado import SAIDA_NULA, AVISO, registro
+
+
+# Os arquivos repetem muito as mesmas datas (milhares de pedidos no mesmo dia), e
+# datetime.strptime é lento: cada texto é convertido uma vez e o resultado é reaproveitado
+# (um datetime não pode ser alterado, então pode ser compartilhado).
+@lru_cache(maxsize=4096)
+def data_de_texto(texto):
+    """
+    Converte uma data no formato "YYYY-MM-DD" em datetime.
+
+    Raises:
+        ValueError: Se o texto não estiver no formato.
+    """
+    return datetime.strptime(texto, "%Y-%m-%d")
+
 
 # A classe Produto define a estrutura de dados para cada item cadastrado no sistema.
 # Contém todas as informações relevantes de um produto.
@@ -9,7 +26,15 @@ class Produto:
     """
     Representa um produto com todos os seus atributos.
     """
-    def __init__(self , codigo , lote , nome , peso , data_validade , data_fabricacao , preco_compra , preco_venda , fornecedor , fabricante , categoria, capacidade_engradado=None):
+    # Atributos fixos em __slots__ para que cada produto não carregue um __dict__.
+    # As datas ficam em _data_validade e _data_fabricacao: como texto até o primeiro acesso
+    # (veja converter_datas) e como datetime depois.
+    __slots__ = ('codigo', 'lote', 'nome', 'peso', '_data_validade', '_data_fabricacao',
+                 'preco_compra', 'preco_venda', 'fornecedor', 'fabricante', 'categoria',
+                 'capacidade_engradado')
+
+    def __init__(self , codigo , lote , nome , peso , data_validade , data_fabricacao , preco_compra , preco_venda , fornecedor , fabricante , categoria, capacidade_engradado=None,
+                 converter_datas=True):
         """
         Inicializa um novo objeto Produto.
 
@@ -17,14 +42,21 @@ class Produto:
             Todos os atributos do produto, como código, nome, datas, etc.
             capacidade_engradado (int, opcional): Define o máximo de itens que um engradado
                                                   deste produto pode conter.
+            converter_datas (bool, opcional): Se False, as datas em texto só são convertidas
+                                              (e validadas) no primeiro acesso. Usado ao ler
+                                              dados gravados pelo próprio sistema.
         """
         self.codigo = codigo
         self.lote = lote
         self.nome = nome 
         self.peso = peso
         # Converte as strings de data (formato "YYYY-MM-DD") para objetos datetime.
-        self.data_validade = datetime.strptime(data_validade , "%Y-%m-%d")
-        self.data_fabricacao = datetime.strptime(data_fabricacao , "%Y-%m-%d")
+        # Datas que já chegam como datetime (por exemplo, de um snapshot binário) são usadas como estão.
+        if converter_datas:
+            data_validade = data_validade if isinstance(data_validade, datetime) else data_de_texto(data_validade)
+            data_fabricacao = data_fabricacao if isinstance(data_fabricacao, datetime) else data_de_texto(data_fabricacao)
+        self._data_validade = data_validade
+        self._data_fabricacao = data_fabricacao
         self.preco_compra = preco_compra
         self.preco_venda = preco_venda
         self.fornecedor = fornecedor
@@ -32,23 +64,46 @@ class Produto:
         self.categoria = categoria
         # Atributo para definir a capacidade máxima de um engradado para este produto.
         self.capacidade_engradado = capacidade_engradado 
-        
+
+    @property
+    def data_validade(self):
+        data = self._data_validade
+        if isinstance(data, str):
+            data = self._data_validade = data_de_texto(data)
+        return data
+
+    @data_validade.setter
+    def data_validade(self, data):
+        self._data_validade = data
+
+    @property
+    def data_fabricacao(self):
+        data = self._data_fabricacao
+        if isinstance(data, str):
+            data = self._data_fabricacao = data_de_texto(data)
+        return data
+
+    @data_fabricacao.setter
+    def data_fabricacao(self, data):
+        self._data_fabricacao = data
+
     def para_dicionario(self):
         """
         Converte o objeto Produto em um dicionário.
         Isso é útil para salvar os dados em formato JSON.
-        As datas são convertidas de volta para strings.
+        As datas são convertidas de volta para strings (as que nunca foram lidas já estão em texto).
 
         Returns:
             dict: Um dicionário com os atributos do produto.
         """
+        data_validade, data_fabricacao = self._data_validade, self._data_fabricacao
         return {
             'codigo': self.codigo, 
             'lote': self.lote,
             'nome': self.nome,
             'peso': self.peso,
-            'data_validade': self.data_validade.strftime("%Y-%m-%d"),
-            'data_fabricacao': self.data_fabricacao.strftime("%Y-%m-%d"),
+            'data_validade': data_validade if isinstance(data_validade, str) else data_validade.strftime("%Y-%m-%d"),
+            'data_fabricacao': data_fabricacao if isinstance(data_fabricacao, str) else data_fabricacao.strftime("%Y-%m-%d"),
             'preco_compra': self.preco_compra,
             'preco_venda': self.preco_venda,
             'fornecedor': self.fornecedor,
@@ -57,6 +112,27 @@ class Produto:
             'capacidade_engradado': self.capacidade_engradado
         }
 
+    @classmethod
+    def de_dicionario(cls, d):
+        """
+        Cria um Produto a partir de um dicionário no formato de para_dicionario. As datas
+        só são convertidas quando forem usadas.
+
+        Args:
+            d (dict): O dicionário com os dados do produto.
+
+        Returns:
+            Produto: O produto recriado.
+        """
+        # .get() é usado para carregar o atributo 'capacidade_engradado'.
+        # Isso garante compatibilidade com arquivos antigos que não possuem esse campo.
+        return cls(
+            d['codigo'], d['lote'], d['nome'], d['peso'], d['data_validade'],
+            d['data_fabricacao'], d['preco_compra'], d['preco_venda'],
+            d['fornecedor'], d['fabricante'], d['categoria'],
+            capacidade_engradado=d.get('capacidade_engradado'), converter_datas=False
+        )
+
 def salvar_produtos(lista_produtos, nome_arquivo):
     """
     Salva uma lista de objetos Produto em um arquivo JSON.
@@ -73,12 +149,14 @@ def salvar_produtos(lista_produtos, nome_arquivo):
         # indent=4 formata o JSON para ser mais legível.
         json.dump(lista_dict, f, ensure_ascii=False, indent=4)
 
-def carregar_produtos(nome_arquivo):
+def carregar_produtos(nome_arquivo, saida=None):
     """
     Carrega produtos de um arquivo JSON e os converte em uma lista de objetos Produto.
 
     Args:
         nome_arquivo (str): O caminho do arquivo de onde os dados serão carregados.
+        saida (opcional): Para onde vai o aviso de arquivo ausente (veja Log_estruturado.py).
+                          Se omitida, o aviso é impresso na tela.
 
     Returns:
         list: Uma lista de objetos Produto.
@@ -91,19 +169,148 @@ def carregar_produtos(nome_arquivo):
             lista_dict = json.load(f)
             # Itera sobre cada dicionário na lista.
             for d in lista_dict:
-                # .get() é usado para carregar o novo atributo 'capacidade_engradado'.
-                # Isso garante compatibilidade com arquivos antigos que não possuem esse campo.
-                capacidade = d.get('capacidade_engradado') 
                 # Cria um objeto Produto a partir do dicionário.
-                produto = Produto(
-                    d['codigo'], d['lote'], d['nome'], d['peso'], d['data_validade'],
-                    d['data_fabricacao'], d['preco_compra'], d['preco_venda'],
-                    d['fornecedor'], d['fabricante'], d['categoria'],
-                    capacidade_engradado=capacidade
-                )
-                lista_produtos.append(produto)
+                lista_produtos.append(Produto.de_dicionario(d))
     # Se o arquivo não for encontrado, o programa continua com uma lista vazia.
     except FileNotFoundError:
-        print(f"Arquivo {nome_arquivo} não encontrado. Criando novo arquivo.")
+        if saida is None:
+            print(f"Arquivo {nome_arquivo} não encontrado. Criando novo arquivo.")
+        elif saida.nivel <= AVISO:
+            saida.emitir(registro(AVISO, 'arquivo_produtos_ausente', arquivo=nome_arquivo))
     # Retorna a lista de produtos (pode estar vazia se o arquivo não existia).
-    return lista_produtos
\ No newline at end of file
+    return lista_produtos
+
+# A classe CatalogoProdutos guarda os produtos cadastrados em tabelas hash (dicionários),
+# substituindo as buscas lineares em uma lista de produtos.
+# - Índice principal: código -> Produto (busca, inclusão e verificação em O(1)).
+# - Índices secundários: categoria, fornecedor e fabricante -> produtos com aquele valor.
+# A ordem de cadastro é preservada, pois os dicionários do Python mantêm a ordem de inserção.
+class CatalogoProdutos:
+    """
+    Catálogo de produtos indexado por código, categoria, fornecedor e fabricante.
+    """
+    def __init__(self, produtos=()):
+        """
+        Inicializa o catálogo, opcionalmente com produtos já existentes.
+
+        Args:
+            produtos (iterable, opcional): Produtos a serem cadastrados no catálogo.
+        """
+        self._por_codigo = {}
+        self._por_categoria = {}
+        self._por_fornecedor = {}
+        self._por_fabricante = {}
+        # Funções notificadas a cada produto cadastrado (veja adicionar_ouvinte).
+        self._ouvintes = []
+        for produto in produtos:
+            self.adicionar(produto)
+
+    def adicionar_ouvinte(self, ouvinte):
+        """
+        Registra uma função que será chamada a cada produto cadastrado, com o evento
+        {'tipo': 'produto_cadastrado', 'produto': dicionário no formato de Produto.para_dicionario}.
+
+        Args:
+            ouvinte (callable): A função a ser chamada com cada evento.
+        """
+        self._ouvintes.append(ouvinte)
+
+    def remover_ouvinte(self, ouvinte):
+        """
+        Cancela o registro de uma função feito com adicionar_ouvinte.
+        """
+        self._ouvintes.remove(ouvinte)
+
+    def adicionar(self, produto):
+        """
+        Cadastra um produto no catálogo e em todos os índices.
+
+        Args:
+            produto (Produto): O produto a ser cadastrado.
+
+        Returns:
+            bool: True se o produto foi cadastrado, False se já existia um produto com o mesmo código.
+        """
+        if produto.codigo in self._por_codigo:
+            return False
+        self._por_codigo[produto.codigo] = produto
+        # Nos índices secundários, cada valor aponta para um dicionário código -> Produto.
+        self._por_categoria.setdefault(produto.categoria, {})[produto.codigo] = produto
+        self._por_fornecedor.setdefault(produto.fornecedor, {})[produto.codigo] = produto
+        self._por_fabricante.setdefault(produto.fabricante, {})[produto.codigo] = produto
+        for ouvinte in self._ouvintes:
+            ouvinte({'tipo': 'produto_cadastrado', 'produto': produto.para_dicionario()})
+        return True
+
+    def obter(self, codigo, padrao=None):
+        """
+        Busca um produto pelo código em O(1).
+
+        Args:
+            codigo (str): O código do produto.
+            padrao (opcional): Valor retornado se o código não estiver cadastrado.
+
+        Returns:
+            Produto: O produto encontrado, ou 'padrao'.
+        """
+        return self._por_codigo.get(codigo, padrao)
+
+    def por_categoria(self, categoria):
+        """
+        Retorna os produtos de uma categoria, na ordem de cadastro.
+        """
+        return list(self._por_categoria.get(categoria, {}).values())
+
+    def por_fornecedor(self, fornecedor):
+        """
+        Retorna os produtos de um fornecedor, na ordem de cadastro.
+        """
+        return list(self._por_fornecedor.get(fornecedor, {}).values())
+
+    def por_fabricante(self, fabricante):
+        """
+        Retorna os produtos de um fabricante, na ordem de cadastro.
+        """
+        return list(self._por_fabricante.get(fabricante, {}).values())
+
+    def __contains__(self, codigo):
+        """
+        Permite usar "codigo in catalogo" para verificar se um código está cadastrado.
+        """
+        return codigo in self._por_codigo
+
+    def __iter__(self):
+        """
+        Percorre os produtos na ordem de cadastro.
+        """
+        return iter(self._por_codigo.values())
+
+    def __len__(self):
+        return len(self._por_codigo)
+
+    def para_serializavel(self):
+        """
+        Converte o catálogo em uma lista de dicionários, no formato do arquivo JSON.
+        """
+        return [produto.para_dicionario() for produto in self]
+
+    def salvar(self, nome_arquivo):
+        """
+        Salva o catálogo em um arquivo JSON (mesmo formato de salvar_produtos).
+        """
+        salvar_produtos(self, nome_arquivo)
+
+    @classmethod
+    def carregar(cls, nome_arquivo, saida=SAIDA_NULA):
+        """
+        Carrega um catálogo de um arquivo JSON (mesmo formato de carregar_produtos).
+
+        Args:
+            nome_arquivo (str): O caminho do arquivo.
+            saida (opcional): Para onde vai o aviso de arquivo ausente (veja Log_estruturado.py);
+                              por padrão, é descartado.
+
+        Returns:
+            CatalogoProdutos: O catálogo com os produtos do arquivo (vazio se o arquivo não existir).
+        """
+        return cls(carregar_produtos(nome_arquivo, saida))
@@ -0,0 +1,480 @@
+# Rede de estoques: vários armazéns (cada um um Estoque, possivelmente em um processo
+# próprio) atrás de um roteador, a RedeEstoques.
+#
+# Cada armazém da rede é acessado por um "ponto" com a mesma interface:
+# - pedir(metodo, *args): envia a chamada de um método do Estoque e retorna uma resposta,
+#   cujo resultado() espera e devolve o valor (ou levanta a exceção do armazém);
+# - pedir_varios(chamadas): envia várias chamadas [(metodo, args), ...] de uma vez; o
+#   resultado() é a lista dos valores, na mesma ordem;
+# - fechar(): libera o armazém.
+# EstoqueLocal executa a chamada na hora, no próprio processo. EstoqueEmProcesso mantém o
+# Estoque em outro processo e conversa com ele por um Pipe: a rede envia a chamada a todos
+# os armazéns antes de esperar as respostas, então os armazéns trabalham ao mesmo tempo
+# (scatter-gather) e a vazão cresce com o número de processos (e de CPUs).
+# Cada chamada custa uma ida e volta pelo Pipe em cada armazém, o que domina as consultas
+# pequenas (como contar um produto): com mais armazéns que CPUs, a vazão dessas chamadas
+# cai. As consultas de vários produtos (contar_produtos, saldos_produtos) vão numa única
+# ida e volta por armazém.
+#
+# Roteamento dos engradados: cada produto tem um armazém de preferência (o último que o
+# aceitou), para que as pilhas do produto fiquem juntas. Um produto novo vai para o próximo
+# armazém, em rodízio, entre os que ainda têm pilhas vazias. Um armazém que recusa um
+# engradado está sem pilhas vazias (o Estoque só recusa nesse caso) e não recebe produtos
+# novos até que alguma retirada libere espaço nele; os engradados recusados seguem para os
+# outros armazéns.
+#
+# Retirada: a quantidade de um pedido é dividida entre os armazéns com saldo, na ordem dada
+# pela política de divisão:
+# - MAIS_PROXIMO: o armazém mais perto do destino (pelas localizações informadas);
+# - MAIOR_SALDO: o armazém com mais unidades disponíveis do produto;
+# - VALIDADE: o armazém cujo lote vence primeiro (pela validade no catálogo de cada um).
+# A retirada é feita em duas fases: cada armazém primeiro reserva a sua parte e, só se
+# todos aceitarem, as partes reservadas são retiradas. Se algum recusar, as reservas já
+# feitas são desfeitas e nenhum armazém é alterado.
+# A rede supõe que os armazéns só são alterados por ela.
+import math
+import multiprocessing
+from datetime import datetime
+
+from Estoque import Estoque, POLITICA_PRIMEIRA_POSICAO
+from Produto import CatalogoProdutos
+
+# Nome reservado da mensagem que leva várias chamadas ao processo de um armazém.
+CHAMADAS_EM_LOTE = '__lote__'
+
+DIVISAO_MAIS_PROXIMO = 'mais_proximo'
+DIVISAO_MAIOR_SALDO = 'maior_saldo'
+DIVISAO_VALIDADE = 'validade'
+POLITICAS_DIVISAO = (DIVISAO_MAIS_PROXIMO, DIVISAO_MAIOR_SALDO, DIVISAO_VALIDADE)
+
+
+def _executar_lote(estoque, chamadas):
+    """
+    Executa as chamadas [(metodo, args), ...] no estoque, em ordem.
+
+    Returns:
+        list: O valor de cada chamada.
+    """
+    return [getattr(estoque, metodo)(*args) for metodo, args in chamadas]
+
+
+class _RespostaPronta:
+    """
+    Resposta de uma chamada já executada.
+    """
+    __slots__ = ('_valor', '_erro')
+
+    def __init__(self, valor=None, erro=None):
+        self._valor = valor
+        self._erro = erro
+
+    def resultado(self):
+        if self._erro is not None:
+            raise self._erro
+        return self._valor
+
+
+class EstoqueLocal:
+    """
+    Ponto da rede para um Estoque no próprio processo.
+    """
+    def __init__(self, estoque):
+        """
+        Args:
+            estoque (Estoque): O estoque do armazém.
+        """
+        self.estoque = estoque
+
+    def pedir(self, metodo, *args):
+        try:
+            return _RespostaPronta(getattr(self.estoque, metodo)(*args))
+        except Exception as erro:
+            return _RespostaPronta(erro=erro)
+
+    def pedir_varios(self, chamadas):
+        try:
+            return _RespostaPronta(_executar_lote(self.estoque, chamadas))
+        except Exception as erro:
+            return _RespostaPronta(erro=erro)
+
+    def fechar(self):
+        pass
+
+
+def _servir(conexao, linhas, colunas, altura_maxima, politica_alocacao, produtos):
+    """
+    Laço do processo de um armazém: executa as chamadas recebidas pelo Pipe, em ordem,
+    até receber None.
+    """
+    estoque = Estoque(linhas, colunas, altura_maxima, politica_alocacao)
+    if produtos is not None:
+        estoque.vincular_catalogo(CatalogoProdutos(produtos))
+    while True:
+        mensagem = conexao.recv()
+        if mensagem is None:
+            break
+        metodo, args = mensagem
+        try:
+            if metodo == CHAMADAS_EM_LOTE:
+                resposta = (True, _executar_lote(estoque, args))
+            else:
+                resposta = (True, getattr(estoque, metodo)(*args))
+        except Exception as erro:
+            resposta = (False, erro)
+        conexao.send(resposta)
+    conexao.close()
+
+
+class _RespostaPendente:
+    """
+    Resposta de uma chamada enviada a um EstoqueEmProcesso. As respostas chegam pelo Pipe
+    na ordem das chamadas; pedir o resultado de uma recebe também as anteriores.
+    """
+    __slots__ = ('_ponto', '_numero')
+
+    def __init__(self, ponto, numero):
+        self._ponto = ponto
+        self._numero = numero
+
+    def resultado(self):
+        ok, valor = self._ponto._receber(self._numero)
+        if not ok:
+            raise valor
+        return valor
+
+
+class EstoqueEmProcesso:
+    """
+    Ponto da rede para um Estoque mantido em um processo próprio.
+    """
+    def __init__(self, linhas=8, colunas=5, altura_maxima=5, politica_alocacao=POLITICA_PRIMEIRA_POSICAO,
+                 produtos=None, contexto=None):
+        """
+        Inicia o processo do armazém com um estoque vazio.
+
+        Args:
+            linhas, colunas, altura_maxima, politica_alocacao: Como em Estoque.
+            produtos (iterable, opcional): Produtos do catálogo do armazém, vinculado ao
+                                           estoque (necessário para a política VALIDADE).
+            contexto (opcional): Contexto do multiprocessing ('spawn', 'fork'...); o padrão
+                                 da plataforma, se omitido.
+        """
+        contexto = multiprocessing.get_context(contexto)
+        self._conexao, conexao_filho = contexto.Pipe()
+        produtos = list(produtos) if produtos is not None else None
+        self._processo = contexto.Process(target=_servir, name='armazem', daemon=True,
+                                          args=(conexao_filho, linhas, colunas, altura_maxima,
+                                                politica_alocacao, produtos))
+        self._processo.start()
+        conexao_filho.close()
+        self._enviadas = 0
+        self._recebidas = 0
+        # Respostas já lidas do Pipe que ainda não foram pedidas, por número da chamada.
+        self._respostas = {}
+
+    def pedir(self, metodo, *args):
+        self._conexao.send((metodo, args))
+        self._enviadas += 1
+        return _RespostaPendente(self, self._enviadas)
+
+    def pedir_varios(self, chamadas):
+        return self.pedir(CHAMADAS_EM_LOTE, *chamadas)
+
+    def _receber(self, numero):
+        while self._recebidas < numero:
+            self._recebidas += 1
+            self._respostas[self._recebidas] = self._conexao.recv()
+        return self._respostas.pop(numero)
+
+    def fechar(self):
+        """
+        Espera as respostas pendentes e encerra o processo do armazém.
+        """
+        if self._processo is None:
+            return
+        while self._recebidas < self._enviadas:
+            self._recebidas += 1
+            self._conexao.recv()
+        self._respostas.clear()
+        self._conexao.send(None)
+        self._processo.join()
+        self._conexao.close()
+        self._processo = None
+
+
+class RedeEstoques:
+    """
+    Roteia engradados e retiradas entre vários armazéns (estoques).
+    """
+    def __init__(self, estoques, nomes=None, localizacoes=None, politica_divisao=DIVISAO_MAIOR_SALDO):
+        """
+        Args:
+            estoques (list): Os armazéns: objetos Estoque (usados no próprio processo) ou
+                             pontos como EstoqueEmProcesso.
+            nomes (list, opcional): Nome de cada armazém (padrão: 'armazem-0', 'armazem-1'...).
+            localizacoes (list, opcional): Coordenadas (x, y) de cada armazém, usadas pela
+                                           política MAIS_PROXIMO.
+            politica_divisao (str, opcional): A política padrão de remover_engradado, uma de
+                                              POLITICAS_DIVISAO.
+
+        Raises:
+            ValueError: Se a rede não tiver armazéns, as listas tiverem tamanhos diferentes
+                        ou a política for desconhecida.
+        """
+        if not estoques:
+            raise ValueError("A rede precisa de pelo menos um estoque.")
+        self._pontos = [EstoqueLocal(e) if isinstance(e, Estoque) else e for e in estoques]
+        total = len(self._pontos)
+        self.nomes = list(nomes) if nomes is not None else [f"armazem-{i}" for i in range(total)]
+        self.localizacoes = list(localizacoes) if localizacoes is not None else None
+        if len(self.nomes) != total or (self.localizacoes is not None and len(self.localizacoes) != total):
+            raise ValueError("Informe um nome e uma localização para cada estoque.")
+        self._validar_politica(politica_divisao)
+        self.politica_divisao = politica_divisao
+        # Armazém de preferência de cada produto (o último que aceitou um engradado dele).
+        self._preferido = {}
+        # Armazéns que recusaram engradados: sem pilhas vazias, e os produtos recusados.
+        self._sem_pilha_vazia = [False] * total
+        self._recusados = [set() for _ in range(total)]
+        self._proximo_rodizio = 0
+
+    def __len__(self):
+        return len(self._pontos)
+
+    @staticmethod
+    def _validar_politica(politica):
+        if politica not in POLITICAS_DIVISAO:
+            raise ValueError(f"Política de divisão desconhecida: {politica}")
+
+    def _em_todos(self, metodo, *args):
+        """
+        Envia a mesma chamada a todos os armazéns e só então espera as respostas.
+
+        Returns:
+            list: O resultado de cada armazém, na ordem da rede.
+        """
+        respostas = [ponto.pedir(metodo, *args) for ponto in self._pontos]
+        return [resposta.resultado() for resposta in respostas]
+
+    def _em_todos_varios(self, chamadas):
+        """
+        Envia as mesmas chamadas [(metodo, args), ...] a todos os armazéns, numa única
+        mensagem por armazém, e só então espera as respostas.
+
+        Returns:
+            list: Para cada armazém, na ordem da rede, a lista dos resultados das chamadas.
+        """
+        respostas = [ponto.pedir_varios(chamadas) for ponto in self._pontos]
+        return [resposta.resultado() for resposta in respostas]
+
+    # --- Entrada de engradados ---
+
+    def _escolher(self, produto_codigo):
+        """
+        Escolhe o armazém que deve receber o próximo engradado do produto.
+
+        Returns:
+            int: O índice do armazém, ou None se todos já recusaram o produto.
+        """
+        preferido = self._preferido.get(produto_codigo)
+        if preferido is not None and produto_codigo not in self._recusados[preferido]:
+            return preferido
+        total = len(self._pontos)
+        # Primeiro os armazéns com pilhas vazias, em rodízio; depois os que ainda podem ter
+        # uma pilha do produto com espaço.
+        for exige_pilha_vazia in (True, False):
+            for deslocamento in range(total):
+                indice = (self._proximo_rodizio + deslocamento) % total
+                if produto_codigo in self._recusados[indice]:
+                    continue
+                if exige_pilha_vazia and self._sem_pilha_vazia[indice]:
+                    continue
+                self._proximo_rodizio = (indice + 1) % total
+                self._preferido[produto_codigo] = indice
+                return indice
+        return None
+
+    def adicionar_engradados(self, engradados):
+        """
+        Distribui vários engradados entre os armazéns: cada armazém recebe a sua parte de uma
+        vez e todos trabalham ao mesmo tempo. Os recusados são redistribuídos.
+
+        Args:
+            engradados (iterable): Os engradados a serem adicionados.
+
+        Returns:
+            list: Os engradados que não couberam em nenhum armazém.
+        """
+        restantes = list(engradados)
+        sem_lugar = []
+        while restantes:
+            partes = {}
+            for engradado in restantes:
+                indice = self._escolher(engradado.produto_codigo)
+                if indice is None:
+                    sem_lugar.append(engradado)
+                else:
+                    partes.setdefault(indice, []).append(engradado)
+            respostas = [(indice, self._pontos[indice].pedir('adicionar_engradados', parte))
+                         for indice, parte in partes.items()]
+            restantes = []
+            for indice, resposta in respostas:
+                recusados = resposta.resultado()
+                if recusados:
+                    self._sem_pilha_vazia[indice] = True
+                    for engradado in recusados:
+                        self._recusados[indice].add(engradado.produto_codigo)
+                        if self._preferido.get(engradado.produto_codigo) == indice:
+                            del self._preferido[engradado.produto_codigo]
+                    restantes.extend(recusados)
+        return sem_lugar
+
+    def adicionar_engradado(self, engradado):
+        """
+        Adiciona um engradado ao armazém escolhido pelo roteamento.
+
+        Returns:
+            bool: True se adicionado, False se nenhum armazém tiver espaço.
+        """
+        return not self.adicionar_engradados([engradado])
+
+    # --- Consultas ---
+
+    def saldos(self, produto_codigo):
+        """
+        Unidades disponíveis (sem as reservadas) do produto em cada armazém, pela ordem da rede.
+        """
+        return self._em_todos('disponivel', produto_codigo)
+
+    def contar_por_produto(self, produto_codigo):
+        """
+        Total de unidades do produto na rede, somando as contagens feitas ao mesmo tempo
+        em todos os armazéns.
+        """
+        return sum(self._em_todos('contar_por_produto', produto_codigo))
+
+    def disponivel(self, produto_codigo):
+        """
+        Saldo disponível do produto na rede (unidades menos reservas, somadas).
+        """
+        return sum(self.saldos(produto_codigo))
+
+    def contar_produtos(self, produtos_codigos):
+        """
+        Total de unidades de vários produtos na rede, com uma única ida e volta por armazém.
+
+        Returns:
+            dict: Código -> total de unidades.
+        """
+        codigos = list(produtos_codigos)
+        por_armazem = self._em_todos_varios([('contar_por_produto', (codigo,)) for codigo in codigos])
+        return {codigo: sum(totais) for codigo, totais in zip(codigos, zip(*por_armazem))}
+
+    def saldos_produtos(self, produtos_codigos):
+        """
+        Unidades disponíveis de vários produtos em cada armazém, com uma única ida e volta
+        por armazém.
+
+        Returns:
+            dict: Código -> lista dos saldos de cada armazém, pela ordem da rede.
+        """
+        codigos = list(produtos_codigos)
+        por_armazem = self._em_todos_varios([('disponivel', (codigo,)) for codigo in codigos])
+        return {codigo: list(saldos) for codigo, saldos in zip(codigos, zip(*por_armazem))}
+
+    # --- Retirada ---
+
+    def _ordem(self, produto_codigo, candidatos, saldos, politica, destino):
+        """
+        Ordena os armazéns candidatos (índices) segundo a política de divisão.
+        """
+        if politica == DIVISAO_MAIOR_SALDO:
+            return sorted(candidatos, key=lambda i: -saldos[i])
+        if politica == DIVISAO_MAIS_PROXIMO:
+            if destino is None or self.localizacoes is None:
+                raise ValueError("A política 'mais_proximo' precisa das localizações e de um destino.")
+            return sorted(candidatos, key=lambda i: math.dist(self.localizacoes[i], destino))
+        respostas = [(i, self._pontos[i].pedir('validade', produto_codigo)) for i in candidatos]
+        validades = {i: resposta.resultado() for i, resposta in respostas}
+        # Sem validade conhecida, o armazém fica por último.
+        return sorted(candidatos, key=lambda i: validades[i] or datetime.max)
+
+    def planejar_retirada(self, produto_codigo, quantidade, politica=None, destino=None):
+        """
+        Divide a quantidade entre os armazéns com saldo, sem alterar nada.
+
+        Args:
+            produto_codigo (str): O código do produto.
+            quantidade (int): Unidades a retirar.
+            politica (str, opcional): Uma de POLITICAS_DIVISAO (padrão: a da rede).
+            destino (tuple, opcional): Coordenadas (x, y) do destino, para MAIS_PROXIMO.
+
+        Returns:
+            dict: Unidades a retirar de cada armazém (pelo índice), ou None se a rede não
+                  tiver saldo suficiente.
+        """
+        politica = politica or self.politica_divisao
+        self._validar_politica(politica)
+        saldos = self.saldos(produto_codigo)
+        if sum(saldos) < quantidade:
+            return None
+        candidatos = [i for i, saldo in enumerate(saldos) if saldo > 0]
+        plano = {}
+        faltam = quantidade
+        for indice in self._ordem(produto_codigo, candidatos, saldos, politica, destino):
+            if faltam == 0:
+                break
+            parte = min(saldos[indice], faltam)
+            plano[indice] = parte
+            faltam -= parte
+        return plano
+
+    def remover_engradado(self, produto_codigo, quantidade, politica=None, destino=None):
+        """
+        Retira a quantidade do produto da rede, dividida entre os armazéns pela política.
+        As retiradas de cada armazém são feitas ao mesmo tempo.
+
+        Args:
+            Como em planejar_retirada.
+
+        Returns:
+            dict: Unidades retiradas de cada armazém (pelo nome), ou None se a rede não
+                  tiver saldo suficiente (nada é retirado).
+
+        Raises:
+            RuntimeError: Se um armazém recusar a sua parte (foi alterado por fora da rede).
+                          Nenhum armazém é alterado.
+        """
+        plano = self.planejar_retirada(produto_codigo, quantidade, politica, destino)
+        if plano is None:
+            return None
+        # Primeira fase: cada armazém reserva a sua parte.
+        respostas = [(indice, self._pontos[indice].pedir('reservar', produto_codigo, parte))
+                     for indice, parte in plano.items()]
+        aceitos = [(indice, resposta.resultado()) for indice, resposta in respostas]
+        recusados = [indice for indice, aceito in aceitos if not aceito]
+        if recusados:
+            respostas = [self._pontos[indice].pedir('liberar_reserva', produto_codigo, plano[indice])
+                         for indice, aceito in aceitos if aceito]
+            for resposta in respostas:
+                resposta.resultado()
+            raise RuntimeError(f"O estoque '{self.nomes[recusados[0]]}' recusou a retirada de "
+                               f"{plano[recusados[0]]} unidades do produto {produto_codigo}.")
+        # Segunda fase: as partes reservadas são retiradas.
+        respostas = [(indice, self._pontos[indice].pedir('remover_engradado', produto_codigo, parte, parte))
+                     for indice, parte in plano.items()]
+        for indice, resposta in respostas:
+            if not resposta.resultado():
+                raise RuntimeError(f"O estoque '{self.nomes[indice]}' recusou a retirada de {plano[indice]} "
+                                   f"unidades do produto {produto_codigo}.")
+            # A retirada pode ter esvaziado pilhas: o armazém volta a ser tentado.
+            self._sem_pilha_vazia[indice] = False
+            self._recusados[indice].clear()
+        return {self.nomes[indice]: parte for indice, parte in plano.items()}
+
+    def fechar(self):
+        """
+        Encerra os armazéns (os processos, no caso de EstoqueEmProcesso).
+        """
+        for ponto in self._pontos:
+            ponto.fechar()
@@ -0,0 +1,331 @@
+# Servidor de entrada de pedidos com asyncio.
+# Clientes locais enviam pedidos como linhas JSON por TCP (ou socket Unix), por exemplo:
+#     {"codigo_produto": "1", "quantidade": 3, "solicitante": "Loja 7", "data_solicitacao": "2025-06-01"}
+# e recebem, na mesma ordem, uma linha JSON de resposta para cada pedido:
+#     {"status": "aceito", "numero": 42, "reservado": true}   ou   {"status": "recusado", "erro": "..."}
+# Um cliente pode enviar vários pedidos sem esperar as respostas (pipeline).
+#
+# Cada conexão valida os seus pedidos e os coloca em uma fila assíncrona limitada. Quando a
+# fila está cheia, a conexão espera (e deixa de ler o socket) até haver espaço: um cliente
+# rápido demais é freado sem travar os demais. Uma tarefa em segundo plano retira os pedidos
+# dessa fila em grupos, registra-os na FilaPedidos e outra tarefa processa a FilaPedidos
+# contra o Estoque com processar_lote.
+#
+# Uso (a partir da pasta do projeto; usa os mesmos arquivos do Menu, e só um dos dois pode
+# estar aberto por vez, veja Armazenamento.TravaDiretorio):
+#     python Servidor_pedidos.py --porta 8765
+import argparse
+import asyncio
+import json
+import os
+import signal
+from datetime import datetime
+from Pedido import Pedido
+
+
+class ServidorPedidos:
+    """
+    Recebe pedidos de vários clientes ao mesmo tempo e os encaminha para a FilaPedidos.
+    """
+    def __init__(self, fila_pedidos, estoque, produtos_cadastrados=None, tamanho_fila=10000,
+                 tamanho_lote=1000, intervalo_processamento=0.05, reservar_estoque=True,
+                 fatia_consolidacao=None):
+        """
+        Inicializa o servidor.
+
+        Args:
+            fila_pedidos (FilaPedidos): A fila que recebe os pedidos aceitos.
+            estoque (Estoque): O estoque contra o qual a fila é processada.
+            produtos_cadastrados (CatalogoProdutos, opcional): Se informado, pedidos de
+                                                               produtos não cadastrados são recusados.
+            tamanho_fila (int, opcional): Capacidade da fila assíncrona de entrada.
+            tamanho_lote (int, opcional): Máximo de pedidos registrados de uma só vez na FilaPedidos.
+            intervalo_processamento (float, opcional): Segundos entre dois processamentos da fila.
+            reservar_estoque (bool, opcional): Se True, cada pedido aceito tenta reservar a sua
+                                               quantidade no estoque ao entrar na fila.
+            fatia_consolidacao (float, opcional): Se informado, depois de cada processamento da
+                                                  fila o estoque é consolidado por até esse
+                                                  número de segundos (veja Estoque.consolidar).
+        """
+        self.fila_pedidos = fila_pedidos
+        self.estoque = estoque
+        self.produtos_cadastrados = produtos_cadastrados
+        self.tamanho_fila = tamanho_fila
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_processamento = intervalo_processamento
+        self.reservar_estoque = reservar_estoque
+        self.fatia_consolidacao = fatia_consolidacao
+        self.posicoes_liberadas = 0
+        self.pedidos_aceitos = 0
+        self.pedidos_recusados = 0
+        self.pedidos_atendidos = 0
+        self._entrada = None
+        self._servidores = []
+        self._tarefas = []
+        self._novos_pedidos = None
+        # Conexões abertas: tarefa que atende a conexão -> escritor do socket.
+        self._conexoes = {}
+
+    # --- Ciclo de vida ---
+
+    async def _iniciar_tarefas(self):
+        if self._entrada is None:
+            self._entrada = asyncio.Queue(self.tamanho_fila)
+            self._novos_pedidos = asyncio.Event()
+            self._tarefas = [
+                asyncio.create_task(self._registrar_pedidos(), name='registrar-pedidos'),
+                asyncio.create_task(self._processar_fila(), name='processar-fila'),
+            ]
+
+    async def iniciar_tcp(self, host='127.0.0.1', porta=8765):
+        """
+        Passa a aceitar conexões TCP em host:porta.
+
+        Returns:
+            asyncio.Server: O servidor criado (porta 0 escolhe uma porta livre).
+        """
+        await self._iniciar_tarefas()
+        servidor = await asyncio.start_server(self._atender_cliente, host, porta)
+        self._servidores.append(servidor)
+        return servidor
+
+    async def iniciar_unix(self, caminho):
+        """
+        Passa a aceitar conexões no socket Unix do caminho informado.
+
+        Returns:
+            asyncio.Server: O servidor criado.
+        """
+        await self._iniciar_tarefas()
+        servidor = await asyncio.start_unix_server(self._atender_cliente, caminho)
+        self._servidores.append(servidor)
+        return servidor
+
+    async def parar(self):
+        """
+        Para de aceitar conexões, fecha as conexões abertas, registra os pedidos que já
+        estavam na fila de entrada, processa a FilaPedidos uma última vez e encerra as
+        tarefas em segundo plano.
+        """
+        for servidor in self._servidores:
+            servidor.close()
+        # Fechar o socket faz a leitura da conexão terminar normalmente.
+        for escritor in self._conexoes.values():
+            escritor.close()
+        await asyncio.gather(*self._conexoes, return_exceptions=True)
+        for servidor in self._servidores:
+            await servidor.wait_closed()
+        self._servidores = []
+        if self._entrada is not None:
+            await self._entrada.join()
+            for tarefa in self._tarefas:
+                tarefa.cancel()
+            await asyncio.gather(*self._tarefas, return_exceptions=True)
+            self._processar_agora()
+            self._entrada = None
+            self._tarefas = []
+
+    # --- Conexões ---
+
+    def _validar(self, dados):
+        """
+        Cria um Pedido a partir do dicionário recebido.
+
+        Raises:
+            ValueError: Se o pedido for inválido.
+        """
+        if not isinstance(dados, dict):
+            raise ValueError("o pedido deve ser um objeto JSON")
+        try:
+            codigo_produto = str(dados['codigo_produto'])
+            quantidade = dados['quantidade']
+            solicitante = str(dados['solicitante'])
+        except KeyError as e:
+            raise ValueError(f"campo obrigatório ausente: {e.args[0]}")
+        if self.produtos_cadastrados is not None and codigo_produto not in self.produtos_cadastrados:
+            raise ValueError("nenhum produto encontrado com este código")
+        if not isinstance(quantidade, int) or isinstance(quantidade, bool) or quantidade <= 0:
+            raise ValueError("a quantidade deve ser um número inteiro positivo")
+        # Sem data, vale a data de recebimento.
+        data_solicitacao = dados.get('data_solicitacao') or datetime.now().strftime("%Y-%m-%d")
+        return Pedido(codigo_produto, quantidade, data_solicitacao, solicitante)
+
+    async def _atender_cliente(self, leitor, escritor):
+        """
+        Lê os pedidos de uma conexão, uma linha JSON por pedido. As respostas são escritas
+        por uma tarefa separada, na ordem dos pedidos, assim a leitura não espera a escrita.
+        """
+        self._conexoes[asyncio.current_task()] = escritor
+        respostas = asyncio.Queue()
+        tarefa_escrita = asyncio.create_task(self._escrever_respostas(respostas, escritor))
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                if not linha.strip():
+                    continue
+                resposta = loop.create_future()
+                try:
+                    pedido = self._validar(json.loads(linha))
+                except (ValueError, TypeError) as e:
+                    # json.JSONDecodeError também é um ValueError.
+                    self.pedidos_recusados += 1
+                    resposta.set_result({'status': 'recusado', 'erro': str(e)})
+                    respostas.put_nowait(resposta)
+                    continue
+                respostas.put_nowait(resposta)
+                # Com a fila de entrada cheia, esta conexão espera aqui (contrapressão).
+                await self._entrada.put((pedido, resposta))
+        except ConnectionError:
+            pass
+        finally:
+            respostas.put_nowait(None)
+            await tarefa_escrita
+            del self._conexoes[asyncio.current_task()]
+
+    async def _escrever_respostas(self, respostas, escritor):
+        """
+        Escreve as respostas de uma conexão na ordem em que os pedidos chegaram.
+        """
+        try:
+            while True:
+                resposta = await respostas.get()
+                if resposta is None:
+                    break
+                dados = await resposta
+                escritor.write(json.dumps(dados, ensure_ascii=False).encode('utf-8') + b'\n')
+                # Só espera o socket quando o buffer de saída está cheio.
+                await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+    # --- Tarefas em segundo plano ---
+
+    async def _registrar_pedidos(self):
+        """
+        Retira os pedidos da fila de entrada em grupos e os registra na FilaPedidos.
+        """
+        while True:
+            lote = [await self._entrada.get()]
+            while len(lote) < self.tamanho_lote and not self._entrada.empty():
+                lote.append(self._entrada.get_nowait())
+            estoque_reservas = self.estoque if self.reservar_estoque else None
+            for pedido, resposta in lote:
+                reservado = self.fila_pedidos.adicionar_pedido(pedido, estoque_reservas)
+                self.pedidos_aceitos += 1
+                if not resposta.done():
+                    resposta.set_result({'status': 'aceito', 'numero': pedido.numero, 'reservado': reservado})
+                self._entrada.task_done()
+            self._novos_pedidos.set()
+
+    def _processar_agora(self):
+        """
+        Processa toda a FilaPedidos contra o estoque de uma vez.
+        """
+        if self.fila_pedidos.fila:
+            resultado = self.fila_pedidos.processar_lote(self.estoque)
+            self.pedidos_atendidos += len(resultado['atendidos'])
+
+    async def _processar_fila(self):
+        """
+        Processa a FilaPedidos a cada intervalo em que chegaram pedidos novos. Os pedidos
+        adiados (sem estoque) continuam na fila e são tentados de novo nas próximas rodadas.
+        """
+        while True:
+            await self._novos_pedidos.wait()
+            self._novos_pedidos.clear()
+            self._processar_agora()
+            if self.fatia_consolidacao:
+                # Entre um processamento e outro, uma fatia de consolidação; a próxima
+                # fatia continua de onde esta parou.
+                resultado = self.estoque.consolidar(self.produtos_cadastrados, tempo_limite=self.fatia_consolidacao)
+                self.posicoes_liberadas += resultado['posicoes_liberadas']
+            await asyncio.sleep(self.intervalo_processamento)
+
+
+async def _servir(args):
+    # Os imports ficam aqui para que o módulo possa ser usado sem carregar a persistência.
+    from Armazenamento import iniciar_sistema
+
+    saida = None
+    if args.log:
+        # Registros em JSON por linha, escritos numa thread própria (veja Log_estruturado.py).
+        from Log_estruturado import SaidaAssincrona, SaidaJSONL, NOMES_NIVEIS
+        nivel = {nome: valor for valor, nome in NOMES_NIVEIS.items()}[args.nivel_log]
+        saida = SaidaAssincrona(SaidaJSONL(args.log, nivel))
+    metricas = None
+    if args.metricas:
+        from Metricas import RegistroMetricas
+        metricas = RegistroMetricas()
+    try:
+        persistencia, produtos_cadastrados, estoque, fila_pedidos = iniciar_sistema(
+            os.path.dirname(os.path.abspath(__file__)), args.armazenamento, saida, metricas)
+    except (RuntimeError, ValueError) as e:
+        if saida is not None:
+            saida.fechar()
+        raise SystemExit(f"Erro: {e}")
+
+    servidor = ServidorPedidos(fila_pedidos, estoque, produtos_cadastrados, tamanho_fila=args.tamanho_fila,
+                               fatia_consolidacao=args.fatia_consolidacao)
+    if args.unix:
+        await servidor.iniciar_unix(args.unix)
+        print(f"Recebendo pedidos em {args.unix}")
+    else:
+        await servidor.iniciar_tcp(args.host, args.porta)
+        print(f"Recebendo pedidos em {args.host}:{args.porta}")
+    # Ctrl+C e SIGTERM encerram o servidor passando pelo desligamento abaixo.
+    loop = asyncio.get_running_loop()
+    tarefa = asyncio.current_task()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sinal, tarefa.cancel)
+        except NotImplementedError:
+            pass # Windows: Ctrl+C continua chegando como KeyboardInterrupt.
+    try:
+        while True:
+            # Grava as alterações em disco periodicamente (veja Persistencia.sincronizar).
+            await asyncio.sleep(1)
+            persistencia.sincronizar()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await servidor.parar()
+        persistencia.fechar()
+        if saida is not None:
+            saida.fechar()
+        if metricas is not None:
+            with open(args.metricas, 'w', encoding='utf-8') as f:
+                f.write(metricas.exportar_json(indent=2) + '\n')
+        print(f"Pedidos aceitos: {servidor.pedidos_aceitos}, recusados: {servidor.pedidos_recusados}, "
+              f"atendidos: {servidor.pedidos_atendidos}")
+        if servidor.fatia_consolidacao:
+            print(f"Posições liberadas pela consolidação: {servidor.posicoes_liberadas}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de entrada de pedidos (JSON por linha).")
+    parser.add_argument('--host', default='127.0.0.1', help="Endereço TCP.")
+    parser.add_argument('--porta', type=int, default=8765, help="Porta TCP.")
+    parser.add_argument('--unix', help="Caminho de um socket Unix (substitui host/porta).")
+    parser.add_argument('--tamanho-fila', type=int, default=10000, help="Capacidade da fila de entrada.")
+    parser.add_argument('--armazenamento', choices=('log', 'sqlite'), default=None,
+                        help="Onde gravar o estado (padrão: variável ESTOQUE_ARMAZENAMENTO ou 'log').")
+    parser.add_argument('--metricas', help="Arquivo JSON onde gravar as métricas de desempenho ao encerrar.")
+    parser.add_argument('--log', help="Arquivo JSONL onde gravar as mensagens do estoque e da fila.")
+    parser.add_argument('--nivel-log', choices=('DEBUG', 'INFO', 'AVISO', 'ERRO'), default='INFO',
+                        help="Nível mínimo das mensagens gravadas com --log.")
+    parser.add_argument('--fatia-consolidacao', type=float, default=None,
+                        help="Segundos de consolidação do estoque após cada processamento da fila.")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_servir(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+# Formato binário de snapshot, alternativo aos arquivos JSON.
+#
+# Os arquivos JSON precisam ser lidos e interpretados por inteiro na inicialização. O snapshot
+# binário tem layout fixo: a matriz do estoque é gravada exatamente como os vetores da
+# MatrizColunar, de modo que carregá-la é mapear o arquivo em memória (mmap) e criar
+# memoryviews sobre as regiões do arquivo, sem interpretar texto.
+#
+# Layout (todas as seções começam em posições múltiplas de 8 bytes):
+#   Cabeçalho: MAGICA (8 bytes), versão (uint32), ordem dos bytes (uint8: 0 little, 1 big),
+#              preenchimento, as posições (uint64) das seções de textos, matriz, produtos,
+#              fila e histórico, e o próximo número de pedido da fila (uint64).
+#   Textos:    quantidade (uint64), posições de início (int64, quantidade + 1) e os bytes UTF-8.
+#              Todo texto do snapshot (códigos, nomes, solicitantes...) é guardado uma vez só
+#              e referenciado pelo seu índice nesta tabela.
+#   Matriz:    linhas, colunas, altura_maxima, quantidade de códigos (uint64 cada), os índices
+#              dos códigos na tabela de textos (int32), e os vetores alturas, produtos e
+#              quantidades da MatrizColunar.
+#   Produtos:  quantidade (uint64) e um registro de tamanho fixo (REGISTRO_PRODUTO) por produto.
+#   Fila e histórico: quantidade (uint64) e um registro de tamanho fixo (REGISTRO_PEDIDO) por pedido.
+#
+# Uso como conversor (a partir da pasta do projeto):
+#     python Snapshot_binario.py para-binario produtos.json estoque.json pedidos.json estado.bin
+#     python Snapshot_binario.py para-json estado.bin produtos.json estoque.json pedidos.json
+import mmap
+import struct
+import sys
+from array import array
+from datetime import datetime
+from Produto import Produto, CatalogoProdutos
+from Pedido import Pedido
+from Estoque import Estoque
+from Fila_de_Pedidos import FilaPedidos
+from Matriz_colunar import MatrizColunar
+
+MAGICA = b'ESTQBIN1'
+# Versão 2: o registro de pedido ganhou a marcação de reserva.
+# Versão 3: o cabeçalho ganhou o próximo número de pedido, para que números de pedidos
+# cancelados não sejam reaproveitados. Snapshots das versões 1 e 2 continuam legíveis.
+VERSAO = 3
+CABECALHO = struct.Struct('=8sIB3x6Q')
+CABECALHO_V2 = struct.Struct('=8sIB3x5Q')
+# Produto: codigo, lote, nome (textos), peso, validade, fabricação (ordinais), preço de compra,
+# preço de venda, fornecedor, fabricante, categoria (textos), capacidade do engradado (-1 = ilimitada).
+REGISTRO_PRODUTO = struct.Struct('=3id2i2d4i')
+# Pedido: código do produto (texto), quantidade, data da solicitação (ordinal),
+# solicitante (texto), número (-1 = sem número), reservado (0 ou 1).
+REGISTRO_PEDIDO = struct.Struct('=iqiiqi')
+REGISTRO_PEDIDO_V1 = struct.Struct('=iqiiq')
+INTEIRO = struct.Struct('=Q')
+
+
+def _alinhar(arquivo):
+    """
+    Completa o arquivo com zeros até a próxima posição múltipla de 8 bytes.
+    """
+    arquivo.write(bytes(-arquivo.tell() % 8))
+
+
+def _alinhado(posicao):
+    return posicao + (-posicao % 8)
+
+
+class _TabelaTextos:
+    """
+    Interna os textos gravados no snapshot: cada texto distinto ganha um índice.
+    """
+    def __init__(self):
+        self.textos = []
+        self._indices = {}
+
+    def indice(self, texto):
+        texto = str(texto)
+        indice = self._indices.get(texto)
+        if indice is None:
+            indice = self._indices[texto] = len(self.textos)
+            self.textos.append(texto)
+        return indice
+
+
+def salvar_snapshot_binario(nome_arquivo, produtos_cadastrados, estoque, fila_pedidos):
+    """
+    Grava produtos, estoque e pedidos em um snapshot binário.
+
+    Args:
+        nome_arquivo (str): O caminho do arquivo a ser gravado.
+        produtos_cadastrados (iterable): Os produtos cadastrados.
+        estoque (Estoque): O estoque a ser gravado.
+        fila_pedidos (FilaPedidos): A fila e o histórico a serem gravados.
+    """
+    textos = _TabelaTextos()
+    matriz = MatrizColunar.de_estoque(estoque)
+
+    # Os registros de tamanho fixo são montados antes para que todos os textos já estejam internados.
+    registros_produtos = bytearray()
+    for p in produtos_cadastrados:
+        registros_produtos += REGISTRO_PRODUTO.pack(
+            textos.indice(p.codigo), textos.indice(p.lote), textos.indice(p.nome), p.peso,
+            p.data_validade.toordinal(), p.data_fabricacao.toordinal(), p.preco_compra, p.preco_venda,
+            textos.indice(p.fornecedor), textos.indice(p.fabricante), textos.indice(p.categoria),
+            -1 if p.capacidade_engradado is None else p.capacidade_engradado
+        )
+
+    def registros_pedidos(pedidos):
+        registros = bytearray()
+        for pedido in pedidos:
+            registros += REGISTRO_PEDIDO.pack(
+                textos.indice(pedido.codigo_produto), pedido.quantidade, pedido.data_solicitacao.toordinal(),
+                textos.indice(pedido.solicitante), -1 if pedido.numero is None else pedido.numero,
+                int(pedido.reservado)
+            )
+        return registros
+
+    registros_fila = registros_pedidos(fila_pedidos.fila)
+    registros_historico = registros_pedidos(fila_pedidos.historico_atendidos)
+    indices_codigos = array('i', (textos.indice(c) for c in matriz.codigos))
+
+    with open(nome_arquivo, 'wb') as f:
+        # O cabeçalho é regravado no final, quando as posições das seções forem conhecidas.
+        f.write(bytes(CABECALHO.size))
+        _alinhar(f)
+        secoes = []
+
+        # Textos.
+        secoes.append(f.tell())
+        dados_textos = [t.encode('utf-8') for t in textos.textos]
+        inicios = array('q', [0])
+        for dados in dados_textos:
+            inicios.append(inicios[-1] + len(dados))
+        f.write(INTEIRO.pack(len(dados_textos)))
+        f.write(inicios.tobytes())
+        f.write(b''.join(dados_textos))
+        _alinhar(f)
+
+        # Matriz.
+        secoes.append(f.tell())
+        f.write(struct.pack('=4Q', matriz.linhas, matriz.colunas, matriz.altura_maxima, len(indices_codigos)))
+        for vetor in (indices_codigos, matriz.alturas, matriz.produtos, matriz.quantidades):
+            f.write(vetor.tobytes())
+            _alinhar(f)
+
+        # Produtos, fila e histórico.
+        for quantidade, registros in ((len(registros_produtos) // REGISTRO_PRODUTO.size, registros_produtos),
+                                      (len(fila_pedidos.fila), registros_fila),
+                                      (len(fila_pedidos.historico_atendidos), registros_historico)):
+            secoes.append(f.tell())
+            f.write(INTEIRO.pack(quantidade))
+            f.write(registros)
+            _alinhar(f)
+
+        f.seek(0)
+        f.write(CABECALHO.pack(MAGICA, VERSAO, 0 if sys.byteorder == 'little' else 1, *secoes,
+                               fila_pedidos.proximo_numero))
+
+
+# A classe SnapshotBinario dá acesso a um snapshot binário mapeado em memória.
+# Nada é interpretado ao abrir além do cabeçalho: a matriz é exposta como uma MatrizColunar
+# sobre memoryviews do arquivo, e os textos só são decodificados quando usados.
+class SnapshotBinario:
+    """
+    Snapshot binário aberto com mmap, com visões somente leitura sobre os dados.
+    """
+    def __init__(self, nome_arquivo):
+        """
+        Abre e mapeia o snapshot em memória.
+
+        Args:
+            nome_arquivo (str): O caminho do snapshot binário.
+        """
+        self._arquivo = open(nome_arquivo, 'rb')
+        self._mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        self._visao = memoryview(self._mapa)
+        magica, versao = struct.unpack_from('=8sI', self._mapa, 0)
+        if magica != MAGICA or versao not in (1, 2, VERSAO):
+            self.fechar()
+            raise ValueError(f"'{nome_arquivo}' não é um snapshot binário do estoque (versão {VERSAO}).")
+        if versao == VERSAO:
+            magica, versao, ordem, *secoes, self._proximo_numero = CABECALHO.unpack_from(self._mapa, 0)
+        else:
+            # Sem o próximo número, a numeração segue os pedidos carregados.
+            magica, versao, ordem, *secoes = CABECALHO_V2.unpack_from(self._mapa, 0)
+            self._proximo_numero = None
+        self._registro_pedido = REGISTRO_PEDIDO_V1 if versao == 1 else REGISTRO_PEDIDO
+        if ordem != (0 if sys.byteorder == 'little' else 1):
+            self.fechar()
+            raise ValueError(f"'{nome_arquivo}' foi gravado em uma máquina com outra ordem de bytes.")
+        self._secao_textos, self._secao_matriz, self._secao_produtos, self._secao_fila, self._secao_historico = secoes
+
+        # Tabela de textos: apenas as visões; a decodificação acontece em texto().
+        quantidade = INTEIRO.unpack_from(self._mapa, self._secao_textos)[0]
+        inicio = self._secao_textos + INTEIRO.size
+        self._inicios_textos = self._vetor(inicio, 'q', quantidade + 1)
+        self._dados_textos = inicio + (quantidade + 1) * 8
+        self._cache_textos = {}
+
+        self.matriz = self._abrir_matriz()
+
+    def _vetor(self, inicio, tipo, quantidade):
+        """
+        Cria uma memoryview tipada sobre 'quantidade' itens do arquivo a partir de 'inicio'.
+        """
+        tamanho = array(tipo).itemsize * quantidade
+        return self._visao[inicio:inicio + tamanho].cast(tipo)
+
+    def texto(self, indice):
+        """
+        Retorna o texto de índice 'indice' da tabela de textos, decodificando-o na primeira vez.
+        """
+        texto = self._cache_textos.get(indice)
+        if texto is None:
+            inicio = self._dados_textos + self._inicios_textos[indice]
+            fim = self._dados_textos + self._inicios_textos[indice + 1]
+            texto = self._cache_textos[indice] = bytes(self._visao[inicio:fim]).decode('utf-8')
+        return texto
+
+    def _abrir_matriz(self):
+        linhas, colunas, altura_maxima, quantidade_codigos = struct.unpack_from('=4Q', self._mapa, self._secao_matriz)
+        posicoes = linhas * colunas
+        inicio = self._secao_matriz + 32
+        indices_codigos = self._vetor(inicio, 'i', quantidade_codigos)
+        inicio = _alinhado(inicio + 4 * quantidade_codigos)
+        tipo_alturas = 'B' if altura_maxima <= 255 else 'H'
+        alturas = self._vetor(inicio, tipo_alturas, posicoes)
+        inicio = _alinhado(inicio + alturas.nbytes)
+        produtos = self._vetor(inicio, 'i', posicoes * altura_maxima)
+        inicio = _alinhado(inicio + produtos.nbytes)
+        quantidades = self._vetor(inicio, 'i', posicoes * altura_maxima)
+        codigos = [self.texto(i) for i in indices_codigos]
+        return MatrizColunar.de_vetores(linhas, colunas, altura_maxima, alturas, produtos, quantidades, codigos)
+
+    def _registros(self, secao, registro):
+        quantidade = INTEIRO.unpack_from(self._mapa, secao)[0]
+        inicio = secao + INTEIRO.size
+        return registro.iter_unpack(self._visao[inicio:inicio + quantidade * registro.size])
+
+    def carregar_produtos(self):
+        """
+        Cria o catálogo de produtos do snapshot.
+
+        Returns:
+            CatalogoProdutos: O catálogo com os produtos do snapshot.
+        """
+        produtos = CatalogoProdutos()
+        for (codigo, lote, nome, peso, validade, fabricacao, compra, venda,
+             fornecedor, fabricante, categoria, capacidade) in self._registros(self._secao_produtos, REGISTRO_PRODUTO):
+            produtos.adicionar(Produto(
+                self.texto(codigo), self.texto(lote), self.texto(nome), peso,
+                datetime.fromordinal(validade), datetime.fromordinal(fabricacao), compra, venda,
+                self.texto(fornecedor), self.texto(fabricante), self.texto(categoria),
+                capacidade_engradado=None if capacidade < 0 else capacidade
+            ))
+        return produtos
+
+    def _pedidos(self, secao):
+        for codigo, quantidade, data, solicitante, numero, *reservado in self._registros(secao, self._registro_pedido):
+            yield Pedido(self.texto(codigo), quantidade, datetime.fromordinal(data), self.texto(solicitante),
+                         numero=None if numero < 0 else numero, reservado=bool(reservado and reservado[0]))
+
+    def carregar_pedidos(self, fila_pedidos):
+        """
+        Acrescenta à fila e ao histórico os pedidos do snapshot.
+
+        Args:
+            fila_pedidos (FilaPedidos): A fila de destino.
+        """
+        fila_pedidos.carregar_objetos(self._pedidos(self._secao_fila), self._pedidos(self._secao_historico))
+        if self._proximo_numero is not None:
+            fila_pedidos.avancar_numeracao(self._proximo_numero - 1)
+
+    def carregar_estoque(self, estoque):
+        """
+        Substitui o conteúdo do estoque pelo conteúdo da matriz do snapshot.
+
+        Args:
+            estoque (Estoque): O estoque de destino.
+        """
+        self.matriz.para_estoque(estoque)
+
+    def fechar(self):
+        """
+        Libera as visões e o mapeamento do arquivo.
+        """
+        matriz = getattr(self, 'matriz', None)
+        if matriz is not None:
+            for vetor in (matriz.alturas, matriz.produtos, matriz.quantidades):
+                vetor.release()
+            self.matriz = None
+        if getattr(self, '_inicios_textos', None) is not None:
+            self._inicios_textos.release()
+            self._inicios_textos = None
+        self._visao.release()
+        self._mapa.close()
+        self._arquivo.close()
+
+
+# --- Conversor entre os formatos JSON e binário ---
+
+def json_para_binario(arquivo_produtos, arquivo_estoque, arquivo_pedidos, arquivo_binario):
+    """
+    Converte os três arquivos JSON do sistema em um snapshot binário.
+    """
+    produtos = CatalogoProdutos.carregar(arquivo_produtos)
+    estoque = Estoque()
+    estoque.carregar_estoque(arquivo_estoque)
+    fila_pedidos = FilaPedidos()
+    fila_pedidos.carregar_pedidos(arquivo_pedidos)
+    salvar_snapshot_binario(arquivo_binario, produtos, estoque, fila_pedidos)
+
+
+def binario_para_json(arquivo_binario, arquivo_produtos, arquivo_estoque, arquivo_pedidos):
+    """
+    Converte um snapshot binário nos três arquivos JSON do sistema.
+    """
+    snapshot = SnapshotBinario(arquivo_binario)
+    try:
+        snapshot.carregar_produtos().salvar(arquivo_produtos)
+        matriz = snapshot.matriz
+        estoque = Estoque(matriz.linhas, matriz.colunas, matriz.altura_maxima)
+        snapshot.carregar_estoque(estoque)
+        estoque.salvar_estoque(arquivo_estoque)
+        fila_pedidos = FilaPedidos()
+        snapshot.carregar_pedidos(fila_pedidos)
+        fila_pedidos.salvar_pedidos(arquivo_pedidos)
+    finally:
+        snapshot.fechar()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 6 and sys.argv[1] == 'para-binario':
+        json_para_binario(*sys.argv[2:])
+    elif len(sys.argv) == 6 and sys.argv[1] == 'para-json':
+        binario_para_json(*sys.argv[2:])
+    else:
+        print("Uso:")
+        print("  python Snapshot_binario.py para-binario produtos.json estoque.json pedidos.json estado.bin")
+        print("  python Snapshot_binario.py para-json estado.bin produtos.json estoque.json pedidos.json")
+        sys.exit(1)
@@ -0,0 +1,337 @@
+# Visões materializadas dos relatórios.
+# Em vez de recalcular cada relatório a partir do estoque e do histórico inteiros, cada
+# visão guarda o resultado pronto e o atualiza a cada evento publicado pelo Estoque, pela
+# FilaPedidos e pelo catálogo (veja adicionar_ouvinte em cada um). Ler um relatório custa
+# apenas o tamanho da resposta, não importa o tamanho do armazém ou do histórico.
+#
+# - VisaoTotaisPorProduto: unidades em estoque de cada produto, O(1) por evento;
+# - VisaoItensEmFalta: produtos cadastrados abaixo do limite, O(1) por mudança de total;
+# - VisaoVencimentos: produtos em estoque em ordem de validade, O(log n) quando um produto
+#   entra ou sai do estoque;
+# - VisaoVolumePorCliente: unidades atendidas de cada solicitante, O(1) por atendimento.
+# RelatoriosMaterializados cria e vincula todas elas.
+import bisect
+import heapq
+from datetime import datetime, timedelta
+from operator import itemgetter
+
+from Estoque import CODIGO_MAXIMO
+
+
+class VisaoTotaisPorProduto:
+    """
+    Total de unidades em estoque de cada produto, atualizado pelos eventos do Estoque.
+    As outras visões podem se inscrever para saber quando um total muda.
+    """
+    def __init__(self, estoque):
+        """
+        Calcula os totais uma vez a partir do estoque e passa a acompanhar as alterações.
+
+        Args:
+            estoque (Estoque): O estoque acompanhado.
+        """
+        self.estoque = estoque
+        self.totais = {}
+        # Funções chamadas com (produto_codigo, total anterior, total novo) a cada mudança.
+        self._dependentes = []
+        self._recarregar((e.produto_codigo, e.quantidade) for _, _, _, e in estoque.iter_engradados())
+        estoque.adicionar_ouvinte(self._ao_alterar_estoque)
+
+    def desvincular(self):
+        """
+        Deixa de acompanhar as alterações do estoque.
+        """
+        self.estoque.remover_ouvinte(self._ao_alterar_estoque)
+
+    def inscrever(self, dependente):
+        """
+        Registra uma função chamada com (produto_codigo, total anterior, total novo)
+        sempre que o total de um produto mudar.
+        """
+        self._dependentes.append(dependente)
+
+    def total(self, produto_codigo):
+        """
+        Retorna o total em estoque do produto, em O(1).
+        """
+        return self.totais.get(produto_codigo, 0)
+
+    def _somar(self, produto_codigo, quantidade):
+        antes = self.totais.get(produto_codigo, 0)
+        depois = antes + quantidade
+        if depois:
+            self.totais[produto_codigo] = depois
+        else:
+            self.totais.pop(produto_codigo, None)
+        for dependente in self._dependentes:
+            dependente(produto_codigo, antes, depois)
+
+    def _recarregar(self, engradados):
+        """
+        Recalcula todos os totais (estoque recarregado) e avisa só os produtos que mudaram.
+
+        Args:
+            engradados (iterable): Pares (produto_codigo, quantidade), um por engradado.
+        """
+        novos = {}
+        for codigo, quantidade in engradados:
+            novos[codigo] = novos.get(codigo, 0) + quantidade
+        antigos, self.totais = self.totais, novos
+        for codigo in antigos.keys() | novos.keys():
+            antes, depois = antigos.get(codigo, 0), novos.get(codigo, 0)
+            if antes != depois:
+                for dependente in self._dependentes:
+                    dependente(codigo, antes, depois)
+
+    def _ao_alterar_estoque(self, evento):
+        tipo = evento['tipo']
+        if tipo in ('engradado_adicionado', 'unidades_adicionadas'):
+            self._somar(evento['produto_codigo'], evento['quantidade'])
+        elif tipo == 'unidades_removidas':
+            self._somar(evento['produto_codigo'], -evento['quantidade'])
+        elif tipo == 'estoque_recarregado':
+            self._recarregar((d['produto_codigo'], d['quantidade'])
+                             for linha in evento['dados'] for pilha in linha for d in pilha)
+
+
+class VisaoItensEmFalta:
+    """
+    Produtos cadastrados com estoque abaixo de um limite, mantidos a cada mudança de total
+    e a cada produto cadastrado.
+    """
+    def __init__(self, totais, produtos_cadastrados, limite_baixo=10):
+        """
+        Args:
+            totais (VisaoTotaisPorProduto): A visão de totais acompanhada.
+            produtos_cadastrados (CatalogoProdutos): O catálogo de produtos.
+            limite_baixo (int, opcional): O nível de estoque considerado crítico.
+        """
+        self.totais = totais
+        self.produtos_cadastrados = produtos_cadastrados
+        self.limite_baixo = limite_baixo
+        # Ordem de cadastro de cada produto, para listar os itens na ordem do catálogo.
+        self._ordem = {}
+        self._em_falta = set()
+        for produto in produtos_cadastrados:
+            self._cadastrar(produto.codigo)
+        totais.inscrever(self._ao_mudar_total)
+        produtos_cadastrados.adicionar_ouvinte(self._ao_cadastrar_produto)
+
+    def desvincular(self):
+        self.produtos_cadastrados.remover_ouvinte(self._ao_cadastrar_produto)
+
+    def _cadastrar(self, codigo):
+        self._ordem[codigo] = len(self._ordem)
+        if self.totais.total(codigo) < self.limite_baixo:
+            self._em_falta.add(codigo)
+
+    def _ao_cadastrar_produto(self, evento):
+        if evento['tipo'] == 'produto_cadastrado':
+            self._cadastrar(evento['produto']['codigo'])
+
+    def _ao_mudar_total(self, codigo, antes, depois):
+        if codigo not in self._ordem:
+            return
+        if depois < self.limite_baixo:
+            self._em_falta.add(codigo)
+        else:
+            self._em_falta.discard(codigo)
+
+    def itens(self):
+        """
+        Returns:
+            list: Dicionários no formato de Estoque.obter_itens_em_falta, na ordem do catálogo.
+        """
+        itens_em_falta = []
+        for codigo in sorted(self._em_falta, key=self._ordem.__getitem__):
+            produto = self.produtos_cadastrados.obter(codigo)
+            total_em_estoque = self.totais.total(codigo)
+            itens_em_falta.append({
+                'codigo': codigo, 'nome': produto.nome,
+                'total_em_estoque': total_em_estoque, 'limite_baixo': self.limite_baixo,
+                'faltando': self.limite_baixo - total_em_estoque
+            })
+        return itens_em_falta
+
+
+class VisaoVencimentos:
+    """
+    Produtos cadastrados com unidades em estoque, em ordem de validade (lista ordenada de
+    (data_validade, produto_codigo)), mantida quando um produto entra ou sai do estoque.
+    """
+    def __init__(self, totais, produtos_cadastrados):
+        """
+        Args:
+            totais (VisaoTotaisPorProduto): A visão de totais acompanhada.
+            produtos_cadastrados (CatalogoProdutos): O catálogo, de onde vêm as validades.
+        """
+        self.totais = totais
+        self.produtos_cadastrados = produtos_cadastrados
+        chaves = (self._chave(codigo) for codigo in totais.totais)
+        self._indice = sorted(chave for chave in chaves if chave is not None)
+        totais.inscrever(self._ao_mudar_total)
+        produtos_cadastrados.adicionar_ouvinte(self._ao_cadastrar_produto)
+
+    def desvincular(self):
+        self.produtos_cadastrados.remover_ouvinte(self._ao_cadastrar_produto)
+
+    def _chave(self, codigo):
+        produto = self.produtos_cadastrados.obter(codigo)
+        return (produto.data_validade, codigo) if produto is not None else None
+
+    def _inserir(self, codigo):
+        chave = self._chave(codigo)
+        if chave is not None:
+            indice = bisect.bisect_left(self._indice, chave)
+            if indice == len(self._indice) or self._indice[indice] != chave:
+                self._indice.insert(indice, chave)
+
+    def _retirar(self, codigo):
+        chave = self._chave(codigo)
+        if chave is not None:
+            indice = bisect.bisect_left(self._indice, chave)
+            if indice < len(self._indice) and self._indice[indice] == chave:
+                del self._indice[indice]
+
+    def _ao_mudar_total(self, codigo, antes, depois):
+        if not antes and depois:
+            self._inserir(codigo)
+        elif antes and not depois:
+            self._retirar(codigo)
+
+    def _ao_cadastrar_produto(self, evento):
+        # Um produto cadastrado depois de já ter estoque entra no índice agora.
+        if evento['tipo'] == 'produto_cadastrado' and self.totais.total(evento['produto']['codigo']):
+            self._inserir(evento['produto']['codigo'])
+
+    def vencendo(self, dias=30, hoje=None):
+        """
+        Produtos em estoque que vencem até 'dias' dias a partir de hoje, em O(log n + k).
+
+        Args:
+            dias (int, opcional): O número de dias considerado "próximo ao vencimento".
+            hoje (datetime, opcional): A data de referência (agora, se omitida).
+
+        Returns:
+            list: Dicionários com 'codigo', 'nome', 'lote', 'data_validade' e
+                  'total_em_estoque', em ordem de validade.
+        """
+        data_limite = (hoje or datetime.now()) + timedelta(days=dias)
+        fim = bisect.bisect_right(self._indice, (data_limite, CODIGO_MAXIMO))
+        vencendo = []
+        for data_validade, codigo in self._indice[:fim]:
+            produto = self.produtos_cadastrados.obter(codigo)
+            vencendo.append({
+                'codigo': codigo, 'nome': produto.nome, 'lote': produto.lote,
+                'data_validade': data_validade.strftime("%Y-%m-%d"),
+                'total_em_estoque': self.totais.total(codigo)
+            })
+        return vencendo
+
+
+class VisaoVolumePorCliente:
+    """
+    Unidades e atendimentos de cada solicitante, acumulados a partir dos eventos de
+    atendimento da FilaPedidos.
+    """
+    def __init__(self, fila_pedidos):
+        """
+        Passa a acompanhar os atendimentos. Os volumes são calculados a partir do histórico
+        na primeira consulta, para que a inicialização não percorra um histórico longo.
+
+        Args:
+            fila_pedidos (FilaPedidos): A fila acompanhada.
+        """
+        self.fila_pedidos = fila_pedidos
+        self._unidades = None
+        self._atendimentos = None
+        fila_pedidos.adicionar_ouvinte(self._ao_alterar_fila)
+
+    @property
+    def unidades(self):
+        """
+        Unidades atendidas por solicitante.
+        """
+        if self._unidades is None:
+            self._recarregar((p.solicitante, p.quantidade) for p in self.fila_pedidos.historico_atendidos)
+        return self._unidades
+
+    @property
+    def atendimentos(self):
+        """
+        Número de atendimentos por solicitante.
+        """
+        if self._atendimentos is None:
+            self._recarregar((p.solicitante, p.quantidade) for p in self.fila_pedidos.historico_atendidos)
+        return self._atendimentos
+
+    def desvincular(self):
+        self.fila_pedidos.remover_ouvinte(self._ao_alterar_fila)
+
+    def _recarregar(self, atendimentos):
+        self._unidades = {}
+        self._atendimentos = {}
+        for solicitante, quantidade in atendimentos:
+            self._somar(solicitante, quantidade)
+
+    def _somar(self, solicitante, quantidade):
+        self._unidades[solicitante] = self._unidades.get(solicitante, 0) + quantidade
+        self._atendimentos[solicitante] = self._atendimentos.get(solicitante, 0) + 1
+
+    def _ao_alterar_fila(self, evento):
+        tipo = evento['tipo']
+        if tipo == 'pedido_atendido':
+            # Antes da primeira consulta não há o que somar: o cálculo a partir do histórico
+            # já vai incluir este atendimento.
+            if self._unidades is not None:
+                self._somar(evento['solicitante'], evento['quantidade'])
+        elif tipo == 'fila_recarregada':
+            self._recarregar((d['solicitante'], d['quantidade']) for d in evento['dados']['historico_atendidos'])
+
+    def volume(self, solicitante):
+        """
+        Retorna as unidades já atendidas do solicitante, em O(1).
+        """
+        return self.unidades.get(solicitante, 0)
+
+    def ranking(self, quantidade=None):
+        """
+        Solicitantes em ordem decrescente de unidades atendidas.
+
+        Args:
+            quantidade (int, opcional): Quantos solicitantes listar (todos, se omitido).
+
+        Returns:
+            list: Dicionários com 'solicitante', 'unidades' e 'atendimentos'.
+        """
+        if quantidade is None:
+            ordenados = sorted(self.unidades.items(), key=itemgetter(1), reverse=True)
+        else:
+            ordenados = heapq.nlargest(quantidade, self.unidades.items(), key=itemgetter(1))
+        return [{'solicitante': solicitante, 'unidades': unidades, 'atendimentos': self.atendimentos[solicitante]}
+                for solicitante, unidades in ordenados]
+
+
+class RelatoriosMaterializados:
+    """
+    Cria e vincula todas as visões materializadas de um estoque, fila e catálogo.
+    """
+    def __init__(self, estoque, fila_pedidos, produtos_cadastrados, limite_baixo=10):
+        """
+        Args:
+            estoque (Estoque): O estoque acompanhado.
+            fila_pedidos (FilaPedidos): A fila acompanhada.
+            produtos_cadastrados (CatalogoProdutos): O catálogo de produtos.
+            limite_baixo (int, opcional): O limite do relatório de itens em falta.
+        """
+        self.totais = VisaoTotaisPorProduto(estoque)
+        self.itens_em_falta = VisaoItensEmFalta(self.totais, produtos_cadastrados, limite_baixo)
+        self.vencimentos = VisaoVencimentos(self.totais, produtos_cadastrados)
+        self.volume_por_cliente = VisaoVolumePorCliente(fila_pedidos)
+
+    def desvincular(self):
+        """
+        Deixa de acompanhar o estoque, a fila e o catálogo.
+        """
+        for visao in (self.totais, self.itens_em_falta, self.vencimentos, self.volume_por_cliente):
+            visao.desvincular()
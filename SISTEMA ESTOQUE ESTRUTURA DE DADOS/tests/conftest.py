@@ -0,0 +1,72 @@
+# Configuração comum dos testes (executar com "python -m pytest" a partir da pasta do projeto).
+# Os módulos do sistema ficam na pasta do projeto, fora de um pacote, como no Menu.
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Armazenamento import abrir_armazenamento
+from Engradado import Engradado
+from Estoque import Estoque
+from Fila_de_Pedidos import FilaPedidos
+from Pedido import Pedido
+from Produto import Produto
+
+
+@pytest.fixture
+def arquivos_json(tmp_path):
+    """
+    Caminhos de arquivos JSON completos que ainda não existem (o sistema começa vazio).
+    """
+    return {nome: str(tmp_path / f"{nome}.json") for nome in ('produtos', 'estoque', 'pedidos')}
+
+
+def abrir(diretorio, arquivos_json, tipo='log'):
+    """
+    Abre o armazenamento do diretório e carrega nele um Estoque e uma FilaPedidos novos.
+    """
+    armazenamento = abrir_armazenamento(str(diretorio), tipo)
+    estoque = Estoque()
+    fila_pedidos = FilaPedidos()
+    produtos = armazenamento.carregar(estoque, fila_pedidos, arquivos_json)
+    return armazenamento, produtos, estoque, fila_pedidos
+
+
+def estado(produtos, estoque, fila_pedidos):
+    """
+    O estado completo do sistema em dicionários, para comparar duas cargas.
+    """
+    return ([p.para_dicionario() for p in produtos], estoque.para_serializavel(),
+            fila_pedidos.para_serializavel())
+
+
+def operacoes_aleatorias(produtos, estoque, fila_pedidos, total, semente=1, ao_operar=None):
+    """
+    Aplica uma sequência reprodutível de operações do menu: engradados, pedidos (com e sem
+    reserva), atendimentos, lotes parciais, cancelamentos, retiradas e cadastros.
+    """
+    aleatorio = random.Random(semente)
+    for k in range(total):
+        sorteio = aleatorio.random()
+        codigo = aleatorio.choice('ABC')
+        if sorteio < 0.35:
+            estoque.adicionar_engradado(Engradado(codigo, aleatorio.randint(1, 9)))
+        elif sorteio < 0.55:
+            fila_pedidos.adicionar_pedido(Pedido(codigo, aleatorio.randint(1, 20), '2025-01-01', f"c{k % 5}"),
+                                          estoque if k % 2 else None)
+        elif sorteio < 0.65:
+            fila_pedidos.processar_pedido(estoque)
+        elif sorteio < 0.7:
+            fila_pedidos.processar_lote(estoque, permitir_parcial=True)
+        elif sorteio < 0.75 and fila_pedidos.fila:
+            fila_pedidos.cancelar_pedido(next(iter(fila_pedidos.fila)).numero, estoque)
+        elif sorteio < 0.8:
+            estoque.remover_engradado(codigo, aleatorio.randint(1, 5))
+        elif sorteio < 0.82:
+            produtos.adicionar(Produto(f"N{k}", '1', 'novo', 1, '2026-01-01', '2025-01-01', 1, 2.5,
+                                       'f', 'f', 'c'))
+        if ao_operar is not None:
+            ao_operar()
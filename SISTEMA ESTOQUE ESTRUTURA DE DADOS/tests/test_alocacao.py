@@ -0,0 +1,103 @@
+# Índices de alocação de adicionar_engradado: cada política escolhe a mesma posição que uma
+# varredura célula a célula escolheria, inclusive depois de colocações diretas, de retiradas e
+# de recarregar o estoque.
+import random
+
+from Engradado import Engradado
+from Estoque import (Estoque, POLITICA_COMPLETAR_PILHAS, POLITICA_PILHA_VAZIA,
+                     POLITICA_PRIMEIRA_POSICAO, POLITICAS_ALOCACAO)
+
+import pytest
+
+
+def posicao_esperada(estoque, produto_codigo):
+    """
+    (linha, coluna) que a política do estoque deve escolher, procurando célula por célula.
+    """
+    compativel = vazia = None
+    for i in range(estoque.linhas):
+        for j in range(estoque.colunas):
+            pilha = estoque.obter_pilha(i, j)
+            if pilha is None or pilha.esta_vazia():
+                vazia = vazia or (i, j)
+            elif pilha.topo().produto_codigo == produto_codigo and not pilha.esta_cheia():
+                compativel = compativel or (i, j)
+    if compativel is None or vazia is None:
+        return compativel or vazia
+    if estoque.politica_alocacao == POLITICA_COMPLETAR_PILHAS:
+        return compativel
+    if estoque.politica_alocacao == POLITICA_PILHA_VAZIA:
+        return vazia
+    return min(compativel, vazia)
+
+
+def altura(estoque, posicao):
+    pilha = estoque.obter_pilha(*posicao)
+    return 0 if pilha is None else len(pilha.engradados)
+
+
+def test_cada_politica_escolhe_a_sua_posicao():
+    escolhas = {}
+    for politica in POLITICAS_ALOCACAO:
+        estoque = Estoque(2, 2, 3, politica_alocacao=politica)
+        estoque.colocar_engradado(0, 0, Engradado('B', 1))
+        estoque.colocar_engradado(1, 1, Engradado('A', 1))
+        posicoes = [(i, j) for i in range(2) for j in range(2)]
+        antes = [altura(estoque, posicao) for posicao in posicoes]
+        assert estoque.adicionar_engradado(Engradado('A', 1))
+        escolhas[politica] = [posicao for posicao, h in zip(posicoes, antes) if altura(estoque, posicao) > h]
+    assert escolhas == {POLITICA_PRIMEIRA_POSICAO: [(0, 1)],
+                        POLITICA_COMPLETAR_PILHAS: [(1, 1)],
+                        POLITICA_PILHA_VAZIA: [(0, 1)]}
+
+
+def test_politica_desconhecida():
+    with pytest.raises(ValueError):
+        Estoque(2, 2, 3, politica_alocacao='aleatoria')
+
+
+@pytest.mark.parametrize('politica', POLITICAS_ALOCACAO)
+@pytest.mark.parametrize('semente', [1, 2])
+def test_mesma_posicao_que_a_varredura(politica, semente):
+    aleatorio = random.Random(semente)
+    estoque = Estoque(4, 5, 3, politica_alocacao=politica)
+    for passo in range(1500):
+        codigo = aleatorio.choice('ABC')
+        operacao = aleatorio.random()
+        if operacao < 0.55:
+            esperada = posicao_esperada(estoque, codigo)
+            antes = None if esperada is None else altura(estoque, esperada)
+            assert estoque.adicionar_engradado(Engradado(codigo, aleatorio.randint(1, 9))) == (esperada is not None)
+            if esperada is not None:
+                assert altura(estoque, esperada) == antes + 1
+        elif operacao < 0.65:
+            # Colocação direta, fora da política, em qualquer posição.
+            i, j = aleatorio.randrange(estoque.linhas), aleatorio.randrange(estoque.colunas)
+            estoque.colocar_engradado(i, j, Engradado(codigo, aleatorio.randint(1, 9)))
+        elif operacao < 0.9:
+            estoque.remover_engradado(codigo, aleatorio.randint(1, 15))
+        elif operacao < 0.97:
+            i, j = aleatorio.randrange(estoque.linhas), aleatorio.randrange(estoque.colunas)
+            estoque.retirar_do_topo(i, j, aleatorio.randint(1, 2))
+        else:
+            # Recarregar o estoque recria os índices a partir das pilhas.
+            recarregado = Estoque(4, 5, 3, politica_alocacao=politica)
+            recarregado.carregar_serializavel(estoque.para_serializavel())
+            estoque = recarregado
+
+
+def test_posicao_liberada_volta_a_ser_usada():
+    estoque = Estoque(1, 3, 1)
+    for codigo in 'ABC':
+        assert estoque.adicionar_engradado(Engradado(codigo, 5))
+    assert not estoque.adicionar_engradado(Engradado('D', 5))
+    assert estoque.remover_engradado('B', 5)
+    assert estoque.adicionar_engradado(Engradado('D', 5))
+    assert estoque.obter_pilha(0, 1).topo().produto_codigo == 'D'
+
+
+def test_armazem_grande_aloca_em_ordem():
+    estoque = Estoque(1000, 1000, 2)
+    for _ in range(6):
+        assert estoque.adicionar_engradado(Engradado('A', 1))
+    assert [(i, j) for i, j, _, _ in estoque.iter_engradados('A')] == [(0, 0), (0, 0), (0, 1), (0, 1), (0, 2), (0, 2)]
@@ -0,0 +1,45 @@
+# Armazenamento em SQLite (Armazenamento_sqlite.py): reabrir o banco devolve o mesmo estado,
+# a primeira abertura migra o log de alterações e as consultas em SQL batem com o estoque.
+from Produto import Produto
+
+from conftest import abrir, estado, operacoes_aleatorias
+
+
+def test_sqlite_reaberto_tem_o_mesmo_estado(tmp_path, arquivos_json):
+    armazenamento, produtos, estoque, fila_pedidos = abrir(tmp_path, arquivos_json, 'sqlite')
+    operacoes_aleatorias(produtos, estoque, fila_pedidos, 500)
+    antes = estado(produtos, estoque, fila_pedidos)
+    historico = [p.para_dicionario() for p in fila_pedidos.historico_atendidos]
+    armazenamento.fechar()
+
+    armazenamento, produtos, estoque, fila_pedidos = abrir(tmp_path, arquivos_json, 'sqlite')
+    assert estado(produtos, estoque, fila_pedidos) == antes
+    assert [p.para_dicionario() for p in fila_pedidos.historico_atendidos] == historico
+    armazenamento.fechar()
+
+
+def test_primeira_abertura_migra_o_log(tmp_path, arquivos_json):
+    persistencia, produtos, estoque, fila_pedidos = abrir(tmp_path, arquivos_json, 'log')
+    operacoes_aleatorias(produtos, estoque, fila_pedidos, 400)
+    antes = estado(produtos, estoque, fila_pedidos)
+    persistencia.fechar()
+
+    armazenamento, produtos, estoque, fila_pedidos = abrir(tmp_path, arquivos_json, 'sqlite')
+    assert estado(produtos, estoque, fila_pedidos) == antes
+    armazenamento.fechar()
+
+
+def test_consultas_em_sql_batem_com_o_estoque(tmp_path, arquivos_json):
+    armazenamento, produtos, estoque, fila_pedidos = abrir(tmp_path, arquivos_json, 'sqlite')
+    operacoes_aleatorias(produtos, estoque, fila_pedidos, 400)
+    produtos.adicionar(Produto('X', '1', 'x', 1, '2026-01-01', '2025-01-01', 1, 2, 'f', 'f', 'limpeza'))
+
+    for codigo in 'ABC':
+        assert armazenamento.total_produto(codigo) == estoque.contar_por_produto(codigo)
+        assert ([tuple(p) for p in armazenamento.posicoes_produto(codigo)]
+                == sorted({(i, j) for i, j, _, _ in estoque.iter_engradados(codigo)}))
+    for cliente in ('c0', 'c3'):
+        assert ([p.para_dicionario() for p in armazenamento.historico_do_cliente(cliente)]
+                == [p.para_dicionario() for p in fila_pedidos.historico_atendidos if p.solicitante == cliente])
+    assert [p.codigo for p in produtos.por_categoria('limpeza')] == ['X']
+    armazenamento.fechar()
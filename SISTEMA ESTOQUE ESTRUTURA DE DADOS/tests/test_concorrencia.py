@@ -0,0 +1,100 @@
+# Várias estações de separação (threads) usando o mesmo EstoqueConcorrente, direto ou pela
+# mesma fila: nenhum pedido é atendido duas vezes, o estoque nunca é vendido além do que
+# existe e os índices por produto continuam batendo com as pilhas.
+import random
+import sys
+import threading
+
+import pytest
+
+from Engradado import Engradado
+from Estoque_concorrente import EstoqueConcorrente
+from Fila_concorrente import FilaPedidosConcorrente
+from Pedido import Pedido
+
+
+@pytest.fixture
+def trocas_frequentes():
+    # Troca de thread a cada microssegundo, para expor as disputas.
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(intervalo)
+
+
+@pytest.mark.parametrize('semente', range(3))
+def test_estacoes_nao_atendem_alem_do_estoque(trocas_frequentes, semente):
+    estoque = EstoqueConcorrente(20, 20, 5)
+    for k in range(800):
+        estoque.adicionar_engradado(Engradado('A' if k % 4 else 'B', 5))
+    fila_pedidos = FilaPedidosConcorrente()
+    for k in range(2000):
+        fila_pedidos.adicionar_pedido(Pedido('A' if (k + semente) % 3 else 'B', 2, '2025-01-01', f"c{k}"),
+                                      estoque if k % 2 else None)
+    inicial = {codigo: estoque.contar_por_produto(codigo) for codigo in 'AB'}
+    erros = []
+
+    def estacao():
+        recusas = 0
+        try:
+            while recusas < 30:
+                resultado = fila_pedidos.processar_pedido(estoque)
+                if resultado is None:
+                    return
+                recusas = 0 if resultado else recusas + 1
+        except Exception as e:
+            erros.append(e)
+
+    estacoes = [threading.Thread(target=estacao) for _ in range(8)]
+    for t in estacoes:
+        t.start()
+    for t in estacoes:
+        t.join()
+
+    assert not erros
+    atendidos = list(fila_pedidos.historico_atendidos)
+    assert len({p.numero for p in atendidos}) == len(atendidos)
+    assert len(atendidos) + len(fila_pedidos.fila) == 2000
+    for codigo in 'AB':
+        retirado = inicial[codigo] - estoque.contar_por_produto(codigo)
+        assert retirado == sum(p.quantidade for p in atendidos if p.codigo_produto == codigo)
+        reservado = sum(p.quantidade for p in fila_pedidos.fila if p.reservado and p.codigo_produto == codigo)
+        assert estoque.reservado(codigo) == reservado <= estoque.contar_por_produto(codigo)
+
+
+@pytest.mark.parametrize('semente', range(3))
+def test_entradas_e_retiradas_simultaneas_mantem_os_indices(trocas_frequentes, semente):
+    estoque = EstoqueConcorrente(10, 10, 5, faixas_travas=8)
+    entradas = {codigo: 0 for codigo in 'ABCD'}
+    retiradas = {codigo: 0 for codigo in 'ABCD'}
+    trava_contas = threading.Lock()
+
+    def estacao(numero):
+        aleatorio = random.Random(semente * 100 + numero)
+        for _ in range(300):
+            codigo = aleatorio.choice('ABCD')
+            if aleatorio.random() < 0.6:
+                quantidade = aleatorio.randint(1, 9)
+                if estoque.adicionar_engradado(Engradado(codigo, quantidade)):
+                    with trava_contas:
+                        entradas[codigo] += quantidade
+            else:
+                quantidade = aleatorio.randint(1, 12)
+                if estoque.remover_engradado(codigo, quantidade):
+                    with trava_contas:
+                        retiradas[codigo] += quantidade
+
+    estacoes = [threading.Thread(target=estacao, args=(k,)) for k in range(6)]
+    for t in estacoes:
+        t.start()
+    for t in estacoes:
+        t.join()
+
+    for codigo in 'ABCD':
+        assert estoque.contar_por_produto(codigo) == entradas[codigo] - retiradas[codigo]
+        assert estoque.contar_por_produto(codigo) == sum(e.quantidade for _, _, _, e in estoque.iter_engradados(codigo))
+    # Cada pilha continua com um único produto.
+    pilhas = {}
+    for i, j, _, engradado in estoque.iter_engradados():
+        pilhas.setdefault((i, j), set()).add(engradado.produto_codigo)
+    assert all(len(produtos) == 1 for produtos in pilhas.values())
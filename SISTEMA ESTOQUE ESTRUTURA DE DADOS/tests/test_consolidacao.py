@@ -0,0 +1,96 @@
+# Consolidação das pilhas (Estoque.consolidar): os totais por produto não mudam, nenhum
+# engradado passa da capacidade, as posições liberadas são as que de fato ficaram vazias e
+# os movimentos chegam ao log como qualquer outra alteração.
+import random
+
+from Engradado import Engradado
+from Estoque import Estoque
+from Estoque_concorrente import EstoqueConcorrente
+from Produto import CatalogoProdutos, Produto
+
+import pytest
+
+from conftest import abrir, estado
+
+CAPACIDADES = {'A': 20, 'B': 10, 'C': None}
+
+
+def catalogo():
+    return CatalogoProdutos([Produto(codigo, 'L', codigo, 1, '2026-01-01', '2025-01-01', 1, 2, 'f', 'f', 'c',
+                                     capacidade_engradado=capacidade)
+                             for codigo, capacidade in CAPACIDADES.items()])
+
+
+def fragmentar(estoque, semente):
+    """
+    Enche o estoque com engradados parciais e abre buracos em pilhas aleatórias.
+    """
+    aleatorio = random.Random(semente)
+    for _ in range(120):
+        codigo = aleatorio.choice('ABC')
+        estoque.adicionar_engradado(Engradado(codigo, aleatorio.randint(1, CAPACIDADES[codigo] or 50)))
+    for _ in range(40):
+        estoque.retirar_do_topo(aleatorio.randrange(estoque.linhas), aleatorio.randrange(estoque.colunas),
+                                aleatorio.randint(1, 15))
+
+
+def ocupadas(estoque):
+    return len({(i, j) for i, j, _, _ in estoque.iter_engradados()})
+
+
+@pytest.mark.parametrize('classe', [Estoque, EstoqueConcorrente])
+@pytest.mark.parametrize('semente', [1, 2, 3])
+def test_consolidar_mantem_totais_e_libera_posicoes(classe, semente):
+    estoque = classe(6, 6, 5)
+    estoque.vincular_catalogo(catalogo())
+    fragmentar(estoque, semente)
+    totais = {codigo: estoque.contar_por_produto(codigo) for codigo in 'ABC'}
+    antes = ocupadas(estoque)
+
+    # Em fatias de poucos movimentos, como em segundo plano.
+    liberadas = 0
+    for _ in range(10000):
+        resultado = estoque.consolidar(max_movimentos=3)
+        assert resultado['movimentos'] <= 3
+        liberadas += resultado['posicoes_liberadas']
+        if resultado['concluido']:
+            break
+    else:
+        pytest.fail("a consolidação não terminou")
+
+    assert liberadas > 0
+    assert ocupadas(estoque) == antes - liberadas
+    assert {codigo: estoque.contar_por_produto(codigo) for codigo in 'ABC'} == totais
+    for _, _, _, engradado in estoque.iter_engradados():
+        capacidade = CAPACIDADES[engradado.produto_codigo]
+        assert 0 < engradado.quantidade and (capacidade is None or engradado.quantidade <= capacidade)
+    # Os índices continuam iguais aos de um estoque recarregado das pilhas.
+    recarregado = Estoque(6, 6, 5)
+    recarregado.carregar_serializavel(estoque.para_serializavel())
+    assert [recarregado.contar_por_produto(codigo) for codigo in 'ABC'] == [totais[codigo] for codigo in 'ABC']
+    # Uma segunda rodada não encontra mais nada a fazer.
+    assert estoque.consolidar()['movimentos'] == 0
+
+
+def test_sem_capacidade_engradados_so_sao_movidos_inteiros():
+    estoque = Estoque(1, 3, 3)
+    for j, quantidade in enumerate([4, 7]):
+        estoque.colocar_engradado(0, j, Engradado('C', quantidade))
+    resultado = estoque.consolidar(catalogo())
+    assert (resultado['movimentos'], resultado['posicoes_liberadas'], resultado['concluido']) == (1, 1, True)
+    assert sorted(e.quantidade for _, _, _, e in estoque.iter_engradados('C')) == [4, 7]
+
+
+def test_movimentos_chegam_ao_log(tmp_path, arquivos_json):
+    persistencia, produtos, estoque, fila_pedidos = abrir(tmp_path, arquivos_json)
+    for produto in catalogo():
+        produtos.adicionar(produto)
+    estoque.vincular_catalogo(produtos)
+    fragmentar(estoque, 1)
+    assert estoque.consolidar()['movimentos'] > 0
+    antes = estado(produtos, estoque, fila_pedidos)
+    persistencia.fechar()
+
+    persistencia, produtos, estoque, fila_pedidos = abrir(tmp_path, arquivos_json)
+    assert estado(produtos, estoque, fila_pedidos) == antes
+    persistencia.fechar()
@@ -0,0 +1,85 @@
+# Importação em lote (Importacao_lote.py): linhas inválidas são rejeitadas e contadas com o
+# número da linha, as válidas entram no estoque ou na fila, e o que não cabe é contado à parte.
+import json
+
+import Importacao_lote
+from Engradado import Engradado
+from Estoque import Estoque
+from Fila_de_Pedidos import FilaPedidos
+from Importacao_lote import importar_engradados, importar_pedidos
+from Produto import CatalogoProdutos, Produto
+
+import pytest
+
+
+@pytest.fixture
+def produtos():
+    return CatalogoProdutos([Produto(codigo, 'L', codigo, 1, '2026-01-01', '2025-01-01', 1, 2, 'f', 'f', 'c',
+                                     capacidade_engradado=capacidade)
+                             for codigo, capacidade in (('A', 10), ('B', None))])
+
+
+def test_engradados_csv(tmp_path, produtos):
+    caminho = tmp_path / 'caminhao.csv'
+    caminho.write_text("produto_codigo,quantidade\n"
+                       "A,10\n"     # válida
+                       "A,11\n"     # passa da capacidade do engradado
+                       "B,500\n"    # válida: B não tem capacidade
+                       "Z,1\n"      # produto não cadastrado
+                       "A,0\n"      # quantidade não positiva
+                       "A,2.5\n"    # quantidade não inteira
+                       ",3\n"       # código ausente
+                       "B,7\n", encoding='utf-8')
+    estoque = Estoque()
+    resultado = importar_engradados(str(caminho), estoque, produtos, tamanho_lote=2)
+
+    assert (resultado['linhas_lidas'], resultado['linhas_importadas'], resultado['linhas_rejeitadas'],
+            resultado['sem_espaco']) == (8, 3, 5, 0)
+    assert [erro.split(':')[0] for erro in resultado['erros']] == ['linha 3', 'linha 5', 'linha 6', 'linha 7', 'linha 8']
+    assert (estoque.contar_por_produto('A'), estoque.contar_por_produto('B')) == (10, 507)
+
+
+def test_engradados_sem_espaco(tmp_path, produtos):
+    caminho = tmp_path / 'caminhao.jsonl'
+    caminho.write_text(''.join(json.dumps({'produto_codigo': 'A', 'quantidade': 5}) + '\n' for _ in range(10)),
+                       encoding='utf-8')
+    estoque = Estoque(1, 2, 3)
+    resultado = importar_engradados(str(caminho), estoque, produtos, tamanho_lote=4)
+    assert (resultado['linhas_importadas'], resultado['sem_espaco'], resultado['linhas_rejeitadas']) == (6, 4, 0)
+    assert estoque.contar_por_produto('A') == 30
+
+
+def test_pedidos_jsonl(tmp_path, produtos):
+    linhas = [
+        json.dumps({'codigo_produto': 'A', 'quantidade': 4, 'solicitante': 'c1', 'data_solicitacao': '2025-02-01'}),
+        json.dumps({'codigo_produto': 'A', 'quantidade': 4, 'solicitante': 'c1', 'data_solicitacao': '2025-13-01'}),
+        json.dumps({'codigo_produto': 'A', 'quantidade': True, 'solicitante': 'c1'}),
+        json.dumps({'codigo_produto': 'B', 'quantidade': 3}),
+        json.dumps(['A', 1, 'c1']),
+        '{quebrado',
+        '',
+        json.dumps({'codigo_produto': 'B', 'quantidade': 9, 'solicitante': 'c2'}),
+    ]
+    caminho = tmp_path / 'pedidos.jsonl'
+    caminho.write_text('\n'.join(linhas) + '\n', encoding='utf-8')
+    estoque = Estoque()
+    estoque.colocar_engradado(0, 0, Engradado('A', 10))
+    fila_pedidos = FilaPedidos()
+    resultado = importar_pedidos(str(caminho), fila_pedidos, produtos, estoque)
+
+    # A linha em branco não é um registro.
+    assert (resultado['linhas_lidas'], resultado['linhas_importadas'], resultado['linhas_rejeitadas'],
+            resultado['reservados']) == (7, 2, 5, 1)
+    assert [erro.split(':')[0] for erro in resultado['erros']] == ['linha 2', 'linha 3', 'linha 4', 'linha 5', 'linha 6']
+    assert [(p.codigo_produto, p.quantidade, p.solicitante, p.reservado) for p in fila_pedidos.fila] == [
+        ('A', 4, 'c1', True), ('B', 9, 'c2', False)]
+    assert estoque.reservado('A') == 4
+
+
+def test_erros_guardados_sao_limitados(tmp_path, produtos, monkeypatch):
+    monkeypatch.setattr(Importacao_lote, 'MAXIMO_ERROS_GUARDADOS', 3)
+    caminho = tmp_path / 'caminhao.csv'
+    caminho.write_text("produto_codigo,quantidade\n" + "Z,1\n" * 10, encoding='utf-8')
+    resultado = importar_engradados(str(caminho), Estoque(), produtos)
+    assert resultado['linhas_rejeitadas'] == 10
+    assert len(resultado['erros']) == 3
@@ -0,0 +1,35 @@
+# Saídas do log estruturado: a escrita assíncrona sobrevive a falhas do destino, e os avisos
+# da carga vão para a saída em vez da tela.
+from Log_estruturado import INFO, SaidaAssincrona, SaidaMemoria, registro
+from Produto import CatalogoProdutos
+
+
+class SaidaQueFalha(SaidaMemoria):
+    """
+    Falha em todo registro do tipo 'falha', como uma gravação em disco cheio.
+    """
+    def emitir(self, registro):
+        if registro['tipo'] == 'falha':
+            raise OSError("disco cheio")
+        super().emitir(registro)
+
+
+def test_falha_do_destino_nao_encerra_a_escrita():
+    destino = SaidaQueFalha()
+    # Fila pequena: se a thread de escrita morresse, os emitir seguintes ficariam presos.
+    saida = SaidaAssincrona(destino, capacidade=2)
+    for k in range(50):
+        saida.emitir(registro(INFO, 'falha' if k % 5 == 0 else 'ok', k=k))
+    saida.fechar()
+    assert saida.erros == 10
+    assert isinstance(saida.ultimo_erro, OSError)
+    assert [r['k'] for r in destino.registros] == [k for k in range(50) if k % 5]
+
+
+def test_catalogo_ausente_avisa_pela_saida(tmp_path, capsys):
+    saida = SaidaMemoria()
+    arquivo = str(tmp_path / 'produtos.json')
+    assert len(CatalogoProdutos.carregar(arquivo, saida)) == 0
+    assert len(CatalogoProdutos.carregar(arquivo)) == 0
+    assert capsys.readouterr().out == ''
+    assert [(r['tipo'], r['arquivo']) for r in saida.registros] == [('arquivo_produtos_ausente', arquivo)]
@@ -0,0 +1,121 @@
+# Métricas (Metricas.py): engradados tocados pelo remover_engradado e pelos passos de um
+# plano de retirada, resultados e espera da fila, histogramas, exportação e a volta aos
+# métodos originais.
+import json
+
+from Engradado import Engradado
+from Estoque import Estoque
+from Fila_de_Pedidos import FilaPedidos
+from Metricas import (LIMITES_CONTAGEM, Histograma, RegistroMetricas, desinstrumentar,
+                      instrumentar_armazenamento, instrumentar_estoque, instrumentar_fila)
+from Pedido import Pedido
+from Planejador_retirada import PlanejadorRetirada
+
+from conftest import abrir
+
+
+def _estoque_medido():
+    estoque = Estoque(2, 2, 4)
+    for quantidade in (5, 5, 5, 5):
+        estoque.colocar_engradado(0, 0, Engradado('A', quantidade))
+    registro = RegistroMetricas()
+    instrumentar_estoque(estoque, registro)
+    return estoque, registro
+
+
+def test_remover_engradado_conta_pilhas_e_engradados():
+    estoque, registro = _estoque_medido()
+    estoque.remover_engradado('A', 12)
+    assert registro.contador('estoque.remover_engradado.chamadas') == 1
+    assert registro.histograma('estoque.remover_engradado.engradados_tocados').soma == 3
+    assert registro.histograma('estoque.remover_engradado.pilhas_visitadas').soma == 1
+
+
+def test_plano_de_retirada_conta_engradados_tocados():
+    estoque, registro = _estoque_medido()
+    planejador = PlanejadorRetirada(estoque)
+    assert planejador.executar(planejador.planejar('A', 12))
+    assert registro.contador('estoque.retirar_do_topo.engradados_tocados') == 3
+    assert registro.histograma('estoque.remover_engradado.engradados_tocados') is None
+
+
+def test_alocacao_conta_posicoes_examinadas():
+    estoque, registro = _estoque_medido()
+    estoque.adicionar_engradado(Engradado('B', 1))
+    assert registro.contador('estoque.adicionar_engradado.chamadas') == 1
+    assert registro.histograma('estoque.alocacao.posicoes_examinadas').contagem == 1
+
+
+def test_desinstrumentar_volta_aos_metodos_da_classe():
+    estoque, registro = _estoque_medido()
+    desinstrumentar(estoque)
+    estoque.remover_engradado('A', 1)
+    estoque.retirar_do_topo(0, 0, 1)
+    assert registro.instantaneo() == {'contadores': {}, 'medidores': {}, 'histogramas': {}}
+    assert 'remover_engradado' not in vars(estoque) and 'retirar_do_topo' not in vars(estoque)
+
+
+def test_fila_conta_resultados_profundidade_e_espera():
+    estoque, fila_pedidos, registro = Estoque(), FilaPedidos(), RegistroMetricas()
+    estoque.adicionar_engradado(Engradado('A', 5))
+    fila_pedidos.adicionar_pedido(Pedido('A', 3, '2025-01-01', 'c'))
+    instrumentar_fila(fila_pedidos, registro)
+    fila_pedidos.adicionar_pedido(Pedido('A', 3, '2025-01-01', 'c'))
+    assert registro.medidor('fila.profundidade') == 2
+
+    resultados = [fila_pedidos.processar_pedido(estoque) for _ in range(3)]
+    assert resultados == [True, False, False]
+    assert [registro.contador('fila.processar_pedido.' + r) for r in ('atendidos', 'recusados', 'fila_vazia')] == [1, 2, 0]
+    assert registro.contador('fila.processar_pedido.chamadas') == 3
+    assert registro.histograma('fila.espera.segundos').contagem == 1
+    assert registro.medidor('fila.profundidade') == 1
+
+    fila_pedidos.cancelar_pedido(2)
+    assert fila_pedidos.processar_pedido(estoque) is None
+    assert registro.contador('fila.processar_pedido.fila_vazia') == 1
+    assert registro.medidor('fila.profundidade') == 0
+
+
+def test_histograma_faixas_e_percentis():
+    histograma = Histograma(LIMITES_CONTAGEM)
+    for valor in [0, 1, 1, 3, 3, 3, 5, 2000]:
+        histograma.registrar(valor)
+    assert histograma.contagens[:5] == [1, 2, 0, 3, 1]
+    assert histograma.contagens[-1] == 1
+    assert (histograma.percentil(50), histograma.percentil(100), histograma.maximo) == (4, 2000, 2000)
+    assert Histograma().percentil(50) is None
+
+
+def test_exportacao_json_e_texto():
+    registro = RegistroMetricas()
+    registro.contar('estoque.remover_engradado.chamadas', 2)
+    registro.definir('fila.profundidade', 7)
+    for valor in (1, 3):
+        registro.observar('estoque.alocacao.posicoes_examinadas', valor, LIMITES_CONTAGEM)
+
+    assert json.loads(registro.exportar_json()) == registro.instantaneo()
+    linhas = registro.exportar_texto(prefixo='armazem_').splitlines()
+    assert 'armazem_estoque_remover_engradado_chamadas_total 2' in linhas
+    assert 'armazem_fila_profundidade 7' in linhas
+    # As faixas são acumuladas, como no formato do Prometheus.
+    assert 'armazem_estoque_alocacao_posicoes_examinadas_bucket{le="2"} 1' in linhas
+    assert 'armazem_estoque_alocacao_posicoes_examinadas_bucket{le="+Inf"} 2' in linhas
+    assert 'armazem_estoque_alocacao_posicoes_examinadas_sum 4' in linhas
+
+    registro.zerar()
+    assert registro.instantaneo() == {'contadores': {}, 'medidores': {}, 'histogramas': {}}
+
+
+def test_armazenamento_conta_salvamentos(tmp_path, arquivos_json):
+    armazenamento, _, estoque, _ = abrir(tmp_path, arquivos_json)
+    registro = RegistroMetricas()
+    instrumentar_armazenamento(armazenamento, registro)
+    estoque.adicionar_engradado(Engradado('A', 1))
+    armazenamento.sincronizar()
+    armazenamento.sincronizar()
+    assert registro.contador('armazenamento.salvar.chamadas') == 2
+    assert registro.histograma('armazenamento.salvar.segundos').contagem == 2
+    desinstrumentar(armazenamento)
+    armazenamento.sincronizar()
+    assert registro.contador('armazenamento.salvar.chamadas') == 2
+    armazenamento.fechar()
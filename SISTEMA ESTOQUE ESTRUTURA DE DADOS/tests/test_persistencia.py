@@ -0,0 +1,112 @@
+# Reconstrução do estado pelo log de alterações (Persistencia.py): reabrir o armazenamento
+# deve devolver o mesmo estado. Os testes parametrizados valem também para o banco SQLite
+# (veja test_armazenamento_sqlite.py).
+from Armazenamento import TravaDiretorio
+from Engradado import Engradado
+from Fila_de_Pedidos import FilaPedidos
+from Pedido import Pedido
+from Persistencia import Persistencia
+
+import pytest
+
+from conftest import abrir, estado, operacoes_aleatorias
+
+
+def test_log_reaplica_segmentos_sobre_o_snapshot(tmp_path, arquivos_json):
+    persistencia, produtos, estoque, fila_pedidos = abrir(tmp_path, arquivos_json)
+    operacoes_aleatorias(produtos, estoque, fila_pedidos, 300, semente=1)
+    persistencia.compactar(esperar=True)
+    # Alterações depois do snapshot ficam só nos segmentos do log.
+    operacoes_aleatorias(produtos, estoque, fila_pedidos, 300, semente=2)
+    antes = estado(produtos, estoque, fila_pedidos)
+    reservado = {codigo: estoque.reservado(codigo) for codigo in 'ABC'}
+    persistencia.fechar()
+
+    assert (tmp_path / 'estado.snapshot.json').exists()
+    persistencia, produtos, estoque, fila_pedidos = abrir(tmp_path, arquivos_json)
+    assert estado(produtos, estoque, fila_pedidos) == antes
+    assert {codigo: estoque.reservado(codigo) for codigo in 'ABC'} == reservado
+    persistencia.fechar()
+
+
+def test_log_ignora_ultima_linha_incompleta(tmp_path, arquivos_json):
+    persistencia, produtos, estoque, fila_pedidos = abrir(tmp_path, arquivos_json)
+    operacoes_aleatorias(produtos, estoque, fila_pedidos, 200)
+    antes = estado(produtos, estoque, fila_pedidos)
+    persistencia.fechar()
+
+    # Uma gravação interrompida deixa meio registro no fim do último segmento.
+    _, ultimo = Persistencia(str(tmp_path))._segmentos()[-1]
+    with open(ultimo, 'a', encoding='utf-8') as f:
+        f.write('{"tipo":"engradado_adicionado","linha":0,"col')
+
+    persistencia, produtos, estoque, fila_pedidos = abrir(tmp_path, arquivos_json)
+    assert estado(produtos, estoque, fila_pedidos) == antes
+    # A linha incompleta é cortada: o segmento deixa de ser o último sem quebrar a próxima carga.
+    estoque.adicionar_engradado(Engradado('A', 3))
+    antes = estado(produtos, estoque, fila_pedidos)
+    persistencia.fechar()
+
+    persistencia, produtos, estoque, fila_pedidos = abrir(tmp_path, arquivos_json)
+    assert estado(produtos, estoque, fila_pedidos) == antes
+    persistencia.fechar()
+
+
+def test_log_recusa_registro_corrompido_no_meio(tmp_path, arquivos_json):
+    persistencia, produtos, estoque, fila_pedidos = abrir(tmp_path, arquivos_json)
+    operacoes_aleatorias(produtos, estoque, fila_pedidos, 200)
+    persistencia.fechar()
+
+    _, ultimo = Persistencia(str(tmp_path))._segmentos()[-1]
+    with open(ultimo, 'r', encoding='utf-8') as f:
+        linhas = f.readlines()
+    linhas[len(linhas) // 2] = '{"tipo":"engradado_adic\n'
+    with open(ultimo, 'w', encoding='utf-8') as f:
+        f.writelines(linhas)
+
+    with pytest.raises(ValueError):
+        abrir(tmp_path, arquivos_json)
+    # A carga que falhou não deixa o diretório travado.
+    trava = TravaDiretorio(str(tmp_path))
+    trava.obter()
+    trava.liberar()
+
+
+@pytest.mark.parametrize('tipo', ['log', 'sqlite'])
+def test_diretorio_aberto_recusa_segundo_armazenamento(tmp_path, arquivos_json, tipo):
+    armazenamento, _, _, _ = abrir(tmp_path, arquivos_json, tipo)
+    # A trava é do sistema operacional, então uma segunda abertura no mesmo processo também falha.
+    with pytest.raises(RuntimeError):
+        TravaDiretorio(str(tmp_path)).obter()
+    armazenamento.fechar()
+    trava = TravaDiretorio(str(tmp_path))
+    trava.obter()
+    trava.liberar()
+
+
+@pytest.mark.parametrize('tipo', ['log', 'sqlite'])
+def test_numeracao_continua_com_a_fila_vazia(tmp_path, arquivos_json, tipo):
+    armazenamento, produtos, estoque, fila_pedidos = abrir(tmp_path, arquivos_json, tipo)
+    estoque.adicionar_engradado(Engradado('A', 9))
+    for quantidade in (2, 3, 20):
+        fila_pedidos.adicionar_pedido(Pedido('A', quantidade, '2025-01-01', 'c'))
+    fila_pedidos.processar_lote(estoque)
+    # O último pedido (número 3) é cancelado: nem o histórico guarda o seu número.
+    fila_pedidos.cancelar_pedido(3)
+    assert not fila_pedidos.fila
+    if tipo == 'log':
+        armazenamento.compactar(esperar=True)
+    armazenamento.fechar()
+
+    armazenamento, produtos, estoque, fila_pedidos = abrir(tmp_path, arquivos_json, tipo)
+    pedido = Pedido('A', 1, '2025-01-02', 'c')
+    fila_pedidos.adicionar_pedido(pedido)
+    assert pedido.numero == 4
+    armazenamento.fechar()
+
+
+def test_numeracao_de_arquivo_antigo_segue_o_historico():
+    fila_pedidos = FilaPedidos()
+    fila_pedidos.carregar_serializavel({'fila': [], 'historico_atendidos': [
+        Pedido('A', 1, '2025-01-01', 'c', numero=7).para_dicionario()]}, adiar_historico=True)
+    assert fila_pedidos.proximo_numero == 8
@@ -0,0 +1,101 @@
+# Planos de retirada: mínimo de engradados parciais e, depois, de engradados tocados,
+# conferido contra uma busca exaustiva em estoques pequenos.
+import itertools
+import random
+
+import Planejador_retirada
+from Engradado import Engradado
+from Estoque import Estoque
+from Planejador_retirada import PlanejadorRetirada
+
+import pytest
+
+
+def montar_estoque(pilhas):
+    """
+    Estoque 2x3 com as pilhas dadas (quantidades da base para o topo), nas posições em ordem.
+    """
+    estoque = Estoque(2, 3, 4)
+    for posicao, quantidades in enumerate(pilhas):
+        for quantidade in quantidades:
+            estoque.colocar_engradado(posicao // 3, posicao % 3, Engradado('A', quantidade))
+    return estoque
+
+
+def custo_minimo(pilhas, quantidade):
+    """
+    (parciais, engradados tocados) do melhor plano, testando todos os prefixos de cada pilha.
+    """
+    topos = [list(reversed(quantidades)) for quantidades in pilhas]
+    melhor = None
+    for prefixos in itertools.product(*[range(len(topo) + 1) for topo in topos]):
+        inteiros = sum(sum(topo[:k]) for topo, k in zip(topos, prefixos))
+        tocados = sum(prefixos)
+        if inteiros == quantidade:
+            custo = (0, tocados)
+        elif inteiros < quantidade and any(k < len(topo) and inteiros + topo[k] > quantidade
+                                            for topo, k in zip(topos, prefixos)):
+            custo = (1, tocados + 1)
+        else:
+            continue
+        melhor = custo if melhor is None else min(melhor, custo)
+    return melhor
+
+
+def test_prefere_engradados_inteiros_a_abrir_um_parcial():
+    estoque = montar_estoque([[6], [5, 5]])
+    plano = PlanejadorRetirada(estoque).planejar('A', 10)
+    assert plano['engradados_parciais'] == 0
+    assert plano['engradados_completos'] == 2
+    assert [(p['linha'], p['coluna'], p['quantidade']) for p in plano['passos']] == [(0, 1, 5), (0, 1, 5)]
+
+
+@pytest.mark.parametrize('semente', [1, 2, 3])
+def test_plano_minimo_em_estoques_pequenos(semente):
+    aleatorio = random.Random(semente)
+    for _ in range(300):
+        pilhas = [[aleatorio.choice([1, 2, 3, 5, 6, 7]) for _ in range(aleatorio.randint(1, 3))]
+                  for _ in range(aleatorio.randint(1, 6))]
+        total = sum(map(sum, pilhas))
+        quantidade = aleatorio.randint(1, total)
+        estoque = montar_estoque(pilhas)
+        planejador = PlanejadorRetirada(estoque)
+        plano = planejador.planejar('A', quantidade)
+        assert sum(p['quantidade'] for p in plano['passos']) == quantidade
+        assert (plano['engradados_parciais'], len(plano['passos'])) == custo_minimo(pilhas, quantidade)
+        assert planejador.executar(plano)
+        assert estoque.contar_por_produto('A') == total - quantidade
+
+
+def test_plano_guloso_acima_do_limite(monkeypatch):
+    monkeypatch.setattr(Planejador_retirada, 'LIMITE_PLANO_EXATO', 0)
+    estoque = montar_estoque([[6], [5, 5]])
+    plano = PlanejadorRetirada(estoque).planejar('A', 10)
+    assert sum(p['quantidade'] for p in plano['passos']) == 10
+    assert plano['engradados_parciais'] <= 1
+
+
+def test_estoque_insuficiente():
+    assert PlanejadorRetirada(montar_estoque([[6], [5, 5]])).planejar('A', 17) is None
+
+
+def test_executar_recusa_plano_com_engradado_novo_no_topo():
+    estoque = Estoque(2, 3, 4)
+    estoque.colocar_engradado(0, 0, Engradado('A', 5))
+    planejador = PlanejadorRetirada(estoque)
+    plano = planejador.planejar('A', 5)
+    estoque.colocar_engradado(0, 0, Engradado('A', 2))
+    with pytest.raises(ValueError):
+        planejador.executar(plano)
+    assert estoque.contar_por_produto('A') == 7
+
+
+def test_executar_recusa_plano_com_engradado_a_menos():
+    estoque = montar_estoque([[5, 5]])
+    planejador = PlanejadorRetirada(estoque)
+    plano = planejador.planejar('A', 10)
+    estoque.retirar_do_topo(0, 0, 5)
+    estoque.colocar_engradado(0, 1, Engradado('A', 5))
+    with pytest.raises(ValueError):
+        planejador.executar(plano)
+    assert estoque.contar_por_produto('A') == 10
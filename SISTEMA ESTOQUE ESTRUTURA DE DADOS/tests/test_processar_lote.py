@@ -0,0 +1,38 @@
+# Processamento em lote: atendidos, parciais e adiados são listas disjuntas, e os pedidos
+# que não foram atendidos por inteiro voltam à fila na mesma ordem.
+from Engradado import Engradado
+from Estoque import Estoque
+from Fila_de_Pedidos import FilaPedidos
+from Pedido import Pedido
+
+
+def test_parciais_e_adiados_sao_disjuntos():
+    estoque = Estoque(4, 4, 4)
+    estoque.adicionar_engradado(Engradado('A', 10))
+    fila_pedidos = FilaPedidos()
+    for codigo, quantidade in (('A', 4), ('A', 8), ('B', 3), ('A', 1)):
+        fila_pedidos.adicionar_pedido(Pedido(codigo, quantidade, '2025-01-01', 'c'))
+
+    resultado = fila_pedidos.processar_lote(estoque, permitir_parcial=True)
+
+    assert [p.numero for p in resultado['atendidos']] == [1]
+    assert [(p['pedido'].numero, p['quantidade_atendida'], p['quantidade_pendente'])
+            for p in resultado['parciais']] == [(2, 6, 2)]
+    assert [p.numero for p in resultado['adiados']] == [3, 4]
+    assert [(p.numero, p.quantidade) for p in fila_pedidos.fila] == [(2, 2), (3, 3), (4, 1)]
+    assert estoque.contar_por_produto('A') == 0
+
+
+def test_sem_parcial_o_pedido_maior_fica_adiado():
+    estoque = Estoque(4, 4, 4)
+    estoque.adicionar_engradado(Engradado('A', 10))
+    fila_pedidos = FilaPedidos()
+    for quantidade in (4, 8, 1):
+        fila_pedidos.adicionar_pedido(Pedido('A', quantidade, '2025-01-01', 'c'))
+
+    resultado = fila_pedidos.processar_lote(estoque)
+
+    assert [p.numero for p in resultado['atendidos']] == [1, 3]
+    assert resultado['parciais'] == []
+    assert [p.numero for p in resultado['adiados']] == [2]
+    assert [p.numero for p in fila_pedidos.fila] == [2]
@@ -0,0 +1,115 @@
+# Rede de estoques: o roteamento mantém cada produto no seu armazém e reparte os produtos
+# novos em rodízio, os engradados recusados seguem para outro armazém, a retirada é dividida
+# pela política escolhida e é tudo ou nada, e as consultas em lote dão o mesmo resultado que
+# as consultas de um produto por vez.
+from Engradado import Engradado
+from Estoque import Estoque
+from Produto import CatalogoProdutos, Produto
+from Rede_estoques import (DIVISAO_MAIOR_SALDO, DIVISAO_MAIS_PROXIMO, DIVISAO_VALIDADE,
+                           EstoqueEmProcesso, RedeEstoques)
+
+import pytest
+
+
+def unidades(armazens, produto_codigo):
+    return [estoque.contar_por_produto(produto_codigo) for estoque in armazens]
+
+
+def test_produto_fica_no_seu_armazem_e_novos_vao_em_rodizio():
+    armazens = [Estoque(2, 2, 3) for _ in range(3)]
+    rede = RedeEstoques(armazens)
+    assert rede.adicionar_engradados([Engradado(codigo, 1) for codigo in 'ABCDABCD']) == []
+    assert [unidades(armazens, codigo) for codigo in 'ABCD'] == [[2, 0, 0], [0, 2, 0], [0, 0, 2], [2, 0, 0]]
+    assert rede.adicionar_engradado(Engradado('B', 1))
+    assert unidades(armazens, 'B') == [0, 3, 0]
+
+
+def test_engradados_recusados_seguem_para_outro_armazem():
+    armazens = [Estoque(1, 1, 1), Estoque(1, 2, 1)]
+    rede = RedeEstoques(armazens)
+    # O primeiro armazém só tem uma pilha, de um engradado: o segundo A é recusado e redistribuído.
+    assert rede.adicionar_engradados([Engradado('A', 1), Engradado('A', 2)]) == []
+    assert unidades(armazens, 'A') == [1, 2]
+    # Um produto novo não vai para o armazém sem pilhas vazias.
+    assert rede.adicionar_engradado(Engradado('B', 1))
+    assert unidades(armazens, 'B') == [0, 1]
+    # A rede está cheia: o engradado volta sem lugar.
+    sem_lugar = rede.adicionar_engradados([Engradado('C', 1)])
+    assert [e.produto_codigo for e in sem_lugar] == ['C']
+    # Uma retirada libera as pilhas de A e os armazéns voltam a ser tentados.
+    assert rede.remover_engradado('A', 3) == {'armazem-1': 2, 'armazem-0': 1}
+    assert rede.adicionar_engradados([Engradado('C', 1), Engradado('D', 1)]) == []
+    assert unidades(armazens, 'C') + unidades(armazens, 'D') in ([1, 0, 0, 1], [0, 1, 1, 0])
+
+
+def _rede_com_saldos(saldos, **kwargs):
+    armazens = [Estoque(2, 2, 3) for _ in saldos]
+    for estoque, saldo in zip(armazens, saldos):
+        if saldo:
+            estoque.adicionar_engradado(Engradado('A', saldo))
+    return armazens, RedeEstoques(armazens, nomes=['norte', 'centro', 'sul'], **kwargs)
+
+
+def test_divisao_pelo_maior_saldo():
+    armazens, rede = _rede_com_saldos([4, 9, 6])
+    assert rede.planejar_retirada('A', 12, DIVISAO_MAIOR_SALDO) == {1: 9, 2: 3}
+    assert rede.remover_engradado('A', 12) == {'centro': 9, 'sul': 3}
+    assert unidades(armazens, 'A') == [4, 0, 3]
+
+
+def test_divisao_pelo_mais_proximo():
+    armazens, rede = _rede_com_saldos([4, 9, 6], localizacoes=[(0, 10), (0, 0), (0, -10)])
+    assert rede.remover_engradado('A', 8, DIVISAO_MAIS_PROXIMO, destino=(0, -8)) == {'sul': 6, 'centro': 2}
+    assert unidades(armazens, 'A') == [4, 7, 0]
+    with pytest.raises(ValueError):
+        rede.planejar_retirada('A', 1, DIVISAO_MAIS_PROXIMO)
+
+
+def test_divisao_pela_validade():
+    armazens, rede = _rede_com_saldos([4, 9, 6], politica_divisao=DIVISAO_VALIDADE)
+    # Cada armazém tem o seu lote do produto; o do centro não tem o produto no catálogo.
+    for estoque, validade in zip(armazens, ['2026-03-01', None, '2026-01-01']):
+        if validade is not None:
+            estoque.vincular_catalogo(CatalogoProdutos([
+                Produto('A', 'L', 'A', 1, validade, '2025-01-01', 1, 2, 'f', 'f', 'c')]))
+    assert rede.planejar_retirada('A', 12) == {2: 6, 0: 4, 1: 2}
+
+
+def test_saldo_insuficiente_e_politica_desconhecida():
+    armazens, rede = _rede_com_saldos([4, 9, 6])
+    assert rede.remover_engradado('A', 20) is None
+    assert unidades(armazens, 'A') == [4, 9, 6]
+    with pytest.raises(ValueError):
+        rede.planejar_retirada('A', 1, 'aleatoria')
+
+
+def test_retirada_recusada_nao_altera_nenhum_armazem():
+    armazens = [Estoque(2, 2, 2), Estoque(2, 2, 2)]
+    for estoque in armazens:
+        estoque.adicionar_engradado(Engradado('A', 5))
+    rede = RedeEstoques(armazens)
+    planejar = rede.planejar_retirada
+
+    def planejar_e_alterar(*args):
+        plano = planejar(*args)
+        # Entre o planejamento e a retirada, o segundo armazém é alterado por fora da rede.
+        armazens[1].reservar('A', 3)
+        return plano
+    rede.planejar_retirada = planejar_e_alterar
+
+    with pytest.raises(RuntimeError):
+        rede.remover_engradado('A', 10)
+    assert [estoque.contar_por_produto('A') for estoque in armazens] == [5, 5]
+    assert [estoque.reservado('A') for estoque in armazens] == [0, 3]
+
+
+def test_consultas_em_lote_iguais_as_individuais():
+    rede = RedeEstoques([Estoque(2, 2, 2), EstoqueEmProcesso(2, 2, 2)])
+    try:
+        rede.adicionar_engradados([Engradado(codigo, 3) for codigo in 'ABCABCAB'])
+        rede.remover_engradado('A', 4)
+        codigos = ['A', 'B', 'C', 'D']
+        assert rede.contar_produtos(codigos) == {codigo: rede.contar_por_produto(codigo) for codigo in codigos}
+        assert rede.saldos_produtos(codigos) == {codigo: rede.saldos(codigo) for codigo in codigos}
+    finally:
+        rede.fechar()
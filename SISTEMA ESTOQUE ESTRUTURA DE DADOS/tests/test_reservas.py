@@ -0,0 +1,64 @@
+# Reservas de estoque para pedidos na fila: o reservado de cada produto é a soma dos pedidos
+# reservados e nunca passa do que existe em estoque; unidades reservadas só saem para o
+# próprio pedido, e cancelar o pedido devolve a reserva ao saldo disponível.
+from Engradado import Engradado
+from Estoque import Estoque
+from Fila_de_Pedidos import FilaPedidos
+from Pedido import Pedido
+from Politicas_fila import PoliticaFIFO
+from Produto import CatalogoProdutos
+
+import pytest
+
+from conftest import operacoes_aleatorias
+
+
+def conferir_reservas(estoque, fila_pedidos):
+    for codigo in 'ABC':
+        reservado_fila = sum(p.quantidade for p in fila_pedidos.fila if p.reservado and p.codigo_produto == codigo)
+        assert estoque.reservado(codigo) == reservado_fila
+        assert estoque.reservado(codigo) <= estoque.contar_por_produto(codigo)
+
+
+@pytest.mark.parametrize('semente', [1, 2, 3])
+def test_reservado_e_a_soma_dos_pedidos_reservados(semente):
+    estoque = Estoque(4, 4, 4)
+    fila_pedidos = FilaPedidos()
+    operacoes_aleatorias(CatalogoProdutos(), estoque, fila_pedidos, 600, semente,
+                         ao_operar=lambda: conferir_reservas(estoque, fila_pedidos))
+
+
+def test_reservas_refeitas_ao_recarregar():
+    estoque = Estoque(4, 4, 4)
+    fila_pedidos = FilaPedidos(PoliticaFIFO())
+    operacoes_aleatorias(CatalogoProdutos(), estoque, fila_pedidos, 300)
+    copia_estoque = Estoque(4, 4, 4)
+    copia_estoque.carregar_serializavel(estoque.para_serializavel())
+    copia_fila = FilaPedidos()
+    copia_fila.carregar_serializavel(fila_pedidos.para_serializavel())
+    copia_fila.reaplicar_reservas(copia_estoque)
+    conferir_reservas(copia_estoque, copia_fila)
+
+
+def test_unidades_reservadas_nao_saem_por_outra_remocao():
+    estoque = Estoque(4, 4, 4)
+    estoque.adicionar_engradado(Engradado('A', 10))
+    fila_pedidos = FilaPedidos()
+    assert fila_pedidos.adicionar_pedido(Pedido('A', 7, '2025-01-01', 'c'), estoque)
+    assert estoque.disponivel('A') == 3
+    assert not estoque.remover_engradado('A', 4)
+    assert estoque.remover_engradado('A', 3)
+    # O pedido reservado ainda é atendido com as unidades separadas para ele.
+    assert fila_pedidos.processar_pedido(estoque)
+    assert estoque.contar_por_produto('A') == 0 and estoque.reservado('A') == 0
+
+
+def test_pedido_sem_saldo_entra_sem_reserva_e_cancelar_libera():
+    estoque = Estoque(4, 4, 4)
+    estoque.adicionar_engradado(Engradado('A', 10))
+    fila_pedidos = FilaPedidos()
+    assert fila_pedidos.adicionar_pedido(Pedido('A', 6, '2025-01-01', 'c'), estoque)
+    assert not fila_pedidos.adicionar_pedido(Pedido('A', 6, '2025-01-01', 'd'), estoque)
+    assert estoque.reservado('A') == 6
+    fila_pedidos.cancelar_pedido(1, estoque)
+    assert estoque.reservado('A') == 0 and estoque.disponivel('A') == 10
@@ -0,0 +1,75 @@
+# Snapshot binário (Snapshot_binario.py): gravar e reabrir devolve o mesmo estado, direto ou
+# passando pelo conversor de e para os arquivos JSON.
+import json
+
+from Estoque import Estoque
+from Fila_de_Pedidos import FilaPedidos
+from Pedido import Pedido
+from Produto import CatalogoProdutos
+from Snapshot_binario import SnapshotBinario, binario_para_json, json_para_binario, salvar_snapshot_binario
+
+import pytest
+
+from conftest import estado, operacoes_aleatorias
+
+
+def carregar_snapshot(nome_arquivo):
+    snapshot = SnapshotBinario(nome_arquivo)
+    try:
+        produtos = snapshot.carregar_produtos()
+        estoque = Estoque(snapshot.matriz.linhas, snapshot.matriz.colunas, snapshot.matriz.altura_maxima)
+        snapshot.carregar_estoque(estoque)
+        fila_pedidos = FilaPedidos()
+        snapshot.carregar_pedidos(fila_pedidos)
+    finally:
+        snapshot.fechar()
+    return produtos, estoque, fila_pedidos
+
+
+@pytest.mark.parametrize('semente', [1, 2])
+def test_snapshot_devolve_o_mesmo_estado(tmp_path, semente):
+    produtos, estoque, fila_pedidos = CatalogoProdutos(), Estoque(6, 4, 3), FilaPedidos()
+    operacoes_aleatorias(produtos, estoque, fila_pedidos, 500, semente)
+    nome_arquivo = str(tmp_path / 'estado.bin')
+    salvar_snapshot_binario(nome_arquivo, produtos, estoque, fila_pedidos)
+
+    produtos_lidos, estoque_lido, fila_lida = carregar_snapshot(nome_arquivo)
+    assert estado(produtos_lidos, estoque_lido, fila_lida) == estado(produtos, estoque, fila_pedidos)
+    assert [estoque_lido.reservado(c) for c in 'ABC'] == [estoque.reservado(c) for c in 'ABC']
+
+
+def test_numero_de_pedido_cancelado_nao_volta(tmp_path):
+    produtos, estoque, fila_pedidos = CatalogoProdutos(), Estoque(), FilaPedidos()
+    for _ in range(3):
+        fila_pedidos.adicionar_pedido(Pedido('A', 1, '2025-01-01', 'c'))
+    fila_pedidos.cancelar_pedido(3)
+    nome_arquivo = str(tmp_path / 'estado.bin')
+    salvar_snapshot_binario(nome_arquivo, produtos, estoque, fila_pedidos)
+
+    _, _, fila_lida = carregar_snapshot(nome_arquivo)
+    fila_lida.adicionar_pedido(Pedido('A', 1, '2025-01-01', 'c'))
+    assert [p.numero for p in fila_lida.fila] == [1, 2, 4]
+
+
+def test_conversor_json_binario_json(tmp_path, arquivos_json):
+    produtos, estoque, fila_pedidos = CatalogoProdutos(), Estoque(), FilaPedidos()
+    operacoes_aleatorias(produtos, estoque, fila_pedidos, 400)
+    produtos.salvar(arquivos_json['produtos'])
+    estoque.salvar_estoque(arquivos_json['estoque'])
+    fila_pedidos.salvar_pedidos(arquivos_json['pedidos'])
+
+    nome_arquivo = str(tmp_path / 'estado.bin')
+    json_para_binario(arquivos_json['produtos'], arquivos_json['estoque'], arquivos_json['pedidos'], nome_arquivo)
+    convertidos = {nome: str(tmp_path / f"{nome}.convertido.json") for nome in arquivos_json}
+    binario_para_json(nome_arquivo, convertidos['produtos'], convertidos['estoque'], convertidos['pedidos'])
+    for nome in arquivos_json:
+        # Comparados como valores: o peso volta como float (1 == 1.0).
+        with open(arquivos_json[nome], encoding='utf-8') as original, open(convertidos[nome], encoding='utf-8') as convertido:
+            assert json.load(convertido) == json.load(original)
+
+
+def test_arquivo_que_nao_e_snapshot(tmp_path):
+    nome_arquivo = tmp_path / 'estado.bin'
+    nome_arquivo.write_bytes(b'{"produtos": []}' + bytes(64))
+    with pytest.raises(ValueError):
+        SnapshotBinario(str(nome_arquivo))
@@ -0,0 +1,40 @@
+# Relatório de vencimentos: o índice de validade do estoque dá o mesmo resultado que a
+# conferência produto a produto, e o relatório não altera o estoque.
+from datetime import datetime, timedelta
+
+from Engradado import Engradado
+from Estoque import Estoque
+from Produto import CatalogoProdutos, Produto
+
+
+def _catalogo_e_estoque():
+    hoje = datetime.now()
+    validades = {'A': 10, 'B': 40, 'C': 30, 'D': 5}
+    catalogo = CatalogoProdutos(
+        Produto(codigo, '1', f"produto {codigo}", 1, (hoje + timedelta(days=dias)).strftime("%Y-%m-%d"),
+                '2025-01-01', 1, 2, 'f', 'f', 'c')
+        for codigo, dias in validades.items())
+    estoque = Estoque(3, 3, 3)
+    for codigo in 'ABCAE':
+        estoque.adicionar_engradado(Engradado(codigo, 4))
+    return catalogo, estoque
+
+
+def test_indice_e_conferencia_dao_o_mesmo_relatorio():
+    catalogo, estoque = _catalogo_e_estoque()
+    sem_indice = estoque.obter_produtos_proximos_vencimento(catalogo)
+    # O relatório não vincula o catálogo ao estoque.
+    assert estoque.validade('A') is None
+
+    estoque.vincular_catalogo(catalogo)
+    assert estoque.obter_produtos_proximos_vencimento(catalogo) == sem_indice
+    assert [item['codigo'] for item in sem_indice] == ['A', 'A', 'C']
+
+
+def test_obter_vencimentos_inclui_a_data_limite():
+    catalogo, estoque = _catalogo_e_estoque()
+    estoque.vincular_catalogo(catalogo)
+    data_c = catalogo.obter('C').data_validade
+    assert [codigo for _, codigo, _, _ in estoque.obter_vencimentos(data_c)] == ['A', 'C']
+    assert [(codigo, total, engradados) for _, codigo, total, engradados
+            in estoque.obter_vencimentos(data_c - timedelta(days=1))] == [('A', 8, 2)]
@@ -0,0 +1,86 @@
+# Visões materializadas (Visoes_relatorios.py): depois de qualquer sequência de operações,
+# cada visão devolve o mesmo que o relatório recalculado a partir do estoque e do histórico.
+import random
+from datetime import datetime, timedelta
+
+from Engradado import Engradado
+from Estoque import Estoque
+from Fila_de_Pedidos import FilaPedidos
+from Pedido import Pedido
+from Produto import CatalogoProdutos, Produto
+from Visoes_relatorios import RelatoriosMaterializados
+
+import pytest
+
+
+def produto(codigo, validade_em_dias):
+    validade = (datetime.now() + timedelta(days=validade_em_dias)).strftime("%Y-%m-%d")
+    return Produto(codigo, 'L', f"n{codigo}", 1, validade, '2025-01-01', 1, 2, 'f', 'f', 'c',
+                   capacidade_engradado=30)
+
+
+def conferir(relatorios, estoque, fila_pedidos, produtos):
+    codigos = [p.codigo for p in produtos] + ['X']
+    assert [relatorios.totais.total(c) for c in codigos] == [estoque.contar_por_produto(c) for c in codigos]
+
+    assert relatorios.itens_em_falta.itens() == estoque.obter_itens_em_falta(produtos)
+
+    # O relatório recalculado lista um item por engradado; a visão, um por produto.
+    recalculado = {}
+    for item in estoque.obter_produtos_proximos_vencimento(produtos, 30):
+        recalculado[item['codigo']] = recalculado.get(item['codigo'], 0) + item['quantidade_engradado']
+    vencendo = relatorios.vencimentos.vencendo(30)
+    assert {v['codigo']: v['total_em_estoque'] for v in vencendo} == recalculado
+    assert [v['data_validade'] for v in vencendo] == sorted(v['data_validade'] for v in vencendo)
+
+    volume = {}
+    for pedido in fila_pedidos.obter_historico_pedidos_atendidos():
+        volume[pedido.solicitante] = volume.get(pedido.solicitante, 0) + pedido.quantidade
+    assert relatorios.volume_por_cliente.unidades == volume
+    assert [r['unidades'] for r in relatorios.volume_por_cliente.ranking()] == sorted(volume.values(), reverse=True)
+
+
+@pytest.mark.parametrize('semente', [1, 2, 3])
+def test_visoes_iguais_aos_relatorios_recalculados(semente):
+    aleatorio = random.Random(semente)
+    produtos = CatalogoProdutos([produto(str(k), aleatorio.randint(-5, 90)) for k in range(8)])
+    estoque, fila_pedidos = Estoque(6, 6, 4), FilaPedidos()
+    relatorios = RelatoriosMaterializados(estoque, fila_pedidos, produtos)
+    for passo in range(1500):
+        sorteio = aleatorio.random()
+        # Códigos de 8 a 11 ainda não estão cadastrados: entram no estoque antes do catálogo.
+        codigo = str(aleatorio.randrange(12))
+        if sorteio < 0.35:
+            estoque.adicionar_engradado(Engradado(codigo, aleatorio.randint(1, 30)))
+        elif sorteio < 0.45:
+            estoque.remover_engradado(codigo, aleatorio.randint(1, 40))
+        elif sorteio < 0.65:
+            fila_pedidos.adicionar_pedido(Pedido(codigo, aleatorio.randint(1, 40), '2025-01-01',
+                                                 f"c{aleatorio.randrange(5)}"), estoque)
+        elif sorteio < 0.75:
+            fila_pedidos.processar_pedido(estoque)
+        elif sorteio < 0.8:
+            fila_pedidos.processar_lote(estoque, permitir_parcial=True)
+        elif sorteio < 0.83:
+            estoque.consolidar(produtos, max_movimentos=5)
+        elif sorteio < 0.84 and produtos.obter(codigo) is None:
+            produtos.adicionar(produto(codigo, aleatorio.randint(-5, 90)))
+        elif sorteio < 0.85:
+            estoque.carregar_serializavel(estoque.para_serializavel())
+        elif sorteio < 0.86:
+            dados = fila_pedidos.para_serializavel()
+            fila_pedidos.limpar()
+            fila_pedidos.carregar_serializavel(dados)
+        if passo % 50 == 0:
+            conferir(relatorios, estoque, fila_pedidos, produtos)
+    conferir(relatorios, estoque, fila_pedidos, produtos)
+
+
+def test_desvincular_para_de_acompanhar():
+    produtos = CatalogoProdutos([produto('A', 10)])
+    estoque, fila_pedidos = Estoque(), FilaPedidos()
+    relatorios = RelatoriosMaterializados(estoque, fila_pedidos, produtos)
+    estoque.adicionar_engradado(Engradado('A', 5))
+    relatorios.desvincular()
+    estoque.adicionar_engradado(Engradado('A', 5))
+    assert relatorios.totais.total('A') == 5